@@ -0,0 +1,311 @@
+"""
+Headless Runner
+Run data generation and workloads without the UI, keep a history of run reports and gate on regressions
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from core.async_engine import AsyncWorkload
+from core.config import Config
+from core.database import DatabaseManager, MongoDBManager, MySQLManager, PostgreSQLManager
+from core.exporter import MetricsExporter, error_class
+from core.generator import READ_QUERIES, SQLDataGenerator, operation_keys
+from core.history import RunHistory
+from core.keys import KeyTracker
+from core.metrics import OperationHistograms, OperationStats, WindowedStats
+from core.rate import RateLimiter
+from core.report import RunReport
+from core.sampler import SystemSampler
+from core.server_metrics import ServerMetricsCollector
+from core.storage import StorageGrowth
+from core.sweep import ParameterSweep
+from core.users import VirtualUserWorkload
+from core.workloads import WORKLOADS
+from core.ycsb import YCSBWorkload
+
+
+MANAGERS = {'mysql': MySQLManager, 'postgresql': PostgreSQLManager, 'mongodb': MongoDBManager}
+
+# Operations run statement by statement, as on the Data Generation page, and the workloads run through their classes
+STATEMENT_OPERATIONS = ('insert', 'update', 'delete', 'random', 'read', 'mixed')
+WORKLOAD_OPERATIONS = ('ycsb', 'users', 'async', 'lock', 'deadlock', 'transactions', 'sweep')
+
+
+def load_manager(path: str) -> DatabaseManager:
+    """Database manager from a JSON connection file ({"db_type": ..., "database": {...}, "ssh": {...}})."""
+    with open(path, encoding='utf-8') as handle:
+        config = json.load(handle)
+    manager = MANAGERS.get(config.get('db_type'))
+    if manager is None:
+        raise ValueError(f"Unknown db_type {config.get('db_type')!r}; expected one of {', '.join(MANAGERS)}")
+    config.setdefault('ssh', {'enabled': False})
+    return manager(config)
+
+
+def run_statements(db_manager: DatabaseManager, args: argparse.Namespace,
+                   exporter: Optional[MetricsExporter] = None) -> Dict[str, Any]:
+    """Execute generated statements one by one; returns the measurements for the run report."""
+    generator = SQLDataGenerator()
+    if args.operation != 'insert':
+        tracker = generator.get_tracker(args.table)
+        tracker.extend(db_manager.fetch_keys(args.table, limit=tracker.capacity))
+    
+    op_stats = OperationStats()
+    histograms = OperationHistograms()
+    timeline = WindowedStats(window=Config.REPORTS['timeline_window'])
+    error_classes = {}
+    rate_limiter = RateLimiter(args.rate, burst=args.batch_size) if args.rate else None
+    
+    for operations in generator.iter_operations(args.table, args.records, args.operation,
+                                                chunk_size=args.batch_size, multi_row=args.multi_row):
+        for op in operations:
+            result = db_manager.execute_query(op.sql)
+            duration = result.get('duration', 0.0)
+            if result.get('success'):
+                rows = result.get('rows_returned', 0) if op.kind in READ_QUERIES else result.get('affected_rows', 0)
+                op_stats.record(op.kind, rows, duration)
+                timeline.record(duration, target_rate=args.rate)
+                histograms.record(op.table, op.kind, duration, rows=len(operation_keys(op)))
+                if exporter is not None:
+                    exporter.record(op.table, op.kind, duration, rows)
+            else:
+                op_stats.record_error(op.kind)
+                timeline.record(0.0, error=True)
+                histograms.record_error(op.table, op.kind)
+                error = error_class(result.get('error'))
+                error_classes[error] = error_classes.get(error, 0) + 1
+                if exporter is not None:
+                    exporter.record_error(op.table, op.kind, result.get('error'))
+                if op.kind == 'insert':
+                    for key in operation_keys(op):
+                        generator.discard_key(op.table, key)
+        
+        if rate_limiter is not None:
+            rate_limiter.acquire(sum(len(operation_keys(op)) for op in operations))
+    
+    return {'op_stats': op_stats, 'timeline': timeline, 'histograms': histograms, 'error_classes': error_classes}
+
+
+def run_workload(db_manager: DatabaseManager, args: argparse.Namespace,
+                 exporter: Optional[MetricsExporter] = None) -> Dict[str, Any]:
+    """Run a YCSB, virtual user, async, contention or sweep workload; returns the measurements for the run report."""
+    rate_limiter = RateLimiter(args.rate) if args.rate else None
+    if args.operation in WORKLOADS:
+        workload = contention_workload(db_manager, args)
+    elif args.operation == 'sweep':
+        workload = ParameterSweep(db_manager, args.table, generator=SQLDataGenerator())
+    elif args.operation == 'ycsb':
+        tracker = KeyTracker()
+        tracker.extend(db_manager.fetch_keys(args.table, limit=tracker.capacity))
+        workload = YCSBWorkload(db_manager, args.table, preset=args.preset, operation_count=args.records,
+                                tracker=tracker)
+    elif args.operation == 'users':
+        workload = VirtualUserWorkload(db_manager, args.table, users=args.users, duration=args.duration,
+                                       rate_limiter=rate_limiter, exporter=exporter)
+        try:
+            return {'result': workload.run()}
+        finally:
+            workload.stop()
+    else:
+        workload = AsyncWorkload(db_manager, args.table, operation_count=args.records,
+                                 concurrency=args.concurrency, rate_limiter=rate_limiter, exporter=exporter)
+    return {'result': workload.run()}
+
+
+def contention_workload(db_manager: DatabaseManager, args: argparse.Namespace):
+    """Lock, deadlock or transactions workload on existing rows, built as on the Data Generation page."""
+    settings = Config.WORKLOADS[args.operation]
+    if args.operation == 'transactions':
+        key_limit = settings['key_sample']
+        return WORKLOADS['transactions'](db_manager, db_manager.fetch_keys('users', limit=key_limit),
+                                         db_manager.fetch_keys('products', limit=key_limit),
+                                         order_keys=db_manager.fetch_keys('orders', limit=key_limit),
+                                         sessions=args.sessions, duration=args.duration,
+                                         lock_timeout=args.lock_timeout, max_retries=args.max_retries)
+    if args.operation == 'lock':
+        hot_keys = args.hot_keys or settings['hot_keys']
+        keys = db_manager.fetch_keys(args.table, limit=hot_keys)
+        return WORKLOADS['lock'](db_manager, args.table, keys, sessions=args.sessions, hot_keys=hot_keys,
+                                 hold_time=args.hold_time, duration=args.duration, lock_timeout=args.lock_timeout)
+    pairs = args.pairs or settings['pairs']
+    keys = db_manager.fetch_keys(args.table, limit=2 * pairs)
+    return WORKLOADS['deadlock'](db_manager, args.table, keys, pairs=pairs, hold_time=args.hold_time,
+                                 duration=args.duration, lock_timeout=args.lock_timeout,
+                                 max_retries=args.max_retries)
+
+
+def command_run(args: argparse.Namespace) -> int:
+    """Run one configuration and write its report; exits non-zero when the run failed."""
+    db_manager = load_manager(args.connection)
+    db_manager.connect()
+    sampler = SystemSampler().start()
+    exporter = MetricsExporter(port=args.metrics_port).start() if args.metrics_port is not None else None
+    
+    settings = {name: value for name, value in vars(args).items() if name not in ('command', 'handler', 'connection')}
+    report = RunReport(settings, db_manager)
+    # Sweeps run without server metrics or storage measurement; transactions write to several tables
+    measured = args.operation != 'sweep'
+    collector = ServerMetricsCollector(db_manager).start() if args.server_metrics and measured else None
+    tables = Config.get_all_tables() if args.operation == 'transactions' else [args.table]
+    growth = StorageGrowth(db_manager, tables).start() if args.storage and measured else None
+    try:
+        if args.operation in STATEMENT_OPERATIONS:
+            measurements = run_statements(db_manager, args, exporter)
+        else:
+            measurements = run_workload(db_manager, args, exporter)
+    finally:
+        server_metrics = collector.stop() if collector is not None else None
+        storage = growth.stop() if growth is not None else None
+        sampler.stop()
+        if exporter is not None:
+            exporter.stop()
+    
+    report.finish(sampler=sampler, server_metrics=server_metrics, storage=storage, **measurements)
+    db_manager.disconnect()
+    paths = report.save(args.report_dir, html_report=args.html)
+    
+    summary = report.data['summary']
+    print(f"{report.data['id']}: {summary['operations']} operations, {summary['errors']} errors, "
+          f"{summary['throughput']:.1f} ops/s over {summary['duration']:.1f}s")
+    for path in paths:
+        print(f"Report written to {path}")
+    if not summary['success']:
+        return 1
+    if args.compare:
+        comparison = RunHistory(args.report_dir).compare(args.compare, report.data, thresholds(args))
+        print_comparison(comparison)
+        return 1 if comparison['regressed'] else 0
+    return 0
+
+
+def thresholds(args: argparse.Namespace) -> Dict[str, Any]:
+    """Regression thresholds given on the command line (the rest default to Config.HISTORY)."""
+    names = ('throughput_drop', 'latency_increase', 'latency_floor_ms', 'alpha')
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+
+def print_comparison(comparison: Dict[str, Any]) -> None:
+    """Print every check of a comparison, regressions flagged."""
+    print(f"Baseline {comparison['baseline']} vs {comparison['candidate']}")
+    for warning in comparison['warnings']:
+        print(f"  warning: {warning}")
+    for check in comparison['checks']:
+        name = f"{check['metric']} ({check['operation']})" if check['operation'] else check['metric']
+        if check['metric'] == 'error_rate':
+            change = f"{check['change'] * 100:+.2f} pts"
+        else:
+            change = f"{check['change'] * 100:+.1f}%"
+        p_value = f"p={check['p_value']:.3f}" if check['p_value'] is not None else "p=n/a"
+        status = 'REGRESSION' if check['regression'] else 'improved' if check['improvement'] else 'ok'
+        print(f"  {name:<32} {check['baseline']:>12.3f} -> {check['candidate']:>12.3f} {change:>12} "
+              f"{p_value:>9}  {status}")
+    print(f"{len(comparison['regressions'])} regression(s)")
+
+
+def command_history(args: argparse.Namespace) -> int:
+    """List archived runs, or pin or unpin the baseline."""
+    history = RunHistory(args.report_dir)
+    if args.unpin:
+        history.unpin()
+        print("Baseline unpinned")
+        return 0
+    if args.pin:
+        print(f"Baseline pinned: {history.pin(args.pin)}")
+        return 0
+    
+    for run in history.runs():
+        marker = '*' if run['baseline'] else ' '
+        print(f"{marker} {run['id']:<40} {str(run['database']):<11} {run['operations']:>10} ops "
+              f"{run['errors']:>7} errors {run['throughput']:>10.1f} ops/s {run['duration']:>8.1f}s")
+    return 0
+
+
+def command_compare(args: argparse.Namespace) -> int:
+    """Compare two runs; exits 1 on a regression."""
+    comparison = RunHistory(args.report_dir).compare(args.baseline, args.candidate, thresholds(args))
+    if args.json:
+        print(json.dumps(comparison, indent=2))
+    else:
+        print_comparison(comparison)
+    return 1 if comparison['regressed'] else 0
+
+
+def add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    """Regression threshold options (defaults from Config.HISTORY)."""
+    parser.add_argument('--throughput-drop', type=float, help="Throughput drop counted as a regression (0.05 = 5%%)")
+    parser.add_argument('--latency-increase', type=float, help="Latency percentile increase counted as a regression")
+    parser.add_argument('--latency-floor-ms', type=float, help="Latency changes smaller than this are noise")
+    parser.add_argument('--alpha', type=float, help="Significance level of the per-window Mann-Whitney test")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line parser."""
+    parser = argparse.ArgumentParser(description="Run data generation without the UI")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help="Run one configuration and write its report")
+    run.add_argument('--connection', required=True,
+                     help='JSON file: {"db_type": "mysql", "database": {"host", "port", "username", "password", '
+                          '"database"}, "ssh": {"enabled": false}}')
+    run.add_argument('--table', required=True, choices=Config.get_all_tables())
+    run.add_argument('--operation', default='insert', choices=STATEMENT_OPERATIONS + WORKLOAD_OPERATIONS)
+    run.add_argument('--records', type=int, default=1000, help="Statements (or workload operations) to run")
+    run.add_argument('--batch-size', type=int, default=Config.PERFORMANCE['batch_size'])
+    run.add_argument('--multi-row', action='store_true', help="Send each INSERT batch as one statement")
+    run.add_argument('--rate', type=float, help="Cap on operations per second (uncapped if omitted)")
+    run.add_argument('--preset', default='A', choices=list(Config.YCSB['workloads']), help="YCSB core workload")
+    run.add_argument('--users', type=int, default=Config.VIRTUAL_USERS['users'], help="Peak virtual users")
+    run.add_argument('--duration', type=float,
+                     help="Run time in seconds of the users, lock, deadlock and transactions workloads "
+                          "(Config default per workload if omitted)")
+    run.add_argument('--concurrency', type=int, default=Config.ASYNC_ENGINE['concurrency'],
+                     help="Async client tasks")
+    run.add_argument('--sessions', type=int, help="Concurrent sessions of the lock and transactions workloads")
+    run.add_argument('--hot-keys', type=int, help="Existing rows the lock workload's sessions compete for")
+    run.add_argument('--pairs', type=int, help="Session pairs of the deadlock workload")
+    run.add_argument('--hold-time', type=float, help="Seconds a lock or deadlock transaction holds its row locks")
+    run.add_argument('--lock-timeout', type=int, help="Lock wait timeout in seconds of the contention workloads")
+    run.add_argument('--max-retries', type=int,
+                     help="Retries of deadlocked or timed out deadlock and transactions workloads")
+    run.add_argument('--server-metrics', action='store_true', help="Capture server metrics during the run")
+    run.add_argument('--storage', action='store_true', help="Measure storage growth")
+    run.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this port during the run")
+    run.add_argument('--report-dir', default=Config.REPORTS['directory'])
+    run.add_argument('--html', action='store_true', help="Also write an HTML report")
+    run.add_argument('--compare', metavar='BASELINE',
+                     help="Compare the run with this run ('baseline' for the pinned one); exit 1 on regression")
+    add_threshold_arguments(run)
+    run.set_defaults(handler=command_run)
+    
+    history = commands.add_parser('history', help="List archived runs, or pin the baseline")
+    history.add_argument('--report-dir', default=Config.REPORTS['directory'])
+    history.add_argument('--pin', metavar='RUN', help="Pin a run (id, 'latest' or report path) as the baseline")
+    history.add_argument('--unpin', action='store_true', help="Forget the pinned baseline")
+    history.set_defaults(handler=command_history)
+    
+    compare = commands.add_parser('compare', help="Compare two runs; exit 1 on regression")
+    compare.add_argument('baseline', nargs='?', default='baseline',
+                         help="Baseline run: id, report path, 'baseline' (pinned, the default) or 'previous'")
+    compare.add_argument('candidate', nargs='?', default='latest', help="Run to check (the latest by default)")
+    compare.add_argument('--report-dir', default=Config.REPORTS['directory'])
+    compare.add_argument('--json', action='store_true', help="Print the comparison as JSON")
+    add_threshold_arguments(compare)
+    compare.set_defaults(handler=command_compare)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point; returns the process exit code (2 when a run or report cannot be found)."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
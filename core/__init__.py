@@ -1,6 +1,25 @@
 # Core package initialization
 from .database import DatabaseManager, MySQLManager, PostgreSQLManager, MongoDBManager
 from .generator import SQLDataGenerator, MultiCoreGenerator, PerformanceMonitor
+from .writer import SQLWriter
+from .pools import ValuePool, ValuePools
+from .unique import FeistelPermutation, UniqueCounter, UniqueValues
+from .keys import KeyRegistry, KeyRegistrySet, KeyTracker
+from .distributions import UniformChooser, ZipfianChooser, HotspotChooser, LatestChooser
+from .metrics import LatencyStats
+from .workloads import LockContentionWorkload, DeadlockWorkload, OrderTransactionWorkload
+from .ycsb import YCSBWorkload
+from .users import VirtualUserWorkload
+from .rate import RateLimiter
+from .async_engine import AsyncWorkload
+from .sweep import ParameterSweep
+from .adaptive import AdaptiveBatchSizer
+from .sampler import SystemSampler
+from .server_metrics import ServerMetricsCollector
+from .storage import StorageGrowth
+from .exporter import MetricsExporter
+from .report import RunReport
+from .history import RunHistory
 from .config import Config
 
 __all__ = [
@@ -11,5 +30,34 @@ __all__ = [
     'SQLDataGenerator',
     'MultiCoreGenerator',
     'PerformanceMonitor',
+    'SQLWriter',
+    'ValuePool',
+    'ValuePools',
+    'FeistelPermutation',
+    'UniqueCounter',
+    'UniqueValues',
+    'KeyRegistry',
+    'KeyRegistrySet',
+    'KeyTracker',
+    'UniformChooser',
+    'ZipfianChooser',
+    'HotspotChooser',
+    'LatestChooser',
+    'LatencyStats',
+    'LockContentionWorkload',
+    'DeadlockWorkload',
+    'OrderTransactionWorkload',
+    'YCSBWorkload',
+    'VirtualUserWorkload',
+    'RateLimiter',
+    'AsyncWorkload',
+    'ParameterSweep',
+    'AdaptiveBatchSizer',
+    'SystemSampler',
+    'ServerMetricsCollector',
+    'StorageGrowth',
+    'MetricsExporter',
+    'RunReport',
+    'RunHistory',
     'Config'
 ]
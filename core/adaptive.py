@@ -0,0 +1,146 @@
+"""
+Adaptive Batching
+AIMD batch size controller driven by per-batch latency, errors and server throttling
+"""
+
+import re
+from typing import Any, Dict, Optional, Union
+
+from .config import Config
+
+
+# Server overload codes: MySQL too many connections / user connection and resource limits,
+# PostgreSQL too_many_connections, insufficient_resources, configuration_limit_exceeded, cannot_connect_now
+THROTTLING_ERRORS = {1040, 1203, 1226, '53300', '53000', '53400', '57P03'}
+
+# Fallback for errors that only survive as text
+THROTTLING_MESSAGES = ('too many connections', 'too many clients', 'resource limit', 'out of memory',
+                       'the database system is starting up')
+
+
+def is_throttling(error: Union[Exception, str, None]) -> bool:
+    """Whether a driver exception or error message means the server is shedding load."""
+    if error is None:
+        return False
+    
+    if isinstance(error, Exception):
+        code = getattr(error, 'pgcode', None)
+        if code is None and error.args and isinstance(error.args[0], int):
+            code = error.args[0]
+        if code in THROTTLING_ERRORS:
+            return True
+        error = str(error)
+    
+    # pymysql errors render as "(1040, 'Too many connections')"
+    match = re.match(r'\((\d+),', error)
+    if match and int(match.group(1)) in THROTTLING_ERRORS:
+        return True
+    return any(message in error.lower() for message in THROTTLING_MESSAGES)
+
+
+class AdaptiveBatchSizer:
+    """
+    Additive-increase / multiplicative-decrease batch size controller.
+    
+    After every batch the caller reports how many rows it carried, how long
+    it took and whether it failed. A clean batch under ``target_latency``
+    grows the next one by ``increase`` rows; a slow or failed batch
+    multiplies the size by ``decrease``. Throttling errors also shrink the
+    batch and return a pause that doubles on each consecutive throttled
+    batch (up to ``max_backoff``), so an overloaded server gets room to
+    recover. The size converges to the largest batch that still meets the
+    latency target.
+    """
+    
+    def __init__(self, initial: Optional[int] = None, min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, target_latency: Optional[float] = None,
+                 increase: Optional[int] = None, decrease: Optional[float] = None,
+                 backoff: Optional[float] = None, max_backoff: Optional[float] = None):
+        """
+        Initialize batch sizer (unset options default to Config.ADAPTIVE_BATCH)
+        
+        Args:
+            initial: Starting batch size (defaults to Config.PERFORMANCE['batch_size'])
+            min_size: Smallest batch size
+            max_size: Largest batch size
+            target_latency: Batch latency to hold, in seconds
+            increase: Rows added after a batch under target
+            decrease: Factor applied after a slow or failed batch (0-1)
+            backoff: First pause after a throttled batch, in seconds
+            max_backoff: Longest pause, in seconds
+        """
+        settings = Config.ADAPTIVE_BATCH
+        self.min_size = min_size or settings['min_size']
+        self.max_size = max_size or settings['max_size']
+        if not 1 <= self.min_size <= self.max_size:
+            raise ValueError("Batch size bounds must satisfy 1 <= min_size <= max_size")
+        
+        self.target_latency = target_latency or settings['target_latency']
+        self.increase = increase or settings['increase']
+        self.decrease = decrease or settings['decrease']
+        if not 0 < self.decrease < 1:
+            raise ValueError("Decrease factor must be between 0 and 1")
+        self.backoff = settings['backoff'] if backoff is None else backoff
+        self.max_backoff = settings['max_backoff'] if max_backoff is None else max_backoff
+        
+        self._size = float(self._clamp(initial or Config.PERFORMANCE['batch_size']))
+        self._pause = 0.0
+        self.history = []
+    
+    def _clamp(self, size: float) -> float:
+        """Keep a size within the bounds."""
+        return min(self.max_size, max(self.min_size, size))
+    
+    @property
+    def batch_size(self) -> int:
+        """Rows to put in the next batch."""
+        return int(self._size)
+    
+    def observe(self, rows: int, seconds: float, errors: int = 0, throttled: bool = False) -> float:
+        """
+        Adjust the batch size after a batch
+        
+        Args:
+            rows: Rows the batch carried
+            seconds: Batch latency
+            errors: Failed statements in the batch
+            throttled: Whether any failure was a throttling error (see is_throttling)
+        
+        Returns:
+            Seconds to pause before the next batch (0 unless throttled)
+        """
+        if throttled:
+            self._pause = min(self.max_backoff, self._pause * 2 if self._pause else self.backoff)
+            action = 'backoff'
+        else:
+            self._pause = 0.0
+            action = 'decrease' if errors or seconds > self.target_latency else 'increase'
+        
+        if action == 'increase':
+            self._size = self._clamp(self._size + self.increase)
+        else:
+            self._size = self._clamp(self._size * self.decrease)
+        
+        self.history.append({
+            'batch': len(self.history) + 1,
+            'rows': rows,
+            'latency_ms': seconds * 1000,
+            'throughput': rows / seconds if seconds > 0 else 0.0,
+            'errors': errors,
+            'action': action,
+            'next_batch_size': self.batch_size
+        })
+        return self._pause
+    
+    def summary(self) -> Dict[str, Any]:
+        """Final batch size, range of sizes used and how often each action fired."""
+        sizes = [entry['rows'] for entry in self.history]
+        actions = [entry['action'] for entry in self.history]
+        return {
+            'batch_size': self.batch_size,
+            'min_used': min(sizes, default=0),
+            'max_used': max(sizes, default=0),
+            'increases': actions.count('increase'),
+            'decreases': actions.count('decrease'),
+            'backoffs': actions.count('backoff')
+        }
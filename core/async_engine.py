@@ -0,0 +1,332 @@
+"""
+Async Engine
+Asyncio execution of generated operations over a pool of async driver connections
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import Config
+from .database import DatabaseManager, MongoDBManager, MySQLManager, PostgreSQLManager
+from .generator import READ_QUERIES, SQLDataGenerator, Operation
+from .metrics import LatencyStats, OperationStats, WindowedStats, find_knee
+from .rate import RateLimiter
+from .shapes import ShapedRateLimiter
+from .writer import TABLE_COLUMNS
+
+
+def _endpoint(db_manager: DatabaseManager) -> Tuple[str, int]:
+    """Host and port to connect to, going through the manager's SSH tunnel when it has one open."""
+    if db_manager.tunnel is not None:
+        return '127.0.0.1', db_manager.tunnel.local_bind_port
+    db_config = db_manager.config.get('database', {})
+    return db_config['host'], db_config['port']
+
+
+def _import_driver(module: str):
+    """Import an optional async driver, with an install hint when it is missing."""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(f"The async engine needs the optional '{module}' package (pip install {module})")
+
+
+class AsyncMySQLDriver:
+    """Runs SQL operations with aiomysql."""
+    
+    module = 'aiomysql'
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """Initialize aiomysql driver"""
+        self.db_manager = db_manager
+    
+    async def connect(self):
+        """Open one autocommit connection."""
+        aiomysql = _import_driver(self.module)
+        host, port = _endpoint(self.db_manager)
+        db_config = self.db_manager.config['database']
+        return await aiomysql.connect(host=host, port=port, user=db_config['username'],
+                                      password=db_config['password'], db=db_config.get('database'),
+                                      autocommit=True, connect_timeout=10)
+    
+    async def execute(self, connection, op: Operation, row: Tuple) -> int:
+        """Run one operation; returns rows returned (reads) or affected (writes)."""
+        async with connection.cursor() as cursor:
+            affected = await cursor.execute(op.sql)
+            if op.kind in READ_QUERIES:
+                return len(await cursor.fetchall())
+            return affected
+    
+    async def close(self, connection) -> None:
+        """Close a connection."""
+        connection.close()
+
+
+class AsyncPostgreSQLDriver:
+    """Runs SQL operations with asyncpg."""
+    
+    module = 'asyncpg'
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """Initialize asyncpg driver"""
+        self.db_manager = db_manager
+    
+    async def connect(self):
+        """Open one connection (asyncpg autocommits outside explicit transactions)."""
+        asyncpg = _import_driver(self.module)
+        host, port = _endpoint(self.db_manager)
+        db_config = self.db_manager.config['database']
+        return await asyncpg.connect(host=host, port=port, user=db_config['username'],
+                                     password=db_config['password'], database=db_config.get('database'),
+                                     timeout=10)
+    
+    async def execute(self, connection, op: Operation, row: Tuple) -> int:
+        """Run one operation; returns rows returned (reads) or affected (writes)."""
+        if op.kind in READ_QUERIES:
+            return len(await connection.fetch(op.sql))
+        # Command tag, e.g. 'INSERT 0 1' or 'UPDATE 3'; the last number is the row count
+        status = await connection.execute(op.sql)
+        match = re.search(r'(\d+)$', status or '')
+        return int(match.group(1)) if match else 0
+    
+    async def close(self, connection) -> None:
+        """Close a connection."""
+        await connection.close()
+
+
+class AsyncMongoDriver:
+    """
+    Runs operations as MongoDB document operations with motor.
+    
+    Inserts, updates, deletes and point lookups map onto collection calls;
+    the other read queries are SQL-only and count as errors.
+    """
+    
+    module = 'motor'
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """Initialize motor driver"""
+        self.db_manager = db_manager
+        self.db_name = db_manager.config['database'].get('database', 'testdb')
+    
+    async def connect(self):
+        """Open one client (each client keeps its own connection pool)."""
+        _import_driver(self.module)
+        from motor.motor_asyncio import AsyncIOMotorClient
+        
+        host, port = _endpoint(self.db_manager)
+        db_config = self.db_manager.config['database']
+        connection_string = (f"mongodb://{db_config['username']}:{db_config['password']}@{host}:{port}/"
+                             f"{db_config.get('database', 'admin')}")
+        return AsyncIOMotorClient(connection_string, serverSelectionTimeoutMS=10000)
+    
+    async def execute(self, connection, op: Operation, row: Tuple) -> int:
+        """Run one operation; returns documents returned or affected."""
+        collection = connection[self.db_name][op.table]
+        columns = TABLE_COLUMNS[op.table]
+        
+        if op.kind == 'insert':
+            await collection.insert_one(dict(zip(columns, row)))
+            return 1
+        if op.kind == 'update':
+            result = await collection.update_one({columns[0]: op.key}, {'$set': dict(zip(columns[1:], row[1:]))})
+            return result.modified_count
+        if op.kind == 'delete':
+            return (await collection.delete_one({columns[0]: op.key})).deleted_count
+        if op.kind == 'point_lookup':
+            return 0 if await collection.find_one({columns[0]: op.key}) is None else 1
+        
+        raise ValueError(f"The {op.kind} query is not supported on MongoDB")
+    
+    async def close(self, connection) -> None:
+        """Close a client."""
+        connection.close()
+
+
+def driver_for(db_manager: DatabaseManager):
+    """Pick the async driver matching a database manager."""
+    if isinstance(db_manager, MySQLManager):
+        return AsyncMySQLDriver(db_manager)
+    if isinstance(db_manager, PostgreSQLManager):
+        return AsyncPostgreSQLDriver(db_manager)
+    if isinstance(db_manager, MongoDBManager):
+        return AsyncMongoDriver(db_manager)
+    raise ValueError(f"No async driver for {db_manager.db_type}")
+
+
+class AsyncWorkload:
+    """
+    Many concurrent clients driven by one asyncio event loop.
+    
+    ``concurrency`` tasks each loop: wait for the shared rate limiter,
+    generate an operation, borrow a connection from a pool of
+    ``connections``, execute it and return the connection. Tasks beyond the
+    pool size queue for a connection, as clients of an application's
+    connection pool would; the wait is reported as pool wait. Statements
+    come from the same generator (and key trackers) as the sync path.
+    """
+    
+    name = 'async'
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, operation: str = 'insert',
+                 operation_count: Optional[int] = 1000, concurrency: Optional[int] = None,
+                 connections: Optional[int] = None, generator: Optional[SQLDataGenerator] = None,
+                 rate_limiter: Optional[RateLimiter] = None, driver=None, exporter=None):
+        """
+        Initialize async workload (unset options default to Config.ASYNC_ENGINE)
+        
+        Args:
+            db_manager: Connected manager whose settings the async connections reuse
+            table_name: Table to run on
+            operation: Generator operation: insert, update, delete, random, read, mixed or a read query class
+            operation_count: Number of operations to run (None: until the rate limiter's profile finishes)
+            concurrency: Concurrent client tasks
+            connections: Size of the connection pool the tasks share
+            generator: Statement generator (a default one if omitted)
+            rate_limiter: Caps operations per second, e.g. following a load shape (uncapped if omitted)
+            driver: Async driver (picked from the manager's database type if omitted)
+            exporter: MetricsExporter also counting every operation
+        """
+        settings = Config.ASYNC_ENGINE
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.operation = operation
+        self.operation_count = operation_count
+        self.concurrency = concurrency or settings['concurrency']
+        self.connections = min(connections or settings['connections'], self.concurrency)
+        self.generator = generator if generator is not None else SQLDataGenerator()
+        self.row_func, _ = self.generator.get_row_generator(table_name)
+        self.rate_limiter = rate_limiter
+        self.driver = driver if driver is not None else driver_for(db_manager)
+        self.exporter = exporter
+        
+        self.stats = OperationStats()
+        self.pool_wait = LatencyStats()
+        self.windows = WindowedStats()
+        self.last_error = None
+        # Client tasks queued for a pool connection
+        self.waiting = 0
+        self._issued = 0
+        self._stopped = False
+    
+    def stop(self) -> None:
+        """Stop issuing new operations; in-flight ones finish."""
+        self._stopped = True
+    
+    async def _client(self, pool: asyncio.Queue, progress: Optional[Callable[[Dict[str, Any]], None]],
+                      started: float) -> None:
+        """One client task: issue operations until the operation count is reached or the rate profile ends."""
+        limiter = self.rate_limiter
+        while not self._stopped and (self.operation_count is None or self._issued < self.operation_count):
+            if limiter is not None:
+                await limiter.acquire_async()
+                if limiter.finished:
+                    break
+            self._issued += 1
+            
+            # The event loop is single-threaded, so the generator needs no lock
+            row = self.row_func()
+            op = self.generator.generate_operation(self.table_name, row, self.operation)
+            
+            wait_start = time.perf_counter()
+            self.waiting += 1
+            connection = await pool.get()
+            self.waiting -= 1
+            start = time.perf_counter()
+            self.pool_wait.record(start - wait_start)
+            try:
+                rows = await self.driver.execute(connection, op, row)
+                elapsed = time.perf_counter() - start
+                self.stats.record(op.kind, rows, elapsed)
+                self.windows.record(elapsed, target_rate=limiter.rate if limiter is not None else None)
+                if self.exporter is not None:
+                    self.exporter.record(op.table, op.kind, elapsed, rows)
+            except Exception as e:
+                self.stats.record_error(op.kind)
+                self.windows.record(0.0, error=True)
+                if self.exporter is not None:
+                    self.exporter.record_error(op.table, op.kind, e)
+                self.last_error = str(e)
+                if op.kind == 'insert':
+                    self.generator.discard_key(op.table, op.key)
+            finally:
+                pool.put_nowait(connection)
+            
+            if progress is not None and self._issued % 1000 == 0:
+                progress(self._report(time.perf_counter() - started))
+    
+    async def run_async(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run the workload inside a running event loop (see run)."""
+        self.stats = OperationStats()
+        self.pool_wait = LatencyStats()
+        self.last_error = None
+        self.waiting = 0
+        self._issued = 0
+        self._stopped = False
+        if self.operation_count is None and not isinstance(self.rate_limiter, ShapedRateLimiter):
+            return {'success': False, 'error': "An open-ended run needs a load shape to end it"}
+        
+        opened = await asyncio.gather(*(self.driver.connect() for _ in range(self.connections)),
+                                      return_exceptions=True)
+        pool = asyncio.Queue()
+        for connection in opened:
+            if isinstance(connection, Exception):
+                self.last_error = str(connection)
+            else:
+                pool.put_nowait(connection)
+        
+        if pool.empty():
+            return {'success': False, 'error': f"No async connections could be opened: {self.last_error}"}
+        
+        started = time.perf_counter()
+        self.windows = WindowedStats(started=started)
+        try:
+            await asyncio.gather(*(self._client(pool, progress, started) for _ in range(self.concurrency)))
+        finally:
+            while not pool.empty():
+                try:
+                    await self.driver.close(pool.get_nowait())
+                except Exception:
+                    pass
+        
+        report = self._report(time.perf_counter() - started)
+        report['connections'] = sum(1 for connection in opened if not isinstance(connection, Exception))
+        return report
+    
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run the workload to completion on a new event loop
+        
+        Args:
+            progress: Called every 1000 operations, from the event loop thread, with a partial report
+        
+        Returns:
+            Throughput, per-operation latency and connection pool wait report
+        """
+        return asyncio.run(self.run_async(progress))
+    
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        """Build the standard report."""
+        summary = self.stats.summary()
+        operations = sum(entry['count'] for entry in summary.values())
+        errors = sum(entry['errors'] for entry in summary.values())
+        windows = self.windows.windows()
+        return {
+            'success': errors == 0,
+            'workload': self.name,
+            'database': self.db_manager.db_type,
+            'table': self.table_name,
+            'concurrency': self.concurrency,
+            'connections': self.connections,
+            'operations': operations,
+            'errors': errors,
+            'duration': elapsed,
+            'throughput': operations / elapsed if elapsed > 0 else 0.0,
+            'operations_by_kind': summary,
+            'pool_wait': self.pool_wait.summary(),
+            'windows': windows,
+            'knee': find_knee(windows),
+            'error': self.last_error
+        }
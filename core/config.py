@@ -62,8 +62,8 @@ class Config:
             "columns": [
                 {"name": "id", "type": "VARCHAR(36)", "primary": True},
                 {"name": "order_number", "type": "VARCHAR(20)"},
-                {"name": "user_id", "type": "VARCHAR(36)"},
-                {"name": "product_id", "type": "VARCHAR(36)"},
+                {"name": "user_id", "type": "VARCHAR(36)", "references": "users"},
+                {"name": "product_id", "type": "VARCHAR(36)", "references": "products"},
                 {"name": "quantity", "type": "INT"},
                 {"name": "unit_price", "type": "DECIMAL(10,2)"},
                 {"name": "subtotal", "type": "DECIMAL(10,2)"},
@@ -85,8 +85,15 @@ class Config:
         "✏️ UPDATE Only": "update",
         "🗑️ DELETE Only": "delete",
         "🎲 Random Mix": "random",
+        "🔍 SELECT Only": "read",
+        "⚖️ Read/Write Mix": "mixed",
+        "📊 YCSB Preset": "ycsb",
         "🔒 Lock Simulation": "lock",
-        "⚠️ Deadlock Simulation": "deadlock"
+        "⚠️ Deadlock Simulation": "deadlock",
+        "🛒 Order Transactions": "transactions",
+        "👥 Virtual Users": "users",
+        "🚀 Async High Concurrency": "async",
+        "🧪 Parameter Sweep": "sweep"
     }
     
     # Operation Descriptions
@@ -95,8 +102,15 @@ class Config:
         "update": "Update existing records",
         "delete": "Delete records from the database",
         "random": "Random mix of INSERT, UPDATE, and DELETE operations",
+        "read": "Point lookups, range scans, joins and top-N queries on existing rows",
+        "mixed": "Reads and writes at a configurable read/write ratio",
+        "ycsb": "Standard YCSB core workload mixes (A-F) for cross-database comparison",
         "lock": "Simulate row-level locks with SELECT FOR UPDATE",
-        "deadlock": "Simulate deadlock scenarios for testing"
+        "deadlock": "Simulate deadlock scenarios for testing",
+        "transactions": "TPC-C-lite new-order and payment transactions across orders, products and users",
+        "users": "Ramp virtual users up and down, each on its own connection with think time between operations",
+        "async": "Thousands of concurrent clients on one asyncio event loop over a shared connection pool",
+        "sweep": "Short insert trials over batch size, workers, commit interval and statement style to find the fastest setup"
     }
     
     # Performance Settings
@@ -109,6 +123,220 @@ class Config:
         "retry_delay": 0.1
     }
     
+    # Value Pools (Faker-backed, cached on disk and memory-mapped)
+    VALUE_POOLS = {
+        "cache_dir": "~/.cache/dummydb/pools",
+        "locales": ["en_US", "en_GB", "en_CA", "en_AU", "en_IN"],
+        "seed": 0,
+        "sizes": {
+            "first_names": 5000,
+            "last_names": 5000,
+            "cities": 20000,
+            "companies": 50000,
+            "email_domains": 5000
+        }
+    }
+    
+    # Unique Values (persisted row counter high-water mark, indexes leased per block)
+    UNIQUE_VALUES = {
+        "counter_file": "~/.cache/dummydb/unique_counter",
+        "block": 10000
+    }
+    
+    # Key Registry (primary keys of generated rows, shared with worker processes)
+    KEY_REGISTRY = {
+        "capacity": 1000000
+    }
+    
+    # Key Tracker (live keys targeted by UPDATE and DELETE operations)
+    KEY_TRACKER = {
+        "capacity": 1000000
+    }
+    
+    # Key Access Distributions (default parameters per distribution)
+    ACCESS_DISTRIBUTIONS = {
+        "uniform": {},
+        "zipfian": {"theta": 0.99},
+        "hotspot": {"hot_data_fraction": 0.2, "hot_op_fraction": 0.8},
+        "latest": {"theta": 0.99}
+    }
+    
+    # Think Time Distributions (default parameters in seconds per distribution)
+    THINK_TIMES = {
+        "constant": {"seconds": 0.5},
+        "uniform": {"low": 0.1, "high": 1.0},
+        "exponential": {"mean": 0.5},
+        "normal": {"mean": 0.5, "stddev": 0.15}
+    }
+    
+    # Virtual Users (peak users, ramps, operation script weights and think time)
+    VIRTUAL_USERS = {
+        "users": 20,
+        "duration": 60,
+        "ramp_up": 10,
+        "ramp_down": 5,
+        "sample_interval": 0.5,
+        "script": {
+            "point_lookup": 50,
+            "range_scan": 10,
+            "insert": 20,
+            "update": 15,
+            "delete": 5
+        },
+        "think_time": {"name": "exponential", "mean": 0.5}
+    }
+    
+    # Async Engine (client tasks and the connection pool they share)
+    ASYNC_ENGINE = {
+        "concurrency": 1000,
+        "connections": 100
+    }
+    
+    # Adaptive Batching (AIMD bounds and steps; latencies and pauses in seconds)
+    ADAPTIVE_BATCH = {
+        "min_size": 1,
+        "max_size": 10000,
+        "target_latency": 0.5,
+        "increase": 10,
+        "decrease": 0.5,
+        "backoff": 0.5,
+        "max_backoff": 10.0
+    }
+    
+    # Parameter Sweep (values tried per dimension and rows inserted by each trial)
+    SWEEP = {
+        "batch_sizes": [1, 10, 100, 1000],
+        "workers": [1, 2, 4, 8],
+        "commit_intervals": [1, 100, 1000],
+        "styles": ["single", "multi_row", "executemany", "copy"],
+        "trial_rows": 2000,
+        "strategy": "grid",
+        "cleanup": True
+    }
+    
+    # Load Shapes (target rate profiles; rates in operations/s, times in seconds)
+    LOAD_SHAPES = {
+        "ramp": {"start_rate": 10, "end_rate": 1000, "duration": 300},
+        "step": {"start_rate": 100, "step_rate": 100, "step_duration": 60, "steps": 10},
+        "sine": {"base_rate": 500, "amplitude": 400, "period": 86400},
+        "spike": {"base_rate": 100, "spike_rate": 1000, "interval": 60, "spike_duration": 5, "duration": 600},
+        "soak": {"rate": 200, "duration": 14400}
+    }
+    
+    # Run Metrics (time window length, the p95 growth that marks the latency knee, histogram
+    # range in seconds and precision, the sliding window behind live percentiles and speed,
+    # the precision of per-window latency, and the latency percentiles every summary reports
+    # and run comparisons check)
+    METRICS = {
+        "window": 5,
+        "knee_factor": 3.0,
+        "histogram_highest": 3600,
+        "histogram_digits": 2,
+        "sliding_highest": 60,
+        "sliding_window": 10,
+        "sliding_slots": 5,
+        "window_digits": 1,
+        "percentiles": [50, 90, 95, 99, 99.9]
+    }
+    
+    # System Sampler (seconds between client resource samples, samples kept)
+    SYSTEM_SAMPLER = {
+        "interval": 1.0,
+        "capacity": 900
+    }
+    
+    # Server Metrics (seconds between server statistics polls, statement digests reported)
+    SERVER_METRICS = {
+        "interval": 1.0,
+        "top_statements": 10
+    }
+    
+    # Metrics Exporter (Prometheus endpoint on localhost, metric name prefix, latency buckets in seconds)
+    EXPORTER = {
+        "host": "127.0.0.1",
+        "port": 9464,
+        "prefix": "datagen",
+        "buckets": [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+    }
+    
+    # Run Reports (archive directory, timeline window in seconds)
+    REPORTS = {
+        "directory": "reports",
+        "timeline_window": 1
+    }
+    
+    # Run History (pinned baseline file in the report directory; regression thresholds as fractions,
+    # latency noise floor in ms, significance level and the fewest timeline windows tested)
+    HISTORY = {
+        "baseline_file": "BASELINE",
+        "throughput_drop": 0.05,
+        "latency_increase": 0.10,
+        "latency_floor_ms": 0.5,
+        "error_rate_increase": 0.01,
+        "alpha": 0.05,
+        "min_windows": 5
+    }
+    
+    # Read Workloads (query class weights and query shapes)
+    READS = {
+        "query_mix": {
+            "point_lookup": 0.6,
+            "range_scan": 0.2,
+            "join": 0.15,
+            "top_n": 0.05
+        },
+        "read_ratio": 0.8,
+        "range_column": "created_at",
+        "range_window_hours": 24,
+        "range_limit": 100,
+        "top_n": 10
+    }
+    
+    # YCSB Core Workloads (operation proportions and request distribution per preset)
+    YCSB = {
+        "max_scan_length": 100,
+        "workloads": {
+            "A": {"name": "Update heavy", "proportions": {"read": 0.5, "update": 0.5}, "distribution": "zipfian"},
+            "B": {"name": "Read mostly", "proportions": {"read": 0.95, "update": 0.05}, "distribution": "zipfian"},
+            "C": {"name": "Read only", "proportions": {"read": 1.0}, "distribution": "zipfian"},
+            "D": {"name": "Read latest", "proportions": {"read": 0.95, "insert": 0.05}, "distribution": "latest"},
+            "E": {"name": "Short ranges", "proportions": {"scan": 0.95, "insert": 0.05}, "distribution": "zipfian"},
+            "F": {"name": "Read-modify-write", "proportions": {"read": 0.5, "read_modify_write": 0.5},
+                  "distribution": "zipfian"}
+        }
+    }
+    
+    # Multi-session Workloads (lock / deadlock / transactions operations)
+    WORKLOADS = {
+        "lock": {
+            "sessions": 8,
+            "hot_keys": 10,
+            "keys_per_transaction": 2,
+            "hold_time": 0.05,
+            "duration": 30,
+            "lock_timeout": 5,
+            "sample_interval": 0.5
+        },
+        "deadlock": {
+            "pairs": 4,
+            "hold_time": 0.05,
+            "duration": 30,
+            "lock_timeout": 5,
+            "max_backoff": 1.0,
+            "sample_interval": 0.5
+        },
+        "transactions": {
+            "sessions": 8,
+            "duration": 30,
+            "new_order_ratio": 0.5,
+            "max_lines": 5,
+            "key_sample": 10000,
+            "lock_timeout": 5,
+            "max_backoff": 1.0,
+            "sample_interval": 0.5
+        }
+    }
+    
     # UI Settings
     UI = {
         "page_icon": "⚡",
@@ -135,6 +363,45 @@ class Config:
         """Get list of all table names"""
         return list(Config.TABLE_SCHEMAS.keys())
     
+    @staticmethod
+    def get_table_references(table_name: str) -> Dict[str, str]:
+        """Get foreign key columns of a table mapped to the tables they reference"""
+        columns = Config.TABLE_SCHEMAS.get(table_name, {}).get("columns", [])
+        return {col["name"]: col["references"] for col in columns if col.get("references")}
+    
+    @staticmethod
+    def get_referenced_tables() -> List[str]:
+        """Get tables whose keys are referenced by other tables"""
+        referenced = []
+        for table_name in Config.TABLE_SCHEMAS:
+            for target in Config.get_table_references(table_name).values():
+                if target not in referenced:
+                    referenced.append(target)
+        return referenced
+    
+    @staticmethod
+    def get_load_order(tables: List[str] = None) -> List[str]:
+        """Order tables so referenced tables are loaded before the tables referencing them"""
+        tables = list(Config.TABLE_SCHEMAS.keys()) if tables is None else list(tables)
+        ordered = []
+        visiting = set()
+        
+        def visit(table_name: str) -> None:
+            if table_name in ordered:
+                return
+            if table_name in visiting:
+                raise ValueError(f"Circular table references involving: {table_name}")
+            visiting.add(table_name)
+            for target in Config.get_table_references(table_name).values():
+                if target in tables:
+                    visit(target)
+            visiting.discard(table_name)
+            ordered.append(table_name)
+        
+        for table_name in tables:
+            visit(table_name)
+        return ordered
+    
     @staticmethod
     def get_default_port(db_type: str) -> int:
         """Get default port for database type"""
@@ -4,7 +4,7 @@ Corporate-level database managers with proper error handling and connection pool
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Union
 import time
 from sshtunnel import SSHTunnelForwarder
 
@@ -77,6 +77,179 @@ class DatabaseManager(ABC):
                 self.connect()
             except Exception as e:
                 raise Exception(f"Failed to reconnect: {str(e)}")
+    
+    def fetch_keys(self, table_name: str, id_column: str = 'id', limit: Optional[int] = None) -> List[Any]:
+        """
+        Fetch existing primary keys of a table
+        
+        Args:
+            table_name: Table to read
+            id_column: Primary key column
+            limit: Maximum number of keys to return
+            
+        Returns:
+            List of key values (empty on error)
+        """
+        query = f"SELECT {id_column} FROM {table_name}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        
+        try:
+            self.ensure_connection()
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            keys = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            self.connection.commit()
+            return keys
+        except:
+            return []
+    
+    def execute_stream(self, statements: Iterable[Union[str, List[str]]], commit_every: int = 1000) -> Dict[str, Any]:
+        """
+        Execute a lazily generated stream of SQL statements
+        
+        Args:
+            statements: Statements or statement chunks, e.g. SQLDataGenerator.iter_batch()
+            commit_every: Number of statements per transaction
+            
+        Returns:
+            Execution summary; statements are consumed as they arrive
+        """
+        start_time = time.time()
+        committed = 0
+        pending = 0
+        affected_rows = 0
+        
+        self.ensure_connection()
+        cursor = self.connection.cursor()
+        
+        try:
+            for item in statements:
+                for stmt in ((item,) if isinstance(item, str) else item):
+                    cursor.execute(stmt)
+                    affected_rows += max(cursor.rowcount, 0)
+                    pending += 1
+                    
+                    if pending >= commit_every:
+                        self.connection.commit()
+                        committed += pending
+                        pending = 0
+            
+            self.connection.commit()
+            committed += pending
+            
+            return {
+                'success': True,
+                'executed': committed,
+                'affected_rows': affected_rows,
+                'duration': time.time() - start_time,
+                'error': None
+            }
+        except Exception as e:
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            
+            return {
+                'success': False,
+                'executed': committed,
+                'affected_rows': affected_rows,
+                'duration': time.time() - start_time,
+                'error': str(e)
+            }
+        finally:
+            cursor.close()
+    
+    def clone(self) -> 'DatabaseManager':
+        """Create an unconnected manager with the same configuration (its own connection and tunnel)."""
+        return type(self)(self.config)
+    
+    def set_lock_timeout(self, seconds: float) -> Dict[str, Any]:
+        """Set how long this session waits for a row lock (not supported by default)."""
+        return {'success': False, 'error': 'Lock timeouts are not supported for this database'}
+    
+    def sample_locks(self) -> List[Dict[str, Any]]:
+        """Snapshot current row locks as {'lock_type', 'lock_mode', 'status', 'count'} rows (empty if unsupported)."""
+        return []
+    
+    def sample_server_stats(self) -> Dict[str, float]:
+        """
+        Snapshot server-wide counters under common names (empty if unsupported)
+        
+        Cumulative counters: commits, rollbacks, rows_inserted, rows_updated,
+        rows_deleted, rows_read, cache_requests (logical page reads),
+        disk_reads (pages read from disk), checkpoints, lock_waits,
+        deadlocks, bytes_written. Gauges: connections, active. Each
+        database reports the subset it has.
+        """
+        return {}
+    
+    def top_statements(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Statement digests as {'statement', 'calls', 'total_ms', 'rows'} rows, cumulative, all when limit is None (empty if unsupported)."""
+        return []
+    
+    def table_storage(self, tables: List[str]) -> Dict[str, Dict[str, float]]:
+        """Exact row count and on-disk bytes per table as {'rows', 'data_bytes', 'index_bytes'} (empty if unsupported)."""
+        return {}
+    
+    def log_bytes(self) -> Dict[str, float]:
+        """Cumulative bytes written to each server log, e.g. {'wal': ...} (empty if unsupported)."""
+        return {}
+    
+    def _count_rows(self, table_name: str, quote: str) -> float:
+        """Exact row count of a table (0 on error)."""
+        rows = self._query_rows(f"SELECT COUNT(*) FROM {quote}{table_name}{quote}")
+        return float(rows[0][0]) if rows else 0.0
+    
+    def _query_rows(self, query: str) -> List[tuple]:
+        """Run a statistics query on this connection and end its transaction (empty on error)."""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            cursor.close()
+            self.connection.commit()
+            return list(rows)
+        except:
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            return []
+    
+    def _query_locks(self, query: str) -> List[Dict[str, Any]]:
+        """Run a lock snapshot query returning (lock_type, lock_mode, status, count) rows."""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            rows = [
+                {'lock_type': lock_type, 'lock_mode': lock_mode, 'status': status, 'count': int(count)}
+                for lock_type, lock_mode, status, count in cursor.fetchall()
+            ]
+            cursor.close()
+            self.connection.commit()
+            return rows
+        except:
+            return []
+
+
+# MySQL SHOW GLOBAL STATUS variable -> common server counter name
+MYSQL_STATUS_COUNTERS = {
+    'Com_commit': 'commits',
+    'Com_rollback': 'rollbacks',
+    'Innodb_rows_inserted': 'rows_inserted',
+    'Innodb_rows_updated': 'rows_updated',
+    'Innodb_rows_deleted': 'rows_deleted',
+    'Innodb_rows_read': 'rows_read',
+    'Innodb_buffer_pool_read_requests': 'cache_requests',
+    'Innodb_buffer_pool_reads': 'disk_reads',
+    'Innodb_row_lock_waits': 'lock_waits',
+    'Innodb_data_written': 'bytes_written',
+    'Threads_connected': 'connections',
+    'Threads_running': 'active'
+}
 
 
 class MySQLManager(DatabaseManager):
@@ -165,6 +338,9 @@ class MySQLManager(DatabaseManager):
             else:
                 cursor.execute(query)
             
+            # Queries (SELECT) return rows; drain them so the transfer is measured
+            rows_returned = len(cursor.fetchall()) if cursor.description else 0
+            
             self.connection.commit()
             affected_rows = cursor.rowcount
             cursor.close()
@@ -174,6 +350,7 @@ class MySQLManager(DatabaseManager):
             return {
                 'success': True,
                 'affected_rows': affected_rows,
+                'rows_returned': rows_returned,
                 'duration': duration,
                 'error': None
             }
@@ -188,10 +365,63 @@ class MySQLManager(DatabaseManager):
             return {
                 'success': False,
                 'affected_rows': 0,
+                'rows_returned': 0,
                 'duration': duration,
                 'error': str(e)
             }
     
+    def set_lock_timeout(self, seconds: float) -> Dict[str, Any]:
+        """Set innodb_lock_wait_timeout for this session (whole seconds, at least 1)"""
+        return self.execute_query(f"SET SESSION innodb_lock_wait_timeout = {max(1, int(round(seconds)))}")
+    
+    def sample_locks(self) -> List[Dict[str, Any]]:
+        """Snapshot InnoDB data locks from performance_schema.data_locks (MySQL 8+)"""
+        return self._query_locks(
+            "SELECT LOCK_TYPE, LOCK_MODE, LOCK_STATUS, COUNT(*) FROM performance_schema.data_locks "
+            "GROUP BY LOCK_TYPE, LOCK_MODE, LOCK_STATUS"
+        )
+    
+    def sample_server_stats(self) -> Dict[str, float]:
+        """Snapshot counters from SHOW GLOBAL STATUS"""
+        names = ', '.join(f"'{name}'" for name in MYSQL_STATUS_COUNTERS)
+        rows = self._query_rows(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({names})")
+        return {MYSQL_STATUS_COUNTERS[name]: float(value) for name, value in rows if name in MYSQL_STATUS_COUNTERS}
+    
+    def top_statements(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Statement digests from performance_schema, by total execution time"""
+        rows = self._query_rows(
+            "SELECT DIGEST_TEXT, COUNT_STAR, SUM_TIMER_WAIT / 1000000000, SUM_ROWS_AFFECTED + SUM_ROWS_SENT "
+            "FROM performance_schema.events_statements_summary_by_digest WHERE DIGEST_TEXT IS NOT NULL "
+            "ORDER BY SUM_TIMER_WAIT DESC" + (f" LIMIT {int(limit)}" if limit is not None else "")
+        )
+        return [{'statement': statement, 'calls': int(calls), 'total_ms': float(total_ms), 'rows': int(rows_)}
+                for statement, calls, total_ms, rows_ in rows]
+    
+    def table_storage(self, tables: List[str]) -> Dict[str, Dict[str, float]]:
+        """Data and index length from information_schema.TABLES, after ANALYZE TABLE refreshes them"""
+        if not tables:
+            return {}
+        
+        # InnoDB sizes are cached statistics (and grow a page or extent at a time); refresh them first
+        self._query_rows(f"ANALYZE TABLE {', '.join(f'`{table}`' for table in tables)}")
+        names = ', '.join(f"'{table}'" for table in tables)
+        rows = self._query_rows("SELECT TABLE_NAME, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+                                f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({names})")
+        return {name: {'rows': self._count_rows(name, '`'), 'data_bytes': float(data or 0),
+                       'index_bytes': float(index or 0)}
+                for name, data, index in rows}
+    
+    def log_bytes(self) -> Dict[str, float]:
+        """InnoDB redo bytes written (Innodb_os_log_written) and total binary log size (when binlog is on)"""
+        logs = {}
+        rows = self._query_rows("SHOW GLOBAL STATUS LIKE 'Innodb_os_log_written'")
+        if rows:
+            logs['redo'] = float(rows[0][1])
+        rows = self._query_rows("SHOW BINARY LOGS")
+        if rows:
+            logs['binlog'] = float(sum(int(row[1]) for row in rows))
+        return logs
+    
     def create_database(self, db_name: str) -> Dict[str, Any]:
         """Create MySQL database"""
         try:
@@ -329,6 +559,9 @@ class PostgreSQLManager(DatabaseManager):
             else:
                 cursor.execute(query)
             
+            # Queries (SELECT) return rows; drain them so the transfer is measured
+            rows_returned = len(cursor.fetchall()) if cursor.description else 0
+            
             self.connection.commit()
             affected_rows = cursor.rowcount
             cursor.close()
@@ -338,6 +571,7 @@ class PostgreSQLManager(DatabaseManager):
             return {
                 'success': True,
                 'affected_rows': affected_rows,
+                'rows_returned': rows_returned,
                 'duration': duration,
                 'error': None
             }
@@ -352,10 +586,74 @@ class PostgreSQLManager(DatabaseManager):
             return {
                 'success': False,
                 'affected_rows': 0,
+                'rows_returned': 0,
                 'duration': duration,
                 'error': str(e)
             }
     
+    def set_lock_timeout(self, seconds: float) -> Dict[str, Any]:
+        """Set lock_timeout for this session"""
+        return self.execute_query(f"SET lock_timeout = '{max(1, int(seconds * 1000))}ms'")
+    
+    def sample_locks(self) -> List[Dict[str, Any]]:
+        """Snapshot locks held or awaited by other sessions from pg_locks"""
+        return self._query_locks(
+            "SELECT locktype, mode, CASE WHEN granted THEN 'GRANTED' ELSE 'WAITING' END, COUNT(*) "
+            "FROM pg_locks WHERE pid <> pg_backend_pid() GROUP BY 1, 2, 3"
+        )
+    
+    def sample_server_stats(self) -> Dict[str, float]:
+        """Snapshot counters from pg_stat_database (this database) and pg_stat_bgwriter"""
+        stats = {}
+        rows = self._query_rows(
+            "SELECT xact_commit, xact_rollback, tup_inserted, tup_updated, tup_deleted, tup_fetched, "
+            "blks_hit + blks_read, blks_read, deadlocks, numbackends, "
+            "(SELECT COUNT(*) FROM pg_stat_activity WHERE state = 'active' AND datname = current_database()) "
+            "FROM pg_stat_database WHERE datname = current_database()"
+        )
+        if rows:
+            names = ('commits', 'rollbacks', 'rows_inserted', 'rows_updated', 'rows_deleted', 'rows_read',
+                     'cache_requests', 'disk_reads', 'deadlocks', 'connections', 'active')
+            stats.update(zip(names, map(float, rows[0])))
+        
+        # Checkpoint counters moved to pg_stat_checkpointer in PostgreSQL 17
+        rows = (self._query_rows("SELECT num_timed + num_requested, "
+                                 "buffers_written * current_setting('block_size')::bigint FROM pg_stat_checkpointer")
+                or self._query_rows("SELECT checkpoints_timed + checkpoints_req, "
+                                    "buffers_checkpoint * current_setting('block_size')::bigint FROM pg_stat_bgwriter"))
+        if rows:
+            stats['checkpoints'], stats['bytes_written'] = map(float, rows[0])
+        return stats
+    
+    def top_statements(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Statement digests from pg_stat_statements (when the extension is installed), by total execution time"""
+        rows = self._query_rows(
+            "SELECT query, calls, total_exec_time, rows FROM pg_stat_statements "
+            "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+            "ORDER BY total_exec_time DESC" + (f" LIMIT {int(limit)}" if limit is not None else "")
+        )
+        return [{'statement': statement, 'calls': int(calls), 'total_ms': float(total_ms), 'rows': int(rows_)}
+                for statement, calls, total_ms, rows_ in rows]
+    
+    def table_storage(self, tables: List[str]) -> Dict[str, Dict[str, float]]:
+        """Heap (with TOAST) and index bytes from pg_total_relation_size and pg_indexes_size"""
+        if not tables:
+            return {}
+        
+        names = ', '.join(f"'{table}'" for table in tables)
+        rows = self._query_rows(
+            "SELECT c.relname, pg_total_relation_size(c.oid) - pg_indexes_size(c.oid), pg_indexes_size(c.oid) "
+            "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            f"WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname IN ({names})"
+        )
+        return {name: {'rows': self._count_rows(name, '"'), 'data_bytes': float(data), 'index_bytes': float(index)}
+                for name, data, index in rows}
+    
+    def log_bytes(self) -> Dict[str, float]:
+        """Current WAL insert position in bytes (fails, and is left out, on a standby)"""
+        rows = self._query_rows("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')")
+        return {'wal': float(rows[0][0])} if rows else {}
+    
     def create_database(self, db_name: str) -> Dict[str, Any]:
         """Create PostgreSQL database"""
         try:
@@ -477,6 +775,67 @@ class MongoDBManager(DatabaseManager):
         """Execute MongoDB operation (not applicable for MongoDB)"""
         return {'success': False, 'error': 'Use MongoDB-specific methods'}
     
+    def fetch_keys(self, table_name: str, id_column: str = 'id', limit: Optional[int] = None) -> List[Any]:
+        """Fetch existing primary keys of a MongoDB collection"""
+        try:
+            db_name = self.config['database'].get('database', 'testdb')
+            cursor = self.connection[db_name][table_name].find({}, {id_column: 1, '_id': 0})
+            if limit:
+                cursor = cursor.limit(int(limit))
+            return [doc[id_column] for doc in cursor if id_column in doc]
+        except:
+            return []
+    
+    def sample_server_stats(self) -> Dict[str, float]:
+        """Snapshot counters from serverStatus (opcounters, WiredTiger cache and checkpoints)"""
+        try:
+            status = self.connection.admin.command('serverStatus')
+        except:
+            return {}
+        
+        opcounters = status.get('opcounters', {})
+        cache = status.get('wiredTiger', {}).get('cache', {})
+        transaction = status.get('wiredTiger', {}).get('transaction', {})
+        stats = {
+            'rows_inserted': opcounters.get('insert', 0),
+            'rows_updated': opcounters.get('update', 0),
+            'rows_deleted': opcounters.get('delete', 0),
+            'rows_read': opcounters.get('query', 0) + opcounters.get('getmore', 0),
+            'cache_requests': cache.get('pages requested from the cache', 0),
+            'disk_reads': cache.get('pages read into cache', 0),
+            'checkpoints': transaction.get('transaction checkpoints', 0),
+            'bytes_written': cache.get('bytes written from cache', 0),
+            'connections': status.get('connections', {}).get('current', 0),
+            'active': status.get('globalLock', {}).get('activeClients', {}).get('total', 0)
+        }
+        return {name: float(value) for name, value in stats.items()}
+    
+    def table_storage(self, tables: List[str]) -> Dict[str, Dict[str, float]]:
+        """Document count, storage size and total index size from collStats"""
+        db = self.connection[self.config['database'].get('database', 'testdb')]
+        storage = {}
+        for table in tables:
+            try:
+                stats = db.command('collStats', table)
+            except:
+                continue
+            storage[table] = {'rows': float(stats.get('count', 0)), 'data_bytes': float(stats.get('storageSize', 0)),
+                              'index_bytes': float(stats.get('totalIndexSize', 0))}
+        return storage
+    
+    def log_bytes(self) -> Dict[str, float]:
+        """WiredTiger journal bytes written, from serverStatus"""
+        try:
+            status = self.connection.admin.command('serverStatus')
+        except:
+            return {}
+        written = status.get('wiredTiger', {}).get('log', {}).get('log bytes written')
+        return {'journal': float(written)} if written is not None else {}
+    
+    def execute_stream(self, statements: Iterable[Union[str, List[str]]], commit_every: int = 1000) -> Dict[str, Any]:
+        """Execute SQL statement stream (not applicable for MongoDB)"""
+        return {'success': False, 'executed': 0, 'error': 'Use MongoDB-specific methods'}
+    
     def create_database(self, db_name: str) -> Dict[str, Any]:
         """Create MongoDB database (implicit in MongoDB)"""
         try:
@@ -0,0 +1,166 @@
+"""
+Access Distributions
+Skewed key choosers (Zipfian, hotspot, latest) for picking which rows operations hit
+"""
+
+import random
+from typing import Callable, Dict, Optional
+
+from .config import Config
+
+
+class UniformChooser:
+    """Every key is equally likely."""
+    
+    def __call__(self, n: int) -> int:
+        """Pick an index in [0, n)."""
+        return random.randrange(n)
+
+
+class ZipfianChooser:
+    """
+    Zipfian choice over [0, n): index 0 is the hottest key.
+    
+    Uses the constant-time generator of Gray et al. ("Quickly Generating
+    Billion-Record Synthetic Databases"), as in YCSB. Its only O(n) part,
+    the normalizing constant zeta(n), is cached and updated incrementally
+    as the key count grows or shrinks, so each pick is O(1) amortized.
+    """
+    
+    def __init__(self, theta: float = 0.99):
+        """
+        Initialize Zipfian chooser
+        
+        Args:
+            theta: Skew in (0, 1); higher values concentrate more picks on hot keys
+        """
+        if not 0 < theta < 1:
+            raise ValueError("Zipfian theta must be between 0 and 1 (exclusive)")
+        
+        self.theta = theta
+        self._alpha = 1.0 / (1.0 - theta)
+        self._zeta2 = 1.0 + 0.5 ** theta
+        self._n = 0
+        self._zetan = 0.0
+        self._eta = 0.0
+    
+    def _resize(self, n: int) -> None:
+        """Bring zeta(n) and eta up to date for a new key count."""
+        theta = self.theta
+        if n > self._n:
+            self._zetan += sum(1.0 / i ** theta for i in range(self._n + 1, n + 1))
+        else:
+            self._zetan -= sum(1.0 / i ** theta for i in range(n + 1, self._n + 1))
+        self._n = n
+        
+        if n > 2:
+            self._eta = (1.0 - (2.0 / n) ** (1.0 - theta)) / (1.0 - self._zeta2 / self._zetan)
+    
+    def __call__(self, n: int) -> int:
+        """Pick an index in [0, n)."""
+        if n != self._n:
+            self._resize(n)
+        
+        uz = random.random() * self._zetan
+        if uz < 1.0 or n == 1:
+            return 0
+        if uz < self._zeta2 or n == 2:
+            return 1
+        
+        u = uz / self._zetan
+        return min(int(n * (self._eta * u - self._eta + 1.0) ** self._alpha), n - 1)
+
+
+class HotspotChooser:
+    """
+    A fixed fraction of operations goes to a small hot set of keys.
+    
+    ``hot_op_fraction`` of picks land uniformly in the first
+    ``hot_data_fraction`` of the key space, the rest uniformly in the
+    remainder (e.g. 80% of operations on 20% of the keys).
+    """
+    
+    def __init__(self, hot_data_fraction: float = 0.2, hot_op_fraction: float = 0.8):
+        """
+        Initialize hotspot chooser
+        
+        Args:
+            hot_data_fraction: Share of keys that are hot, in (0, 1]
+            hot_op_fraction: Share of operations that hit the hot keys, in [0, 1]
+        """
+        if not 0 < hot_data_fraction <= 1:
+            raise ValueError("Hot data fraction must be in (0, 1]")
+        if not 0 <= hot_op_fraction <= 1:
+            raise ValueError("Hot operation fraction must be in [0, 1]")
+        
+        self.hot_data_fraction = hot_data_fraction
+        self.hot_op_fraction = hot_op_fraction
+    
+    def __call__(self, n: int) -> int:
+        """Pick an index in [0, n)."""
+        hot_count = max(1, int(n * self.hot_data_fraction))
+        if hot_count >= n or random.random() < self.hot_op_fraction:
+            return random.randrange(hot_count)
+        return hot_count + random.randrange(n - hot_count)
+
+
+class LatestChooser:
+    """
+    Zipfian skew towards the most recently added keys.
+    
+    Index n - 1 is taken to be the newest key and the hottest; recency
+    falls off with the same Zipfian shape. KeyTracker keeps its keys in
+    insertion order, so this holds there (keys seeded from the database
+    count as oldest). The shared KeyRegistry does not: reservoir sampling
+    and discards move keys between slots, so use other choosers there.
+    """
+    
+    def __init__(self, theta: float = 0.99):
+        """
+        Initialize latest-biased chooser
+        
+        Args:
+            theta: Zipfian skew in (0, 1)
+        """
+        self.zipfian = ZipfianChooser(theta)
+    
+    def __call__(self, n: int) -> int:
+        """Pick an index in [0, n)."""
+        return n - 1 - self.zipfian(n)
+
+
+# Distribution name -> chooser class
+CHOOSERS = {
+    'uniform': UniformChooser,
+    'zipfian': ZipfianChooser,
+    'hotspot': HotspotChooser,
+    'latest': LatestChooser
+}
+
+
+def make_chooser(name: str, **params) -> Callable[[int], int]:
+    """
+    Build a key chooser by distribution name
+    
+    Args:
+        name: One of CHOOSERS
+        **params: Distribution parameters; missing ones default to Config.ACCESS_DISTRIBUTIONS
+    
+    Returns:
+        Callable mapping the key count n to an index in [0, n)
+    """
+    if name not in CHOOSERS:
+        raise ValueError(f"Unknown access distribution: {name}")
+    
+    settings = dict(Config.ACCESS_DISTRIBUTIONS.get(name, {}))
+    settings.update(params)
+    return CHOOSERS[name](**settings)
+
+
+def make_choosers(distributions: Optional[Dict[str, dict]]) -> Dict[str, Callable[[int], int]]:
+    """Build choosers per operation from {'update': {'name': 'zipfian', 'theta': 0.9}, ...}."""
+    choosers = {}
+    for operation, spec in (distributions or {}).items():
+        spec = dict(spec)
+        choosers[operation] = make_chooser(spec.pop('name'), **spec)
+    return choosers
@@ -0,0 +1,297 @@
+"""
+Metrics Exporter
+Prometheus/OpenMetrics endpoint over lock-free per-worker counters, aggregated when scraped
+"""
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .adaptive import is_throttling
+from .config import Config
+from .workloads import classify_error
+
+
+# Message fragments identifying error classes when the driver error only survives as text
+ERROR_PATTERNS = {
+    'deadlock': ('deadlock',),
+    'lock_timeout': ('lock wait timeout', 'lock timeout'),
+    'duplicate_key': ('duplicate', 'unique constraint', 'e11000'),
+    'connection': ('connection', 'gone away', 'closed')
+}
+
+
+def error_class(error: Union[Exception, str, None]) -> str:
+    """Label a driver exception or error message: deadlock, lock_timeout, throttling, duplicate_key, ..."""
+    if error is None:
+        return 'other'
+    if isinstance(error, Exception):
+        kind = classify_error(error)
+        if kind is not None:
+            return kind
+    if is_throttling(error):
+        return 'throttling'
+    
+    text = str(error).lower()
+    for name, fragments in ERROR_PATTERNS.items():
+        if any(fragment in text for fragment in fragments):
+            return name
+    return 'other'
+
+
+class WorkerCounters:
+    """
+    Counters owned by one worker thread.
+    
+    Only the owning thread writes them, so recording takes no lock; the
+    exporter reads them when scraped. Latency goes into fixed buckets (one
+    count per bucket plus +Inf, and the running sum), so a scrape turns
+    them into a Prometheus histogram without touching the workers.
+    """
+    
+    def __init__(self, buckets: List[float]):
+        """
+        Initialize worker counters
+        
+        Args:
+            buckets: Sorted latency bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        self.rows = {}
+        self.statements = {}
+        self.errors = {}
+        self.latency = {}
+    
+    def record(self, table: str, kind: str, seconds: float, rows: int = 1) -> None:
+        """Count one successful statement, its rows and its latency."""
+        key = (table, kind)
+        self.statements[key] = self.statements.get(key, 0) + 1
+        self.rows[key] = self.rows.get(key, 0) + rows
+        counts = self.latency.get(key)
+        if counts is None:
+            counts = self.latency[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, seconds)] += 1
+        counts[-1] += seconds
+    
+    def record_error(self, table: str, kind: str, error: str) -> None:
+        """Count one failed statement under its error class."""
+        self.statements[(table, kind)] = self.statements.get((table, kind), 0) + 1
+        key = (table, kind, error)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+
+class MetricsExporter:
+    """
+    Serves generation metrics in the Prometheus text format on localhost.
+    
+    Each worker thread records into its own WorkerCounters, found through a
+    thread-local, so the per-statement path never takes a lock; the
+    exporter's lock is only taken when a new worker registers and when a
+    scrape sums every worker's counters. Exposes rows, statements and
+    errors by class as counters, statement latency as a histogram, and any
+    registered gauges (target vs actual rate, queue depth, ...) evaluated at
+    scrape time. Counters live as long as the exporter, as Prometheus
+    expects, so they keep growing across runs.
+    """
+    
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 buckets: Optional[List[float]] = None, prefix: Optional[str] = None):
+        """
+        Initialize exporter (unset options default to Config.EXPORTER)
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            buckets: Latency bucket upper bounds in seconds
+            prefix: Metric name prefix
+        """
+        settings = Config.EXPORTER
+        self.host = host or settings['host']
+        self.port = settings['port'] if port is None else port
+        self.buckets = sorted(buckets or settings['buckets'])
+        self.prefix = prefix or settings['prefix']
+        self._local = threading.local()
+        self._workers = []
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the HTTP endpoint is serving."""
+        return self._server is not None
+    
+    @property
+    def url(self) -> str:
+        """Scrape URL of the endpoint."""
+        return f"http://{self.host}:{self.port}/metrics"
+    
+    def worker(self) -> WorkerCounters:
+        """The calling thread's counters, registered on first use."""
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = WorkerCounters(self.buckets)
+            with self._lock:
+                self._workers.append(counters)
+        return counters
+    
+    def record(self, table: str, kind: str, seconds: float, rows: int = 1) -> None:
+        """Count a successful statement on the calling thread's counters."""
+        self.worker().record(table, kind, seconds, rows)
+    
+    def record_error(self, table: str, kind: str, error: Union[Exception, str, None] = None) -> None:
+        """Count a failed statement, classified with error_class, on the calling thread's counters."""
+        self.worker().record_error(table, kind, error_class(error))
+    
+    def gauge(self, name: str, value: Callable[[], Optional[float]], description: str = '',
+              labels: Optional[Dict[str, str]] = None) -> None:
+        """Expose `value()` as a gauge, evaluated on every scrape; labels tell apart runs sharing a name."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._gauges[key] = (value, description)
+    
+    def clear_gauges(self, **labels: str) -> None:
+        """Drop the gauges carrying all the given labels (every gauge if none), e.g. when their run ends."""
+        wanted = set(labels.items())
+        with self._lock:
+            self._gauges = {key: gauge for key, gauge in self._gauges.items() if not wanted <= set(key[1])}
+    
+    def collect(self) -> Dict[str, Any]:
+        """Sum every worker's counters and evaluate the gauges."""
+        with self._lock:
+            workers = list(self._workers)
+            gauges = dict(self._gauges)
+        
+        totals = {'rows': {}, 'statements': {}, 'errors': {}, 'latency': {}}
+        for counters in workers:
+            # Copies are atomic under the GIL, so a worker adding a key mid-scrape is harmless
+            for name in ('rows', 'statements', 'errors'):
+                merged = totals[name]
+                for key, value in list(getattr(counters, name).items()):
+                    merged[key] = merged.get(key, 0) + value
+            for key, counts in list(counters.latency.items()):
+                merged = totals['latency'].setdefault(key, [0] * len(counts))
+                for index, value in enumerate(list(counts)):
+                    merged[index] += value
+        
+        values = {}
+        for key, (value, description) in gauges.items():
+            try:
+                values[key] = (value(), description)
+            except Exception:
+                values[key] = (None, description)
+        totals['gauges'] = values
+        totals['workers'] = len(workers)
+        return totals
+    
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        Format the current metrics
+        
+        Args:
+            openmetrics: OpenMetrics text (counter families without _total, ending in # EOF)
+                         instead of the Prometheus 0.0.4 text format
+        
+        Returns:
+            Exposition text
+        """
+        metrics = self.collect()
+        lines = []
+        
+        def family(name: str, kind: str, description: str) -> str:
+            metric = f"{self.prefix}_{name}"
+            declared = metric if kind != 'counter' or not openmetrics else metric[:-len('_total')]
+            lines.append(f"# HELP {declared} {description}")
+            lines.append(f"# TYPE {declared} {kind}")
+            return metric
+        
+        def labels(**values: Any) -> str:
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in values.items()) + '}'
+        
+        metric = family('rows_total', 'counter', "Rows written or returned by successful statements")
+        for (table, kind), value in sorted(metrics['rows'].items()):
+            lines.append(f"{metric}{labels(table=table, operation=kind)} {value}")
+        
+        metric = family('statements_total', 'counter', "Statements executed, failed ones included")
+        for (table, kind), value in sorted(metrics['statements'].items()):
+            lines.append(f"{metric}{labels(table=table, operation=kind)} {value}")
+        
+        metric = family('errors_total', 'counter', "Failed statements by error class")
+        for (table, kind, error), value in sorted(metrics['errors'].items()):
+            lines.append(f"{metric}{labels(table=table, operation=kind, error=error)} {value}")
+        
+        metric = family('statement_duration_seconds', 'histogram', "Statement latency")
+        for (table, kind), counts in sorted(metrics['latency'].items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float('inf')], counts[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{metric}_bucket{labels(table=table, operation=kind, le=le)} {cumulative}")
+            lines.append(f"{metric}_sum{labels(table=table, operation=kind)} {counts[-1]}")
+            lines.append(f"{metric}_count{labels(table=table, operation=kind)} {cumulative}")
+        
+        metric = family('workers', 'gauge', "Worker threads that have recorded statements")
+        lines.append(f"{metric} {metrics['workers']}")
+        declared = set()
+        for (name, gauge_labels), (value, description) in sorted(metrics['gauges'].items()):
+            if value is None:
+                continue
+            if name not in declared:
+                declared.add(name)
+                family(name, 'gauge', description or name.replace('_', ' ').capitalize())
+            lines.append(f"{self.prefix}_{name}{labels(**dict(gauge_labels)) if gauge_labels else ''} {value}")
+        
+        if openmetrics:
+            lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+    
+    def start(self) -> 'MetricsExporter':
+        """Serve /metrics on a daemon thread (no-op when already serving)."""
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-exporter',
+                                            daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving; the counters are kept."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _handler(exporter: MetricsExporter):
+    """Request handler class serving an exporter's metrics."""
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+            body = exporter.render(openmetrics=openmetrics).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+                             if openmetrics else 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the console
+            pass
+    
+    return MetricsHandler
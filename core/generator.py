@@ -10,18 +10,78 @@ import random
 import string
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Callable, Iterator, Optional, Union
 import multiprocessing as mp
 from multiprocessing import Pool, cpu_count
 import time
+from collections import namedtuple
 import psutil
 
+from .writer import SQLWriter, TABLE_COLUMNS, format_sql_value
+from .pools import ValuePools
+from .unique import UniqueCounter, UniqueValues
+from .keys import KeyRegistrySet, KeyTracker
+from .config import Config
+
+
+# Data type -> table name
+DATA_TYPE_TABLES = {
+    'user': 'users',
+    'product': 'products',
+    'order': 'orders'
+}
+
+# One generated statement with what it targets (a multi-row INSERT carries a tuple of keys)
+Operation = namedtuple('Operation', ['kind', 'table', 'key', 'sql'])
+
+WRITE_OPERATIONS = ('insert', 'update', 'delete')
+
+ORDER_TAX_RATE = 0.08
+
+# Read query classes (weights in Config.READS['query_mix'])
+READ_QUERIES = ('point_lookup', 'range_scan', 'join', 'top_n')
+
+
+def operation_keys(op: Operation) -> Tuple:
+    """Keys an operation covers: one per row of a multi-row INSERT, otherwise its single key."""
+    return op.key if isinstance(op.key, tuple) else (op.key,)
+
+
+def _name_token(name: str) -> str:
+    """Lowercase a name and keep only characters valid in usernames and email local parts."""
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
 
 class SQLDataGenerator:
     """Advanced SQL data generator with multi-processing support."""
     
-    def __init__(self, seed: int = None):
-        """Initialize the SQL data generator."""
+    def __init__(self, seed: int = None, pools: Optional[ValuePools] = None,
+                 unique_start: Optional[int] = None, registries: Optional[KeyRegistrySet] = None,
+                 reference_chooser: Optional[Callable[[int], int]] = None,
+                 trackers: Optional[Dict[str, KeyTracker]] = None,
+                 access_choosers: Optional[Dict[str, Callable[[int], int]]] = None,
+                 read_ratio: Optional[float] = None, query_mix: Optional[Dict[str, float]] = None,
+                 unique_counter: Optional[UniqueCounter] = None):
+        """
+        Initialize the SQL data generator.
+        
+        Args:
+            seed: Random seed
+            pools: Optional memory-mapped value pools replacing the built-in lists
+            unique_start: Row counter start; enables collision-free usernames,
+                emails, SKUs and order numbers (see core/unique.py)
+            registries: Key registries; inserted keys are recorded and foreign
+                keys are sampled from them (see core/keys.py)
+            reference_chooser: Index distribution for sampling foreign keys (uniform by default)
+            trackers: Live key trackers per table; UPDATE and DELETE target tracked
+                keys (a new dict is used if omitted, pass one in to keep keys across runs)
+            access_choosers: Key access distribution per operation ('update', 'delete',
+                'read'), see core.distributions; uniform when an operation has none
+            read_ratio: Share of reads in the 'mixed' operation (defaults to Config.READS)
+            query_mix: Weights of the read query classes (defaults to Config.READS)
+            unique_counter: Persistent counter to lease unique value indexes from instead of
+                starting at unique_start, so values never repeat across sessions and runs
+        """
         if seed is not None:
             random.seed(seed)
         
@@ -51,6 +111,43 @@ class SQLDataGenerator:
         self.product_categories = ["Electronics", "Clothing", "Books", "Home", "Sports", "Toys"]
         self.payment_methods = ["Credit Card", "Debit Card", "PayPal", "Bank Transfer", "Cash"]
         self.order_statuses = ["Pending", "Processing", "Shipped", "Delivered", "Cancelled"]
+        self.email_domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com"]
+        self.companies = None
+        
+        # Large realistic pools (see core/pools.py) replace the small built-in lists
+        self.pools = pools
+        if pools is not None:
+            self.first_names = pools.first_names
+            self.last_names = pools.last_names
+            self.cities = pools.cities
+            self.companies = pools.companies
+            self.email_domains = pools.email_domains
+        
+        # Counter-based unique values; None keeps the short random formats
+        if unique_counter is not None:
+            self.unique = UniqueValues(counter=unique_counter)
+        else:
+            self.unique = UniqueValues(unique_start) if unique_start is not None else None
+        
+        # Real keys of referenced tables, so orders point at existing users/products
+        self.registries = registries
+        self.reference_chooser = reference_chooser
+        
+        # Keys inserted so far, so UPDATE and DELETE hit existing rows
+        self.trackers = trackers if trackers is not None else {}
+        self.access_choosers = access_choosers or {}
+        
+        # Read/write mix
+        self.read_ratio = Config.READS['read_ratio'] if read_ratio is None else read_ratio
+        query_mix = query_mix or Config.READS['query_mix']
+        unknown = set(query_mix) - set(READ_QUERIES)
+        if unknown:
+            raise ValueError(f"Unknown read queries: {', '.join(sorted(unknown))}")
+        self._query_names = list(query_mix)
+        self._query_weights = list(query_mix.values())
+        
+        # Reusable statement buffer with per-table cached SQL prefixes
+        self.writer = SQLWriter()
     
     # ==================== Basic Generators ====================
     
@@ -81,9 +178,18 @@ class SQLDataGenerator:
     def generate_email(self, name: str = None) -> str:
         """Generate a random email."""
         if name is None:
-            name = f"{random.choice(self.first_names).lower()}.{random.choice(self.last_names).lower()}"
-        domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com"]
-        return f"{name}@{random.choice(domains)}"
+            name = f"{_name_token(random.choice(self.first_names))}.{_name_token(random.choice(self.last_names))}"
+        return f"{name}@{random.choice(self.email_domains)}"
+    
+    def generate_reference(self, table_name: str) -> str:
+        """Pick an existing key of a referenced table, or a fresh UUID if none are known."""
+        if self.registries is not None:
+            registry = self.registries.get(table_name)
+            if registry is not None:
+                key = registry.sample(self.reference_chooser)
+                if key is not None:
+                    return key
+        return self.generate_uuid()
     
     def generate_phone(self) -> str:
         """Generate a random phone number."""
@@ -94,112 +200,122 @@ class SQLDataGenerator:
     
     # ==================== Complex Object Generators ====================
     
-    def generate_user(self) -> Dict[str, Any]:
-        """Generate a user record."""
+    def generate_user_row(self) -> Tuple:
+        """Generate a user record as a tuple ordered like TABLE_COLUMNS['users']."""
         first_name = random.choice(self.first_names)
         last_name = random.choice(self.last_names)
-        username = f"{first_name.lower()}.{last_name.lower()}{random.randint(1, 99)}"
-        
-        return {
-            "id": self.generate_uuid(),
-            "username": username,
-            "email": self.generate_email(f"{first_name}.{last_name}"),
-            "first_name": first_name,
-            "last_name": last_name,
-            "phone": self.generate_phone(),
-            "city": random.choice(self.cities),
-            "state": random.choice(self.states),
-            "country": random.choice(self.countries),
-            "is_active": random.choice([True, False]),
-            "created_at": self.generate_datetime(),
-            "updated_at": self.generate_datetime()
-        }
+        local_part = f"{_name_token(first_name)}.{_name_token(last_name)}"
+        if self.unique is not None:
+            # The unique username doubles as the email local part
+            username = local_part + self.unique.username_suffix(self.unique.next_index())
+            local_part = username
+        else:
+            username = f"{local_part}{random.randint(1, 99)}"
+        
+        return (
+            self.generate_uuid(),
+            username,
+            self.generate_email(local_part),
+            first_name,
+            last_name,
+            self.generate_phone(),
+            random.choice(self.cities),
+            random.choice(self.states),
+            random.choice(self.countries),
+            random.choice([True, False]),
+            self.generate_datetime(),
+            self.generate_datetime()
+        )
     
-    def generate_product(self) -> Dict[str, Any]:
-        """Generate a product record."""
+    def generate_product_row(self) -> Tuple:
+        """Generate a product record as a tuple ordered like TABLE_COLUMNS['products']."""
         adjectives = ["Premium", "Deluxe", "Pro", "Elite", "Smart", "Classic"]
         nouns = ["Widget", "Gadget", "Device", "Tool", "Kit", "System"]
         
-        return {
-            "id": self.generate_uuid(),
-            "sku": f"{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}-{random.randint(100000, 999999)}",
-            "name": f"{random.choice(adjectives)} {random.choice(nouns)}",
-            "category": random.choice(self.product_categories),
-            "price": self.generate_float(10.0, 1000.0, 2),
-            "stock_quantity": self.generate_integer(0, 1000),
-            "is_available": random.choice([True, False]),
-            "created_at": self.generate_datetime(),
-            "updated_at": self.generate_datetime()
-        }
+        name = f"{random.choice(adjectives)} {random.choice(nouns)}"
+        if self.companies is not None:
+            name = f"{random.choice(self.companies)} {name}"
+        
+        if self.unique is not None:
+            sku = self.unique.sku(self.unique.next_index())
+        else:
+            sku = f"{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}-{random.randint(100000, 999999)}"
+        
+        return (
+            self.generate_uuid(),
+            sku,
+            name,
+            random.choice(self.product_categories),
+            self.generate_float(10.0, 1000.0, 2),
+            self.generate_integer(0, 1000),
+            random.choice([True, False]),
+            self.generate_datetime(),
+            self.generate_datetime()
+        )
     
-    def generate_order(self) -> Dict[str, Any]:
-        """Generate an order record."""
-        quantity = self.generate_integer(1, 10)
-        unit_price = self.generate_float(10.0, 500.0, 2)
+    @staticmethod
+    def order_totals(quantity: int, unit_price: float) -> Tuple[float, float, float]:
+        """Compute an order line's (subtotal, tax, total)."""
         subtotal = round(quantity * unit_price, 2)
-        tax = round(subtotal * 0.08, 2)
+        tax = round(subtotal * ORDER_TAX_RATE, 2)
         total = round(subtotal + tax, 2)
+        return subtotal, tax, total
+    
+    def generate_order_row(self) -> Tuple:
+        """Generate an order record as a tuple ordered like TABLE_COLUMNS['orders']."""
+        quantity = self.generate_integer(1, 10)
+        unit_price = self.generate_float(10.0, 500.0, 2)
+        subtotal, tax, total = self.order_totals(quantity, unit_price)
         
-        return {
-            "id": self.generate_uuid(),
-            "order_number": f"ORD-{random.randint(100000, 999999)}",
-            "user_id": self.generate_uuid(),
-            "product_id": self.generate_uuid(),
-            "quantity": quantity,
-            "unit_price": unit_price,
-            "subtotal": subtotal,
-            "tax": tax,
-            "total": total,
-            "payment_method": random.choice(self.payment_methods),
-            "status": random.choice(self.order_statuses),
-            "created_at": self.generate_datetime(),
-            "updated_at": self.generate_datetime()
-        }
+        if self.unique is not None:
+            order_number = self.unique.order_number(self.unique.next_index())
+        else:
+            order_number = f"ORD-{random.randint(100000, 999999)}"
+        
+        return (
+            self.generate_uuid(),
+            order_number,
+            self.generate_reference('users'),
+            self.generate_reference('products'),
+            quantity,
+            unit_price,
+            subtotal,
+            tax,
+            total,
+            random.choice(self.payment_methods),
+            random.choice(self.order_statuses),
+            self.generate_datetime(),
+            self.generate_datetime()
+        )
+    
+    def generate_user(self) -> Dict[str, Any]:
+        """Generate a user record."""
+        return dict(zip(TABLE_COLUMNS['users'], self.generate_user_row()))
+    
+    def generate_product(self) -> Dict[str, Any]:
+        """Generate a product record."""
+        return dict(zip(TABLE_COLUMNS['products'], self.generate_product_row()))
+    
+    def generate_order(self) -> Dict[str, Any]:
+        """Generate an order record."""
+        return dict(zip(TABLE_COLUMNS['orders'], self.generate_order_row()))
     
     # ==================== SQL Statement Generators ====================
     
     def generate_insert_statement(self, table_name: str, data: Dict[str, Any]) -> str:
         """Generate SQL INSERT statement."""
-        columns = []
-        values = []
-        
-        for key, value in data.items():
-            columns.append(key)
-            if value is None:
-                values.append('NULL')
-            elif isinstance(value, bool):
-                values.append('TRUE' if value else 'FALSE')
-            elif isinstance(value, (int, float)):
-                values.append(str(value))
-            else:
-                escaped_value = str(value).replace("'", "''")
-                values.append(f"'{escaped_value}'")
-        
-        columns_str = ', '.join(columns)
-        values_str = ', '.join(values)
+        columns_str = ', '.join(data.keys())
+        values_str = ', '.join(map(format_sql_value, data.values()))
         
         return f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str});"
     
     def generate_update_statement(self, table_name: str, data: Dict[str, Any], id_column: str = 'id') -> str:
         """Generate SQL UPDATE statement."""
         record_id = data.get(id_column)
-        set_clauses = []
-        
-        for key, value in data.items():
-            if key == id_column:
-                continue
-            
-            if value is None:
-                set_clauses.append(f"{key} = NULL")
-            elif isinstance(value, bool):
-                set_clauses.append(f"{key} = {'TRUE' if value else 'FALSE'}")
-            elif isinstance(value, (int, float)):
-                set_clauses.append(f"{key} = {value}")
-            else:
-                escaped_value = str(value).replace("'", "''")
-                set_clauses.append(f"{key} = '{escaped_value}'")
-        
-        set_str = ', '.join(set_clauses)
+        set_str = ', '.join(
+            f"{key} = {format_sql_value(value)}"
+            for key, value in data.items() if key != id_column
+        )
         
         if isinstance(record_id, str):
             where_clause = f"{id_column} = '{record_id}'"
@@ -217,62 +333,247 @@ class SQLDataGenerator:
         
         return f"DELETE FROM {table_name} WHERE {where_clause};"
     
+    def generate_insert_row(self, table_name: str, row: Tuple) -> str:
+        """Generate SQL INSERT statement from a row tuple."""
+        return self.writer.format_insert(table_name, row)
+    
+    def generate_update_row(self, table_name: str, row: Tuple) -> str:
+        """Generate SQL UPDATE statement from a row tuple (primary key first)."""
+        return self.writer.format_update(table_name, row)
+    
     # ==================== Batch Generators ====================
     
-    def generate_batch(self, data_type: str, count: int, operation: str = 'insert') -> List[str]:
-        """Generate a batch of SQL statements."""
-        statements = []
-        
-        # Map data types to generators and table names
-        generators = {
-            'user': (self.generate_user, 'users'),
-            'product': (self.generate_product, 'products'),
-            'order': (self.generate_order, 'orders')
+    def get_row_generator(self, data_type: str) -> Tuple[Callable[[], Tuple], str]:
+        """Resolve a data type ('user') or table name ('users') to its row generator and table."""
+        row_generators = {
+            'users': self.generate_user_row,
+            'products': self.generate_product_row,
+            'orders': self.generate_order_row
         }
         
-        if data_type not in generators:
+        table_name = DATA_TYPE_TABLES.get(data_type, data_type)
+        if table_name not in row_generators:
             raise ValueError(f"Unknown data type: {data_type}")
         
-        generator_func, table_name = generators[data_type]
+        return row_generators[table_name], table_name
+    
+    def get_tracker(self, table_name: str) -> KeyTracker:
+        """Get (or create) the live key tracker of a table."""
+        tracker = self.trackers.get(table_name)
+        if tracker is None:
+            tracker = self.trackers[table_name] = KeyTracker()
+        return tracker
+    
+    def generate_operation(self, table_name: str, row: Tuple, operation: str = 'insert') -> Operation:
+        """
+        Generate a single SQL operation for a row tuple
+        
+        INSERT starts tracking the row's key; UPDATE and DELETE target a
+        tracked key when one exists (DELETE stops tracking it) and fall back
+        to the row's fresh key otherwise. 'read' picks a query class from the
+        query mix and 'mixed' reads with probability read_ratio.
+        """
+        # Handle random operation - randomly choose INSERT, UPDATE, or DELETE
+        if operation == 'random':
+            operation = random.choice(WRITE_OPERATIONS)
+        elif operation == 'mixed':
+            operation = 'read' if random.random() < self.read_ratio else random.choice(WRITE_OPERATIONS)
+        
+        if operation == 'read':
+            operation = random.choices(self._query_names, self._query_weights)[0]
+        if operation in READ_QUERIES:
+            return self.generate_read(table_name, operation)
+        
+        if operation == 'insert':
+            if self.registries is not None and table_name in self.registries:
+                self.registries[table_name].append(row[0])
+            self.get_tracker(table_name).add(row[0])
+            return Operation('insert', table_name, row[0], self.writer.format_insert(table_name, row))
+        elif operation == 'update':
+            key = self.get_tracker(table_name).choose(self.access_choosers.get('update'))
+            if key is not None:
+                row = (key,) + row[1:]
+            return Operation('update', table_name, row[0], self.writer.format_update(table_name, row))
+        elif operation == 'delete':
+            key = self.get_tracker(table_name).pop(self.access_choosers.get('delete'))
+            if key is None:
+                key = row[0]
+            elif self.registries is not None and table_name in self.registries:
+                self.registries[table_name].discard(key)
+            return Operation('delete', table_name, key, self.writer.format_delete(table_name, key))
+        
+        raise ValueError(f"Unknown operation: {operation}")
+    
+    def generate_insert_many(self, table_name: str, rows: List[Tuple]) -> Operation:
+        """Generate one multi-row INSERT for row tuples; starts tracking every row's key."""
+        keys = tuple(row[0] for row in rows)
+        if self.registries is not None and table_name in self.registries:
+            self.registries[table_name].extend(keys)
+        self.get_tracker(table_name).extend(keys)
+        return Operation('insert', table_name, keys, self.writer.format_insert_many(table_name, rows))
+    
+    def generate_read(self, table_name: str, query: str) -> Operation:
+        """
+        Generate a read query of the given class
+        
+        Point lookups and joins target a tracked key (via the 'read' access
+        distribution); range scans cover a random created_at window.
+        """
+        settings = Config.READS
+        
+        if query == 'top_n':
+            return Operation(query, table_name, None, self.writer.format_top_n(table_name, settings['top_n']))
+        
+        if query == 'range_scan':
+            window = timedelta(hours=settings['range_window_hours'])
+            earliest = datetime.now() - timedelta(days=365)
+            span = max(0, int((timedelta(days=365) - window).total_seconds()))
+            start = earliest + timedelta(seconds=random.randint(0, span))
+            sql = self.writer.format_range_scan(table_name, settings['range_column'],
+                                               start.strftime("%Y-%m-%d %H:%M:%S"),
+                                               (start + window).strftime("%Y-%m-%d %H:%M:%S"),
+                                               settings['range_limit'])
+            return Operation(query, table_name, None, sql)
+        
+        key = self.get_tracker(table_name).choose(self.access_choosers.get('read'))
+        if key is None:
+            key = self.generate_uuid()
+        
+        if query == 'point_lookup':
+            return Operation(query, table_name, key, self.writer.format_select(table_name, key))
+        if query == 'join':
+            return Operation(query, table_name, key, self.writer.format_join(table_name, key))
+        
+        raise ValueError(f"Unknown read query: {query}")
+    
+    def generate_statement(self, table_name: str, row: Tuple, operation: str = 'insert') -> str:
+        """Generate a single SQL statement for a row tuple."""
+        return self.generate_operation(table_name, row, operation).sql
+    
+    def discard_key(self, table_name: str, key: str) -> None:
+        """Stop tracking a key whose INSERT failed."""
+        tracker = self.trackers.get(table_name)
+        if tracker is not None:
+            tracker.discard(key)
+        if self.registries is not None and table_name in self.registries:
+            self.registries[table_name].discard(key)
+    
+    def write_batch(self, writer: SQLWriter, data_type: str, count: int, operation: str = 'insert') -> int:
+        """Write a batch of SQL statements into a writer; returns the statement count."""
+        row_func, table_name = self.get_row_generator(data_type)
         
         for _ in range(count):
-            data = generator_func()
-            
-            # Handle random operation - randomly choose INSERT, UPDATE, or DELETE
-            if operation == 'random':
-                actual_operation = random.choice(['insert', 'update', 'delete'])
-            else:
-                actual_operation = operation
-            
-            if actual_operation == 'insert':
-                stmt = self.generate_insert_statement(table_name, data)
-            elif actual_operation == 'update':
-                stmt = self.generate_update_statement(table_name, data)
-            elif actual_operation == 'delete':
-                stmt = self.generate_delete_statement(table_name, data['id'])
-            else:
-                raise ValueError(f"Unknown operation: {actual_operation}")
-            
-            statements.append(stmt)
+            writer.write(self.generate_statement(table_name, row_func(), operation))
         
+        return count
+    
+    def iter_batch(self, data_type: str, count: int, operation: str = 'insert',
+                   chunk_size: Optional[int] = None) -> Iterator[Union[str, List[str]]]:
+        """
+        Lazily generate SQL statements
+        
+        Args:
+            data_type: Data type ('user') or table name ('users')
+            count: Total number of statements
+            operation: insert, update, delete or random
+            chunk_size: Yield lists of up to this many statements instead of single strings
+        
+        Yields:
+            One statement at a time, or one chunk at a time when chunk_size is set
+        """
+        row_func, table_name = self.get_row_generator(data_type)
+        
+        if not chunk_size:
+            for _ in range(count):
+                yield self.generate_statement(table_name, row_func(), operation)
+            return
+        
+        # Chunks are built in a private buffer that is reused for every chunk
+        writer = SQLWriter()
+        remaining = count
+        while remaining > 0:
+            current_chunk = min(chunk_size, remaining)
+            for _ in range(current_chunk):
+                writer.write(self.generate_statement(table_name, row_func(), operation))
+            yield writer.statements()
+            writer.reset()
+            remaining -= current_chunk
+    
+    def iter_operations(self, data_type: str, count: int, operation: str = 'insert',
+                        chunk_size: Union[int, Callable[[], int]] = 1000,
+                        multi_row: bool = False) -> Iterator[List[Operation]]:
+        """
+        Lazily generate chunks of operations
+        
+        Like iter_batch, but each item carries its resolved kind, table and
+        target key so executors can report affected rows per operation and
+        un-track keys whose INSERT failed. chunk_size may be a callable,
+        read before every chunk, so a controller can resize batches while
+        the run is in progress. With multi_row, an INSERT-only chunk is one
+        multi-row INSERT operation.
+        """
+        row_func, table_name = self.get_row_generator(data_type)
+        
+        remaining = count
+        while remaining > 0:
+            current_chunk = min(chunk_size() if callable(chunk_size) else chunk_size, remaining)
+            if multi_row and operation == 'insert':
+                yield [self.generate_insert_many(table_name, [row_func() for _ in range(current_chunk)])]
+            else:
+                yield [self.generate_operation(table_name, row_func(), operation) for _ in range(current_chunk)]
+            remaining -= current_chunk
+    
+    def generate_batch(self, data_type: str, count: int, operation: str = 'insert') -> List[str]:
+        """Generate a batch of SQL statements."""
+        self.writer.reset()
+        self.write_batch(self.writer, data_type, count, operation)
+        statements = self.writer.statements()
+        self.writer.reset()
         return statements
+    
+    def write_file(self, path: str, data_type: str, count: int, operation: str = 'insert',
+                   chunk_size: int = 10000) -> int:
+        """Stream generated SQL statements to a file in constant memory; returns the statement count."""
+        with open(path, 'w', encoding='utf-8') as f:
+            writer = SQLWriter()
+            remaining = count
+            while remaining > 0:
+                current_chunk = min(chunk_size, remaining)
+                self.write_batch(writer, data_type, current_chunk, operation)
+                f.write(writer.getvalue())
+                writer.reset()
+                remaining -= current_chunk
+        
+        return count
 
 
 class MultiCoreGenerator:
     """Multi-core data generation manager."""
     
-    def __init__(self, num_cores: int = None):
+    def __init__(self, num_cores: int = None, pools: Optional[ValuePools] = None,
+                 unique_start: Optional[int] = None, registries: Optional[KeyRegistrySet] = None):
         """Initialize multi-core generator."""
         self.num_cores = num_cores or cpu_count()
-        self.generator = SQLDataGenerator()
+        self.pools = pools
+        self.unique_start = unique_start
+        self.registries = registries
+        self.generator = SQLDataGenerator(pools=pools)
     
     @staticmethod
-    def _generate_chunk(args: Tuple[str, int, str, int]) -> Tuple[List[str], float, int]:
-        """Generate a chunk of data (worker function)."""
-        data_type, count, operation, seed = args
+    def _generate_chunk(args: Tuple) -> Tuple[List[str], float, int, List[str]]:
+        """Generate a chunk of data (worker function); also returns the keys that did not fit the registry."""
+        data_type, count, operation, seed, pool_paths, unique_start, registry_handles, registry_start = args
+        
+        # Workers memory-map the same pool files, sharing pages instead of copying
+        pools = ValuePools.open(pool_paths) if pool_paths else None
+        
+        # Attach to the shared key registries; this worker owns one slot range of its own table
+        registries = None
+        if registry_handles:
+            registries = KeyRegistrySet.attach(registry_handles, DATA_TYPE_TABLES.get(data_type, data_type), registry_start)
         
         # Create generator with seed for this worker
-        generator = SQLDataGenerator(seed)
+        generator = SQLDataGenerator(seed, pools=pools, unique_start=unique_start, registries=registries)
         
         start_time = time.time()
         start_cpu = psutil.Process().cpu_percent()
@@ -282,7 +583,14 @@ class MultiCoreGenerator:
         end_time = time.time()
         duration = end_time - start_time
         
-        return statements, duration, len(statements)
+        overflow = []
+        if registries is not None:
+            writer = registries.get(DATA_TYPE_TABLES.get(data_type, data_type))
+            if writer is not None:
+                overflow = writer.overflow
+            registries.close()
+        
+        return statements, duration, len(statements), overflow
     
     def generate_parallel(self, data_type: str, total_count: int, operation: str = 'insert') -> Dict[str, Any]:
         """Generate data using multiple cores."""
@@ -293,22 +601,46 @@ class MultiCoreGenerator:
         remainder = total_count % self.num_cores
         
         # Prepare arguments for each worker
+        pool_paths = self.pools.paths if self.pools is not None else None
+        
+        # Workers sample the registries directly, so purge discarded keys first;
+        # inserted keys go to disjoint slot ranges of the table's registry
+        if self.registries is not None:
+            self.registries.compact()
+        registry_handles = self.registries.handles if self.registries is not None else None
+        table_registry = self.registries.get(DATA_TYPE_TABLES.get(data_type, data_type)) if self.registries is not None else None
+        registry_start = len(table_registry) if table_registry is not None else 0
+        
         tasks = []
         for i in range(self.num_cores):
             count = chunk_size + (1 if i < remainder else 0)
             if count > 0:
                 seed = random.randint(1, 1000000) + i
-                tasks.append((data_type, count, operation, seed))
+                tasks.append((data_type, count, operation, seed, pool_paths, self.unique_start,
+                              registry_handles, registry_start if operation == 'insert' else None))
+                
+                # Each worker gets a disjoint row counter range
+                if self.unique_start is not None:
+                    self.unique_start += count
+                if operation == 'insert':
+                    registry_start += count
         
         # Execute in parallel
         with Pool(processes=self.num_cores) as pool:
             results = pool.map(self._generate_chunk, tasks)
         
+        # Publish the keys written by the workers; keys past the capacity
+        # go through the parent's reservoir sampling
+        if table_registry is not None and operation == 'insert':
+            table_registry.set_count(registry_start)
+            for result in results:
+                table_registry.extend(result[3])
+        
         # Combine results
         all_statements = []
         total_duration = 0
         
-        for statements, duration, count in results:
+        for statements, duration, count, _ in results:
             all_statements.extend(statements)
             total_duration = max(total_duration, duration)
         
@@ -322,6 +654,22 @@ class MultiCoreGenerator:
             'cores_used': self.num_cores,
             'records_per_second': len(all_statements) / total_time if total_time > 0 else 0
         }
+    
+    def generate_dataset(self, counts: Dict[str, int], operation: str = 'insert') -> Dict[str, Dict[str, Any]]:
+        """
+        Generate several tables in dependency order
+        
+        Args:
+            counts: Row count per table name
+            operation: Operation for every table (normally insert)
+            
+        Returns:
+            generate_parallel() result per table, in load order
+        """
+        results = {}
+        for table_name in Config.get_load_order(list(counts.keys())):
+            results[table_name] = self.generate_parallel(table_name, counts[table_name], operation)
+        return results
 
 
 class PerformanceMonitor:
@@ -329,13 +677,13 @@ class PerformanceMonitor:
     
     @staticmethod
     def get_cpu_usage() -> float:
-        """Get current CPU usage percentage."""
-        return psutil.cpu_percent(interval=0.1)
+        """Get CPU usage percentage since the previous call (non-blocking; see SystemSampler for history)."""
+        return psutil.cpu_percent(interval=None)
     
     @staticmethod
     def get_cpu_per_core() -> List[float]:
-        """Get CPU usage per core."""
-        return psutil.cpu_percent(interval=0.1, percpu=True)
+        """Get CPU usage per core since the previous call (non-blocking)."""
+        return psutil.cpu_percent(interval=None, percpu=True)
     
     @staticmethod
     def get_memory_usage() -> Dict[str, float]:
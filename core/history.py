@@ -0,0 +1,273 @@
+"""
+Run History
+Archived run reports with a pinned baseline, and regression checks between two runs
+"""
+
+import json
+import math
+import os
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .config import Config
+from .metrics import percentile_keys
+
+
+def mann_whitney(baseline: Sequence[float], candidate: Sequence[float]) -> Optional[float]:
+    """
+    Two-sided Mann-Whitney U test between two samples
+    
+    Args:
+        baseline: Per-window values of the baseline run
+        candidate: Per-window values of the candidate run
+    
+    Returns:
+        p-value (normal approximation with tie correction), or None when either sample is empty
+    """
+    n1, n2 = len(baseline), len(candidate)
+    if not n1 or not n2:
+        return None
+    
+    values = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    start = 0
+    while start < len(values):
+        end = start
+        while end + 1 < len(values) and values[end + 1][0] == values[start][0]:
+            end += 1
+        for index in range(start, end + 1):
+            ranks[index] = (start + end) / 2 + 1
+        size = end - start + 1
+        ties += size ** 3 - size
+        start = end + 1
+    
+    n = n1 + n2
+    u = sum(rank for rank, (_, group) in zip(ranks, values) if group == 0) - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0
+    z = max(0.0, abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return 2 * (1 - NormalDist().cdf(z))
+
+
+def _windows(report: Dict[str, Any], metric: str) -> List[float]:
+    """Per-window values of a metric from a report's timeline, empty windows skipped."""
+    return [window[metric] for window in report.get('timeline') or []
+            if window.get('operations') and window.get(metric) is not None]
+
+
+def compare_runs(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                 thresholds: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Check a run against a baseline run for regressions
+    
+    A metric regresses when it moves the wrong way by more than its
+    threshold (latency also by more than the noise floor) and, when both
+    timelines have enough windows, the per-window values differ
+    significantly (Mann-Whitney U, p < alpha). Latency percentiles (the
+    Config.METRICS set every summary reports) are checked per table and
+    operation; their significance test uses the whole run's per-window
+    percentiles.
+    
+    Args:
+        baseline: Baseline run report
+        candidate: Run report to check
+        thresholds: Overrides for Config.HISTORY thresholds
+    
+    Returns:
+        Comparison with every check, the regressions, and warnings when the runs differ in setup
+    """
+    settings = {**Config.HISTORY, **(thresholds or {})}
+    min_windows = settings['min_windows']
+    checks = []
+    
+    def significance(metric: str) -> Optional[float]:
+        before, after = _windows(baseline, metric), _windows(candidate, metric)
+        if len(before) < min_windows or len(after) < min_windows:
+            return None
+        return mann_whitney(before, after)
+    
+    def check(metric: str, before: Optional[float], after: Optional[float], threshold: float,
+              higher_is_better: bool, p_value: Optional[float] = None, floor: float = 0.0,
+              operation: Optional[str] = None) -> None:
+        if before is None or after is None:
+            return
+        change = (after - before) / before if before else (0.0 if after == before else math.inf)
+        worse = -change if higher_is_better else change
+        significant = p_value is None or p_value < settings['alpha']
+        checks.append({
+            'metric': metric,
+            'operation': operation,
+            'baseline': before,
+            'candidate': after,
+            'change': change,
+            'threshold': threshold,
+            'p_value': p_value,
+            'regression': worse > threshold and abs(after - before) > floor and significant,
+            'improvement': -worse > threshold and abs(after - before) > floor and significant
+        })
+    
+    check('throughput', baseline['summary']['throughput'], candidate['summary']['throughput'],
+          settings['throughput_drop'], higher_is_better=True, p_value=significance('throughput'))
+    
+    candidate_latency = {(entry.get('table'), entry['operation']): entry for entry in candidate.get('latency') or []}
+    for entry in baseline.get('latency') or []:
+        other = candidate_latency.get((entry.get('table'), entry['operation']))
+        if other is None or not entry.get('count') or not other.get('count'):
+            continue
+        operation = '.'.join(str(part) for part in (entry.get('table'), entry['operation']) if part)
+        for metric in percentile_keys():
+            check(metric, entry.get(metric), other.get(metric), settings['latency_increase'],
+                  higher_is_better=False, p_value=significance(metric), floor=settings['latency_floor_ms'],
+                  operation=operation)
+    
+    # Error rates are compared as an absolute increase; a relative change from 0% means little
+    before, after = baseline['summary']['error_rate'], candidate['summary']['error_rate']
+    checks.append({'metric': 'error_rate', 'operation': None, 'baseline': before, 'candidate': after,
+                   'change': after - before, 'threshold': settings['error_rate_increase'], 'p_value': None,
+                   'regression': after - before > settings['error_rate_increase'],
+                   'improvement': before - after > settings['error_rate_increase']})
+    
+    warnings = []
+    if baseline.get('database') != candidate.get('database'):
+        warnings.append(f"database differs: {baseline.get('database')} vs {candidate.get('database')}")
+    for name in ('operation', 'table'):
+        before, after = baseline['config'].get(name), candidate['config'].get(name)
+        if before != after:
+            warnings.append(f"{name} differs: {before} vs {after}")
+    
+    regressions = [entry for entry in checks if entry['regression']]
+    return {
+        'baseline': baseline['id'],
+        'candidate': candidate['id'],
+        'checks': checks,
+        'regressions': regressions,
+        'regressed': bool(regressions),
+        'warnings': warnings
+    }
+
+
+class RunHistory:
+    """
+    Directory of archived run reports with one pinned baseline.
+    
+    Every run report saved to the directory (see RunReport.save) is part
+    of the history; report ids start with the run's start time, so they
+    sort chronologically. The pinned baseline's id is kept in a small file
+    beside the reports. Runs are referred to by id, by 'latest',
+    'previous' or 'baseline', or by the path of a report file.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize run history
+        
+        Args:
+            directory: Report directory (defaults to Config.REPORTS['directory'])
+        """
+        self.directory = directory or Config.REPORTS['directory']
+        self.baseline_path = os.path.join(self.directory, Config.HISTORY['baseline_file'])
+    
+    def ids(self) -> List[str]:
+        """Archived run ids, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json'))
+    
+    def runs(self) -> List[Dict[str, Any]]:
+        """One summary row per archived run, oldest first."""
+        baseline = self.baseline
+        rows = []
+        for run_id in self.ids():
+            try:
+                report = self.load(run_id)
+            except ValueError:
+                continue
+            summary = report['summary']
+            rows.append({'id': run_id, 'baseline': run_id == baseline, 'database': report.get('database'),
+                         'operation': report['config'].get('operation'), 'table': report['config'].get('table'),
+                         'operations': summary['operations'], 'errors': summary['errors'],
+                         'throughput': summary['throughput'], 'duration': summary['duration']})
+        return rows
+    
+    def resolve(self, ref: str) -> str:
+        """
+        Path of the report a reference points to
+        
+        Args:
+            ref: Run id, 'latest', 'previous', 'baseline' or a report file path
+        
+        Returns:
+            Report file path
+        """
+        if os.path.isfile(ref):
+            return ref
+        if ref == 'baseline':
+            ref = self.baseline
+            if ref is None:
+                raise ValueError(f"No baseline is pinned in {self.directory}")
+        elif ref in ('latest', 'previous'):
+            ids = self.ids()
+            needed = 1 if ref == 'latest' else 2
+            if len(ids) < needed:
+                raise ValueError(f"Fewer than {needed} runs archived in {self.directory}")
+            ref = ids[-needed]
+        
+        path = os.path.join(self.directory, f"{ref}.json")
+        if not os.path.isfile(path):
+            raise ValueError(f"No run {ref} in {self.directory}")
+        return path
+    
+    def load(self, ref: str) -> Dict[str, Any]:
+        """Report a reference points to (see resolve)."""
+        path = self.resolve(ref)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                report = json.load(handle)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot read run report {path}: {e}") from e
+        if not isinstance(report, dict) or 'summary' not in report:
+            raise ValueError(f"{path} is not a run report")
+        return report
+    
+    @property
+    def baseline(self) -> Optional[str]:
+        """Id of the pinned baseline run, or None."""
+        try:
+            with open(self.baseline_path, encoding='utf-8') as handle:
+                return handle.read().strip() or None
+        except OSError:
+            return None
+    
+    def pin(self, ref: str) -> str:
+        """Pin a run as the baseline; returns its id."""
+        run_id = self.load(ref)['id']
+        if not os.path.isfile(os.path.join(self.directory, f"{run_id}.json")):
+            raise ValueError(f"Run {run_id} is not archived in {self.directory}")
+        with open(self.baseline_path, 'w', encoding='utf-8') as handle:
+            handle.write(run_id + '\n')
+        return run_id
+    
+    def unpin(self) -> None:
+        """Forget the pinned baseline."""
+        if os.path.exists(self.baseline_path):
+            os.remove(self.baseline_path)
+    
+    def compare(self, baseline: Union[str, Dict[str, Any]] = 'baseline',
+                candidate: Union[str, Dict[str, Any]] = 'latest',
+                thresholds: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Compare two runs (see compare_runs)
+        
+        Args:
+            baseline: Reference to the baseline run, or its report
+            candidate: Reference to the run to check, or its report
+            thresholds: Overrides for Config.HISTORY thresholds
+        
+        Returns:
+            Comparison report
+        """
+        baseline = self.load(baseline) if isinstance(baseline, str) else baseline
+        candidate = self.load(candidate) if isinstance(candidate, str) else candidate
+        return compare_runs(baseline, candidate, thresholds)
@@ -0,0 +1,387 @@
+"""
+Key Registry
+Compact, shared-memory store of generated primary keys per table
+"""
+
+import random
+import struct
+import threading
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Iterable, Optional
+
+from .config import Config
+
+
+# Header: number of keys stored (uint64); followed by 16-byte UUID slots
+_COUNT = struct.Struct('=Q')
+
+
+def uniform_index(n: int) -> int:
+    """Pick an index in [0, n) uniformly."""
+    return random.randrange(n)
+
+
+class KeyRegistry:
+    """
+    Array-backed registry of UUID primary keys for one table.
+    
+    Keys are stored as raw 16-byte UUIDs in a fixed-capacity
+    ``SharedMemory`` block, so 100M keys take 1.6 GB and worker processes
+    attach to the same block by name instead of receiving copies.
+    
+    Only the creating process appends (under a lock, so sessions may share
+    a registry). MultiCoreGenerator workers instead write to disjoint slot
+    ranges (``start``) and the parent publishes the new count with
+    ``set_count`` once they finish; keys past the capacity are kept in
+    ``overflow`` for the parent to append. Other attachments are read-only
+    and ignore appends. When the registry is full, reservoir sampling keeps
+    it a uniform sample of every key added. Keys whose rows are gone (failed
+    inserts, deletes) are discarded: sampling drops them lazily and
+    ``compact`` purges them before workers attach.
+    """
+    
+    KEY_SIZE = 16
+    
+    def __init__(self, capacity: int, name: Optional[str] = None, start: Optional[int] = None):
+        """
+        Create a registry, or attach to an existing one by name
+        
+        Args:
+            capacity: Maximum number of keys held
+            name: Shared memory block name to attach to; a new block is created if omitted
+            start: Slot to start writing at when attached as a worker
+        """
+        self.capacity = capacity
+        size = _COUNT.size + capacity * self.KEY_SIZE
+        
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            _COUNT.pack_into(self._shm.buf, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            # The creating process owns cleanup; stop the tracker unlinking it on worker exit
+            try:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+            except Exception:
+                pass
+        
+        # Workers write their own slot range and leave the shared count alone;
+        # keys past the capacity go back to the parent for reservoir sampling
+        self._next = start
+        self.overflow = []
+        self._buf = self._shm.buf
+        # Keys added so far (for reservoir sampling) and discarded keys not yet purged, creator only
+        self.seen = 0
+        self._discarded = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def name(self) -> str:
+        """Shared memory block name, for attaching from another process."""
+        return self._shm.name
+    
+    def __len__(self) -> int:
+        return _COUNT.unpack_from(self._buf, 0)[0]
+    
+    def set_count(self, count: int) -> None:
+        """Publish the number of valid keys (after workers filled their slots)."""
+        count = min(count, self.capacity)
+        with self._lock:
+            # Only the keys written to free slots are new; overflow keys are counted as they are appended
+            self.seen += max(0, count - len(self))
+            _COUNT.pack_into(self._buf, 0, count)
+    
+    def _write_slot(self, slot: int, key: str) -> None:
+        offset = _COUNT.size + slot * self.KEY_SIZE
+        self._buf[offset:offset + self.KEY_SIZE] = uuid.UUID(key).bytes
+    
+    def _read_slot(self, slot: int) -> bytes:
+        offset = _COUNT.size + slot * self.KEY_SIZE
+        return bytes(self._buf[offset:offset + self.KEY_SIZE])
+    
+    def _remove_slot(self, slot: int) -> None:
+        """Fill a slot with the last key and shrink the count."""
+        last = len(self) - 1
+        if slot != last:
+            offset = _COUNT.size + slot * self.KEY_SIZE
+            self._buf[offset:offset + self.KEY_SIZE] = self._read_slot(last)
+        _COUNT.pack_into(self._buf, 0, last)
+    
+    def append(self, key: str) -> None:
+        """Add a generated key."""
+        if not self._owner and self._next is None:
+            return
+        
+        if self._next is not None:
+            # Worker mode: private slot range, count published by the parent
+            if self._next < self.capacity:
+                self._write_slot(self._next, key)
+            else:
+                self.overflow.append(key)
+            self._next += 1
+            return
+        
+        with self._lock:
+            self.seen += 1
+            count = len(self)
+            if count < self.capacity:
+                self._write_slot(count, key)
+                _COUNT.pack_into(self._buf, 0, count + 1)
+                return
+            
+            # Reservoir sampling (Algorithm R): keep each key seen with equal probability
+            slot = random.randrange(self.seen)
+            if slot < self.capacity:
+                self._write_slot(slot, key)
+    
+    def extend(self, keys: Iterable[str]) -> None:
+        """Add several keys."""
+        for key in keys:
+            self.append(key)
+    
+    def discard(self, key: str) -> None:
+        """Forget a key whose row does not exist (failed INSERT, DELETE); sampling stops returning it."""
+        if not self._owner:
+            return
+        with self._lock:
+            self._discarded.add(uuid.UUID(key).bytes)
+            # Keys never sampled again would pile up; purge once they outnumber the live ones
+            if len(self._discarded) > max(len(self), 1024):
+                self._compact()
+    
+    def compact(self) -> None:
+        """Purge every discarded key now (e.g. before worker processes attach and sample)."""
+        if self._owner:
+            with self._lock:
+                self._compact()
+    
+    def _compact(self) -> None:
+        if not self._discarded:
+            return
+        count = len(self)
+        data = bytes(self._buf[_COUNT.size:_COUNT.size + count * self.KEY_SIZE])
+        kept = bytearray()
+        for offset in range(0, len(data), self.KEY_SIZE):
+            key = data[offset:offset + self.KEY_SIZE]
+            if key not in self._discarded:
+                kept += key
+        self._buf[_COUNT.size:_COUNT.size + len(kept)] = kept
+        _COUNT.pack_into(self._buf, 0, len(kept) // self.KEY_SIZE)
+        self._discarded.clear()
+    
+    def get(self, index: int) -> str:
+        """Get the key stored at an index."""
+        return str(uuid.UUID(bytes=self._read_slot(index)))
+    
+    def sample(self, chooser: Optional[Callable[[int], int]] = None) -> Optional[str]:
+        """
+        Pick a stored key
+        
+        Args:
+            chooser: Maps the key count n to an index in [0, n); uniform if omitted
+        
+        Returns:
+            A key, or None if the registry is empty
+        """
+        with self._lock:
+            while True:
+                count = len(self)
+                if count == 0:
+                    return None
+                index = (chooser or uniform_index)(count)
+                key = self._read_slot(index)
+                if key not in self._discarded:
+                    return str(uuid.UUID(bytes=key))
+                # Drop the discarded key and pick again
+                self._discarded.discard(key)
+                self._remove_slot(index)
+    
+    def clear(self) -> None:
+        """Forget all keys."""
+        with self._lock:
+            _COUNT.pack_into(self._buf, 0, 0)
+            self.seen = 0
+            self._discarded.clear()
+    
+    def close(self) -> None:
+        """Detach; the creating process also frees the shared memory."""
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class KeyRegistrySet:
+    """Key registries for every table, keyed by table name."""
+    
+    def __init__(self, registries: Dict[str, KeyRegistry]):
+        """Initialize from existing registries."""
+        self.registries = registries
+    
+    def __getitem__(self, table_name: str) -> KeyRegistry:
+        return self.registries[table_name]
+    
+    def __contains__(self, table_name: str) -> bool:
+        return table_name in self.registries
+    
+    def get(self, table_name: str) -> Optional[KeyRegistry]:
+        """Get a table's registry, if any."""
+        return self.registries.get(table_name)
+    
+    @classmethod
+    def create(cls, tables: Optional[Iterable[str]] = None, capacity: Optional[int] = None) -> 'KeyRegistrySet':
+        """Create empty registries for the given (default: all referenced) tables."""
+        capacity = capacity or Config.KEY_REGISTRY['capacity']
+        if tables is None:
+            tables = Config.get_referenced_tables()
+        return cls({table_name: KeyRegistry(capacity) for table_name in tables})
+    
+    @property
+    def handles(self) -> Dict[str, tuple]:
+        """(name, capacity) per table, for attaching from worker processes."""
+        return {table_name: (registry.name, registry.capacity) for table_name, registry in self.registries.items()}
+    
+    @classmethod
+    def attach(cls, handles: Dict[str, tuple], writer_table: Optional[str] = None,
+               start: Optional[int] = None) -> 'KeyRegistrySet':
+        """Attach to registries created in another process."""
+        return cls({
+            table_name: KeyRegistry(capacity, name=name, start=start if table_name == writer_table else None)
+            for table_name, (name, capacity) in handles.items()
+        })
+    
+    def compact(self) -> None:
+        """Purge discarded keys from every registry."""
+        for registry in self.registries.values():
+            registry.compact()
+    
+    def close(self) -> None:
+        """Detach from (and, in the creating process, free) all registries."""
+        for registry in self.registries.values():
+            registry.close()
+
+
+class KeyTracker:
+    """
+    Bounded tracker of keys that currently exist in a table.
+    
+    Keys are packed as 16-byte UUIDs in one bytearray, oldest first, so
+    index n - 1 is the newest key (what LatestChooser relies on); keys
+    seeded with ``extend`` count as older than later inserts, in the order
+    given. Removing a key leaves a hole instead of moving another key into
+    its slot, and picks that land on a hole draw again; holes are squeezed
+    out once they make up half the slots, so picking and removing stay
+    O(1) amortized. Once ``capacity`` keys are held, reservoir sampling
+    keeps the tracker a uniform sample of every key added so far: the
+    evicted key leaves a hole and the new key joins at the newest end.
+    """
+    
+    KEY_SIZE = 16
+    # Marks a removed slot (never a generated UUID4)
+    HOLE = bytes(KEY_SIZE)
+    # Draws that may land on holes before the holes are squeezed out
+    PICK_ATTEMPTS = 10
+    
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize key tracker
+        
+        Args:
+            capacity: Maximum number of keys held (defaults to Config.KEY_TRACKER)
+        """
+        self.capacity = capacity or Config.KEY_TRACKER['capacity']
+        self.seen = 0
+        self._slots = bytearray()
+        self._holes = 0
+    
+    def __len__(self) -> int:
+        return len(self._slots) // self.KEY_SIZE - self._holes
+    
+    def _slot(self, index: int) -> bytes:
+        offset = index * self.KEY_SIZE
+        return bytes(self._slots[offset:offset + self.KEY_SIZE])
+    
+    def _get(self, index: int) -> str:
+        return str(uuid.UUID(bytes=self._slot(index)))
+    
+    def _remove(self, index: int) -> None:
+        offset = index * self.KEY_SIZE
+        self._slots[offset:offset + self.KEY_SIZE] = self.HOLE
+        self._holes += 1
+        if self._holes * 2 > len(self._slots) // self.KEY_SIZE:
+            self._compact()
+    
+    def _compact(self) -> None:
+        """Squeeze out the holes, keeping the keys in order."""
+        view = memoryview(self._slots)
+        self._slots = bytearray().join(
+            view[offset:offset + self.KEY_SIZE] for offset in range(0, len(self._slots), self.KEY_SIZE)
+            if view[offset:offset + self.KEY_SIZE] != self.HOLE
+        )
+        view.release()
+        self._holes = 0
+    
+    def _pick(self, chooser: Callable[[int], int]) -> int:
+        """Index of a live slot drawn with the chooser (over all slots, holes included)."""
+        for _ in range(self.PICK_ATTEMPTS):
+            index = chooser(len(self._slots) // self.KEY_SIZE)
+            if self._slot(index) != self.HOLE:
+                return index
+        
+        # A skewed chooser kept hitting holes (e.g. its hot keys were deleted)
+        self._compact()
+        return chooser(len(self._slots) // self.KEY_SIZE)
+    
+    def add(self, key: str) -> None:
+        """Track a newly inserted key."""
+        self.seen += 1
+        key_bytes = uuid.UUID(key).bytes
+        
+        if len(self) < self.capacity:
+            self._slots += key_bytes
+            return
+        
+        # Reservoir sampling: keep each key seen with equal probability
+        if random.randrange(self.seen) < self.capacity:
+            self._remove(self._pick(uniform_index))
+            self._slots += key_bytes
+    
+    def extend(self, keys: Iterable[str]) -> None:
+        """Track several existing keys."""
+        for key in keys:
+            self.add(key)
+    
+    def choose(self, chooser: Optional[Callable[[int], int]] = None) -> Optional[str]:
+        """Pick a tracked key (for UPDATE); None if nothing is tracked."""
+        if len(self) == 0:
+            return None
+        return self._get(self._pick(chooser or uniform_index))
+    
+    def pop(self, chooser: Optional[Callable[[int], int]] = None) -> Optional[str]:
+        """Pick and stop tracking a key (for DELETE); None if nothing is tracked."""
+        if len(self) == 0:
+            return None
+        index = self._pick(chooser or uniform_index)
+        key = self._get(index)
+        self._remove(index)
+        return key
+    
+    def discard(self, key: str) -> bool:
+        """Stop tracking a specific key, e.g. after a failed insert (O(n) scan)."""
+        key_bytes = uuid.UUID(key).bytes
+        offset = self._slots.find(key_bytes)
+        while offset != -1 and offset % self.KEY_SIZE:
+            offset = self._slots.find(key_bytes, offset + 1)
+        if offset == -1:
+            return False
+        self._remove(offset // self.KEY_SIZE)
+        return True
+    
+    def clear(self) -> None:
+        """Forget all keys."""
+        self._slots = bytearray()
+        self._holes = 0
+        self.seen = 0
@@ -0,0 +1,514 @@
+"""
+Workload Metrics
+Latency recording, HDR-style histograms and percentile summaries for workload runs
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+
+
+def percentile_key(percent: float) -> str:
+    """Summary key of a latency percentile, e.g. 'p95_ms' or 'p999_ms' for 99.9."""
+    return f"p{percent:g}".replace('.', '') + '_ms'
+
+
+def percentile_keys() -> List[str]:
+    """Summary keys of the Config.METRICS percentiles, lowest first."""
+    return [percentile_key(percent) for percent in Config.METRICS['percentiles']]
+
+
+# Histogram count array length per (range, precision): how many exact samples fit in the same memory
+_HISTOGRAM_SLOTS = {}
+
+
+def _histogram_slots(highest: Optional[float], significant_digits: Optional[int]) -> int:
+    """Count array length of a LatencyHistogram with these options."""
+    key = (highest or Config.METRICS['histogram_highest'], significant_digits or Config.METRICS['histogram_digits'])
+    if key not in _HISTOGRAM_SLOTS:
+        _HISTOGRAM_SLOTS[key] = len(LatencyHistogram(*key).counts)
+    return _HISTOGRAM_SLOTS[key]
+
+
+class LatencyStats:
+    """
+    Latency samples (in seconds) with percentile summaries, in bounded memory.
+    
+    Samples are kept exactly until they would take as much memory as a
+    LatencyHistogram of the same range and precision; from then on they
+    are folded into that histogram, so a summary is exact for small
+    counts, accurate to the histogram's precision for large ones, and
+    millions of samples cost kilobytes. Each session records into its own
+    instance; instances are merged once the run ends, so recording needs
+    no locking. The running total gives the mean during a run.
+    """
+    
+    def __init__(self, highest: Optional[float] = None, significant_digits: Optional[int] = None):
+        """
+        Initialize empty latency stats (unset options default to Config.METRICS)
+        
+        Args:
+            highest: Largest trackable latency in seconds once samples are folded
+            significant_digits: Decimal digits of precision kept once samples are folded
+        """
+        self.highest = highest
+        self.significant_digits = significant_digits
+        self.samples = array('d')
+        self.histogram = None
+        self.total = 0.0
+        self._exact_limit = _histogram_slots(highest, significant_digits)
+    
+    def __len__(self) -> int:
+        return len(self.histogram) if self.histogram is not None else len(self.samples)
+    
+    def _fold(self) -> 'LatencyHistogram':
+        """Move the exact samples into the histogram (created on first use)."""
+        if self.histogram is None:
+            self.histogram = LatencyHistogram(self.highest, self.significant_digits)
+        for seconds in self.samples:
+            self.histogram.record(seconds)
+        self.samples = array('d')
+        return self.histogram
+    
+    def record(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self.total += seconds
+        if self.histogram is not None:
+            self.histogram.record(seconds)
+            return
+        self.samples.append(seconds)
+        if len(self.samples) > self._exact_limit:
+            self._fold()
+    
+    def merge(self, other: 'LatencyStats') -> None:
+        """Add another instance's samples."""
+        if other.histogram is not None:
+            self._fold().merge(other.histogram)
+        for seconds in other.samples:
+            if self.histogram is not None:
+                self.histogram.record(seconds)
+            else:
+                self.samples.append(seconds)
+        if len(self.samples) > self._exact_limit:
+            self._fold()
+        self.total += other.total
+    
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile in seconds (0.0 when empty)."""
+        if self.histogram is not None:
+            return self.histogram.percentile(percent)
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, the Config.METRICS percentiles and max in milliseconds."""
+        if self.histogram is not None:
+            return {**self.histogram.summary(), 'mean_ms': self.total / len(self.histogram) * 1000}
+        
+        count = len(self.samples)
+        if count == 0:
+            return {'count': 0, 'mean_ms': 0.0, **dict.fromkeys(percentile_keys(), 0.0), 'max_ms': 0.0}
+        
+        ordered = sorted(self.samples)
+        
+        def at(percent: float) -> float:
+            return ordered[max(1, math.ceil(percent / 100 * count)) - 1] * 1000
+        
+        return {
+            'count': count,
+            'mean_ms': self.total / count * 1000,
+            **{percentile_key(percent): at(percent) for percent in Config.METRICS['percentiles']},
+            'max_ms': ordered[-1] * 1000
+        }
+
+
+class OperationStats:
+    """Count, errors, rows and latency per operation kind (insert, point_lookup, ...)."""
+    
+    def __init__(self):
+        """Initialize empty operation stats"""
+        self.kinds = {}
+    
+    def _entry(self, kind: str) -> Dict:
+        entry = self.kinds.get(kind)
+        if entry is None:
+            entry = self.kinds[kind] = {'count': 0, 'errors': 0, 'rows': 0, 'latency': LatencyStats()}
+        return entry
+    
+    def record(self, kind: str, rows: int, seconds: float) -> None:
+        """Record a successful operation with the rows it affected or returned."""
+        entry = self._entry(kind)
+        entry['count'] += 1
+        entry['rows'] += max(rows, 0)
+        entry['latency'].record(seconds)
+    
+    def record_error(self, kind: str) -> None:
+        """Record a failed operation."""
+        self._entry(kind)['errors'] += 1
+    
+    def merge(self, other: 'OperationStats') -> None:
+        """Add another instance's counts and samples (safe while its owner keeps recording)."""
+        # The owner may add a kind mid-merge; iterate over a snapshot of the kinds
+        for kind, entry in list(other.kinds.items()):
+            mine = self._entry(kind)
+            mine['count'] += entry['count']
+            mine['errors'] += entry['errors']
+            mine['rows'] += entry['rows']
+            mine['latency'].merge(entry['latency'])
+    
+    def totals(self) -> Tuple[int, int]:
+        """Successful and failed operations over all kinds, cheap enough for live progress."""
+        entries = list(self.kinds.values())
+        return sum(entry['count'] for entry in entries), sum(entry['errors'] for entry in entries)
+    
+    def rows(self, kind: str) -> int:
+        """Rows affected or returned by an operation kind so far."""
+        entry = self.kinds.get(kind)
+        return entry['rows'] if entry else 0
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per kind: count, errors, rows, rows per operation and latency summary in milliseconds."""
+        result = {}
+        for kind, entry in self.kinds.items():
+            latency = entry['latency'].summary()
+            del latency['count']
+            result[kind] = {
+                'count': entry['count'],
+                'errors': entry['errors'],
+                'rows': entry['rows'],
+                'rows_per_op': entry['rows'] / entry['count'] if entry['count'] else 0.0,
+                **latency
+            }
+        return result
+
+
+class WindowedStats:
+    """
+    Throughput and latency per fixed time window of a run.
+    
+    Shows how a run changes over time, e.g. under a load shape: each
+    window records its operations, errors, latency and the target rate in
+    force. Recording is locked so threaded workers can share one instance.
+    """
+    
+    def __init__(self, window: Optional[float] = None, started: Optional[float] = None):
+        """
+        Initialize windowed stats
+        
+        Args:
+            window: Window length in seconds (defaults to Config.METRICS)
+            started: perf_counter() value the run started at (now if omitted)
+        """
+        settings = Config.METRICS
+        self.window = window or settings['window']
+        self.started = time.perf_counter() if started is None else started
+        # Long runs have thousands of windows; each folds into a small, coarser histogram
+        self.highest = settings['sliding_highest']
+        self.significant_digits = settings['window_digits']
+        self._windows = {}
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float, error: bool = False, target_rate: Optional[float] = None,
+               now: Optional[float] = None) -> None:
+        """Record one operation finishing now (or at perf_counter() time `now`)."""
+        index = int(((time.perf_counter() if now is None else now) - self.started) // self.window)
+        with self._lock:
+            entry = self._windows.get(index)
+            if entry is None:
+                entry = self._windows[index] = {'count': 0, 'errors': 0, 'target_rate': None,
+                                                'latency': LatencyStats(self.highest, self.significant_digits)}
+            if error:
+                entry['errors'] += 1
+            else:
+                entry['count'] += 1
+                entry['latency'].record(seconds)
+            if target_rate is not None:
+                entry['target_rate'] = target_rate
+    
+    def windows(self) -> List[Dict[str, Any]]:
+        """Per window, in time order: start, operations, errors, throughput, target rate and latency in ms."""
+        with self._lock:
+            items = sorted(self._windows.items())
+        
+        result = []
+        for index, entry in items:
+            latency = entry['latency'].summary()
+            del latency['count']
+            result.append({
+                'start': index * self.window,
+                'operations': entry['count'],
+                'errors': entry['errors'],
+                'throughput': entry['count'] / self.window,
+                'target_rate': entry['target_rate'],
+                **latency
+            })
+        return result
+
+
+def find_knee(windows: List[Dict[str, Any]], factor: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find the window where latency explodes
+    
+    Args:
+        windows: WindowedStats.windows() output, in time order
+        factor: How many times the best p95 so far counts as an explosion (defaults to Config.METRICS)
+    
+    Returns:
+        The first window whose p95 exceeds factor x the lowest earlier p95, or None
+    """
+    factor = factor or Config.METRICS['knee_factor']
+    baseline = None
+    for window in windows:
+        if not window['operations']:
+            continue
+        if baseline is not None and window['p95_ms'] > factor * baseline:
+            return window
+        baseline = window['p95_ms'] if baseline is None else min(baseline, window['p95_ms'])
+    return None
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram in a fixed-size count array.
+    
+    Values are recorded in microseconds into log-linear buckets: every
+    power-of-two range is split into the same number of linear
+    sub-buckets, enough to keep ``significant_digits`` decimal digits of
+    precision. The array size depends only on the trackable range and
+    precision (about 26 KB for 1 us to 1 h at 2 digits), so millions of
+    samples cost no more memory than one. Values above the range are
+    clamped to its top.
+    """
+    
+    def __init__(self, highest: Optional[float] = None, significant_digits: Optional[int] = None):
+        """
+        Initialize histogram (unset options default to Config.METRICS)
+        
+        Args:
+            highest: Largest trackable latency in seconds
+            significant_digits: Decimal digits of precision kept (1-5)
+        """
+        settings = Config.METRICS
+        digits = significant_digits or settings['histogram_digits']
+        if not 1 <= digits <= 5:
+            raise ValueError("Significant digits must be between 1 and 5")
+        
+        self.highest = int((highest or settings['histogram_highest']) * 1_000_000)
+        self.significant_digits = digits
+        self.sub_bucket_count = 1 << math.ceil(math.log2(2 * 10 ** digits))
+        self.sub_bucket_half = self.sub_bucket_count // 2
+        self._half_magnitude = self.sub_bucket_half.bit_length() - 1
+        
+        self.bucket_count = 1
+        smallest_untrackable = self.sub_bucket_count
+        while smallest_untrackable <= self.highest:
+            smallest_untrackable <<= 1
+            self.bucket_count += 1
+        
+        self.counts = array('q', bytes(8 * (self.bucket_count + 1) * self.sub_bucket_half))
+        self.total = 0
+        self.total_us = 0
+        self.max_us = 0
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    def _index(self, value: int) -> int:
+        """Count array slot of a value in microseconds."""
+        bucket = max(0, value.bit_length() - self._half_magnitude - 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._half_magnitude) + sub_bucket - self.sub_bucket_half
+    
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value in microseconds that lands in a count array slot."""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self.sub_bucket_half - 1)) + self.sub_bucket_half
+        if bucket < 0:
+            sub_bucket -= self.sub_bucket_half
+            bucket = 0
+        return ((sub_bucket + 1) << bucket) - 1
+    
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Record a latency (seconds) `count` times."""
+        value = min(self.highest, max(0, int(seconds * 1_000_000)))
+        self.counts[self._index(value)] += count
+        self.total += count
+        self.total_us += value * count
+        self.max_us = max(self.max_us, value)
+    
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram with the same range and precision."""
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Histograms must share range and precision to merge")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+    
+    def reset(self) -> None:
+        """Drop all samples, keeping the array."""
+        self.counts = array('q', bytes(8 * len(self.counts)))
+        self.total = 0
+        self.total_us = 0
+        self.max_us = 0
+    
+    def percentile(self, percent: float) -> float:
+        """Percentile in seconds (0.0 when empty), accurate to the histogram's precision."""
+        if not self.total:
+            return 0.0
+        
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, the Config.METRICS percentiles and max in milliseconds."""
+        if not self.total:
+            return {'count': 0, 'mean_ms': 0.0, **dict.fromkeys(percentile_keys(), 0.0), 'max_ms': 0.0}
+        
+        return {
+            'count': self.total,
+            'mean_ms': self.total_us / self.total / 1000,
+            **{percentile_key(percent): self.percentile(percent) * 1000
+               for percent in Config.METRICS['percentiles']},
+            'max_ms': self.max_us / 1000
+        }
+
+
+class OperationHistograms:
+    """
+    Latency histograms per table x operation, overall and over a sliding window.
+    
+    Each (table, operation) pair keeps a histogram for the whole run and a
+    ring of ``slots`` smaller histograms covering the last ``window``
+    seconds; the oldest slot is cleared as time moves on, so window
+    percentiles and throughput follow the current load. Recording is
+    locked so threaded workers can share one instance.
+    """
+    
+    def __init__(self, window: Optional[float] = None, slots: Optional[int] = None):
+        """
+        Initialize histogram set (unset options default to Config.METRICS)
+        
+        Args:
+            window: Sliding window length in seconds
+            slots: Sub-windows the sliding window is split into
+        """
+        settings = Config.METRICS
+        self.window = window or settings['sliding_window']
+        self.slots = slots or settings['sliding_slots']
+        self.slot_length = self.window / self.slots
+        self.started = time.perf_counter()
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def _entry(self, table: str, kind: str) -> Dict[str, Any]:
+        """Histograms of a table and operation, created on first use (caller holds the lock)."""
+        key = (table, kind)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {
+                'total': LatencyHistogram(),
+                'errors': 0,
+                'rows': 0,
+                'slots': [LatencyHistogram(highest=Config.METRICS['sliding_highest']) for _ in range(self.slots)],
+                'slot_rows': [0] * self.slots,
+                'slot_ids': [-1] * self.slots
+            }
+        return entry
+    
+    def _slot(self, entry: Dict[str, Any], now: float) -> int:
+        """Ring position for a time, clearing it when it still holds an older sub-window."""
+        slot_id = int((now - self.started) // self.slot_length)
+        position = slot_id % self.slots
+        if entry['slot_ids'][position] != slot_id:
+            entry['slots'][position].reset()
+            entry['slot_rows'][position] = 0
+            entry['slot_ids'][position] = slot_id
+        return position
+    
+    def record(self, table: str, kind: str, seconds: float, rows: int = 1, now: Optional[float] = None) -> None:
+        """Record one successful operation covering `rows` rows, finishing now (or at perf_counter() `now`)."""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            entry = self._entry(table, kind)
+            entry['total'].record(seconds)
+            entry['rows'] += rows
+            position = self._slot(entry, now)
+            entry['slots'][position].record(seconds)
+            entry['slot_rows'][position] += rows
+    
+    def record_error(self, table: str, kind: str) -> None:
+        """Record a failed operation."""
+        with self._lock:
+            self._entry(table, kind)['errors'] += 1
+    
+    def _live_slots(self, entry: Dict[str, Any], now: float) -> List[int]:
+        """Ring positions holding sub-windows of the sliding window ending now."""
+        current = int((now - self.started) // self.slot_length)
+        return [position for position, slot_id in enumerate(entry['slot_ids'])
+                if current - self.slots < slot_id <= current]
+    
+    def _window(self, entry: Dict[str, Any], now: float) -> Tuple[LatencyHistogram, int]:
+        """Merged histogram and rows of the sliding window ending now."""
+        histogram = LatencyHistogram(highest=Config.METRICS['sliding_highest'])
+        rows = 0
+        for position in self._live_slots(entry, now):
+            histogram.merge(entry['slots'][position])
+            rows += entry['slot_rows'][position]
+        return histogram, rows
+    
+    def _covered(self, now: float) -> float:
+        """Seconds the sliding window spans (early in a run it only reaches back to the start)."""
+        return min(self.window, max(now - self.started, self.slot_length))
+    
+    def throughput(self, now: Optional[float] = None) -> float:
+        """Rows per second across all tables and operations over the sliding window."""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            rows = sum(entry['slot_rows'][position] for entry in self._entries.values()
+                       for position in self._live_slots(entry, now))
+        return rows / self._covered(now)
+    
+    def overall(self, now: Optional[float] = None) -> Dict[str, float]:
+        """All operations together: whole-run and sliding-window p99, plus sliding throughput."""
+        now = time.perf_counter() if now is None else now
+        total = LatencyHistogram()
+        recent = LatencyHistogram(highest=Config.METRICS['sliding_highest'])
+        with self._lock:
+            for entry in self._entries.values():
+                total.merge(entry['total'])
+                recent.merge(self._window(entry, now)[0])
+        return {'p99_ms': total.summary()['p99_ms'], 'window_p99_ms': recent.summary()['p99_ms'],
+                'throughput': self.throughput(now)}
+    
+    def summary(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Per table and operation: whole-run latency in ms, errors and rows, plus sliding-window p99 and rows/s."""
+        now = time.perf_counter() if now is None else now
+        result = []
+        with self._lock:
+            for (table, kind), entry in sorted(self._entries.items()):
+                recent, rows = self._window(entry, now)
+                result.append({
+                    'table': table,
+                    'operation': kind,
+                    **entry['total'].summary(),
+                    'errors': entry['errors'],
+                    'rows': entry['rows'],
+                    'window_p99_ms': recent.summary()['p99_ms'],
+                    'window_throughput': rows / self._covered(now)
+                })
+        return result
@@ -0,0 +1,180 @@
+"""
+Value Pools
+Large Faker-backed value pools, built once, cached on disk and memory-mapped
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .config import Config
+
+
+# Pool name -> Faker call producing one candidate value
+POOL_BUILDERS: Dict[str, Callable] = {
+    'first_names': lambda fake: fake.first_name(),
+    'last_names': lambda fake: fake.last_name(),
+    'cities': lambda fake: fake.city(),
+    'companies': lambda fake: fake.company(),
+    'email_domains': lambda fake: fake.free_email_domain() if fake.pybool(truth_probability=20) else fake.domain_name()
+}
+
+# File layout: magic, value count, (count + 1) uint64 offsets, UTF-8 blob
+_MAGIC = b'DDBPOOL1'
+_HEADER = struct.Struct('=8sQ')
+
+
+class ValuePool(Sequence):
+    """
+    Read-only sequence of strings backed by a memory-mapped pool file.
+    
+    Every process that opens the same file shares its pages through the OS
+    page cache, so workers get the pool without copying or unpickling it.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open a pool file
+        
+        Args:
+            path: Path written by ValuePool.write()
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a value pool file: {path}")
+        
+        self._count = count
+        offsets_end = _HEADER.size + 8 * (count + 1)
+        self._offsets = memoryview(self._mm)[_HEADER.size:offsets_end].cast('Q')
+        self._blob_start = offsets_end
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("value pool index out of range")
+        
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._mm[start:end].decode('utf-8')
+    
+    def close(self) -> None:
+        """Release the memory map."""
+        self._offsets.release()
+        self._mm.close()
+    
+    @staticmethod
+    def write(path: str, values: Iterable[str]) -> int:
+        """Write values to a pool file atomically; returns the value count."""
+        offsets = array('Q', [0])
+        blob = bytearray()
+        for value in values:
+            blob += value.encode('utf-8')
+            offsets.append(len(blob))
+        
+        count = len(offsets) - 1
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, count))
+            f.write(offsets.tobytes())
+            f.write(blob)
+        os.replace(tmp_path, path)
+        
+        return count
+
+
+class ValuePools:
+    """Named set of memory-mapped value pools (pools.first_names, pools.cities, ...)."""
+    
+    def __init__(self, pools: Dict[str, ValuePool]):
+        """Initialize from already opened pools."""
+        self.pools = pools
+    
+    def __getattr__(self, name: str) -> ValuePool:
+        try:
+            return self.__dict__['pools'][name]
+        except KeyError:
+            raise AttributeError(f"No value pool named '{name}'")
+    
+    @property
+    def paths(self) -> Dict[str, str]:
+        """Pool file paths, for reopening the same pools in another process."""
+        return {name: pool.path for name, pool in self.pools.items()}
+    
+    @classmethod
+    def open(cls, paths: Dict[str, str]) -> 'ValuePools':
+        """Memory-map existing pool files."""
+        return cls({name: ValuePool(path) for name, path in paths.items()})
+    
+    @classmethod
+    def build(cls, cache_dir: Optional[str] = None, sizes: Optional[Dict[str, int]] = None,
+              locales: Optional[List[str]] = None, seed: Optional[int] = None) -> 'ValuePools':
+        """
+        Build (or reuse cached) Faker-backed pools and memory-map them
+        
+        Args:
+            cache_dir: Directory for pool files (defaults to Config.VALUE_POOLS)
+            sizes: Target number of distinct values per pool
+            locales: Faker locales to draw from
+            seed: Faker seed; part of the cache key
+        
+        Returns:
+            Loaded value pools
+        """
+        settings = Config.VALUE_POOLS
+        cache_dir = os.path.expanduser(cache_dir or settings['cache_dir'])
+        sizes = sizes or settings['sizes']
+        locales = locales or settings['locales']
+        seed = settings['seed'] if seed is None else seed
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        paths = {}
+        for name, size in sizes.items():
+            if name not in POOL_BUILDERS:
+                raise ValueError(f"Unknown value pool: {name}")
+            
+            key = hashlib.sha1(f"{name}|{size}|{','.join(locales)}|{seed}".encode()).hexdigest()[:12]
+            path = os.path.join(cache_dir, f"{name}-{key}.pool")
+            if not os.path.exists(path):
+                ValuePool.write(path, build_pool_values(name, size, locales, seed))
+            paths[name] = path
+        
+        return cls.open(paths)
+    
+    def close(self) -> None:
+        """Release all memory maps."""
+        for pool in self.pools.values():
+            pool.close()
+
+
+def build_pool_values(name: str, size: int, locales: List[str], seed: int) -> List[str]:
+    """Draw up to `size` distinct values for a pool from Faker."""
+    from faker import Faker
+    
+    fake = Faker(locales)
+    fake.seed_instance(seed)
+    builder = POOL_BUILDERS[name]
+    
+    # Some providers have fewer distinct values than requested; cap the attempts
+    values = {}
+    attempts = 0
+    while len(values) < size and attempts < size * 5:
+        values[builder(fake)] = None
+        attempts += 1
+    
+    return list(values)
@@ -0,0 +1,79 @@
+"""
+Rate Limiting
+Token bucket shared by threaded and asyncio workloads to cap operations per second
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token bucket limiting operations per second across threads and tasks.
+    
+    Tokens refill continuously at ``rate`` per second up to ``burst``.
+    ``reserve`` takes tokens immediately, letting the balance go negative,
+    and returns how long the caller must wait before proceeding; callers
+    therefore queue up in arrival order without polling. The same instance
+    can be shared by sync workers (``acquire``) and asyncio tasks
+    (``acquire_async``) in one process.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize rate limiter
+        
+        Args:
+            rate: Operations per second
+            burst: Most operations allowed back to back after an idle period (defaults to one second's worth)
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @property
+    def finished(self) -> bool:
+        """Whether a time-limited rate profile has ended (never, for a fixed rate)."""
+        return False
+    
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update (caller holds the lock)."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def set_rate(self, rate: float) -> None:
+        """Change the rate; tokens earned so far are kept."""
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        with self._lock:
+            self._refill()
+            self.rate = rate
+    
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens now; returns the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def acquire(self, tokens: float = 1) -> float:
+        """Block the calling thread until tokens are available; returns the time waited."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Wait (without blocking the event loop) until tokens are available; returns the time waited."""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
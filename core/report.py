@@ -0,0 +1,273 @@
+"""
+Run Reports
+Machine-readable end-of-run reports (JSON, optionally HTML with plotly charts) for archiving and comparing runs
+"""
+
+import html
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager
+from .metrics import OperationHistograms, OperationStats, WindowedStats, percentile_keys
+from .sampler import SystemSampler
+
+
+# Bumped when the report layout changes incompatibly
+REPORT_VERSION = 1
+
+# Settings never written to a report
+SECRET_KEYS = ('password', 'key_file', 'passphrase')
+
+
+def redact(settings: Any) -> Any:
+    """Copy of nested settings with secrets masked."""
+    if isinstance(settings, dict):
+        return {key: '***' if key in SECRET_KEYS and value else redact(value) for key, value in settings.items()}
+    if isinstance(settings, (list, tuple)):
+        return [redact(value) for value in settings]
+    return settings
+
+
+class RunReport:
+    """
+    Record of one run, for archiving and comparison.
+    
+    Created when the run starts, with its full configuration (secrets
+    masked). ``finish`` gathers what the run measured into one
+    JSON-serializable dict: summary, per-operation statistics, latency
+    percentiles, the throughput timeline, errors by operation and class,
+    client resource samples from the run's time span, server metrics and
+    storage growth. The statement-by-statement path passes its live
+    statistics; workloads pass their result report, which is kept whole.
+    """
+    
+    def __init__(self, settings: Dict[str, Any], db_manager: Optional[DatabaseManager] = None):
+        """
+        Initialize run report
+        
+        Args:
+            settings: Full run configuration (operation, table, sizes, rates, workload settings, ...)
+            db_manager: Manager the run uses; its connection settings are recorded without secrets
+        """
+        self.settings = redact(settings)
+        if db_manager is not None:
+            self.settings.setdefault('connection', redact(db_manager.config))
+        self.database = db_manager.db_type if db_manager is not None else settings.get('database')
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._monotonic = time.monotonic()
+        self.data = None
+    
+    @property
+    def run_id(self) -> str:
+        """Sortable identifier: start time (to the microsecond, so runs started together differ), operation and table."""
+        parts = [self.started_at.strftime('%Y%m%d-%H%M%S-%f'), self.settings.get('operation'),
+                 self.settings.get('table')]
+        return '-'.join(str(part) for part in parts if part)
+    
+    def finish(self, result: Optional[Dict[str, Any]] = None, op_stats: Optional[OperationStats] = None,
+               timeline: Optional[WindowedStats] = None, histograms: Optional[OperationHistograms] = None,
+               error_classes: Optional[Dict[str, int]] = None, sampler: Optional[SystemSampler] = None,
+               session: Optional[str] = None, server_metrics: Optional[Dict[str, Any]] = None,
+               storage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the report once the run has ended
+        
+        Args:
+            result: Workload result report (workload runs)
+            op_stats: Per-operation statistics (statement-by-statement runs)
+            timeline: Per-window throughput and latency (per second by default)
+            histograms: Per table and operation latency histograms
+            error_classes: Failed statements by error class (see core.exporter.error_class)
+            sampler: Client resource sampler; samples taken during the run are kept
+            session: Session whose sampler gauges belong to this run
+            server_metrics: ServerMetricsCollector report
+            storage: StorageGrowth report
+        
+        Returns:
+            The report (also kept in ``data``)
+        """
+        duration = time.perf_counter() - self._started
+        result = result or {}
+        by_operation = op_stats.summary() if op_stats is not None else dict(
+            result.get('operations_by_kind') or result.get('transactions_by_kind') or {})
+        operations = sum(entry['count'] for entry in by_operation.values())
+        errors = sum(entry['errors'] for entry in by_operation.values())
+        elapsed = result.get('duration') or duration
+        throughput = result.get('throughput', result.get('goodput', operations / elapsed if elapsed > 0 else 0.0))
+        
+        if histograms is not None:
+            latency = histograms.summary()
+        else:
+            latency = [{'table': result.get('table', self.settings.get('table')), 'operation': kind, **entry}
+                       for kind, entry in by_operation.items()]
+        
+        window = timeline.window if timeline is not None else Config.METRICS['window']
+        if timeline is not None:
+            windows = timeline.windows()
+        elif result.get('windows'):
+            windows = result['windows']
+        else:
+            windows = self._user_timeline(result.get('timeline') or [])
+            window = windows[1]['start'] - windows[0]['start'] if len(windows) > 1 else window
+        
+        by_class = dict(error_classes or {})
+        if not by_class and isinstance(result.get('errors'), dict):
+            by_class = {kind: count for kind, count in result['errors'].items() if count}
+        
+        self.data = {
+            'version': REPORT_VERSION,
+            'id': self.run_id,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'database': self.database,
+            'config': self.settings,
+            'summary': {
+                'success': result.get('success', errors == 0) if result else errors == 0,
+                'operations': operations,
+                'errors': errors,
+                'error_rate': errors / (operations + errors) if operations + errors else 0.0,
+                'rows': sum(entry.get('rows', 0) for entry in by_operation.values()),
+                'duration': elapsed,
+                'throughput': throughput
+            },
+            'operations': by_operation,
+            'latency': latency,
+            'timeline': windows,
+            'timeline_window': window,
+            'errors': {
+                'total': errors,
+                'by_operation': {kind: entry['errors'] for kind, entry in by_operation.items() if entry['errors']},
+                'by_class': by_class,
+                'last': result.get('error')
+            },
+            'resources': self._resources(sampler, session),
+            'server_metrics': server_metrics,
+            'storage': storage,
+            'workload': result or None
+        }
+        return self.data
+    
+    @staticmethod
+    def _user_timeline(samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Throughput between virtual-user controller ticks (cumulative operation counts)."""
+        windows = []
+        for before, after in zip(samples, samples[1:]):
+            span = after['elapsed'] - before['elapsed']
+            count = after['operations'] - before['operations']
+            windows.append({'start': before['elapsed'], 'operations': count, 'users': before['users'],
+                            'throughput': count / span if span > 0 else 0.0})
+        return windows
+    
+    def _resources(self, sampler: Optional[SystemSampler], session: Optional[str] = None) -> Dict[str, Any]:
+        """Client resource samples taken since the run started, timed from the start, with peaks."""
+        if sampler is None:
+            return {'samples': []}
+        
+        since = self._monotonic - sampler.started
+        samples = [{**sample, 'elapsed': sample['elapsed'] - since}
+                   for sample in sampler.history(session=session) if sample['elapsed'] >= since]
+        cpu = [sample['cpu_percent'] for sample in samples]
+        return {
+            'samples': samples,
+            'cpu_percent_mean': sum(cpu) / len(cpu) if cpu else None,
+            'cpu_percent_max': max(cpu, default=None),
+            'process_rss_mb_max': max((sample['process_rss_mb'] for sample in samples), default=None)
+        }
+    
+    def to_json(self) -> str:
+        """The report as indented JSON."""
+        return json.dumps(self.data, indent=2, default=str)
+    
+    def to_html(self) -> str:
+        """Standalone HTML page: summary, latency table, plotly charts of the timelines and the configuration."""
+        import pandas as pd
+        import plotly.graph_objects as go
+        
+        data = self.data
+        figures = []
+        
+        timeline = pd.DataFrame(data['timeline'])
+        if not timeline.empty:
+            figure = go.Figure()
+            figure.add_scatter(x=timeline['start'], y=timeline['throughput'], name='Throughput')
+            if 'target_rate' in timeline and timeline['target_rate'].notna().any():
+                figure.add_scatter(x=timeline['start'], y=timeline['target_rate'], name='Target rate')
+            figures.append(("Throughput (ops/s)", figure))
+            percentiles = [column for column in percentile_keys() if column in timeline]
+            if percentiles:
+                figure = go.Figure()
+                for column in percentiles:
+                    figure.add_scatter(x=timeline['start'], y=timeline[column], name=column)
+                figures.append(("Latency (ms)", figure))
+        
+        resources = pd.DataFrame(data['resources']['samples'])
+        if not resources.empty:
+            figure = go.Figure()
+            for column in ('cpu_percent', 'process_cpu_percent'):
+                figure.add_scatter(x=resources['elapsed'], y=resources[column], name=column)
+            figures.append(("Client CPU (%)", figure))
+        
+        server = pd.DataFrame((data['server_metrics'] or {}).get('samples') or [])
+        if not server.empty:
+            figure = go.Figure()
+            for column in ('commits_per_sec', 'client_throughput', 'rows_inserted_per_sec'):
+                if column in server:
+                    figure.add_scatter(x=server['elapsed'], y=server[column], name=column)
+            figures.append(("Server activity (per second)", figure))
+        
+        charts = []
+        for index, (title, figure) in enumerate(figures):
+            figure.update_layout(title=title, height=360, margin={'t': 40, 'b': 30})
+            charts.append(figure.to_html(full_html=False, include_plotlyjs='cdn' if index == 0 else False))
+        
+        summary = pd.DataFrame([data['summary']]).to_html(index=False)
+        latency = pd.DataFrame(data['latency']).to_html(index=False) if data['latency'] else ""
+        title = html.escape(f"Run {data['id']}")
+        return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title>
+<style>body {{ font-family: sans-serif; margin: 2rem; }} table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}</style></head>
+<body>
+<h1>{title}</h1>
+<p>{html.escape(str(data['database']))}, started {html.escape(data['started_at'])}</p>
+<h2>Summary</h2>
+{summary}
+<h2>Latency (ms)</h2>
+{latency}
+{''.join(charts)}
+<h2>Configuration</h2>
+<pre>{html.escape(json.dumps(data['config'], indent=2, default=str))}</pre>
+</body>
+</html>
+"""
+
+    def save(self, directory: Optional[str] = None, html_report: bool = False) -> List[str]:
+        """
+        Write the report to a directory
+        
+        Args:
+            directory: Target directory (defaults to Config.REPORTS['directory'])
+            html_report: Also write the HTML version
+        
+        Returns:
+            Paths written
+        """
+        directory = directory or Config.REPORTS['directory']
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.data['id']}.json")
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.to_json())
+        paths = [path]
+        
+        if html_report:
+            path = os.path.join(directory, f"{self.data['id']}.html")
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(self.to_html())
+            paths.append(path)
+        return paths
@@ -0,0 +1,173 @@
+"""
+System Sampler
+Background thread sampling client CPU, memory, network and process usage into a ring buffer
+"""
+
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from .config import Config
+
+
+def weak_gauge(method: Callable[[], float]) -> Callable[[], float]:
+    """Gauge calling a bound method without keeping its object alive; raises ReferenceError once it is gone."""
+    ref = weakref.WeakMethod(method)
+    
+    def gauge() -> float:
+        bound = ref()
+        if bound is None:
+            raise ReferenceError("gauge owner was garbage collected")
+        return bound()
+    
+    return gauge
+
+
+class SystemSampler:
+    """
+    Samples the client machine at a fixed interval on a daemon thread.
+    
+    Every ``interval`` seconds it records total and per-core CPU, memory,
+    network throughput and this process's RSS and CPU into a ring buffer
+    holding the last ``capacity`` samples. CPU figures use psutil's
+    non-blocking mode (usage since the previous sample), so neither the
+    sampler nor its readers ever sleep inside psutil. Readers get the
+    latest sample or a recent window instantly. Gauges registered with
+    ``track`` (e.g. the run's rows per second) are sampled on the same
+    tick, so they line up with resource use. The sampler is shared by the
+    whole process, so a gauge may belong to a session: its values are kept
+    apart and only that session's readers see them, under the plain name.
+    """
+    
+    def __init__(self, interval: Optional[float] = None, capacity: Optional[int] = None):
+        """
+        Initialize sampler (unset options default to Config.SYSTEM_SAMPLER)
+        
+        Args:
+            interval: Seconds between samples
+            capacity: Samples kept in the ring buffer
+        """
+        settings = Config.SYSTEM_SAMPLER
+        self.interval = interval or settings['interval']
+        self.capacity = capacity or settings['capacity']
+        self.samples = deque(maxlen=self.capacity)
+        self.started = time.monotonic()
+        self._gauges = {}
+        self._process = psutil.Process()
+        self._net = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> 'SystemSampler':
+        """Start the sampling thread (no-op when already running)."""
+        if not self.running:
+            # Prime the since-last-call counters so the first sample covers one interval
+            psutil.cpu_percent(percpu=True)
+            self._process.cpu_percent()
+            self._net = (time.monotonic(), psutil.net_io_counters())
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='system-sampler', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop the sampling thread and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def track(self, name: str, gauge: Callable[[], float], session: Optional[str] = None) -> None:
+        """Sample `gauge()` under `name` (for one session, if given) on every tick; a gauge raising ReferenceError is dropped."""
+        with self._lock:
+            self._gauges[(session, name)] = gauge
+    
+    def untrack(self, name: str, session: Optional[str] = None) -> None:
+        """Stop sampling a gauge."""
+        with self._lock:
+            self._gauges.pop((session, name), None)
+    
+    def _loop(self) -> None:
+        """Sampling thread: one sample per interval until stopped."""
+        while not self._stop.wait(self.interval):
+            self.sample()
+    
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and add it to the ring buffer."""
+        now = time.monotonic()
+        per_core = psutil.cpu_percent(percpu=True)
+        memory = psutil.virtual_memory()
+        net = psutil.net_io_counters()
+        
+        sent_rate = recv_rate = 0.0
+        if self._net is not None and now > self._net[0]:
+            elapsed = now - self._net[0]
+            sent_rate = (net.bytes_sent - self._net[1].bytes_sent) / elapsed / 1024
+            recv_rate = (net.bytes_recv - self._net[1].bytes_recv) / elapsed / 1024
+        self._net = (now, net)
+        
+        sample = {
+            'elapsed': now - self.started,
+            'cpu_percent': sum(per_core) / len(per_core) if per_core else 0.0,
+            'cpu_per_core': per_core,
+            'memory_percent': memory.percent,
+            'memory_used_gb': memory.used / (1024**3),
+            'net_sent_kbps': sent_rate,
+            'net_recv_kbps': recv_rate,
+            'process_rss_mb': self._process.memory_info().rss / (1024**2),
+            'process_cpu_percent': self._process.cpu_percent()
+        }
+        
+        with self._lock:
+            gauges = list(self._gauges.items())
+        for (session, name), gauge in gauges:
+            try:
+                value = gauge()
+            except ReferenceError:
+                # The gauge's owner (e.g. a closed session) is gone
+                self.untrack(name, session)
+                continue
+            except Exception:
+                value = None
+            if session is None:
+                sample[name] = value
+            else:
+                sample.setdefault('sessions', {}).setdefault(session, {})[name] = value
+        
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+    
+    @staticmethod
+    def _view(sample: Dict[str, Any], session: Optional[str]) -> Dict[str, Any]:
+        """A sample as one session sees it: its own gauges under their plain names, no one else's."""
+        if 'sessions' not in sample:
+            return sample
+        view = {key: value for key, value in sample.items() if key != 'sessions'}
+        view.update(sample['sessions'].get(session, {}))
+        return view
+    
+    def latest(self, session: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Most recent sample (with a session's gauges, if given), or None before the first one."""
+        with self._lock:
+            sample = self.samples[-1] if self.samples else None
+        return self._view(sample, session) if sample is not None else None
+    
+    def history(self, seconds: Optional[float] = None, session: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Samples from the last `seconds` (all buffered samples if omitted), oldest first, with a session's gauges."""
+        with self._lock:
+            samples = list(self.samples)
+        if seconds is not None and samples:
+            since = samples[-1]['elapsed'] - seconds
+            samples = [sample for sample in samples if sample['elapsed'] >= since]
+        return [self._view(sample, session) for sample in samples]
@@ -0,0 +1,178 @@
+"""
+Server Metrics
+Background collector polling database server statistics during a run, on its own connection
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager
+
+
+# Server statistics that are point-in-time values rather than cumulative counters
+SERVER_GAUGES = ('connections', 'active')
+
+
+class ServerMetricsCollector:
+    """
+    Polls server statistics on a separate connection while a run executes.
+    
+    Every ``interval`` seconds a daemon thread reads the manager's
+    ``sample_server_stats`` counters through a clone of the manager, so
+    polling never shares a connection (or a transaction) with the load.
+    Consecutive snapshots become per-second rates (commits/s, rows
+    written/s, disk reads/s, checkpoints, ...) plus the buffer cache hit
+    ratio, each stamped with the client throughput at the same moment so
+    server work lines up with the load that caused it. Every statement
+    digest is read at start and stop and the busiest differences are
+    reported, so statements that were already expensive before the run
+    cannot crowd out (or inflate) the ones it issued.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, interval: Optional[float] = None,
+                 throughput: Optional[Callable[[], float]] = None, top_statements: Optional[int] = None):
+        """
+        Initialize collector (unset options default to Config.SERVER_METRICS)
+        
+        Args:
+            db_manager: Manager whose settings the collector's connection reuses
+            interval: Seconds between polls
+            throughput: Returns the client's current operations (or rows) per second
+            top_statements: Statement digests to report (0 to skip)
+        """
+        settings = Config.SERVER_METRICS
+        self.db_manager = db_manager
+        self.interval = interval or settings['interval']
+        self.throughput = throughput
+        self.top_statements = settings['top_statements'] if top_statements is None else top_statements
+        self.samples = []
+        self.last_error = None
+        self._db = None
+        self._first = None
+        self._previous = None
+        self._statements = []
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self) -> 'ServerMetricsCollector':
+        """Connect, take the baseline snapshot and start polling."""
+        self.samples = []
+        self.last_error = None
+        self._db = self.db_manager.clone()
+        try:
+            self._db.connect()
+        except Exception as e:
+            self.last_error = str(e)
+            self._db = None
+            return self
+        
+        self._started = time.perf_counter()
+        self._first = self._previous = (self._started, self._db.sample_server_stats())
+        if self.top_statements:
+            self._statements = self._db.top_statements(limit=None)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='server-metrics', daemon=True)
+        self._thread.start()
+        return self
+    
+    def _loop(self) -> None:
+        """Polling thread: one sample per interval until stopped."""
+        while not self._stop.wait(self.interval):
+            self.poll()
+    
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Snapshot the server now and record rates since the previous snapshot."""
+        now = time.perf_counter()
+        try:
+            stats = self._db.sample_server_stats()
+        except Exception as e:
+            self.last_error = str(e)
+            return None
+        if not stats:
+            return None
+        
+        sample = self._rates(self._previous, (now, stats))
+        sample['elapsed'] = now - self._started
+        if self.throughput is not None:
+            try:
+                sample['client_throughput'] = self.throughput()
+            except Exception:
+                sample['client_throughput'] = None
+        self._previous = (now, stats)
+        self.samples.append(sample)
+        return sample
+    
+    @staticmethod
+    def _rates(before, after) -> Dict[str, Any]:
+        """Per-second counter rates and current gauges between two (time, stats) snapshots."""
+        (t0, first), (t1, second) = before, after
+        elapsed = max(t1 - t0, 1e-9)
+        result = {}
+        for name, value in second.items():
+            if name in SERVER_GAUGES:
+                result[name] = value
+            elif name in first:
+                # Counters can reset (server restart, stats reset); treat that as no activity
+                result[f'{name}_per_sec'] = max(0.0, value - first[name]) / elapsed
+        
+        requests = max(0.0, second.get('cache_requests', 0) - first.get('cache_requests', 0))
+        misses = max(0.0, second.get('disk_reads', 0) - first.get('disk_reads', 0))
+        result['cache_hit_ratio'] = 1 - min(misses, requests) / requests if requests else None
+        return result
+    
+    def _statement_deltas(self, before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Statements that ran during the collection, with calls, time and rows spent in it."""
+        baseline = {entry['statement']: entry for entry in before}
+        deltas = []
+        for entry in after:
+            previous = baseline.get(entry['statement'], {'calls': 0, 'total_ms': 0.0, 'rows': 0})
+            calls = entry['calls'] - previous['calls']
+            if calls > 0:
+                total_ms = entry['total_ms'] - previous['total_ms']
+                deltas.append({'statement': entry['statement'], 'calls': calls, 'total_ms': total_ms,
+                               'mean_ms': total_ms / calls, 'rows': entry['rows'] - previous['rows']})
+        deltas.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return deltas[:self.top_statements]
+    
+    def stop(self) -> Dict[str, Any]:
+        """
+        Stop polling, take the final snapshot and disconnect
+        
+        Returns:
+            Report with per-interval samples, whole-run average rates, counter deltas and top statements
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        
+        statements = []
+        averages = {}
+        deltas = {}
+        if self._db is not None:
+            try:
+                self.poll()
+                if self._previous is not self._first:
+                    averages = self._rates(self._first, self._previous)
+                    first, last = self._first[1], self._previous[1]
+                    deltas = {name: max(0.0, value - first[name]) for name, value in last.items()
+                              if name in first and name not in SERVER_GAUGES}
+                if self.top_statements:
+                    statements = self._statement_deltas(self._statements, self._db.top_statements(limit=None))
+            finally:
+                self._db.disconnect()
+                self._db = None
+        
+        return {
+            'success': bool(self.samples),
+            'database': self.db_manager.db_type,
+            'interval': self.interval,
+            'samples': list(self.samples),
+            'averages': averages,
+            'deltas': deltas,
+            'top_statements': statements,
+            'error': self.last_error if self.samples else (self.last_error or "The server reported no statistics")
+        }
@@ -0,0 +1,175 @@
+"""
+Load Shapes
+Time-varying target rate profiles (ramp, step, sine, spike, soak) and the rate limiter that follows them
+"""
+
+import math
+import time
+from typing import Optional
+
+from .config import Config
+from .rate import RateLimiter
+
+
+# Floor for profile rates, so the token bucket never stalls completely
+MIN_RATE = 0.1
+
+
+class RampShape:
+    """Rate rises (or falls) linearly from start_rate to end_rate over the duration."""
+    
+    def __init__(self, start_rate: float = 10, end_rate: float = 1000, duration: float = 300):
+        """Initialize linear ramp"""
+        if duration <= 0:
+            raise ValueError("Ramp duration must be positive")
+        self.start_rate = start_rate
+        self.end_rate = end_rate
+        self.duration = duration
+    
+    def rate(self, elapsed: float) -> float:
+        """Target operations per second at a point of the run."""
+        progress = min(max(elapsed / self.duration, 0.0), 1.0)
+        return max(MIN_RATE, self.start_rate + (self.end_rate - self.start_rate) * progress)
+
+
+class StepShape:
+    """
+    Rate climbs in equal steps, holding each level for step_duration.
+    
+    Step k (from 0) runs at start_rate + k * step_rate; comparing latency
+    across the plateaus shows where the system stops keeping up.
+    """
+    
+    def __init__(self, start_rate: float = 100, step_rate: float = 100, step_duration: float = 60,
+                 steps: int = 10):
+        """Initialize step increments"""
+        if step_duration <= 0 or steps < 1:
+            raise ValueError("Step shape needs a positive step duration and at least one step")
+        self.start_rate = start_rate
+        self.step_rate = step_rate
+        self.step_duration = step_duration
+        self.steps = int(steps)
+        self.duration = step_duration * self.steps
+    
+    def rate(self, elapsed: float) -> float:
+        """Target operations per second at a point of the run."""
+        step = min(int(max(elapsed, 0.0) // self.step_duration), self.steps - 1)
+        return max(MIN_RATE, self.start_rate + step * self.step_rate)
+
+
+class SineShape:
+    """Rate swings around base_rate by amplitude with the given period (a compressed or real day)."""
+    
+    def __init__(self, base_rate: float = 500, amplitude: float = 400, period: float = 86400,
+                 duration: Optional[float] = None):
+        """Initialize sinusoidal pattern (one full period unless a duration is given)"""
+        if period <= 0:
+            raise ValueError("Sine period must be positive")
+        self.base_rate = base_rate
+        self.amplitude = amplitude
+        self.period = period
+        self.duration = duration or period
+    
+    def rate(self, elapsed: float) -> float:
+        """Target operations per second at a point of the run."""
+        return max(MIN_RATE, self.base_rate + self.amplitude * math.sin(2 * math.pi * elapsed / self.period))
+
+
+class SpikeShape:
+    """Rate holds at base_rate with a burst to spike_rate for spike_duration at the end of every interval."""
+    
+    def __init__(self, base_rate: float = 100, spike_rate: float = 1000, interval: float = 60,
+                 spike_duration: float = 5, duration: float = 600):
+        """Initialize periodic spikes"""
+        if not 0 < spike_duration <= interval:
+            raise ValueError("Spike duration must be positive and no longer than the interval")
+        self.base_rate = base_rate
+        self.spike_rate = spike_rate
+        self.interval = interval
+        self.spike_duration = spike_duration
+        self.duration = duration
+    
+    def rate(self, elapsed: float) -> float:
+        """Target operations per second at a point of the run."""
+        in_spike = elapsed % self.interval >= self.interval - self.spike_duration
+        return max(MIN_RATE, self.spike_rate if in_spike else self.base_rate)
+
+
+class SoakShape:
+    """Constant moderate rate held for a long time, to surface leaks, bloat and cache effects."""
+    
+    def __init__(self, rate: float = 200, duration: float = 14400):
+        """Initialize soak"""
+        self.target_rate = rate
+        self.duration = duration
+    
+    def rate(self, elapsed: float) -> float:
+        """Target operations per second at a point of the run."""
+        return max(MIN_RATE, self.target_rate)
+
+
+# Load shape name -> class
+LOAD_SHAPES = {
+    'ramp': RampShape,
+    'step': StepShape,
+    'sine': SineShape,
+    'spike': SpikeShape,
+    'soak': SoakShape
+}
+
+
+def make_load_shape(name: str, **params):
+    """
+    Build a load shape by name
+    
+    Args:
+        name: One of LOAD_SHAPES
+        **params: Shape parameters; missing ones default to Config.LOAD_SHAPES
+    
+    Returns:
+        Shape with rate(elapsed) and duration
+    """
+    if name not in LOAD_SHAPES:
+        raise ValueError(f"Unknown load shape: {name}")
+    
+    settings = dict(Config.LOAD_SHAPES.get(name, {}))
+    settings.update(params)
+    return LOAD_SHAPES[name](**settings)
+
+
+class ShapedRateLimiter(RateLimiter):
+    """
+    Rate limiter whose rate follows a load shape.
+    
+    The clock starts when the limiter is created; every reservation first
+    moves the rate to the shape's value for the elapsed time, and
+    ``finished`` turns true once the shape's duration has passed so
+    callers can end the run.
+    """
+    
+    def __init__(self, shape, burst: Optional[float] = None):
+        """
+        Initialize shaped rate limiter
+        
+        Args:
+            shape: Load shape (see LOAD_SHAPES)
+            burst: Most operations allowed back to back (defaults to 1, i.e. smooth pacing)
+        """
+        super().__init__(shape.rate(0.0), burst=burst if burst is not None else 1.0)
+        self.shape = shape
+        self.started = time.monotonic()
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the profile started."""
+        return time.monotonic() - self.started
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the profile's duration has passed."""
+        return self.elapsed >= self.shape.duration
+    
+    def reserve(self, tokens: float = 1) -> float:
+        """Follow the shape, then take tokens; returns the seconds to wait before using them."""
+        self.set_rate(self.shape.rate(self.elapsed))
+        return super().reserve(tokens)
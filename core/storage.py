@@ -0,0 +1,107 @@
+"""
+Storage Growth
+Before/after snapshots of table, index and log sizes, reported as bytes written per generated row
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager
+
+
+class StorageGrowth:
+    """
+    Measures what a run's rows cost on disk.
+    
+    ``start`` snapshots every table's exact row count, data and index size
+    and the server's log positions (PostgreSQL WAL, MySQL redo and binary
+    log, MongoDB journal); ``stop`` snapshots them again. For each table
+    whose rows or size changed the report gives bytes per added row, index
+    bytes per data byte, and log bytes per row. Logs are server-wide, so
+    log bytes per row is the run's total log growth over all rows added
+    and includes any other activity on the server. Sizes grow a page or
+    extent at a time, so small runs give coarse figures.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, tables: Optional[List[str]] = None):
+        """
+        Initialize storage growth measurement
+        
+        Args:
+            db_manager: Connected manager to snapshot through
+            tables: Tables to measure (all schema tables if omitted)
+        """
+        self.db_manager = db_manager
+        self.tables = list(tables) if tables is not None else Config.get_all_tables()
+        self.before = None
+        self._started = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current table sizes and log positions."""
+        return {'tables': self.db_manager.table_storage(self.tables), 'logs': self.db_manager.log_bytes()}
+    
+    def start(self) -> 'StorageGrowth':
+        """Take the before snapshot."""
+        self.before = self.snapshot()
+        self._started = time.perf_counter()
+        return self
+    
+    def stop(self) -> Dict[str, Any]:
+        """
+        Take the after snapshot and compare
+        
+        Returns:
+            Report with per-table growth, log growth and the run's totals
+        """
+        duration = time.perf_counter() - self._started if self._started is not None else 0.0
+        report = self.compare(self.before or {'tables': {}, 'logs': {}}, self.snapshot())
+        report.update({'database': self.db_manager.db_type, 'duration': duration})
+        return report
+    
+    @staticmethod
+    def compare(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Growth between two snapshots
+        
+        Args:
+            before: Snapshot taken before the run
+            after: Snapshot taken after the run
+        
+        Returns:
+            Report with a row per changed table and log growth by log name
+        """
+        logs = {name: max(0.0, value - before['logs'][name])
+                for name, value in after['logs'].items() if name in before['logs']}
+        log_total = sum(logs.values())
+        
+        tables = []
+        for name, end in after['tables'].items():
+            start = before['tables'].get(name)
+            if start is None:
+                continue
+            rows = end['rows'] - start['rows']
+            data = end['data_bytes'] - start['data_bytes']
+            index = end['index_bytes'] - start['index_bytes']
+            if rows or data or index:
+                tables.append({'table': name, 'rows_before': start['rows'], 'rows_added': rows,
+                               'data_bytes': data, 'index_bytes': index, 'total_bytes': data + index,
+                               'bytes_per_row': (data + index) / rows if rows > 0 else None,
+                               'index_overhead': index / data if data > 0 else None})
+        
+        rows_added = sum(table['rows_added'] for table in tables if table['rows_added'] > 0)
+        log_per_row = log_total / rows_added if rows_added and logs else None
+        for table in tables:
+            table['log_bytes_per_row'] = log_per_row
+        
+        measured = bool(before['tables'] and after['tables'])
+        return {
+            'success': measured,
+            'tables': tables,
+            'logs': logs,
+            'rows_added': rows_added,
+            'total_bytes': sum(table['total_bytes'] for table in tables),
+            'log_bytes': log_total,
+            'log_bytes_per_row': log_per_row,
+            'error': None if measured else "Table sizes are not available for this database"
+        }
@@ -0,0 +1,313 @@
+"""
+Parameter Sweep
+Short INSERT trials over batch size, workers, commit interval and statement style to find the fastest setup
+"""
+
+import csv
+import io
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager, MongoDBManager, PostgreSQLManager
+from .generator import SQLDataGenerator
+from .metrics import LatencyStats
+from .writer import SQLWriter
+
+
+# How rows reach the server: one INSERT per row, one multi-row INSERT per batch,
+# driver executemany over a parameterized INSERT, or PostgreSQL COPY per batch
+STATEMENT_STYLES = ('single', 'multi_row', 'executemany', 'copy')
+
+# Swept dimensions, in the order adaptive search walks them
+DIMENSIONS = ('style', 'batch_size', 'workers', 'commit_interval')
+
+
+class ParameterSweep:
+    """
+    Find the fastest bulk-insert configuration for a table.
+    
+    Each trial inserts the same number of freshly generated rows, split
+    across ``workers`` threads with their own connections. Workers send
+    ``batch_size`` rows per round trip in the given statement style and
+    commit every ``commit_interval`` rows; rows are generated before the
+    clock starts so only database work is timed. A trial reports rows per
+    second and the p50/p99 latency of one batch. 'grid' runs every
+    combination; 'adaptive' walks one dimension at a time from the middle
+    of each range, keeping any change that improves throughput, until no
+    single change helps. Trial rows are deleted afterwards unless
+    ``cleanup`` is off.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, batch_sizes: Optional[List[int]] = None,
+                 workers: Optional[List[int]] = None, commit_intervals: Optional[List[int]] = None,
+                 styles: Optional[List[str]] = None, trial_rows: Optional[int] = None,
+                 strategy: Optional[str] = None, max_p99_ms: Optional[float] = None,
+                 cleanup: Optional[bool] = None, generator: Optional[SQLDataGenerator] = None):
+        """
+        Initialize parameter sweep (unset options default to Config.SWEEP)
+        
+        Args:
+            db_manager: Connected MySQL or PostgreSQL manager whose settings workers reuse
+            table_name: Table to insert into
+            batch_sizes: Rows per round trip to try
+            workers: Concurrent worker counts to try
+            commit_intervals: Rows per transaction to try
+            styles: Statement styles to try, see STATEMENT_STYLES ('copy' needs PostgreSQL)
+            trial_rows: Rows inserted by each trial
+            strategy: 'grid' (every combination) or 'adaptive' (one dimension at a time)
+            max_p99_ms: Only configurations with a batch p99 at or under this can be the best
+            cleanup: Delete each trial's rows after it runs
+            generator: Row generator (a default one if omitted)
+        """
+        settings = Config.SWEEP
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.strategy = strategy or settings['strategy']
+        if self.strategy not in ('grid', 'adaptive'):
+            raise ValueError(f"Unknown sweep strategy: {self.strategy}")
+        
+        styles = list(styles or settings['styles'])
+        unknown = set(styles) - set(STATEMENT_STYLES)
+        if unknown:
+            raise ValueError(f"Unknown statement styles: {', '.join(sorted(unknown))}")
+        if not isinstance(db_manager, PostgreSQLManager) and 'copy' in styles:
+            # COPY FROM STDIN is PostgreSQL-only
+            styles.remove('copy')
+        
+        self.values = {
+            'style': styles,
+            'batch_size': sorted(batch_sizes or settings['batch_sizes']),
+            'workers': sorted(workers or settings['workers']),
+            'commit_interval': sorted(commit_intervals or settings['commit_intervals'])
+        }
+        if not all(self.values.values()):
+            raise ValueError("Every swept dimension needs at least one value")
+        
+        self.trial_rows = trial_rows or settings['trial_rows']
+        self.max_p99_ms = max_p99_ms
+        self.cleanup = settings['cleanup'] if cleanup is None else cleanup
+        self.generator = generator if generator is not None else SQLDataGenerator()
+        self.row_func, _ = self.generator.get_row_generator(table_name)
+        self.trials = []
+        self._stopped = False
+    
+    def stop(self) -> None:
+        """Stop after the current trial."""
+        self._stopped = True
+    
+    def combinations(self) -> List[Dict[str, Any]]:
+        """Every combination of the swept values."""
+        return [dict(zip(DIMENSIONS, values)) for values in itertools.product(*(self.values[d] for d in DIMENSIONS))]
+    
+    def _execute_batch(self, cursor, writer: SQLWriter, style: str, rows: List[tuple]) -> None:
+        """Send one batch of rows in a statement style."""
+        if style == 'single':
+            for row in rows:
+                cursor.execute(writer.format_insert(self.table_name, row))
+        elif style == 'multi_row':
+            cursor.execute(writer.format_insert_many(self.table_name, rows))
+        elif style == 'executemany':
+            cursor.executemany(writer.insert_template(self.table_name), rows)
+        elif style == 'copy':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(writer.format_copy(self.table_name), buffer)
+        else:
+            raise ValueError(f"Unknown statement style: {style}")
+    
+    def _worker(self, db: DatabaseManager, rows: List[tuple], params: Dict[str, Any],
+                latency: LatencyStats, outcome: Dict[str, Any]) -> None:
+        """Worker thread: insert its share of rows in batches, committing every commit_interval rows."""
+        writer = SQLWriter()
+        connection = db.connection
+        cursor = connection.cursor()
+        batch_size = params['batch_size']
+        pending = 0
+        try:
+            for offset in range(0, len(rows), batch_size):
+                batch = rows[offset:offset + batch_size]
+                start = time.perf_counter()
+                self._execute_batch(cursor, writer, params['style'], batch)
+                pending += len(batch)
+                if pending >= params['commit_interval']:
+                    connection.commit()
+                    outcome['rows'] += pending
+                    pending = 0
+                latency.record(time.perf_counter() - start)
+            if pending:
+                connection.commit()
+                outcome['rows'] += pending
+        except Exception as e:
+            try:
+                connection.rollback()
+            except:
+                pass
+            outcome['error'] = str(e)
+        finally:
+            cursor.close()
+    
+    def run_trial(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one configuration; returns its parameters with throughput and batch latency."""
+        rows = [self.row_func() for _ in range(self.trial_rows)]
+        worker_count = params['workers']
+        sessions = [self.db_manager.clone() for _ in range(worker_count)]
+        latencies = [LatencyStats() for _ in range(worker_count)]
+        outcomes = [{'rows': 0, 'error': None} for _ in range(worker_count)]
+        
+        try:
+            # Connections are opened before the clock starts
+            for session in sessions:
+                session.connect()
+            
+            threads = [threading.Thread(target=self._worker,
+                                        args=(session, rows[index::worker_count], params, latencies[index],
+                                              outcomes[index]), daemon=True)
+                       for index, session in enumerate(sessions)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            return {**params, 'rows': 0, 'errors': 1, 'duration': 0.0, 'throughput': 0.0,
+                    'p50_ms': 0.0, 'p99_ms': 0.0, 'error': str(e)}
+        finally:
+            for session in sessions:
+                session.disconnect()
+        
+        latency = LatencyStats()
+        for stats in latencies:
+            latency.merge(stats)
+        summary = latency.summary()
+        inserted = sum(outcome['rows'] for outcome in outcomes)
+        errors = [outcome['error'] for outcome in outcomes if outcome['error']]
+        
+        if self.cleanup:
+            self._delete_rows([row[0] for row in rows])
+        
+        return {
+            **params,
+            'rows': inserted,
+            'errors': len(errors),
+            'duration': elapsed,
+            'throughput': inserted / elapsed if elapsed > 0 else 0.0,
+            'p50_ms': summary['p50_ms'],
+            'p99_ms': summary['p99_ms'],
+            'error': errors[0] if errors else None
+        }
+    
+    def _delete_rows(self, keys: List[Any]) -> None:
+        """Remove a trial's rows so every trial starts from the same table size."""
+        writer = SQLWriter()
+        for offset in range(0, len(keys), 1000):
+            self.db_manager.execute_query(writer.format_delete_many(self.table_name, keys[offset:offset + 1000]))
+    
+    def score(self, trial: Dict[str, Any]) -> Optional[float]:
+        """Throughput of a trial that qualifies for best (no errors, within the p99 limit), else None."""
+        if trial['errors'] or not trial['rows']:
+            return None
+        if self.max_p99_ms is not None and trial['p99_ms'] > self.max_p99_ms:
+            return None
+        return trial['throughput']
+    
+    def best(self) -> Optional[Dict[str, Any]]:
+        """The qualifying trial with the highest throughput."""
+        scored = [trial for trial in self.trials if self.score(trial) is not None]
+        return max(scored, key=self.score, default=None)
+    
+    def _adaptive_candidates(self, current: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Configurations differing from the current one in exactly one dimension."""
+        return [{**current, dimension: value}
+                for dimension in DIMENSIONS for value in self.values[dimension] if value != current[dimension]]
+    
+    def run(self, progress: Optional[Callable[[int, Optional[int], Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run the sweep
+        
+        Args:
+            progress: Called after each trial with (trials done, planned total or None, trial)
+        
+        Returns:
+            Report with every trial and the best configuration
+        """
+        if isinstance(self.db_manager, MongoDBManager):
+            return {'success': False, 'error': "The parameter sweep requires a SQL database"}
+        
+        self.trials = []
+        self._stopped = False
+        started = time.perf_counter()
+        
+        def trial(params: Dict[str, Any]) -> Dict[str, Any]:
+            result = self.run_trial(params)
+            self.trials.append(result)
+            if progress is not None:
+                progress(len(self.trials), total, result)
+            return result
+        
+        if self.strategy == 'grid':
+            total = len(self.combinations())
+            for params in self.combinations():
+                if self._stopped:
+                    break
+                trial(params)
+        else:
+            total = None
+            current = {dimension: values[len(values) // 2] for dimension, values in self.values.items()}
+            current_score = self.score(trial(current)) or 0.0
+            tried = {tuple(current[d] for d in DIMENSIONS)}
+            improved = True
+            while improved and not self._stopped:
+                improved = False
+                for params in self._adaptive_candidates(current):
+                    key = tuple(params[d] for d in DIMENSIONS)
+                    if key in tried or self._stopped:
+                        continue
+                    tried.add(key)
+                    candidate_score = self.score(trial(params))
+                    if candidate_score is not None and candidate_score > current_score:
+                        current, current_score = params, candidate_score
+                        improved = True
+        
+        best = self.best()
+        errors = [trial['error'] for trial in self.trials if trial['error']]
+        return {
+            'success': best is not None,
+            'workload': 'sweep',
+            'database': self.db_manager.db_type,
+            'table': self.table_name,
+            'strategy': self.strategy,
+            'trial_rows': self.trial_rows,
+            'duration': time.perf_counter() - started,
+            'trials': list(self.trials),
+            'best': best,
+            'error': None if best is not None else (errors[0] if errors else "No configuration qualified")
+        }
+
+
+def sweep_figure(trials: List[Dict[str, Any]], best: Optional[Dict[str, Any]] = None):
+    """
+    Plot throughput against batch p99 for every trial
+    
+    Args:
+        trials: ParameterSweep trial results
+        best: Trial to highlight
+    
+    Returns:
+        plotly Figure; point colour is the statement style and size the worker count
+    """
+    import pandas as pd
+    import plotly.express as px
+    
+    frame = pd.DataFrame(trials)
+    figure = px.scatter(frame, x='p99_ms', y='throughput', color='style', size='workers',
+                        hover_data=['batch_size', 'workers', 'commit_interval', 'p50_ms'],
+                        labels={'p99_ms': 'Batch p99 (ms)', 'throughput': 'Rows / second'})
+    if best is not None:
+        figure.add_scatter(x=[best['p99_ms']], y=[best['throughput']], mode='markers', name='Best',
+                           marker={'symbol': 'star', 'size': 18, 'color': 'gold', 'line': {'width': 1}})
+    return figure
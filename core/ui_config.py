@@ -96,8 +96,41 @@ class UIConfig:
         "update": "UPDATE Only",
         "delete": "DELETE Only",
         "random": "Random Mix",
+        "read": "SELECT Only",
+        "mixed": "Read/Write Mix",
+        "ycsb": "YCSB Preset",
         "lock": "Lock Test",
-        "deadlock": "Deadlock Test"
+        "deadlock": "Deadlock Test",
+        "transactions": "Order Transactions",
+        "users": "Virtual Users",
+        "async": "Async High Concurrency",
+        "sweep": "Parameter Sweep"
+    }
+    
+    # Key Access Distributions
+    ACCESS_DISTRIBUTIONS = {
+        "uniform": "Uniform",
+        "zipfian": "Zipfian (hot keys)",
+        "hotspot": "Hotspot (x% of ops on y% of keys)",
+        "latest": "Latest (recent keys)"
+    }
+    
+    # Load Shapes
+    LOAD_SHAPES = {
+        "constant": "Constant (Generation Speed)",
+        "ramp": "Linear Ramp",
+        "step": "Step Increments",
+        "sine": "Sinusoidal (daily pattern)",
+        "spike": "Periodic Spikes",
+        "soak": "Soak (long constant rate)"
+    }
+    
+    # Think Time Distributions
+    THINK_TIMES = {
+        "constant": "Constant",
+        "uniform": "Uniform (low-high)",
+        "exponential": "Exponential (Poisson arrivals)",
+        "normal": "Normal"
     }
     
     # Navigation Steps
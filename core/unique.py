@@ -0,0 +1,195 @@
+"""
+Unique Value Generation
+Collision-free column values from a bijective permutation of a row counter
+"""
+
+import math
+import os
+import string
+import threading
+from typing import Optional
+
+from .config import Config
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (Windows): leases are still serialized within the process
+    fcntl = None
+
+
+_MASK64 = (1 << 64) - 1
+
+_BASE36 = string.digits + string.ascii_lowercase
+
+
+def _splitmix64(x: int) -> int:
+    """SplitMix64 finalizer: a fast, well-mixed 64-bit hash."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection on the integers [0, domain).
+    
+    A balanced Feistel network with modular addition permutes the square
+    [0, radix^2) just covering the domain; the rare out-of-range outputs are
+    fed back in (cycle walking) until they land inside the domain. Because
+    every step is a bijection, distinct inputs always map to distinct
+    outputs, so no record of previously issued values is needed.
+    """
+    
+    def __init__(self, domain: int, key: int = 0, rounds: int = 4):
+        """
+        Initialize the permutation
+        
+        Args:
+            domain: Size of the permuted range (must be >= 1)
+            key: Permutation key; different keys give unrelated orderings
+            rounds: Number of Feistel rounds
+        """
+        if domain < 1:
+            raise ValueError("Permutation domain must be at least 1")
+        
+        self.domain = domain
+        self._radix = math.isqrt(domain - 1) + 1
+        
+        round_keys = []
+        state = key & _MASK64
+        for _ in range(rounds):
+            state = _splitmix64(state)
+            round_keys.append(state)
+        self._round_keys = tuple(round_keys)
+    
+    def _encrypt(self, value: int) -> int:
+        """One pass of the Feistel network over [0, radix^2)."""
+        radix = self._radix
+        left, right = divmod(value, radix)
+        
+        for round_key in self._round_keys:
+            left, right = right, (left + _splitmix64(right ^ round_key)) % radix
+        
+        return left * radix + right
+    
+    def __call__(self, index: int) -> int:
+        """Map an index in [0, domain) to its permuted position."""
+        if not 0 <= index < self.domain:
+            raise ValueError(f"Index {index} is outside the permutation domain ({self.domain})")
+        
+        value = self._encrypt(index)
+        while value >= self.domain:
+            value = self._encrypt(value)
+        return value
+
+
+def encode_base(value: int, alphabet: str, width: int) -> str:
+    """Encode a non-negative integer as a fixed-width string over an alphabet."""
+    base = len(alphabet)
+    chars = []
+    for _ in range(width):
+        value, digit = divmod(value, base)
+        chars.append(alphabet[digit])
+    return ''.join(reversed(chars))
+
+
+class UniqueCounter:
+    """
+    Hands out disjoint blocks of row counter indexes, persisted on disk.
+    
+    The high-water mark lives in a small file, so sessions, later runs and
+    server restarts continue where the last lease ended instead of issuing
+    index 0 (and the same values) again. Leases are serialized by a lock
+    and, where available, an advisory lock on the file, so generators in
+    other processes sharing the file get disjoint blocks too.
+    """
+    
+    def __init__(self, path: Optional[str] = None, block: Optional[int] = None):
+        """
+        Initialize counter (unset options default to Config.UNIQUE_VALUES)
+        
+        Args:
+            path: File holding the high-water mark
+            block: Indexes per lease
+        """
+        settings = Config.UNIQUE_VALUES
+        self.path = os.path.expanduser(path or settings['counter_file'])
+        self.block = block or settings['block']
+        self._lock = threading.Lock()
+    
+    def lease(self, size: Optional[int] = None) -> int:
+        """Reserve the next `size` indexes (one block by default); returns the first."""
+        size = size or self.block
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock, open(self.path, 'a+', encoding='utf-8') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0)
+            text = handle.read().strip()
+            start = int(text) if text else 0
+            handle.seek(0)
+            handle.truncate()
+            handle.write(str(start + size))
+            handle.flush()
+            os.fsync(handle.fileno())
+        return start
+
+
+class UniqueValues:
+    """
+    Unique usernames, SKUs and order numbers derived from a row counter.
+    
+    Every generated row takes the next counter index. Each column permutes
+    that index over its own format's value space, so values look random but
+    never repeat. Workers given disjoint counter ranges (see
+    MultiCoreGenerator) produce disjoint values without coordinating; with
+    a UniqueCounter, indexes come in leased blocks, so separate sessions
+    and runs never issue the same index either.
+    """
+    
+    # Fixed-width base36 username suffix: 36^7 (~78 billion) values
+    USERNAME_SUFFIX_WIDTH = 7
+    # SKU format AAA-nnnnnn: 26^3 * 10^6 (~17.5 billion) values
+    SKU_DOMAIN = 26 ** 3 * 10 ** 6
+    # Order number format ORD-nnnnnnnnnn: 10^10 values
+    ORDER_NUMBER_DIGITS = 10
+    
+    def __init__(self, start: int = 0, key: int = 0, counter: Optional[UniqueCounter] = None):
+        """
+        Initialize unique value source
+        
+        Args:
+            start: First row counter index to issue (ignored with a counter)
+            key: Permutation key shared by all workers of a run
+            counter: Persistent counter to lease index blocks from
+        """
+        self.source = counter
+        self.counter = counter.lease() if counter is not None else start
+        self._block_end = self.counter + counter.block if counter is not None else None
+        self._username = FeistelPermutation(36 ** self.USERNAME_SUFFIX_WIDTH, key ^ 0x75736572)
+        self._sku = FeistelPermutation(self.SKU_DOMAIN, key ^ 0x736B75)
+        self._order_number = FeistelPermutation(10 ** self.ORDER_NUMBER_DIGITS, key ^ 0x6F7264)
+    
+    def next_index(self) -> int:
+        """Take the next row counter index."""
+        if self._block_end is not None and self.counter >= self._block_end:
+            self.counter = self.source.lease()
+            self._block_end = self.counter + self.source.block
+        index = self.counter
+        self.counter += 1
+        return index
+    
+    def username_suffix(self, index: int) -> str:
+        """Fixed-width suffix that makes any name prefix unique."""
+        return encode_base(self._username(index), _BASE36, self.USERNAME_SUFFIX_WIDTH)
+    
+    def sku(self, index: int) -> str:
+        """Unique SKU in the AAA-nnnnnn format."""
+        letters, digits = divmod(self._sku(index), 10 ** 6)
+        return f"{encode_base(letters, string.ascii_uppercase, 3)}-{digits:06d}"
+    
+    def order_number(self, index: int) -> str:
+        """Unique order number in the ORD-nnnnnnnnnn format."""
+        return f"ORD-{self._order_number(index):0{self.ORDER_NUMBER_DIGITS}d}"
@@ -0,0 +1,364 @@
+"""
+Virtual Users
+Concurrent virtual users, each on its own connection, running an operation script with think time
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager, MongoDBManager
+from .generator import READ_QUERIES, SQLDataGenerator
+from .metrics import LatencyStats, OperationStats
+from .rate import RateLimiter
+
+
+class ConstantThinkTime:
+    """Always the same pause."""
+    
+    def __init__(self, seconds: float = 0.5):
+        """Initialize constant think time"""
+        if seconds < 0:
+            raise ValueError("Think time must not be negative")
+        self.seconds = seconds
+    
+    def __call__(self) -> float:
+        """Draw a think time in seconds."""
+        return self.seconds
+
+
+class UniformThinkTime:
+    """Pause drawn uniformly from [low, high]."""
+    
+    def __init__(self, low: float = 0.1, high: float = 1.0):
+        """Initialize uniform think time"""
+        if not 0 <= low <= high:
+            raise ValueError("Think time bounds must satisfy 0 <= low <= high")
+        self.low = low
+        self.high = high
+    
+    def __call__(self) -> float:
+        """Draw a think time in seconds."""
+        return random.uniform(self.low, self.high)
+
+
+class ExponentialThinkTime:
+    """
+    Exponentially distributed pause with the given mean.
+    
+    Independent users with exponential think times issue requests as a
+    Poisson process, the usual model of an open population of clients.
+    """
+    
+    def __init__(self, mean: float = 0.5):
+        """Initialize exponential think time"""
+        if mean < 0:
+            raise ValueError("Think time mean must not be negative")
+        self.mean = mean
+    
+    def __call__(self) -> float:
+        """Draw a think time in seconds."""
+        return random.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+
+
+class NormalThinkTime:
+    """Normally distributed pause, clamped at zero."""
+    
+    def __init__(self, mean: float = 0.5, stddev: float = 0.15):
+        """Initialize normal think time"""
+        if mean < 0 or stddev < 0:
+            raise ValueError("Think time mean and stddev must not be negative")
+        self.mean = mean
+        self.stddev = stddev
+    
+    def __call__(self) -> float:
+        """Draw a think time in seconds."""
+        return max(0.0, random.gauss(self.mean, self.stddev))
+
+
+# Think time distribution name -> class
+THINK_TIMES = {
+    'constant': ConstantThinkTime,
+    'uniform': UniformThinkTime,
+    'exponential': ExponentialThinkTime,
+    'normal': NormalThinkTime
+}
+
+
+def make_think_time(name: str, **params) -> Callable[[], float]:
+    """
+    Build a think time distribution by name
+    
+    Args:
+        name: One of THINK_TIMES
+        **params: Distribution parameters; missing ones default to Config.THINK_TIMES
+    
+    Returns:
+        Callable returning a pause in seconds
+    """
+    if name not in THINK_TIMES:
+        raise ValueError(f"Unknown think time distribution: {name}")
+    
+    settings = dict(Config.THINK_TIMES.get(name, {}))
+    settings.update(params)
+    return THINK_TIMES[name](**settings)
+
+
+class VirtualUser:
+    """One virtual user: its own connection, stop flag and statistics."""
+    
+    def __init__(self, index: int, db_manager: DatabaseManager):
+        """
+        Initialize virtual user
+        
+        Args:
+            index: User number
+            db_manager: Manager to clone the connection settings from
+        """
+        self.index = index
+        self.db = db_manager.clone()
+        self.stop = threading.Event()
+        self.thread = None
+        self.connected = False
+        self.ops = OperationStats()
+        self.think = LatencyStats()
+        self.last_error = None
+
+
+class VirtualUserWorkload:
+    """
+    N virtual users running an operation script against one table.
+    
+    Each user holds its own connection and loops: draw an operation from
+    the script's weights, execute it, then pause for a think time. A
+    controller on the calling thread adjusts the number of running users
+    every ``sample_interval`` seconds: it ramps linearly up to ``users``
+    over ``ramp_up`` seconds and back down over the last ``ramp_down``
+    seconds, stopping the newest users first. Statements come from one
+    shared generator, so INSERTed keys become targets for every user.
+    """
+    
+    name = 'users'
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, users: Optional[int] = None,
+                 duration: Optional[float] = None, ramp_up: Optional[float] = None,
+                 ramp_down: Optional[float] = None, script: Optional[Dict[str, float]] = None,
+                 think_time: Optional[Dict[str, Any]] = None, generator: Optional[SQLDataGenerator] = None,
+                 sample_interval: Optional[float] = None, rate_limiter: Optional[RateLimiter] = None,
+                 exporter=None):
+        """
+        Initialize virtual user workload (unset options default to Config.VIRTUAL_USERS)
+        
+        Args:
+            db_manager: Connected manager whose settings users reuse
+            table_name: Table to run on
+            users: Peak number of concurrent users (one connection each)
+            duration: Run time in seconds, ramps included
+            ramp_up: Seconds to grow from zero to the peak user count
+            ramp_down: Seconds to shrink back to zero at the end of the run
+            script: Operation weights, e.g. {'point_lookup': 5, 'insert': 2, 'update': 1}
+            think_time: Think time spec ({'name': 'exponential', 'mean': 0.5}), see THINK_TIMES
+            generator: Statement generator shared by all users (a default one if omitted)
+            sample_interval: Seconds between controller ticks (user count changes and timeline samples)
+            rate_limiter: Caps the operations per second of all users together (uncapped if omitted)
+            exporter: MetricsExporter also counting every operation (each user thread has its own counters)
+        """
+        settings = Config.VIRTUAL_USERS
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.users = settings['users'] if users is None else users
+        self.duration = settings['duration'] if duration is None else duration
+        self.ramp_up = settings['ramp_up'] if ramp_up is None else ramp_up
+        self.ramp_down = settings['ramp_down'] if ramp_down is None else ramp_down
+        self.sample_interval = sample_interval or settings['sample_interval']
+        
+        script = {kind: weight for kind, weight in (script or settings['script']).items() if weight > 0}
+        if not script:
+            raise ValueError("The user script needs at least one operation with a positive weight")
+        self.script = script
+        self._operations = list(script)
+        self._weights = list(script.values())
+        
+        spec = dict(think_time or settings['think_time'])
+        self.think_time = make_think_time(spec.pop('name'), **spec)
+        
+        self.generator = generator if generator is not None else SQLDataGenerator()
+        self.row_func, _ = self.generator.get_row_generator(table_name)
+        # Generation touches shared key trackers and the generator's writer; execution runs unlocked
+        self._generate_lock = threading.Lock()
+        
+        self.rate_limiter = rate_limiter
+        self.exporter = exporter
+        
+        self.timeline = []
+        self._stop = threading.Event()
+    
+    def target_users(self, elapsed: float) -> int:
+        """Number of users that should be running at a point of the run."""
+        if self.ramp_up and elapsed < self.ramp_up:
+            return min(self.users, math.ceil(self.users * elapsed / self.ramp_up))
+        
+        remaining = self.duration - elapsed
+        if self.ramp_down and remaining < self.ramp_down:
+            return max(0, math.ceil(self.users * remaining / self.ramp_down))
+        return self.users
+    
+    def next_operation(self) -> str:
+        """Draw the next operation from the script's weights."""
+        return random.choices(self._operations, self._weights)[0]
+    
+    def stop(self) -> None:
+        """Ask all users to finish their current operation and stop."""
+        self._stop.set()
+    
+    def _execute(self, user: VirtualUser) -> None:
+        """Generate and run one operation on the user's connection."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        with self._generate_lock:
+            op = self.generator.generate_operation(self.table_name, self.row_func(), self.next_operation())
+        
+        start = time.perf_counter()
+        result = user.db.execute_query(op.sql)
+        elapsed = time.perf_counter() - start
+        
+        if result.get('success'):
+            rows = result.get('rows_returned', 0) if op.kind in READ_QUERIES else result.get('affected_rows', 0)
+            user.ops.record(op.kind, rows, elapsed)
+            if self.exporter is not None:
+                self.exporter.record(op.table, op.kind, elapsed, rows)
+        else:
+            user.ops.record_error(op.kind)
+            user.last_error = result.get('error')
+            if self.exporter is not None:
+                self.exporter.record_error(op.table, op.kind, user.last_error)
+            if op.kind == 'insert':
+                with self._generate_lock:
+                    self.generator.discard_key(op.table, op.key)
+    
+    def _user_loop(self, user: VirtualUser) -> None:
+        """Worker thread: connect, then run operations separated by think time until stopped."""
+        try:
+            user.db.connect()
+            user.connected = True
+        except Exception as e:
+            user.last_error = str(e)
+            return
+        
+        try:
+            while not user.stop.is_set() and not self._stop.is_set():
+                self._execute(user)
+                pause = self.think_time()
+                user.think.record(pause)
+                if pause and user.stop.wait(pause):
+                    break
+        finally:
+            user.db.disconnect()
+    
+    def _scale(self, users: List[VirtualUser], target: int) -> None:
+        """Start or stop users until `target` are running."""
+        running = [user for user in users if not user.stop.is_set()]
+        
+        for index in range(len(users), len(users) + target - len(running)):
+            user = VirtualUser(index, self.db_manager)
+            user.thread = threading.Thread(target=self._user_loop, args=(user,), daemon=True)
+            users.append(user)
+            user.thread.start()
+        
+        # Newest users leave first
+        for user in running[target:]:
+            user.stop.set()
+    
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Run the workload to completion
+        
+        Args:
+            progress: Called every controller tick, from the calling thread, with running counts
+            should_stop: Polled every controller tick; the run ends early when it returns True
+        
+        Returns:
+            Report with per-operation latency, think time and the user count timeline
+        """
+        if isinstance(self.db_manager, MongoDBManager):
+            return {'success': False, 'error': f"The {self.name} workload requires a SQL database"}
+        
+        self._stop.clear()
+        self.timeline = []
+        users = []
+        started = time.perf_counter()
+        
+        try:
+            while True:
+                elapsed = time.perf_counter() - started
+                if elapsed >= self.duration or self._stop.is_set() or (should_stop is not None and should_stop()):
+                    break
+                
+                self._scale(users, self.target_users(elapsed))
+                self.timeline.append({
+                    'elapsed': elapsed,
+                    'users': sum(1 for user in users if not user.stop.is_set()),
+                    'operations': sum(user.ops.totals()[0] for user in users)
+                })
+                if progress is not None:
+                    progress(self._progress(users, elapsed))
+                time.sleep(min(self.sample_interval, max(0.0, self.duration - elapsed)))
+        finally:
+            for user in users:
+                user.stop.set()
+            for user in users:
+                user.thread.join()
+        
+        return self._report(users, time.perf_counter() - started)
+    
+    def _progress(self, users: List[VirtualUser], elapsed: float) -> Dict[str, Any]:
+        """Running counts while users are still recording (the full report merges samples once they stop)."""
+        totals = [user.ops.totals() for user in users]
+        operations = sum(count for count, _ in totals)
+        return {
+            'duration': elapsed,
+            'users': self.timeline[-1]['users'] if self.timeline else 0,
+            'operations': operations,
+            'errors': sum(errors for _, errors in totals),
+            'throughput': operations / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def _report(self, users: List[VirtualUser], elapsed: float) -> Dict[str, Any]:
+        """Merge per-user statistics."""
+        ops = OperationStats()
+        think = LatencyStats()
+        last_error = None
+        for user in users:
+            ops.merge(user.ops)
+            think.merge(user.think)
+            last_error = user.last_error or last_error
+        
+        summary = ops.summary()
+        operations = sum(entry['count'] for entry in summary.values())
+        errors = sum(entry['errors'] for entry in summary.values())
+        failed_connections = sum(1 for user in users if not user.connected and not user.thread.is_alive())
+        
+        return {
+            'success': errors == 0 and failed_connections == 0,
+            'workload': self.name,
+            'database': self.db_manager.db_type,
+            'table': self.table_name,
+            # Every user is stopped by now; report how many were running at the last controller tick
+            'users': self.timeline[-1]['users'] if self.timeline else 0,
+            'peak_users': max((sample['users'] for sample in self.timeline), default=0),
+            'connections_opened': len(users),
+            'failed_connections': failed_connections,
+            'duration': elapsed,
+            'operations': operations,
+            'errors': errors,
+            'throughput': operations / elapsed if elapsed > 0 else 0.0,
+            'operations_by_kind': summary,
+            'think_time': think.summary(),
+            'timeline': list(self.timeline),
+            'error': last_error
+        }
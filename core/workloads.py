@@ -0,0 +1,674 @@
+"""
+Contention Workloads
+Concurrent multi-session lock, deadlock and order transaction workloads, each session on its own connection
+"""
+
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager, MongoDBManager
+from .distributions import make_chooser
+from .generator import SQLDataGenerator
+from .metrics import LatencyStats, OperationStats
+from .writer import TABLE_COLUMNS
+
+
+# Driver error codes: pymysql puts the MySQL errno in args[0], psycopg2 sets pgcode
+DEADLOCK_ERRORS = {1213, '40P01'}
+LOCK_TIMEOUT_ERRORS = {1205, '55P03'}
+SERIALIZATION_ERRORS = {'40001'}
+
+# Error kinds worth retrying: the transaction was rolled back because of contention
+RETRYABLE_ERRORS = ('deadlock', 'lock_timeout', 'serialization')
+
+ERROR_KINDS = RETRYABLE_ERRORS + ('aborted', 'other')
+
+# Draws per wanted key before pick_keys stops asking the chooser and fills the rest uniformly
+PICK_ATTEMPTS = 10
+
+
+class TransactionAborted(Exception):
+    """Raised by a workload transaction to roll itself back (e.g. a row it needs is gone)."""
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """Classify a driver exception as 'deadlock', 'lock_timeout', 'serialization' or None."""
+    code = getattr(error, 'pgcode', None)
+    if code is None and error.args and isinstance(error.args[0], int):
+        code = error.args[0]
+    
+    if code in DEADLOCK_ERRORS:
+        return 'deadlock'
+    if code in LOCK_TIMEOUT_ERRORS:
+        return 'lock_timeout'
+    if code in SERIALIZATION_ERRORS:
+        return 'serialization'
+    return None
+
+
+class WorkloadSession:
+    """One client session: its own connection, value generator and statistics."""
+    
+    def __init__(self, index: int, db_manager: DatabaseManager, table_name: str,
+                 distribution: Optional[Dict[str, Any]] = None):
+        """
+        Initialize workload session
+        
+        Args:
+            index: Session number
+            db_manager: Manager to clone the connection settings from
+            table_name: Table the session works on
+            distribution: Access distribution spec ({'name': ..., **params}); uniform if omitted
+        """
+        self.index = index
+        self.db = db_manager.clone()
+        self.table_name = table_name
+        self.generator = SQLDataGenerator()
+        self.row_func, _ = self.generator.get_row_generator(table_name)
+        
+        spec = dict(distribution or {'name': 'uniform'})
+        self.chooser = make_chooser(spec.pop('name'), **spec)
+        
+        self.kind = None
+        self.transactions = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failed = 0
+        self.errors = dict.fromkeys(ERROR_KINDS, 0)
+        self.last_error = None
+        self.lock_wait = LatencyStats()
+        self.latency = LatencyStats()
+        self.retry_latency = LatencyStats()
+        # Committed and failed transactions per transaction type
+        self.ops = OperationStats()
+    
+    def pick_keys(self, keys: List[Any], count: int) -> List[Any]:
+        """Pick distinct keys with the session's access distribution."""
+        count = min(count, len(keys))
+        picked = {}
+        for _ in range(count * PICK_ATTEMPTS):
+            if len(picked) >= count:
+                break
+            picked[keys[self.chooser(len(keys))]] = None
+        
+        # A skewed chooser may not reach enough distinct keys (e.g. a hot set smaller than count)
+        if len(picked) < count:
+            remaining = [key for key in keys if key not in picked]
+            picked.update(dict.fromkeys(random.sample(remaining, count - len(picked))))
+        return list(picked)
+    
+    def update_statement(self, key: Any) -> str:
+        """UPDATE a row's non-key columns with freshly generated values."""
+        return self.generator.writer.format_update(self.table_name, (key,) + self.row_func()[1:])
+
+
+class ContentionWorkload(ABC):
+    """
+    Base class for workloads running concurrent transactions on separate sessions.
+    
+    Subclasses implement ``transaction(session, cursor)``. The base class opens
+    one connection per session, loops transactions until the duration ends,
+    classifies lock errors, retries transactions rolled back by contention
+    with jittered exponential backoff, samples the server's lock tables on an
+    extra connection and merges per-session statistics into one report.
+    """
+    
+    name = 'contention'
+    min_keys = 1
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, keys: List[Any],
+                 sessions: int, duration: float, lock_timeout: Optional[float] = None,
+                 sample_interval: Optional[float] = None, distribution: Optional[Dict[str, Any]] = None,
+                 max_retries: int = 0, backoff: float = 0.0, max_backoff: float = 0.0):
+        """
+        Initialize workload
+        
+        Args:
+            db_manager: Connected manager whose settings sessions reuse
+            table_name: Table to run on
+            keys: Existing primary keys the transactions lock
+            sessions: Number of concurrent sessions (one connection each)
+            duration: Run time in seconds
+            lock_timeout: Per-session lock wait timeout in seconds (server default if None)
+            sample_interval: Seconds between lock table samples (no sampling if None)
+            distribution: Key access distribution spec, see core.distributions
+            max_retries: Retries of a transaction rolled back by a deadlock or lock timeout
+            backoff: Base delay in seconds before the first retry; doubles per retry
+            max_backoff: Cap on the retry delay in seconds
+        """
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.keys = list(keys)
+        self.sessions = sessions
+        self.duration = duration
+        self.lock_timeout = lock_timeout
+        self.sample_interval = sample_interval
+        self.distribution = distribution
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        
+        self.lock_samples = []
+        self._stop = threading.Event()
+    
+    def next_transaction(self, session: WorkloadSession) -> str:
+        """Pick the type of the session's next transaction (available as session.kind)."""
+        return self.name
+    
+    @abstractmethod
+    def transaction(self, session: WorkloadSession, cursor) -> None:
+        """Run one transaction's statements (committed by the caller)."""
+        pass
+    
+    def on_commit(self, session: WorkloadSession) -> None:
+        """Called after each successful commit."""
+    
+    def stop(self) -> None:
+        """Ask all sessions to finish their current transaction and exit."""
+        self._stop.set()
+    
+    def retry_delay(self, retry: int) -> float:
+        """Jittered exponential backoff before the given retry (0-based)."""
+        return min(self.max_backoff, self.backoff * 2 ** retry) * random.uniform(0.5, 1.0)
+    
+    def _attempt(self, session: WorkloadSession) -> Optional[str]:
+        """Run and commit one attempt; returns None on success, else the error kind."""
+        connection = session.db.connection
+        session.attempts += 1
+        cursor = connection.cursor()
+        try:
+            self.transaction(session, cursor)
+            connection.commit()
+            self.on_commit(session)
+            return None
+        except Exception as e:
+            try:
+                connection.rollback()
+            except:
+                pass
+            
+            if isinstance(e, TransactionAborted):
+                kind = 'aborted'
+            else:
+                kind = classify_error(e) or 'other'
+            session.errors[kind] += 1
+            if kind == 'other':
+                session.last_error = str(e)
+            return kind
+        finally:
+            cursor.close()
+    
+    def _run_transaction(self, session: WorkloadSession) -> bool:
+        """Run one transaction, retrying contention failures; returns False if the session should end."""
+        session.kind = self.next_transaction(session)
+        start = time.perf_counter()
+        for retry in range(self.max_retries + 1):
+            kind = self._attempt(session)
+            if kind is None:
+                elapsed = time.perf_counter() - start
+                session.transactions += 1
+                session.latency.record(elapsed)
+                session.ops.record(session.kind, 0, elapsed)
+                if retry:
+                    # Recovery cost: time from the first attempt to the successful retry
+                    session.retry_latency.record(elapsed)
+                return True
+            
+            if kind not in RETRYABLE_ERRORS:
+                session.ops.record_error(session.kind)
+                # Aborted by the workload itself: carry on. Anything else (bad table,
+                # lost connection) is not a contention error; stop this session
+                return kind == 'aborted'
+            
+            if retry < self.max_retries:
+                session.retries += 1
+                time.sleep(self.retry_delay(retry))
+        
+        session.failed += 1
+        session.ops.record_error(session.kind)
+        return True
+    
+    def _session_loop(self, session: WorkloadSession, deadline: float) -> None:
+        """Worker thread: connect and run transactions until the deadline."""
+        try:
+            session.db.connect()
+            if self.lock_timeout is not None:
+                session.db.set_lock_timeout(self.lock_timeout)
+        except Exception as e:
+            session.errors['other'] += 1
+            session.last_error = str(e)
+            return
+        
+        try:
+            while not self._stop.is_set() and time.perf_counter() < deadline:
+                if not self._run_transaction(session):
+                    break
+        finally:
+            session.db.disconnect()
+    
+    def _sample_loop(self, started: float, deadline: float) -> None:
+        """Sampler thread: snapshot server lock tables on a separate connection."""
+        sampler = self.db_manager.clone()
+        try:
+            sampler.connect()
+        except Exception:
+            return
+        
+        try:
+            while not self._stop.wait(self.sample_interval) and time.perf_counter() < deadline:
+                locks = sampler.sample_locks()
+                self.lock_samples.append({
+                    'elapsed': time.perf_counter() - started,
+                    'granted': sum(row['count'] for row in locks if row['status'] == 'GRANTED'),
+                    'waiting': sum(row['count'] for row in locks if row['status'] == 'WAITING'),
+                    'locks': locks
+                })
+        finally:
+            sampler.disconnect()
+    
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run the workload to completion
+        
+        Args:
+            progress: Called about twice a second, from the calling thread, with running counts
+        
+        Returns:
+            Report with throughput, latency and lock wait summaries, error counts and lock samples
+        """
+        if isinstance(self.db_manager, MongoDBManager):
+            return {'success': False, 'error': f"The {self.name} workload requires a SQL database"}
+        if len(self.keys) < self.min_keys:
+            return {'success': False, 'error': f"The {self.name} workload needs at least {self.min_keys} "
+                                               f"existing rows in {self.table_name}"}
+        
+        self._stop.clear()
+        self.lock_samples = []
+        sessions = [WorkloadSession(i, self.db_manager, self.table_name, self.distribution)
+                    for i in range(self.sessions)]
+        
+        started = time.perf_counter()
+        deadline = started + self.duration
+        threads = [threading.Thread(target=self._session_loop, args=(session, deadline), daemon=True)
+                   for session in sessions]
+        if self.sample_interval:
+            threads.append(threading.Thread(target=self._sample_loop, args=(started, deadline), daemon=True))
+        
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+                if progress is not None:
+                    progress(self._progress(sessions, time.perf_counter() - started))
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        
+        return self._report(sessions, time.perf_counter() - started)
+    
+    def _progress(self, sessions: List[WorkloadSession], elapsed: float) -> Dict[str, Any]:
+        """Running counts while sessions are still recording (the full report merges samples once they stop)."""
+        transactions = sum(session.transactions for session in sessions)
+        waits = sum(len(session.lock_wait) for session in sessions)
+        errors = dict.fromkeys(ERROR_KINDS, 0)
+        for session in sessions:
+            for kind, count in list(session.errors.items()):
+                errors[kind] += count
+        return {
+            'duration': elapsed,
+            'transactions': transactions,
+            'attempts': sum(session.attempts for session in sessions),
+            'goodput': transactions / elapsed if elapsed > 0 else 0.0,
+            'lock_wait': {'mean_ms': sum(session.lock_wait.total for session in sessions) / waits * 1000
+                          if waits else 0.0},
+            'errors': errors
+        }
+    
+    def _report(self, sessions: List[WorkloadSession], elapsed: float) -> Dict[str, Any]:
+        """Merge per-session statistics."""
+        lock_wait = LatencyStats()
+        latency = LatencyStats()
+        retry_latency = LatencyStats()
+        ops = OperationStats()
+        errors = dict.fromkeys(ERROR_KINDS, 0)
+        last_error = None
+        
+        for session in sessions:
+            lock_wait.merge(session.lock_wait)
+            latency.merge(session.latency)
+            retry_latency.merge(session.retry_latency)
+            ops.merge(session.ops)
+            for kind, count in session.errors.items():
+                errors[kind] += count
+            last_error = session.last_error or last_error
+        
+        transactions = sum(session.transactions for session in sessions)
+        attempts = sum(session.attempts for session in sessions)
+        minutes = elapsed / 60
+        by_kind = ops.summary()
+        for entry in by_kind.values():
+            entry['tpm'] = entry['count'] / minutes if minutes > 0 else 0.0
+        
+        return {
+            'success': errors['other'] == 0,
+            'workload': self.name,
+            'sessions': len(sessions),
+            'duration': elapsed,
+            'transactions': transactions,
+            'attempts': attempts,
+            'retries': sum(session.retries for session in sessions),
+            'failed': sum(session.failed for session in sessions),
+            # All attempted work vs. committed work only
+            'throughput': attempts / elapsed if elapsed > 0 else 0.0,
+            'goodput': transactions / elapsed if elapsed > 0 else 0.0,
+            'tpm': transactions / minutes if minutes > 0 else 0.0,
+            'deadlock_rate': errors['deadlock'] / attempts if attempts else 0.0,
+            # Share of attempts rolled back (contention or workload aborts)
+            'abort_rate': (attempts - transactions) / attempts if attempts else 0.0,
+            'transactions_by_kind': by_kind,
+            'lock_wait': lock_wait.summary(),
+            'latency': latency.summary(),
+            'retry_latency': retry_latency.summary(),
+            'errors': errors,
+            'lock_samples': list(self.lock_samples),
+            'error': last_error
+        }
+
+
+class LockContentionWorkload(ContentionWorkload):
+    """
+    Sessions lock overlapping rows with SELECT ... FOR UPDATE.
+    
+    Every transaction locks ``keys_per_transaction`` rows drawn from a small
+    hot set (in key order, so sessions queue up rather than deadlock), holds
+    the locks for ``hold_time`` seconds, updates the rows and commits. The
+    time spent in the SELECT is recorded as lock wait.
+    """
+    
+    name = 'lock'
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, keys: List[Any],
+                 sessions: Optional[int] = None, hot_keys: Optional[int] = None,
+                 keys_per_transaction: Optional[int] = None, hold_time: Optional[float] = None,
+                 duration: Optional[float] = None, lock_timeout: Optional[float] = None,
+                 sample_interval: Optional[float] = None, distribution: Optional[Dict[str, Any]] = None):
+        """
+        Initialize lock contention workload (unset options default to Config.WORKLOADS['lock'])
+        
+        Args:
+            db_manager: Connected manager whose settings sessions reuse
+            table_name: Table to run on
+            keys: Existing primary keys; the first ``hot_keys`` form the contended set
+            sessions: Number of concurrent sessions
+            hot_keys: Size of the contended key set
+            keys_per_transaction: Rows locked per transaction
+            hold_time: Seconds locks are held before updating
+            duration: Run time in seconds
+            lock_timeout: Per-session lock wait timeout in seconds
+            sample_interval: Seconds between lock table samples
+            distribution: Access distribution over the hot set, see core.distributions
+        """
+        settings = Config.WORKLOADS['lock']
+        hot_keys = hot_keys or settings['hot_keys']
+        super().__init__(
+            db_manager, table_name, list(keys)[:hot_keys],
+            sessions=sessions or settings['sessions'],
+            duration=settings['duration'] if duration is None else duration,
+            lock_timeout=settings['lock_timeout'] if lock_timeout is None else lock_timeout,
+            sample_interval=settings['sample_interval'] if sample_interval is None else sample_interval,
+            distribution=distribution
+        )
+        self.keys_per_transaction = keys_per_transaction or settings['keys_per_transaction']
+        self.hold_time = settings['hold_time'] if hold_time is None else hold_time
+    
+    def transaction(self, session: WorkloadSession, cursor) -> None:
+        """Lock rows, hold the locks, update the rows."""
+        keys = session.pick_keys(self.keys, self.keys_per_transaction)
+        
+        start = time.perf_counter()
+        cursor.execute(session.generator.writer.format_lock(self.table_name, keys))
+        cursor.fetchall()
+        session.lock_wait.record(time.perf_counter() - start)
+        
+        if self.hold_time:
+            time.sleep(self.hold_time)
+        
+        for key in keys:
+            cursor.execute(session.update_statement(key))
+
+
+class DeadlockWorkload(ContentionWorkload):
+    """
+    Paired sessions lock the same two rows in opposite orders.
+    
+    Session 2k locks row A then row B, session 2k+1 locks B then A, holding
+    the first lock for ``hold_time`` seconds so the two transactions usually
+    wait on each other. The server breaks the cycle by rolling one back; it
+    is retried with backoff, and the report gives the deadlock rate, the
+    recovery cost (retry latency) and the committed-transaction goodput.
+    """
+    
+    name = 'deadlock'
+    min_keys = 2
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, keys: List[Any],
+                 pairs: Optional[int] = None, hold_time: Optional[float] = None,
+                 duration: Optional[float] = None, lock_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff: Optional[float] = None,
+                 max_backoff: Optional[float] = None, sample_interval: Optional[float] = None):
+        """
+        Initialize deadlock workload (unset options default to Config.WORKLOADS['deadlock']
+        and, for retries, Config.PERFORMANCE)
+        
+        Args:
+            db_manager: Connected manager whose settings sessions reuse
+            table_name: Table to run on
+            keys: Existing primary keys; each pair of sessions shares two of them
+            pairs: Number of session pairs (concurrency is twice this)
+            hold_time: Seconds the first lock is held before taking the second
+            duration: Run time in seconds
+            lock_timeout: Per-session lock wait timeout in seconds
+            max_retries: Retries per transaction before it counts as failed
+            backoff: Base retry delay in seconds
+            max_backoff: Cap on the retry delay in seconds
+            sample_interval: Seconds between lock table samples
+        """
+        settings = Config.WORKLOADS['deadlock']
+        pairs = pairs or settings['pairs']
+        super().__init__(
+            db_manager, table_name, list(keys)[:2 * pairs],
+            sessions=2 * pairs,
+            duration=settings['duration'] if duration is None else duration,
+            lock_timeout=settings['lock_timeout'] if lock_timeout is None else lock_timeout,
+            sample_interval=settings['sample_interval'] if sample_interval is None else sample_interval,
+            max_retries=Config.PERFORMANCE['max_retries'] if max_retries is None else max_retries,
+            backoff=Config.PERFORMANCE['retry_delay'] if backoff is None else backoff,
+            max_backoff=settings['max_backoff'] if max_backoff is None else max_backoff
+        )
+        self.hold_time = settings['hold_time'] if hold_time is None else hold_time
+    
+    def lock_order(self, session: WorkloadSession) -> tuple:
+        """The two keys a session locks, in the order it locks them."""
+        pair = session.index // 2
+        first = self.keys[(2 * pair) % len(self.keys)]
+        second = self.keys[(2 * pair + 1) % len(self.keys)]
+        return (first, second) if session.index % 2 == 0 else (second, first)
+    
+    def transaction(self, session: WorkloadSession, cursor) -> None:
+        """Lock two rows one at a time, then update both."""
+        keys = self.lock_order(session)
+        writer = session.generator.writer
+        
+        for position, key in enumerate(keys):
+            start = time.perf_counter()
+            cursor.execute(writer.format_lock(self.table_name, [key]))
+            cursor.fetchall()
+            session.lock_wait.record(time.perf_counter() - start)
+            
+            if position == 0 and self.hold_time:
+                time.sleep(self.hold_time)
+        
+        for key in keys:
+            cursor.execute(session.update_statement(key))
+
+
+class OrderTransactionWorkload(ContentionWorkload):
+    """
+    TPC-C-lite mix of new-order and payment transactions on orders, products and users.
+    
+    A new-order transaction reads a customer, then for each of 1..max_lines
+    products locks the product row, decrements its stock (restocking by 91
+    when it would fall below 10, as TPC-C does) and inserts an order line.
+    A payment transaction locks an existing order, advances its status and
+    records the payment method, then touches the customer row. Orders
+    created by new-order become candidates for payment. The report adds
+    transactions per minute (overall and per type) and the abort rate.
+    """
+    
+    name = 'transactions'
+    
+    # Status a payment moves an order to
+    NEXT_STATUS = {'Pending': 'Processing', 'Processing': 'Shipped', 'Shipped': 'Delivered'}
+    
+    def __init__(self, db_manager: DatabaseManager, user_keys: List[Any], product_keys: List[Any],
+                 order_keys: Optional[List[Any]] = None, sessions: Optional[int] = None,
+                 duration: Optional[float] = None, new_order_ratio: Optional[float] = None,
+                 max_lines: Optional[int] = None, lock_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff: Optional[float] = None,
+                 max_backoff: Optional[float] = None, sample_interval: Optional[float] = None):
+        """
+        Initialize order transaction workload (unset options default to
+        Config.WORKLOADS['transactions'] and, for retries, Config.PERFORMANCE)
+        
+        Args:
+            db_manager: Connected manager whose settings sessions reuse
+            user_keys: Existing user ids customers are drawn from
+            product_keys: Existing product ids order lines are drawn from
+            order_keys: Existing order ids payments start from (new orders are added)
+            sessions: Number of concurrent sessions
+            duration: Run time in seconds
+            new_order_ratio: Share of transactions that are new orders (the rest are payments)
+            max_lines: Most order lines (products) per new order
+            lock_timeout: Per-session lock wait timeout in seconds
+            max_retries: Retries per transaction before it counts as failed
+            backoff: Base retry delay in seconds
+            max_backoff: Cap on the retry delay in seconds
+            sample_interval: Seconds between lock table samples
+        """
+        settings = Config.WORKLOADS['transactions']
+        super().__init__(
+            db_manager, 'orders', user_keys,
+            sessions=sessions or settings['sessions'],
+            duration=settings['duration'] if duration is None else duration,
+            lock_timeout=settings['lock_timeout'] if lock_timeout is None else lock_timeout,
+            sample_interval=settings['sample_interval'] if sample_interval is None else sample_interval,
+            max_retries=Config.PERFORMANCE['max_retries'] if max_retries is None else max_retries,
+            backoff=Config.PERFORMANCE['retry_delay'] if backoff is None else backoff,
+            max_backoff=settings['max_backoff'] if max_backoff is None else max_backoff
+        )
+        self.product_keys = list(product_keys)
+        self.order_keys = list(order_keys or [])
+        self.new_order_ratio = settings['new_order_ratio'] if new_order_ratio is None else new_order_ratio
+        self.max_lines = max_lines or settings['max_lines']
+        self._orders_lock = threading.Lock()
+    
+    def next_transaction(self, session: WorkloadSession) -> str:
+        """New order with probability new_order_ratio (always, until an order exists), else payment."""
+        if not self.order_keys or random.random() < self.new_order_ratio:
+            return 'new_order'
+        return 'payment'
+    
+    def transaction(self, session: WorkloadSession, cursor) -> None:
+        """Run the session's current transaction type."""
+        session.new_orders = []
+        if session.kind == 'new_order':
+            self.new_order(session, cursor)
+        else:
+            self.payment(session, cursor)
+    
+    def on_commit(self, session: WorkloadSession) -> None:
+        """Make committed orders available to payments."""
+        if session.new_orders:
+            with self._orders_lock:
+                self.order_keys.extend(session.new_orders)
+    
+    def new_order(self, session: WorkloadSession, cursor) -> None:
+        """Read a customer, then lock, restock-aware decrement and order each product."""
+        writer = session.generator.writer
+        user_id = random.choice(self.keys)
+        cursor.execute(writer.format_select('users', user_id, columns=('id',)))
+        if not cursor.fetchall():
+            raise TransactionAborted(f"User {user_id} no longer exists")
+        
+        lines = random.randint(1, self.max_lines)
+        product_ids = sorted(random.sample(self.product_keys, min(lines, len(self.product_keys))))
+        order_number = session.generator.generate_order_row()[1]
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Products are locked in key order so concurrent new orders cannot deadlock each other
+        for product_id in product_ids:
+            start = time.perf_counter()
+            cursor.execute(writer.format_select('products', product_id, columns=('price', 'stock_quantity'),
+                                                for_update=True))
+            rows = cursor.fetchall()
+            session.lock_wait.record(time.perf_counter() - start)
+            if not rows:
+                raise TransactionAborted(f"Product {product_id} no longer exists")
+            
+            price, stock = rows[0]
+            quantity = random.randint(1, 10)
+            stock = stock - quantity if stock >= quantity + 10 else stock - quantity + 91
+            cursor.execute(writer.format_set('products', product_id, {'stock_quantity': stock, 'updated_at': now}))
+            
+            unit_price = float(price)
+            subtotal, tax, total = session.generator.order_totals(quantity, unit_price)
+            order_id = session.generator.generate_uuid()
+            order = {
+                'id': order_id, 'order_number': order_number, 'user_id': user_id, 'product_id': product_id,
+                'quantity': quantity, 'unit_price': unit_price, 'subtotal': subtotal, 'tax': tax, 'total': total,
+                'payment_method': None, 'status': 'Pending', 'created_at': now, 'updated_at': now
+            }
+            cursor.execute(writer.format_insert('orders', tuple(order[column] for column in TABLE_COLUMNS['orders'])))
+            session.new_orders.append(order_id)
+    
+    def payment(self, session: WorkloadSession, cursor) -> None:
+        """Lock an order, advance its status with the payment method, then update the customer."""
+        writer = session.generator.writer
+        order_id = random.choice(self.order_keys)
+        start = time.perf_counter()
+        cursor.execute(writer.format_select('orders', order_id, columns=('user_id', 'status'), for_update=True))
+        rows = cursor.fetchall()
+        session.lock_wait.record(time.perf_counter() - start)
+        if not rows:
+            raise TransactionAborted(f"Order {order_id} no longer exists")
+        
+        user_id, status = rows[0]
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute(writer.format_set('orders', order_id, {
+            'status': self.NEXT_STATUS.get(status, status),
+            'payment_method': random.choice(session.generator.payment_methods),
+            'updated_at': now
+        }))
+        cursor.execute(writer.format_set('users', user_id, {'updated_at': now}))
+    
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run the workload (needs existing users and products)."""
+        if not self.product_keys:
+            return {'success': False, 'error': "The transactions workload needs existing rows in products"}
+        return super().run(progress)
+
+
+# Operation name -> workload class, for operations that run as multi-session workloads
+WORKLOADS = {
+    'lock': LockContentionWorkload,
+    'deadlock': DeadlockWorkload,
+    'transactions': OrderTransactionWorkload
+}
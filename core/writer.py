@@ -0,0 +1,244 @@
+"""
+SQL Statement Writer
+Buffer-based SQL emission for generated rows
+"""
+
+import io
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .config import Config
+
+
+# Fixed column order per table; row tuples are laid out in this order
+# with the primary key first
+TABLE_COLUMNS = {
+    table_name: tuple(col['name'] for col in schema['columns'])
+    for table_name, schema in Config.TABLE_SCHEMAS.items()
+}
+
+
+def _join_plan(table_name: str) -> Tuple[str, str, dict]:
+    """
+    Pick the table a join or aggregation over table_name is driven from
+    
+    Returns:
+        (fact table, column filtered or grouped on, {foreign key column: referenced table})
+    """
+    references = Config.get_table_references(table_name)
+    if references:
+        return table_name, TABLE_COLUMNS[table_name][0], references
+    
+    for fact_table in TABLE_COLUMNS:
+        fact_references = Config.get_table_references(fact_table)
+        for column, target in fact_references.items():
+            if target == table_name:
+                return fact_table, column, fact_references
+    
+    raise ValueError(f"Table {table_name} has no relationships to join on")
+
+
+def format_sql_value(value: Any) -> str:
+    """Render a Python value as an SQL literal."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SQLWriter:
+    """
+    Write SQL statements straight into a text buffer.
+    
+    Statements are appended to ``stream`` (an owned, reusable ``io.StringIO``
+    by default, or any writable text file). The ``INSERT INTO table (cols)
+    VALUES`` prefix and UPDATE column clauses are computed once per table.
+    Individual statement strings are only materialized by ``statements()``.
+    """
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Initialize SQL writer
+        
+        Args:
+            stream: Writable text stream; an internal StringIO is used if omitted
+        """
+        self._owns_stream = stream is None
+        self.stream = io.StringIO() if stream is None else stream
+        self.count = 0
+        
+        # End offset of each statement in the owned buffer
+        self._offsets = array('Q')
+        self._position = 0
+        
+        self._insert_prefixes = {}
+        self._update_clauses = {}
+    
+    # ==================== Formatting ====================
+    
+    def insert_prefix(self, table_name: str) -> str:
+        """Get the cached 'INSERT INTO table (cols) VALUES ' prefix for a table."""
+        prefix = self._insert_prefixes.get(table_name)
+        if prefix is None:
+            prefix = f"INSERT INTO {table_name} ({', '.join(TABLE_COLUMNS[table_name])}) VALUES "
+            self._insert_prefixes[table_name] = prefix
+        return prefix
+    
+    def format_insert(self, table_name: str, row: Tuple) -> str:
+        """Format a single-row INSERT statement."""
+        return self.insert_prefix(table_name) + '(' + ', '.join(map(format_sql_value, row)) + ');'
+    
+    def format_insert_many(self, table_name: str, rows: Iterable[Tuple]) -> str:
+        """Format a multi-row INSERT statement."""
+        values = '), ('.join(', '.join(map(format_sql_value, row)) for row in rows)
+        return self.insert_prefix(table_name) + '(' + values + ');'
+    
+    def insert_template(self, table_name: str) -> str:
+        """Format a parameterized single-row INSERT (%s placeholders) for executemany."""
+        columns = TABLE_COLUMNS[table_name]
+        return self.insert_prefix(table_name) + '(' + ', '.join(['%s'] * len(columns)) + ')'
+    
+    def format_copy(self, table_name: str) -> str:
+        """Format a PostgreSQL COPY ... FROM STDIN for CSV rows in column order."""
+        return f"COPY {table_name} ({', '.join(TABLE_COLUMNS[table_name])}) FROM STDIN WITH (FORMAT csv)"
+    
+    def format_update(self, table_name: str, row: Tuple) -> str:
+        """Format an UPDATE statement setting every non-key column of a row."""
+        clauses = self._update_clauses.get(table_name)
+        if clauses is None:
+            columns = TABLE_COLUMNS[table_name]
+            clauses = (
+                f"UPDATE {table_name} SET ",
+                tuple(f"{column} = " for column in columns[1:]),
+                f" WHERE {columns[0]} = "
+            )
+            self._update_clauses[table_name] = clauses
+        
+        head, setters, where = clauses
+        set_str = ', '.join([setter + format_sql_value(value) for setter, value in zip(setters, row[1:])])
+        return head + set_str + where + format_sql_value(row[0]) + ';'
+    
+    def format_set(self, table_name: str, record_id: Any, values: Dict[str, Any]) -> str:
+        """Format an UPDATE of some columns of one row by primary key."""
+        set_str = ', '.join(f"{column} = {format_sql_value(value)}" for column, value in values.items())
+        return f"UPDATE {table_name} SET {set_str} WHERE {TABLE_COLUMNS[table_name][0]} = {format_sql_value(record_id)};"
+    
+    def format_delete(self, table_name: str, record_id: Any) -> str:
+        """Format a DELETE statement by primary key."""
+        return f"DELETE FROM {table_name} WHERE {TABLE_COLUMNS[table_name][0]} = {format_sql_value(record_id)};"
+    
+    def format_delete_many(self, table_name: str, record_ids: Iterable[Any]) -> str:
+        """Format one DELETE removing several rows by primary key."""
+        key = TABLE_COLUMNS[table_name][0]
+        return f"DELETE FROM {table_name} WHERE {key} IN ({', '.join(map(format_sql_value, record_ids))});"
+    
+    def format_lock(self, table_name: str, record_ids: Iterable[Any]) -> str:
+        """Format a SELECT ... FOR UPDATE locking rows by primary key, in key order."""
+        key = TABLE_COLUMNS[table_name][0]
+        ids = ', '.join(map(format_sql_value, record_ids))
+        return f"SELECT {key} FROM {table_name} WHERE {key} IN ({ids}) ORDER BY {key} FOR UPDATE;"
+    
+    def format_select(self, table_name: str, record_id: Any, columns: Optional[Iterable[str]] = None,
+                      for_update: bool = False) -> str:
+        """Format a primary-key lookup, optionally of some columns and locking the row."""
+        selected = ', '.join(columns) if columns else '*'
+        lock = ' FOR UPDATE' if for_update else ''
+        return (f"SELECT {selected} FROM {table_name} WHERE {TABLE_COLUMNS[table_name][0]} = "
+                f"{format_sql_value(record_id)}{lock};")
+    
+    def format_range_scan(self, table_name: str, column: str, start: Any, end: Any, limit: int) -> str:
+        """Format a range scan over a column, in column order."""
+        return (f"SELECT * FROM {table_name} WHERE {column} BETWEEN {format_sql_value(start)} "
+                f"AND {format_sql_value(end)} ORDER BY {column} LIMIT {int(limit)};")
+    
+    def format_key_scan(self, table_name: str, start_id: Any, limit: int) -> str:
+        """Format a scan of up to `limit` rows in primary key order, starting at a key."""
+        key = TABLE_COLUMNS[table_name][0]
+        return f"SELECT * FROM {table_name} WHERE {key} >= {format_sql_value(start_id)} ORDER BY {key} LIMIT {int(limit)};"
+    
+    def format_join(self, table_name: str, record_id: Any) -> str:
+        """
+        Format a join of a row's related records
+        
+        Orders are joined to their user and product; a user or product key
+        selects its orders joined to the other referenced tables.
+        """
+        fact_table, column, references = _join_plan(table_name)
+        joins = ''.join(
+            f" JOIN {target} ON {fact_table}.{fk} = {target}.{TABLE_COLUMNS[target][0]}"
+            for fk, target in references.items()
+        )
+        return f"SELECT * FROM {fact_table}{joins} WHERE {fact_table}.{column} = {format_sql_value(record_id)};"
+    
+    def format_top_n(self, table_name: str, limit: int) -> str:
+        """Format a top-N aggregation, e.g. the users or products with the highest order totals."""
+        fact_table, column, references = _join_plan(table_name)
+        if column == TABLE_COLUMNS[fact_table][0]:
+            # Driven from the fact table itself: group on its first foreign key
+            column = next(iter(references))
+        
+        amounts = [col['name'] for col in Config.TABLE_SCHEMAS[fact_table]['columns']
+                   if col['type'].startswith('DECIMAL')]
+        if amounts:
+            return (f"SELECT {column}, COUNT(*) AS record_count, SUM({amounts[-1]}) AS total_amount FROM {fact_table} "
+                    f"GROUP BY {column} ORDER BY total_amount DESC LIMIT {int(limit)};")
+        return (f"SELECT {column}, COUNT(*) AS record_count FROM {fact_table} "
+                f"GROUP BY {column} ORDER BY record_count DESC LIMIT {int(limit)};")
+    
+    # ==================== Writing ====================
+    
+    def write(self, statement: str) -> None:
+        """Append a complete statement to the stream."""
+        self.stream.write(statement)
+        self.stream.write('\n')
+        self.count += 1
+        
+        if self._owns_stream:
+            self._position += len(statement) + 1
+            self._offsets.append(self._position)
+    
+    def write_insert(self, table_name: str, row: Tuple) -> None:
+        """Append a single-row INSERT statement."""
+        self.write(self.format_insert(table_name, row))
+    
+    def write_insert_many(self, table_name: str, rows: Iterable[Tuple]) -> None:
+        """Append a multi-row INSERT statement."""
+        self.write(self.format_insert_many(table_name, rows))
+    
+    def write_update(self, table_name: str, row: Tuple) -> None:
+        """Append an UPDATE statement."""
+        self.write(self.format_update(table_name, row))
+    
+    def write_delete(self, table_name: str, record_id: Any) -> None:
+        """Append a DELETE statement."""
+        self.write(self.format_delete(table_name, record_id))
+    
+    # ==================== Buffer Access ====================
+    
+    def getvalue(self) -> str:
+        """Get the buffered SQL script (one statement per line)."""
+        if not self._owns_stream:
+            raise ValueError("getvalue() is only available on the writer's own buffer")
+        return self.stream.getvalue()
+    
+    def statements(self) -> List[str]:
+        """Split the owned buffer into individual statement strings."""
+        text = self.getvalue()
+        result = []
+        start = 0
+        for end in self._offsets:
+            result.append(text[start:end - 1])
+            start = end
+        return result
+    
+    def reset(self) -> None:
+        """Clear the owned buffer so it can be reused."""
+        if self._owns_stream:
+            self.stream.seek(0)
+            self.stream.truncate()
+            self._offsets = array('Q')
+            self._position = 0
+        self.count = 0
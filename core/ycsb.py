@@ -0,0 +1,214 @@
+"""
+YCSB Workloads
+Standard core workload mixes (A-F) run against MySQL, PostgreSQL or MongoDB
+"""
+
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import Config
+from .database import DatabaseManager, MongoDBManager
+from .distributions import make_chooser
+from .generator import SQLDataGenerator
+from .keys import KeyTracker
+from .metrics import OperationStats
+from .writer import TABLE_COLUMNS
+
+
+class SQLExecutor:
+    """Runs YCSB operations as SQL through a MySQL or PostgreSQL manager."""
+    
+    def __init__(self, db_manager: DatabaseManager, generator: SQLDataGenerator):
+        """Initialize SQL executor"""
+        self.db_manager = db_manager
+        self.writer = generator.writer
+    
+    def _execute(self, sql: str) -> Dict[str, Any]:
+        result = self.db_manager.execute_query(sql)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return result
+    
+    def read(self, table_name: str, key: Any) -> int:
+        """Fetch one row by key; returns rows read."""
+        return self._execute(self.writer.format_select(table_name, key))['rows_returned']
+    
+    def update(self, table_name: str, row: Tuple) -> int:
+        """Overwrite a row's non-key columns; returns rows updated."""
+        return self._execute(self.writer.format_update(table_name, row))['affected_rows']
+    
+    def insert(self, table_name: str, row: Tuple) -> int:
+        """Insert a row; returns rows inserted."""
+        return self._execute(self.writer.format_insert(table_name, row))['affected_rows']
+    
+    def scan(self, table_name: str, key: Any, limit: int) -> int:
+        """Read up to `limit` rows in key order from a start key; returns rows read."""
+        return self._execute(self.writer.format_key_scan(table_name, key, limit))['rows_returned']
+
+
+class MongoExecutor:
+    """Runs YCSB operations as MongoDB document operations."""
+    
+    def __init__(self, db_manager: MongoDBManager, generator: SQLDataGenerator):
+        """Initialize MongoDB executor"""
+        db_name = db_manager.config['database'].get('database', 'testdb')
+        self.db = db_manager.connection[db_name]
+    
+    def read(self, table_name: str, key: Any) -> int:
+        """Fetch one document by key; returns documents read."""
+        key_column = TABLE_COLUMNS[table_name][0]
+        return 0 if self.db[table_name].find_one({key_column: key}) is None else 1
+    
+    def update(self, table_name: str, row: Tuple) -> int:
+        """Overwrite a document's non-key fields; returns documents updated."""
+        columns = TABLE_COLUMNS[table_name]
+        result = self.db[table_name].update_one({columns[0]: row[0]}, {'$set': dict(zip(columns[1:], row[1:]))})
+        return result.modified_count
+    
+    def insert(self, table_name: str, row: Tuple) -> int:
+        """Insert a document; returns documents inserted."""
+        self.db[table_name].insert_one(dict(zip(TABLE_COLUMNS[table_name], row)))
+        return 1
+    
+    def scan(self, table_name: str, key: Any, limit: int) -> int:
+        """Read up to `limit` documents in key order from a start key; returns documents read."""
+        key_column = TABLE_COLUMNS[table_name][0]
+        cursor = self.db[table_name].find({key_column: {'$gte': key}}).sort(key_column, 1).limit(int(limit))
+        return sum(1 for _ in cursor)
+
+
+def executor_for(db_manager: DatabaseManager, generator: SQLDataGenerator):
+    """Pick the executor matching a database manager."""
+    if isinstance(db_manager, MongoDBManager):
+        return MongoExecutor(db_manager, generator)
+    return SQLExecutor(db_manager, generator)
+
+
+class YCSBWorkload:
+    """
+    One YCSB core workload (A-F) mapped onto a table.
+    
+    Operations follow the preset's proportions: read is a primary-key
+    lookup, update rewrites a row's non-key columns, insert adds a new
+    row, scan reads a short key range and read-modify-write reads a row
+    then updates it. Keys follow the preset's request distribution over
+    the table's tracked keys, so the table should be loaded (INSERT)
+    first; inserted keys join the tracker, which is what 'latest' favours.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, table_name: str, preset: str,
+                 operation_count: int, tracker: Optional[KeyTracker] = None,
+                 max_scan_length: Optional[int] = None):
+        """
+        Initialize YCSB workload
+        
+        Args:
+            db_manager: Connected MySQL, PostgreSQL or MongoDB manager
+            table_name: Table (collection) to run on
+            preset: Workload letter, one of Config.YCSB['workloads']
+            operation_count: Number of operations to run
+            tracker: Keys of existing rows (a new, empty tracker if omitted)
+            max_scan_length: Longest scan; lengths are uniform in [1, max] (defaults to Config.YCSB)
+        """
+        workloads = Config.YCSB['workloads']
+        if preset not in workloads:
+            raise ValueError(f"Unknown YCSB workload: {preset}")
+        
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.preset = preset
+        self.settings = workloads[preset]
+        self.operation_count = operation_count
+        self.tracker = tracker if tracker is not None else KeyTracker()
+        self.max_scan_length = max_scan_length or Config.YCSB['max_scan_length']
+        
+        self.generator = SQLDataGenerator(trackers={table_name: self.tracker})
+        self.row_func, _ = self.generator.get_row_generator(table_name)
+        self.chooser = make_chooser(self.settings['distribution'])
+        self._operations = list(self.settings['proportions'])
+        self._weights = list(self.settings['proportions'].values())
+    
+    def next_operation(self) -> str:
+        """Draw the next operation from the preset's proportions."""
+        return random.choices(self._operations, self._weights)[0]
+    
+    def _execute(self, executor, operation: str) -> int:
+        """Run one operation; returns rows read or written."""
+        if operation == 'insert':
+            row = self.row_func()
+            rows = executor.insert(self.table_name, row)
+            self.tracker.add(row[0])
+            return rows
+        
+        key = self.tracker.choose(self.chooser)
+        if operation == 'read':
+            return executor.read(self.table_name, key)
+        if operation == 'update':
+            return executor.update(self.table_name, (key,) + self.row_func()[1:])
+        if operation == 'scan':
+            return executor.scan(self.table_name, key, random.randint(1, self.max_scan_length))
+        if operation == 'read_modify_write':
+            rows = executor.read(self.table_name, key)
+            executor.update(self.table_name, (key,) + self.row_func()[1:])
+            return rows
+        
+        raise ValueError(f"Unknown YCSB operation: {operation}")
+    
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Run the workload
+        
+        Args:
+            progress: Called every 1000 operations with a partial report
+            should_stop: Polled every 1000 operations; the run ends early when it returns True
+        
+        Returns:
+            Throughput and per-operation latency report
+        """
+        if len(self.tracker) == 0 and set(self._operations) != {'insert'}:
+            return {'success': False, 'error': f"No existing rows in {self.table_name}; load the table first"}
+        
+        executor = executor_for(self.db_manager, self.generator)
+        stats = OperationStats()
+        started = time.perf_counter()
+        last_error = None
+        
+        for done in range(1, self.operation_count + 1):
+            operation = self.next_operation()
+            start = time.perf_counter()
+            try:
+                rows = self._execute(executor, operation)
+                stats.record(operation, rows, time.perf_counter() - start)
+            except Exception as e:
+                stats.record_error(operation)
+                last_error = str(e)
+            
+            if done % 1000 == 0:
+                if progress is not None:
+                    progress(self._report(stats, time.perf_counter() - started, last_error))
+                if should_stop is not None and should_stop():
+                    break
+        
+        return self._report(stats, time.perf_counter() - started, last_error)
+    
+    def _report(self, stats: OperationStats, elapsed: float, last_error: Optional[str]) -> Dict[str, Any]:
+        """Build the standard report."""
+        summary = stats.summary()
+        operations = sum(entry['count'] for entry in summary.values())
+        errors = sum(entry['errors'] for entry in summary.values())
+        return {
+            'success': errors == 0,
+            'workload': 'ycsb',
+            'preset': self.preset,
+            'preset_name': self.settings['name'],
+            'database': self.db_manager.db_type,
+            'table': self.table_name,
+            'operations': operations,
+            'errors': errors,
+            'duration': elapsed,
+            'throughput': operations / elapsed if elapsed > 0 else 0.0,
+            'operations_by_kind': summary,
+            'error': last_error
+        }
@@ -4,8 +4,30 @@ Premium Award-Winning Design
 """
 
 import streamlit as st
+import pandas as pd
 import time
-from core.generator import SQLDataGenerator, PerformanceMonitor
+import uuid
+from typing import Optional
+from core.generator import SQLDataGenerator, READ_QUERIES, operation_keys
+from core.pools import ValuePools
+from core.unique import UniqueCounter
+from core.keys import KeyRegistrySet, KeyTracker
+from core.distributions import make_choosers
+from core.workloads import WORKLOADS
+from core.metrics import OperationHistograms, OperationStats, WindowedStats, find_knee
+from core.ycsb import YCSBWorkload
+from core.users import VirtualUserWorkload
+from core.async_engine import AsyncWorkload
+from core.sweep import ParameterSweep, STATEMENT_STYLES, sweep_figure
+from core.adaptive import AdaptiveBatchSizer, is_throttling
+from core.sampler import SystemSampler, weak_gauge
+from core.server_metrics import ServerMetricsCollector
+from core.storage import StorageGrowth
+from core.exporter import MetricsExporter, error_class
+from core.report import RunReport
+from core.history import RunHistory
+from core.rate import RateLimiter
+from core.shapes import ShapedRateLimiter, make_load_shape
 from core.config import Config
 from core.ui_config import UIConfig
 
@@ -157,6 +179,18 @@ if 'is_generating' not in st.session_state:
     st.session_state.is_generating = False
 if 'total_generated' not in st.session_state:
     st.session_state.total_generated = 0
+if 'key_trackers' not in st.session_state:
+    st.session_state.key_trackers = {}
+if 'op_stats' not in st.session_state:
+    st.session_state.op_stats = OperationStats()
+if 'load_windows' not in st.session_state:
+    st.session_state.load_windows = WindowedStats()
+if 'histograms' not in st.session_state:
+    st.session_state.histograms = OperationHistograms()
+# Labels what this session registers in process-wide resources (metrics gauges, sampler gauges)
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:8]
+session_id = st.session_state.session_id
 
 db_manager = st.session_state.db_connection
 tables = st.session_state.tables
@@ -174,9 +208,9 @@ with col2:
                             format_func=lambda x: UIConfig.OPERATIONS[x])
 
 with col3:
-    batch_size = st.number_input("Batch Size", min_value=1, max_value=10000, value=100)
+    batch_size = st.number_input("Batch Size", min_value=1, max_value=10000, value=Config.PERFORMANCE['batch_size'])
 
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 
 with col1:
     total_records = st.number_input("Total Records", min_value=1, max_value=1000000, value=1000)
@@ -184,6 +218,326 @@ with col1:
 with col2:
     speed = st.slider("Generation Speed (records/sec)", min_value=1, max_value=1000, value=100)
 
+with col3:
+    use_pools = st.checkbox("Realistic Value Pools", value=False,
+                            help="Draw names, cities, companies and email domains from large Faker pools (built once and cached on disk)")
+    unique_values = st.checkbox("Unique Values", value=False,
+                                help="Guarantee collision-free usernames, emails, SKUs and order numbers")
+    capture_server_metrics = st.checkbox("Capture Server Metrics", value=False,
+                                         help="Poll server status counters and statement digests on a separate "
+                                              "connection during the run")
+    measure_storage = st.checkbox("Measure Storage Growth", value=False,
+                                  help="Snapshot table, index and WAL/binlog sizes before and after the run and "
+                                       "report bytes written per row")
+    archive_reports = st.checkbox("Archive Run Reports", value=True,
+                                  help=f"Save a JSON report of every run to {Config.REPORTS['directory']}/")
+
+# Which existing rows UPDATE and DELETE hit
+access_distributions = {}
+targeted_operations = {'update': ['update'], 'delete': ['delete'], 'random': ['update', 'delete'],
+                       'read': ['read'], 'mixed': ['update', 'delete', 'read'],
+                       'lock': ['lock'], 'users': ['update', 'delete', 'read'],
+                       'async': ['update', 'delete', 'read']}.get(operation, [])
+if targeted_operations:
+    with st.expander("🎯 Key Access Distribution"):
+        for op_col, op_name in zip(st.columns(len(targeted_operations)), targeted_operations):
+            with op_col:
+                defaults = Config.ACCESS_DISTRIBUTIONS
+                name = st.selectbox(f"{op_name.upper()} Distribution", options=list(UIConfig.ACCESS_DISTRIBUTIONS.keys()),
+                                    format_func=lambda x: UIConfig.ACCESS_DISTRIBUTIONS[x], key=f"dist_{op_name}")
+                spec = {'name': name}
+                if name in ('zipfian', 'latest'):
+                    spec['theta'] = st.slider("Skew (theta)", min_value=0.01, max_value=0.99,
+                                              value=defaults[name]['theta'], key=f"theta_{op_name}")
+                elif name == 'hotspot':
+                    spec['hot_data_fraction'] = st.slider("Hot Keys (%)", min_value=1, max_value=100,
+                                                          value=int(defaults['hotspot']['hot_data_fraction'] * 100),
+                                                          key=f"hot_data_{op_name}") / 100
+                    spec['hot_op_fraction'] = st.slider("Operations on Hot Keys (%)", min_value=0, max_value=100,
+                                                        value=int(defaults['hotspot']['hot_op_fraction'] * 100),
+                                                        key=f"hot_op_{op_name}") / 100
+                access_distributions[op_name] = spec
+
+# Read query mix and read/write ratio
+read_ratio = None
+query_mix = None
+if operation in ('read', 'mixed', 'users', 'async'):
+    defaults = Config.READS
+    with st.expander("🔍 Read Workload Settings"):
+        if operation in ('mixed', 'async'):
+            read_ratio = st.slider("Reads (%)", min_value=0, max_value=100,
+                                   value=int(defaults['read_ratio'] * 100)) / 100
+        st.caption("Query class weights")
+        query_mix = {}
+        for query_col, query in zip(st.columns(len(READ_QUERIES)), READ_QUERIES):
+            with query_col:
+                query_mix[query] = st.number_input(query.replace('_', ' ').title(), min_value=0, max_value=100,
+                                                   value=int(defaults['query_mix'].get(query, 0) * 100),
+                                                   key=f"mix_{query}")
+        if not any(query_mix.values()):
+            query_mix = None
+
+# Time-varying target rate (replaces the constant Generation Speed)
+load_shape = None
+if operation not in WORKLOADS and operation not in ('ycsb', 'sweep'):
+    with st.expander("📈 Load Shape"):
+        shape_name = st.selectbox("Target Rate Profile", options=list(UIConfig.LOAD_SHAPES.keys()),
+                                  format_func=lambda x: UIConfig.LOAD_SHAPES[x])
+        if shape_name != 'constant':
+            shape_defaults = Config.LOAD_SHAPES[shape_name]
+            load_shape = {'name': shape_name}
+            for param_col, (param, value) in zip(st.columns(len(shape_defaults)), shape_defaults.items()):
+                with param_col:
+                    load_shape[param] = st.number_input(param.replace('_', ' ').title(), min_value=0.0,
+                                                        value=float(value), key=f"shape_{shape_name}_{param}")
+            st.caption("Rates are operations per second, times are seconds. The run ends when the profile does "
+                       "(or Total Records is reached).")
+
+# Batch sizing for the statement-by-statement generation path
+adaptive_batch = None
+multi_row = False
+if operation not in WORKLOADS and operation not in ('ycsb', 'sweep', 'users', 'async'):
+    defaults = Config.ADAPTIVE_BATCH
+    with st.expander("📦 Batching"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            adapt = st.checkbox("Adaptive Batch Size", value=False,
+                                help="Grow batches while they finish under the target latency, shrink them when "
+                                     "they are slow or fail, and back off when the server throttles")
+            multi_row = st.checkbox("Multi-Row INSERTs", value=False, disabled=operation != 'insert',
+                                    help="Send each batch as one INSERT statement") and operation == 'insert'
+        if adapt:
+            with col2:
+                target_ms = st.number_input("Target Batch Latency (ms)", min_value=1, max_value=60000,
+                                            value=int(defaults['target_latency'] * 1000))
+                increase = st.number_input("Increase Step (rows)", min_value=1, max_value=10000,
+                                           value=defaults['increase'])
+            with col3:
+                min_size = st.number_input("Min Batch Size", min_value=1, max_value=10000, value=defaults['min_size'])
+                max_size = st.number_input("Max Batch Size", min_value=1, max_value=100000, value=defaults['max_size'])
+            adaptive_batch = {'initial': batch_size, 'target_latency': target_ms / 1000, 'increase': increase,
+                              'min_size': min_size, 'max_size': max(min_size, max_size)}
+            st.caption("Batch Size is the starting point.")
+
+# Multi-session contention workloads
+workload_settings = {}
+if operation == 'ycsb':
+    presets = Config.YCSB['workloads']
+    with st.expander("📊 YCSB Settings", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            workload_settings['preset'] = st.selectbox("Core Workload", options=list(presets.keys()),
+                                                       format_func=lambda x: f"{x} - {presets[x]['name']}")
+        with col2:
+            workload_settings['max_scan_length'] = st.number_input("Max Scan Length", min_value=1, max_value=1000,
+                                                                   value=Config.YCSB['max_scan_length'])
+        preset = presets[workload_settings['preset']]
+        st.caption(", ".join(f"{int(share * 100)}% {name.replace('_', '-')}"
+                             for name, share in preset['proportions'].items())
+                   + f"; {preset['distribution']} request distribution. Uses Total Records as the operation count.")
+if operation == 'lock':
+    defaults = Config.WORKLOADS['lock']
+    with st.expander("🔒 Lock Workload Settings", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            workload_settings['sessions'] = st.number_input("Concurrent Sessions", min_value=1, max_value=64,
+                                                            value=defaults['sessions'])
+            workload_settings['hot_keys'] = st.number_input("Hot Keys", min_value=1, max_value=10000,
+                                                            value=defaults['hot_keys'],
+                                                            help="Number of existing rows all sessions compete for")
+        with col2:
+            workload_settings['keys_per_transaction'] = st.number_input("Rows Locked per Transaction", min_value=1,
+                                                                        max_value=100,
+                                                                        value=defaults['keys_per_transaction'])
+            workload_settings['hold_time'] = st.number_input("Lock Hold Time (ms)", min_value=0, max_value=10000,
+                                                             value=int(defaults['hold_time'] * 1000)) / 1000
+        with col3:
+            workload_settings['duration'] = st.number_input("Duration (s)", min_value=1, max_value=3600,
+                                                            value=defaults['duration'])
+            workload_settings['lock_timeout'] = st.number_input("Lock Wait Timeout (s)", min_value=1, max_value=600,
+                                                                value=defaults['lock_timeout'])
+elif operation == 'deadlock':
+    defaults = Config.WORKLOADS['deadlock']
+    with st.expander("⚠️ Deadlock Workload Settings", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            workload_settings['pairs'] = st.number_input("Session Pairs", min_value=1, max_value=32,
+                                                         value=defaults['pairs'],
+                                                         help="Each pair locks the same two rows in opposite orders")
+            workload_settings['hold_time'] = st.number_input("Lock Hold Time (ms)", min_value=0, max_value=10000,
+                                                             value=int(defaults['hold_time'] * 1000)) / 1000
+        with col2:
+            workload_settings['duration'] = st.number_input("Duration (s)", min_value=1, max_value=3600,
+                                                            value=defaults['duration'])
+            workload_settings['lock_timeout'] = st.number_input("Lock Wait Timeout (s)", min_value=1, max_value=600,
+                                                                value=defaults['lock_timeout'],
+                                                                help="innodb_lock_wait_timeout / lock_timeout per session")
+        with col3:
+            workload_settings['max_retries'] = st.number_input("Max Retries", min_value=0, max_value=20,
+                                                               value=Config.PERFORMANCE['max_retries'])
+            workload_settings['backoff'] = st.number_input("Retry Backoff (ms)", min_value=0, max_value=10000,
+                                                           value=int(Config.PERFORMANCE['retry_delay'] * 1000)) / 1000
+elif operation == 'transactions':
+    defaults = Config.WORKLOADS['transactions']
+    with st.expander("🛒 Order Transaction Settings", expanded=True):
+        st.caption("Runs on orders, products and users regardless of the selected table; load all three first.")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            workload_settings['sessions'] = st.number_input("Concurrent Sessions", min_value=1, max_value=64,
+                                                            value=defaults['sessions'])
+            workload_settings['new_order_ratio'] = st.slider("New-Order Share", 0.0, 1.0,
+                                                             float(defaults['new_order_ratio']), 0.05,
+                                                             help="The rest are payment transactions")
+        with col2:
+            workload_settings['max_lines'] = st.number_input("Max Lines per Order", min_value=1, max_value=15,
+                                                             value=defaults['max_lines'])
+            workload_settings['duration'] = st.number_input("Duration (s)", min_value=1, max_value=3600,
+                                                            value=defaults['duration'])
+        with col3:
+            workload_settings['lock_timeout'] = st.number_input("Lock Wait Timeout (s)", min_value=1, max_value=600,
+                                                                value=defaults['lock_timeout'])
+            workload_settings['max_retries'] = st.number_input("Max Retries", min_value=0, max_value=20,
+                                                               value=Config.PERFORMANCE['max_retries'])
+elif operation == 'users':
+    defaults = Config.VIRTUAL_USERS
+    with st.expander("👥 Virtual User Settings", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            workload_settings['users'] = st.number_input("Peak Users", min_value=1, max_value=500,
+                                                         value=defaults['users'], help="One connection per user")
+            workload_settings['duration'] = st.number_input("Duration (s)", min_value=1, max_value=3600,
+                                                            value=defaults['duration'])
+        with col2:
+            workload_settings['ramp_up'] = st.number_input("Ramp Up (s)", min_value=0, max_value=3600,
+                                                           value=defaults['ramp_up'])
+            workload_settings['ramp_down'] = st.number_input("Ramp Down (s)", min_value=0, max_value=3600,
+                                                             value=defaults['ramp_down'])
+        with col3:
+            think_defaults = Config.THINK_TIMES
+            think_name = st.selectbox("Think Time", options=list(UIConfig.THINK_TIMES.keys()),
+                                      index=list(UIConfig.THINK_TIMES).index(defaults['think_time']['name']),
+                                      format_func=lambda x: UIConfig.THINK_TIMES[x])
+            think_time = {'name': think_name}
+            if think_name == 'constant':
+                think_time['seconds'] = st.number_input("Pause (ms)", min_value=0, max_value=60000,
+                                                        value=int(think_defaults['constant']['seconds'] * 1000)) / 1000
+            elif think_name == 'uniform':
+                think_time['low'] = st.number_input("Min Pause (ms)", min_value=0, max_value=60000,
+                                                    value=int(think_defaults['uniform']['low'] * 1000)) / 1000
+                think_time['high'] = st.number_input("Max Pause (ms)", min_value=0, max_value=60000,
+                                                     value=int(think_defaults['uniform']['high'] * 1000)) / 1000
+            else:
+                think_time['mean'] = st.number_input("Mean Pause (ms)", min_value=0, max_value=60000,
+                                                     value=int(think_defaults[think_name]['mean'] * 1000)) / 1000
+                if think_name == 'normal':
+                    think_time['stddev'] = st.number_input("Std Dev (ms)", min_value=0, max_value=60000,
+                                                           value=int(think_defaults['normal']['stddev'] * 1000)) / 1000
+            workload_settings['think_time'] = think_time
+        
+        st.caption("Session script: operation weights")
+        script_operations = ('insert', 'update', 'delete') + READ_QUERIES
+        script = {}
+        for script_col, script_op in zip(st.columns(len(script_operations)), script_operations):
+            with script_col:
+                script[script_op] = st.number_input(script_op.replace('_', ' ').title(), min_value=0, max_value=100,
+                                                    value=defaults['script'].get(script_op, 0), key=f"script_{script_op}")
+        workload_settings['script'] = script
+        cap_rate = st.checkbox("Cap at Generation Speed", value=False,
+                               help="Limit all users together to the Generation Speed setting")
+elif operation == 'async':
+    defaults = Config.ASYNC_ENGINE
+    with st.expander("🚀 Async Engine Settings", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            workload_settings['operation'] = st.selectbox(
+                "Statement Mix", options=['insert', 'update', 'delete', 'random', 'read', 'mixed'],
+                format_func=lambda x: UIConfig.OPERATIONS[x])
+        with col2:
+            workload_settings['concurrency'] = st.number_input("Concurrent Clients", min_value=1, max_value=100000,
+                                                               value=defaults['concurrency'])
+        with col3:
+            workload_settings['connections'] = st.number_input("Connection Pool Size", min_value=1, max_value=5000,
+                                                               value=defaults['connections'])
+        cap_rate = st.checkbox("Cap at Generation Speed", value=False,
+                               help="Limit the operation rate to the Generation Speed setting")
+        st.caption("Needs the optional aiomysql, asyncpg or motor package. Uses Total Records as the operation count.")
+elif operation == 'sweep':
+    defaults = Config.SWEEP
+    with st.expander("🧪 Sweep Settings", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            workload_settings['batch_sizes'] = st.multiselect("Batch Sizes", options=[1, 10, 50, 100, 500, 1000, 5000],
+                                                              default=defaults['batch_sizes'])
+            workload_settings['workers'] = st.multiselect("Workers", options=[1, 2, 4, 8, 16, 32],
+                                                          default=defaults['workers'])
+            workload_settings['commit_intervals'] = st.multiselect("Commit Every (rows)",
+                                                                   options=[1, 10, 100, 1000, 10000],
+                                                                   default=defaults['commit_intervals'])
+        with col2:
+            workload_settings['styles'] = st.multiselect("Statement Styles", options=list(STATEMENT_STYLES),
+                                                         default=defaults['styles'],
+                                                         help="COPY is skipped on MySQL")
+            workload_settings['trial_rows'] = st.number_input("Rows per Trial", min_value=100, max_value=1000000,
+                                                              value=defaults['trial_rows'])
+            workload_settings['strategy'] = st.radio("Search", options=['grid', 'adaptive'], horizontal=True,
+                                                     format_func=lambda x: {'grid': "Full Grid",
+                                                                            'adaptive': "Adaptive"}[x],
+                                                     help="Adaptive changes one setting at a time from the middle "
+                                                          "values and keeps what helps")
+            max_p99 = st.number_input("Max Batch p99 (ms, 0 = no limit)", min_value=0, max_value=60000, value=0)
+            workload_settings['max_p99_ms'] = max_p99 or None
+            workload_settings['cleanup'] = st.checkbox("Delete Trial Rows", value=defaults['cleanup'])
+
+
+@st.cache_resource(show_spinner="Building value pools...")
+def load_value_pools() -> ValuePools:
+    """Build or load the cached Faker value pools once per server process."""
+    return ValuePools.build()
+
+
+@st.cache_resource
+def get_key_registries(database: tuple) -> KeyRegistrySet:
+    """One set of shared-memory key registries per target database, shared by every session using it."""
+    return KeyRegistrySet.create()
+
+
+@st.cache_resource
+def get_unique_counter() -> UniqueCounter:
+    """One persistent unique value counter per server process, shared by every session."""
+    return UniqueCounter()
+
+
+@st.cache_resource
+def get_system_sampler() -> SystemSampler:
+    """Start the background client resource sampler once per server process."""
+    return SystemSampler().start()
+
+
+@st.cache_resource
+def get_metrics_exporter() -> MetricsExporter:
+    """One metrics exporter per server process, so counters survive reruns."""
+    return MetricsExporter()
+
+
+# Prometheus endpoint: shared by every session of this server, so it runs until someone stops it
+metrics_exporter = get_metrics_exporter()
+with st.expander("📡 Prometheus Endpoint", expanded=metrics_exporter.running):
+    if metrics_exporter.running:
+        st.caption(f"Serving rows, statements, errors, latency buckets and rates at {metrics_exporter.url}")
+        if st.button("⏹️ Stop Endpoint", help="Stops the endpoint for every session on this server"):
+            metrics_exporter.stop()
+            st.rerun()
+    elif st.button("▶️ Start Endpoint",
+                   help="Serve rows, statements, errors, latency buckets and rates for Prometheus "
+                        f"on {Config.EXPORTER['host']}:{Config.EXPORTER['port']}"):
+        try:
+            metrics_exporter.start()
+            st.rerun()
+        except OSError as e:
+            st.warning(f"⚠️ Could not serve metrics on port {metrics_exporter.port}: {e}")
+exporter = metrics_exporter if metrics_exporter.running else None
+
+
 # Control Panel
 st.markdown("## Control Panel")
 
@@ -200,12 +554,32 @@ with col2:
 with col3:
     if st.button("🔄 Reset Counters", use_container_width=True):
         st.session_state.total_generated = 0
+        st.session_state.op_stats = OperationStats()
+        st.session_state.load_windows = WindowedStats()
+        st.session_state.histograms = OperationHistograms()
+        st.session_state.pop('workload_result', None)
+        st.session_state.pop('batch_history', None)
+        st.session_state.pop('server_metrics', None)
+        st.session_state.pop('storage_growth', None)
+        st.session_state.pop('run_report', None)
         st.rerun()
 
 if stop_btn:
     st.session_state.is_generating = False
     st.rerun()
 
+
+def speed_card_html(histograms: OperationHistograms) -> str:
+    """Metric card with rows per second and p99 latency over the sliding window."""
+    overall = histograms.overall()
+    return f"""
+    <div class="metric-card">
+        <div class="metric-value">{overall['throughput']:,.1f}</div>
+        <div class="metric-label">Current Speed (rows/s) · p99 {overall['window_p99_ms']:.1f} ms</div>
+    </div>
+    """
+
+
 # Metrics Dashboard
 st.markdown("## Live Metrics")
 
@@ -229,63 +603,704 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    st.markdown(f"""
-    <div class="metric-card">
-        <div class="metric-value">0</div>
-        <div class="metric-label">Current Speed</div>
-    </div>
-    """, unsafe_allow_html=True)
+    speed_card = st.empty()
+    speed_card.markdown(speed_card_html(st.session_state.histograms), unsafe_allow_html=True)
+
+sampler = get_system_sampler()
+# Weakly held, so the shared sampler drops the gauge once this session is gone
+sampler.track('rows_per_sec', weak_gauge(st.session_state.histograms.throughput), session=session_id)
 
 with col4:
-    monitor = PerformanceMonitor()
-    cpu_usage = monitor.get_cpu_usage()
+    snapshot = sampler.latest(session_id)
     st.markdown(f"""
     <div class="metric-card">
-        <div class="metric-value">{cpu_usage:.1f}%</div>
+        <div class="metric-value">{snapshot['cpu_percent'] if snapshot else 0.0:.1f}%</div>
         <div class="metric-label">CPU Usage</div>
     </div>
     """, unsafe_allow_html=True)
 
+
+def render_client_resources(placeholder, sampler: SystemSampler) -> None:
+    """Chart the run's rows per second next to client CPU, memory and network over the last five minutes."""
+    history = sampler.history(seconds=300, session=session_id)
+    if not history:
+        placeholder.caption("Collecting samples...")
+        return
+    
+    frame = pd.DataFrame(history).set_index('elapsed')
+    with placeholder.container():
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Rows per second")
+            st.line_chart(frame.reindex(columns=['rows_per_sec']))
+            st.caption("Process memory (MB)")
+            st.line_chart(frame[['process_rss_mb']])
+        with col2:
+            st.caption("CPU (%)")
+            st.line_chart(frame[['cpu_percent', 'process_cpu_percent']])
+            st.caption("Network (KB/s)")
+            st.line_chart(frame[['net_sent_kbps', 'net_recv_kbps']])
+
+
+with st.expander("🖥️ Client Resources"):
+    resources_chart = st.empty()
+    render_client_resources(resources_chart, sampler)
+
+def describe_rows(stats: OperationStats) -> str:
+    """Rows written and read so far, for status messages."""
+    read_rows = sum(stats.rows(query) for query in READ_QUERIES)
+    return (f"rows inserted: {stats.rows('insert')}, updated: {stats.rows('update')}, "
+            f"deleted: {stats.rows('delete')}, read: {read_rows}")
+
+
+def render_load_windows(windows) -> None:
+    """Chart target rate, throughput and latency per time window, and call out the latency knee."""
+    if not windows:
+        return
+    
+    st.markdown("### Load Over Time")
+    frame = pd.DataFrame(windows).set_index('start')
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Operations per second")
+        st.line_chart(frame[['target_rate', 'throughput']] if frame['target_rate'].notna().any() else frame[['throughput']])
+    with col2:
+        st.caption("Latency (ms)")
+        st.line_chart(frame[['p50_ms', 'p95_ms', 'p99_ms']])
+    
+    knee = find_knee(windows)
+    if knee is not None:
+        rate = f" at a target of {knee['target_rate']:.0f} ops/s" if knee['target_rate'] else ""
+        st.warning(f"📈 Latency knee at {knee['start']:.0f}s{rate}: p95 {knee['p95_ms']:.1f} ms, "
+                   f"{knee['throughput']:.1f} ops/s achieved")
+
+
+# Operation Breakdown
+if st.session_state.op_stats.kinds and not st.session_state.is_generating:
+    st.markdown("## Operation Breakdown")
+    st.dataframe(pd.DataFrame(st.session_state.op_stats.summary()).T, use_container_width=True)
+    
+    latency = st.session_state.histograms.summary()
+    if latency:
+        st.markdown("### Latency Percentiles (ms)")
+        st.dataframe(pd.DataFrame(latency).set_index(['table', 'operation']), use_container_width=True)
+    render_load_windows(st.session_state.load_windows.windows())
+    
+    batch_history = st.session_state.get('batch_history')
+    if batch_history:
+        st.markdown("### Adaptive Batch Size")
+        history = pd.DataFrame(batch_history).set_index('batch')
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Rows per batch")
+            st.line_chart(history[['rows']])
+        with col2:
+            st.caption("Batch latency (ms)")
+            st.line_chart(history[['latency_ms']])
+        backoffs = int((history['action'] == 'backoff').sum())
+        if backoffs:
+            st.warning(f"⏳ Backed off {backoffs} times because the server was throttling")
+
+def render_metric_cards(cards) -> None:
+    """Render (value, label) pairs as a row of metric cards."""
+    for col, (value, label) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-value">{value}</div>
+                <div class="metric-label">{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+# Workload Results
+workload_result = st.session_state.get('workload_result')
+if workload_result and not st.session_state.is_generating:
+    st.markdown("## Workload Results")
+    
+    if not workload_result['success']:
+        st.error(f"❌ Error: {workload_result['error']}")
+    
+    if 'transactions' in workload_result:
+        errors = workload_result['errors']
+        by_kind = workload_result['transactions_by_kind']
+        if workload_result['workload'] == 'transactions':
+            cards = [
+                (f"{workload_result['tpm']:,.0f}", "Transactions / min"),
+                (f"{by_kind.get('new_order', {}).get('tpm', 0):,.0f}", "New Orders / min"),
+                (f"{workload_result['abort_rate'] * 100:.1f}%", "Abort Rate"),
+                (workload_result['failed'] + errors['aborted'], "Failed / Aborted")
+            ]
+        elif workload_result['workload'] == 'deadlock':
+            cards = [
+                (f"{workload_result['goodput']:.1f}", "Goodput (tx/s)"),
+                (f"{workload_result['deadlock_rate'] * 100:.1f}%", "Deadlock Rate"),
+                (f"{workload_result['retry_latency']['p95_ms']:.1f}", "Retry Latency p95 (ms)"),
+                (workload_result['failed'], "Failed After Retries")
+            ]
+        else:
+            cards = [
+                (workload_result['transactions'], "Transactions"),
+                (f"{workload_result['goodput']:.1f}", "Goodput (tx/s)"),
+                (f"{workload_result['lock_wait']['p95_ms']:.1f}", "Lock Wait p95 (ms)"),
+                (errors['lock_timeout'] + errors['deadlock'], "Lock Timeouts / Deadlocks")
+            ]
+        render_metric_cards(cards)
+        
+        st.markdown("### Latency Distribution (ms)")
+        st.dataframe(pd.DataFrame({
+            'Lock Wait': workload_result['lock_wait'],
+            'Transaction': workload_result['latency'],
+            'Retried Transaction': workload_result['retry_latency']
+        }).T, use_container_width=True)
+        if len(by_kind) > 1:
+            st.markdown("### Per-Transaction Type")
+            st.dataframe(pd.DataFrame(by_kind).T, use_container_width=True)
+        st.caption(f"{workload_result['attempts']} attempts, {workload_result['retries']} retries, "
+                   f"{errors['deadlock']} deadlocks, {errors['lock_timeout']} lock wait timeouts")
+        
+        if workload_result['lock_samples']:
+            st.markdown("### Server Locks Over Time")
+            samples = pd.DataFrame(workload_result['lock_samples'])
+            st.line_chart(samples.set_index('elapsed')[['granted', 'waiting']])
+    
+    elif workload_result.get('workload') == 'async':
+        by_kind = workload_result['operations_by_kind']
+        render_metric_cards([
+            (workload_result['concurrency'], "Concurrent Clients"),
+            (f"{workload_result['throughput']:.1f}", "Throughput (ops/s)"),
+            (f"{workload_result['pool_wait']['p95_ms']:.1f}", "Pool Wait p95 (ms)"),
+            (workload_result['errors'], "Errors")
+        ])
+        st.caption(f"{workload_result['operations']} operations over {workload_result['connections']} connections "
+                   f"on {workload_result['database']} table {workload_result['table']}")
+        st.markdown("### Per-Operation Latency (ms)")
+        st.dataframe(pd.DataFrame(by_kind).T, use_container_width=True)
+        render_load_windows(workload_result['windows'])
+    
+    elif workload_result.get('workload') == 'sweep':
+        best = workload_result['best']
+        if best is not None:
+            render_metric_cards([
+                (f"{best['throughput']:,.0f}", "Best Rows / s"),
+                (f"{best['style']} × {best['batch_size']}", "Style × Batch Size"),
+                (f"{best['workers']} / {best['commit_interval']}", "Workers / Commit Every"),
+                (f"{best['p99_ms']:.1f}", "Batch p99 (ms)")
+            ])
+        st.caption(f"{len(workload_result['trials'])} trials of {workload_result['trial_rows']} rows "
+                   f"({workload_result['strategy']} search) on {workload_result['database']} "
+                   f"table {workload_result['table']}")
+        
+        if workload_result['trials']:
+            trials = pd.DataFrame(workload_result['trials']).sort_values('throughput', ascending=False)
+            st.dataframe(trials, use_container_width=True, hide_index=True)
+            st.plotly_chart(sweep_figure(workload_result['trials'], best), use_container_width=True)
+    
+    elif workload_result.get('workload') == 'users':
+        by_kind = workload_result['operations_by_kind']
+        render_metric_cards([
+            (workload_result['peak_users'], "Peak Users"),
+            (f"{workload_result['throughput']:.1f}", "Throughput (ops/s)"),
+            (f"{max((entry['p95_ms'] for entry in by_kind.values()), default=0):.1f}", "Worst p95 (ms)"),
+            (workload_result['errors'], "Errors")
+        ])
+        st.caption(f"{workload_result['connections_opened']} connections opened, "
+                   f"{workload_result['failed_connections']} failed; "
+                   f"mean think time {workload_result['think_time']['mean_ms']:.0f} ms")
+        
+        st.markdown("### Per-Operation Latency (ms)")
+        st.dataframe(pd.DataFrame(by_kind).T, use_container_width=True)
+        
+        if workload_result['timeline']:
+            st.markdown("### Active Users Over Time")
+            timeline = pd.DataFrame(workload_result['timeline']).set_index('elapsed')
+            st.line_chart(timeline[['users']])
+    
+    elif 'operations_by_kind' in workload_result:
+        st.caption(f"YCSB workload {workload_result['preset']} ({workload_result['preset_name']}) on "
+                   f"{workload_result['database']} table {workload_result['table']}")
+        by_kind = workload_result['operations_by_kind']
+        render_metric_cards([
+            (workload_result['operations'], "Operations"),
+            (f"{workload_result['throughput']:.1f}", "Throughput (ops/s)"),
+            (f"{max((entry['p99_ms'] for entry in by_kind.values()), default=0):.1f}", "Worst p99 (ms)"),
+            (workload_result['errors'], "Errors")
+        ])
+        
+        st.markdown("### Per-Operation Latency (ms)")
+        st.dataframe(pd.DataFrame(by_kind).T, use_container_width=True)
+
+# Server Metrics
+server_metrics = st.session_state.get('server_metrics')
+if server_metrics and not st.session_state.is_generating:
+    st.markdown("## Server Metrics")
+    
+    if not server_metrics['success']:
+        st.error(f"❌ Error: {server_metrics['error']}")
+    else:
+        averages = server_metrics['averages']
+        deltas = server_metrics['deltas']
+        hit_ratio = averages.get('cache_hit_ratio')
+        written = sum(averages.get(f'rows_{kind}_per_sec', 0.0) for kind in ('inserted', 'updated', 'deleted'))
+        render_metric_cards([
+            (f"{averages.get('commits_per_sec', 0.0):,.1f}", "Commits / s"),
+            (f"{written:,.0f}", "Rows Written / s"),
+            (f"{hit_ratio * 100:.2f}%" if hit_ratio is not None else "n/a", "Cache Hit Ratio"),
+            (f"{deltas.get('checkpoints', 0):.0f}", "Checkpoints")
+        ])
+        
+        samples = pd.DataFrame(server_metrics['samples']).set_index('elapsed')
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Server commits per second and client throughput")
+            st.line_chart(samples.reindex(columns=['commits_per_sec', 'client_throughput']).dropna(axis=1, how='all'))
+            st.caption("Server rows per second")
+            st.line_chart(samples.reindex(columns=['rows_inserted_per_sec', 'rows_updated_per_sec',
+                                                   'rows_deleted_per_sec', 'rows_read_per_sec']).dropna(axis=1, how='all'))
+        with col2:
+            st.caption("Buffer cache hit ratio")
+            st.line_chart(samples.reindex(columns=['cache_hit_ratio']))
+            st.caption("Disk reads and checkpoints per second")
+            st.line_chart(samples.reindex(columns=['disk_reads_per_sec', 'checkpoints_per_sec']).dropna(axis=1, how='all'))
+        
+        if server_metrics['top_statements']:
+            st.markdown("### Top Statements")
+            st.dataframe(pd.DataFrame(server_metrics['top_statements']), use_container_width=True, hide_index=True)
+        st.caption(f"{server_metrics['database']} polled every {server_metrics['interval']:g}s on a separate connection; "
+                   f"{deltas.get('deadlocks', 0):.0f} deadlocks, {deltas.get('lock_waits', 0):.0f} lock waits, "
+                   f"{deltas.get('bytes_written', 0) / (1024**2):,.1f} MB written")
+
+# Storage Growth
+storage_growth = st.session_state.get('storage_growth')
+if storage_growth and not st.session_state.is_generating:
+    st.markdown("## Storage Growth")
+    
+    if not storage_growth['success']:
+        st.error(f"❌ Error: {storage_growth['error']}")
+    else:
+        rows_added = storage_growth['rows_added']
+        data_bytes = sum(table['data_bytes'] for table in storage_growth['tables'])
+        index_bytes = sum(table['index_bytes'] for table in storage_growth['tables'])
+        log_per_row = storage_growth['log_bytes_per_row']
+        render_metric_cards([
+            (f"{rows_added:,.0f}", "Rows Added"),
+            (f"{storage_growth['total_bytes'] / rows_added:,.0f}" if rows_added > 0 else "n/a", "Bytes / Row"),
+            (f"{index_bytes / data_bytes * 100:.0f}%" if data_bytes > 0 else "n/a", "Index Overhead"),
+            (f"{log_per_row:,.0f}" if log_per_row is not None else "n/a", "Log Bytes / Row")
+        ])
+        
+        if storage_growth['tables']:
+            st.dataframe(pd.DataFrame(storage_growth['tables']).set_index('table'), use_container_width=True)
+        logs = ', '.join(f"{name} {value / (1024**2):,.1f} MB" for name, value in storage_growth['logs'].items())
+        st.caption(f"Log growth: {logs or 'not available'}. Logs are server-wide and sizes grow a page or extent "
+                   f"at a time, so short runs give coarse figures.")
+
+# Run Report
+run_report = st.session_state.get('run_report')
+if run_report and not st.session_state.is_generating:
+    st.markdown("## Run Report")
+    summary = run_report.data['summary']
+    st.caption(f"Run {run_report.data['id']}: {summary['operations']:,} operations, {summary['errors']:,} errors, "
+               f"{summary['throughput']:,.1f} ops/s over {summary['duration']:.1f}s")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ JSON Report", run_report.to_json(), file_name=f"{run_report.data['id']}.json",
+                           mime="application/json", use_container_width=True)
+    with col2:
+        st.download_button("⬇️ HTML Report", run_report.to_html(), file_name=f"{run_report.data['id']}.html",
+                           mime="text/html", use_container_width=True)
+    archived = st.session_state.get('run_report_paths')
+    if archived:
+        st.caption(f"Archived to {', '.join(archived)}")
+        history = RunHistory()
+        baseline = history.baseline
+        if st.button("📌 Pin as Baseline", disabled=baseline == run_report.data['id']):
+            baseline = history.pin(run_report.data['id'])
+            st.success(f"✅ Run {baseline} is now the baseline")
+        if baseline and baseline != run_report.data['id']:
+            try:
+                comparison = history.compare(baseline, run_report.data)
+            except ValueError as e:
+                st.warning(f"⚠️ Cannot compare with the baseline: {e}")
+            else:
+                for warning in comparison['warnings']:
+                    st.caption(f"⚠️ Baseline {warning}")
+                if comparison['regressed']:
+                    st.error(f"❌ {len(comparison['regressions'])} regression(s) against baseline {baseline}")
+                else:
+                    st.success(f"✅ No regressions against baseline {baseline}")
+                st.dataframe(pd.DataFrame(comparison['checks']), use_container_width=True, hide_index=True)
+
+def build_generator() -> SQLDataGenerator:
+    """Generator configured from the page settings, with empty key registries and trackers seeded from the database."""
+    # Foreign keys are sampled from real rows; seed empty registries from the database
+    db_config = db_manager.config.get('database', {})
+    registries = get_key_registries((db_manager.db_type, db_manager.config.get('ssh', {}).get('host'),
+                                     db_config.get('host'), db_config.get('port'), db_config.get('database')))
+    for column, referenced_table in Config.get_table_references(selected_table).items():
+        registry = registries.get(referenced_table)
+        if registry is not None and len(registry) == 0:
+            registry.extend(db_manager.fetch_keys(referenced_table, limit=registry.capacity))
+            if len(registry) == 0:
+                st.warning(f"⚠️ No {referenced_table} found. Generate {referenced_table} first so "
+                           f"{selected_table}.{column} references existing rows.")
+    
+    generator = SQLDataGenerator(
+        pools=load_value_pools() if use_pools else None,
+        registries=registries,
+        trackers=st.session_state.key_trackers,
+        access_choosers=make_choosers(access_distributions),
+        read_ratio=read_ratio,
+        query_mix=query_mix,
+        unique_counter=get_unique_counter() if unique_values else None
+    )
+    
+    # UPDATE, DELETE and key lookups target live rows; seed an empty tracker from the database
+    tracker = generator.get_tracker(selected_table)
+    if operation != 'insert' and len(tracker) == 0:
+        tracker.extend(db_manager.fetch_keys(selected_table, limit=tracker.capacity))
+        if len(tracker) == 0:
+            st.warning(f"⚠️ No existing {selected_table} rows found; updates, deletes and lookups will not match any row.")
+    
+    return generator
+
+
+def make_rate_limiter(burst=None) -> RateLimiter:
+    """Rate limiter for the run: the selected load shape, or the constant Generation Speed."""
+    if load_shape:
+        spec = dict(load_shape)
+        return ShapedRateLimiter(make_load_shape(spec.pop('name'), **spec), burst=burst)
+    return RateLimiter(speed, burst=burst)
+
+
+def start_server_metrics(throughput=None) -> Optional[ServerMetricsCollector]:
+    """Start polling server statistics for the run when capture is enabled."""
+    st.session_state.pop('server_metrics', None)
+    if not capture_server_metrics:
+        return None
+    return ServerMetricsCollector(db_manager, throughput=throughput).start()
+
+
+def stop_server_metrics(collector: Optional[ServerMetricsCollector]) -> None:
+    """Stop a collector and keep its report for display."""
+    if collector is not None:
+        st.session_state.server_metrics = collector.stop()
+
+
+def export_gauges(**gauges) -> None:
+    """Expose this session's run gauges (evaluated on every scrape), replacing its previous ones."""
+    if exporter is not None:
+        exporter.clear_gauges(session=session_id)
+        for name, value in gauges.items():
+            exporter.gauge(name, value, labels={'session': session_id})
+
+
+def run_settings() -> dict:
+    """The page settings a run report records."""
+    return {
+        'operation': operation,
+        'table': selected_table,
+        'total_records': total_records,
+        'batch_size': batch_size,
+        'speed': speed,
+        'load_shape': load_shape,
+        'adaptive_batch': adaptive_batch,
+        'multi_row': multi_row,
+        'access_distributions': access_distributions,
+        'read_ratio': read_ratio,
+        'query_mix': query_mix,
+        'value_pools': use_pools,
+        'unique_values': unique_values,
+        'workload': workload_settings
+    }
+
+
+def finish_run_report(report: RunReport, **measurements) -> None:
+    """Complete a run's report with the client, server and storage measurements, and archive it when enabled."""
+    measurements.setdefault('server_metrics', st.session_state.get('server_metrics'))
+    measurements.setdefault('storage', st.session_state.get('storage_growth'))
+    report.finish(sampler=sampler, session=session_id, **measurements)
+    st.session_state.run_report = report
+    st.session_state.run_report_paths = None
+    if archive_reports:
+        try:
+            st.session_state.run_report_paths = report.save()
+        except OSError as e:
+            st.warning(f"⚠️ Could not archive the run report: {e}")
+
+
+def start_storage_growth(tables=None) -> Optional[StorageGrowth]:
+    """Snapshot table and log sizes before the run when measurement is enabled (tables default to the selected one)."""
+    st.session_state.pop('storage_growth', None)
+    if not measure_storage:
+        return None
+    return StorageGrowth(db_manager, [selected_table] if tables is None else tables).start()
+
+
+def stop_storage_growth(growth: Optional[StorageGrowth]) -> None:
+    """Snapshot sizes after the run and keep the growth report for display."""
+    if growth is not None:
+        st.session_state.storage_growth = growth.stop()
+
+
 # Generation Logic
 if start_btn:
     st.session_state.is_generating = True
 
-if st.session_state.is_generating:
+if st.session_state.is_generating and operation in WORKLOADS:
+    st.markdown("## Workload in Progress...")
+    status_text = st.empty()
+    
+    # Sessions contend for existing rows
+    if operation == 'transactions':
+        key_limit = Config.WORKLOADS['transactions']['key_sample']
+        workload = WORKLOADS[operation](db_manager, db_manager.fetch_keys('users', limit=key_limit),
+                                        db_manager.fetch_keys('products', limit=key_limit),
+                                        order_keys=db_manager.fetch_keys('orders', limit=key_limit),
+                                        **workload_settings)
+    else:
+        key_limit = workload_settings['hot_keys'] if operation == 'lock' else 2 * workload_settings['pairs']
+        keys = db_manager.fetch_keys(selected_table, limit=key_limit)
+        if operation in access_distributions:
+            workload_settings['distribution'] = access_distributions[operation]
+        workload = WORKLOADS[operation](db_manager, selected_table, keys, **workload_settings)
+    
+    def show_progress(report):
+        status_text.text(f"{report['duration']:.0f}s: {report['transactions']} transactions, "
+                         f"{report['goodput']:.1f} tx/s committed, lock wait mean {report['lock_wait']['mean_ms']:.1f} ms, "
+                         f"{report['errors']['deadlock']} deadlocks")
+    
+    run_report = RunReport(run_settings(), db_manager)
+    collector = start_server_metrics()
+    # Transactions write to several tables
+    growth = start_storage_growth(Config.get_all_tables() if operation == 'transactions' else None)
+    result = None
+    try:
+        st.session_state.workload_result = result = workload.run(progress=show_progress)
+    finally:
+        workload.stop()
+        stop_server_metrics(collector)
+        stop_storage_growth(growth)
+        finish_run_report(run_report, result=result)
+        st.session_state.is_generating = False
+    
+    st.rerun()
+
+elif st.session_state.is_generating and operation == 'ycsb':
+    st.markdown("## YCSB Workload in Progress...")
+    status_text = st.empty()
+    
+    # Requests go to existing rows; seed an empty tracker from the database
+    tracker = st.session_state.key_trackers.setdefault(selected_table, KeyTracker())
+    if len(tracker) == 0:
+        tracker.extend(db_manager.fetch_keys(selected_table, limit=tracker.capacity))
+    
+    workload = YCSBWorkload(db_manager, selected_table, operation_count=total_records, tracker=tracker,
+                            **workload_settings)
+    
+    def show_progress(report):
+        status_text.text(f"{report['operations']}/{total_records} operations, "
+                         f"{report['throughput']:.1f} ops/s, {report['errors']} errors")
+    
+    run_report = RunReport(run_settings(), db_manager)
+    collector = start_server_metrics()
+    growth = start_storage_growth()
+    result = None
+    try:
+        st.session_state.workload_result = result = workload.run(progress=show_progress)
+    finally:
+        stop_server_metrics(collector)
+        stop_storage_growth(growth)
+        finish_run_report(run_report, result=result)
+        st.session_state.is_generating = False
+    
+    st.rerun()
+
+elif st.session_state.is_generating and operation == 'users':
+    st.markdown("## Virtual Users Running...")
+    status_text = st.empty()
+    
+    workload = VirtualUserWorkload(db_manager, selected_table, generator=build_generator(),
+                                   rate_limiter=make_rate_limiter() if cap_rate or load_shape else None,
+                                   exporter=exporter, **workload_settings)
+    export_gauges(active_users=lambda: workload.timeline[-1]['users'] if workload.timeline else 0,
+                  target_rate=lambda: workload.rate_limiter.rate if workload.rate_limiter else None)
+    
+    def show_progress(report):
+        status_text.text(f"{report['duration']:.0f}s: {report['users']} users, {report['operations']} operations, "
+                         f"{report['throughput']:.1f} ops/s, {report['errors']} errors")
+    
+    run_report = RunReport(run_settings(), db_manager)
+    collector = start_server_metrics()
+    growth = start_storage_growth()
+    result = None
+    try:
+        st.session_state.workload_result = result = workload.run(progress=show_progress)
+    finally:
+        workload.stop()
+        stop_server_metrics(collector)
+        stop_storage_growth(growth)
+        finish_run_report(run_report, result=result)
+        export_gauges()
+        st.session_state.is_generating = False
+    
+    st.rerun()
+
+elif st.session_state.is_generating and operation == 'async':
+    st.markdown("## Async Workload in Progress...")
+    status_text = st.empty()
+    
+    workload = AsyncWorkload(db_manager, selected_table, operation_count=None if load_shape else total_records,
+                             generator=build_generator(),
+                             rate_limiter=make_rate_limiter() if cap_rate or load_shape else None,
+                             exporter=exporter, **workload_settings)
+    export_gauges(queue_depth=lambda: workload.waiting,
+                  target_rate=lambda: workload.rate_limiter.rate if workload.rate_limiter else None)
+    
+    def show_progress(report):
+        status_text.text(f"{report['operations']}/{total_records} operations, {report['throughput']:.1f} ops/s, "
+                         f"pool wait p95 {report['pool_wait']['p95_ms']:.1f} ms, {report['errors']} errors")
+    
+    run_report = RunReport(run_settings(), db_manager)
+    collector = start_server_metrics()
+    growth = start_storage_growth()
+    result = None
+    try:
+        st.session_state.workload_result = result = workload.run(progress=show_progress)
+    except ImportError as e:
+        st.session_state.workload_result = result = {'success': False, 'error': str(e)}
+    finally:
+        stop_server_metrics(collector)
+        stop_storage_growth(growth)
+        finish_run_report(run_report, result=result)
+        export_gauges()
+        st.session_state.is_generating = False
+    
+    st.rerun()
+
+elif st.session_state.is_generating and operation == 'sweep':
+    st.markdown("## Parameter Sweep in Progress...")
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def show_progress(done, total, trial):
+        if total:
+            progress_bar.progress(done / total)
+        status_text.text(f"Trial {done}{f'/{total}' if total else ''}: {trial['style']}, batch {trial['batch_size']}, "
+                         f"{trial['workers']} workers, commit every {trial['commit_interval']}: "
+                         f"{trial['throughput']:,.0f} rows/s, p99 {trial['p99_ms']:.1f} ms")
+    
+    run_report = RunReport(run_settings(), db_manager)
+    result = None
+    try:
+        workload = ParameterSweep(db_manager, selected_table, generator=build_generator(), **workload_settings)
+        st.session_state.workload_result = result = workload.run(progress=show_progress)
+    except ValueError as e:
+        st.session_state.workload_result = result = {'success': False, 'error': str(e)}
+    finally:
+        # Sweeps run without server metrics or storage measurement
+        finish_run_report(run_report, result=result, server_metrics=None, storage=None)
+        st.session_state.is_generating = False
+    
+    st.rerun()
+
+elif st.session_state.is_generating:
     st.markdown("## Generation in Progress...")
     
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    generator = SQLDataGenerator()
+    generator = build_generator()
+    
     remaining = total_records - st.session_state.total_generated
+    op_stats = st.session_state.op_stats
+    rate_limiter = make_rate_limiter(burst=batch_size)
+    load_windows = st.session_state.load_windows = WindowedStats()
+    histograms = st.session_state.histograms
+    resources_drawn = time.monotonic()
+    sizer = AdaptiveBatchSizer(**adaptive_batch) if adaptive_batch else None
+    st.session_state.batch_history = sizer.history if sizer else None
+    timeline = WindowedStats(window=Config.REPORTS['timeline_window'])
+    error_classes = {}
+    run_report = RunReport(run_settings(), db_manager)
+    collector = start_server_metrics(throughput=histograms.throughput)
+    # Statements generated for the current batch but not executed yet
+    queue = {'depth': 0}
+    export_gauges(target_rate=lambda: rate_limiter.rate, actual_rate=histograms.throughput,
+                  queue_depth=lambda: queue['depth'])
+    growth = start_storage_growth()
     
-    while remaining > 0 and st.session_state.is_generating:
-        current_batch = min(batch_size, remaining)
-        
-        try:
-            statements = generator.generate_batch(selected_table, current_batch, operation)
+    try:
+        # Operations are generated lazily, one batch at a time; the sizer picks each batch's size
+        chunk_size = (lambda: sizer.batch_size) if sizer else batch_size
+        for operations in generator.iter_operations(selected_table, remaining, operation, chunk_size=chunk_size,
+                                                    multi_row=multi_row):
+            if not st.session_state.is_generating or rate_limiter.finished:
+                break
             
-            for stmt in statements:
-                db_manager.execute_query(stmt)
+            batch_start = time.perf_counter()
+            batch_errors = 0
+            throttled = False
+            queue['depth'] = len(operations)
+            for op in operations:
+                result = db_manager.execute_query(op.sql)
+                queue['depth'] -= 1
+                if result.get('success'):
+                    rows = result.get('rows_returned', 0) if op.kind in READ_QUERIES else result.get('affected_rows', 0)
+                    op_stats.record(op.kind, rows, result.get('duration', 0.0))
+                    load_windows.record(result.get('duration', 0.0), target_rate=rate_limiter.rate)
+                    timeline.record(result.get('duration', 0.0), target_rate=rate_limiter.rate)
+                    histograms.record(op.table, op.kind, result.get('duration', 0.0), rows=len(operation_keys(op)))
+                    if exporter is not None:
+                        exporter.record(op.table, op.kind, result.get('duration', 0.0), rows)
+                else:
+                    op_stats.record_error(op.kind)
+                    load_windows.record(0.0, error=True)
+                    timeline.record(0.0, error=True)
+                    histograms.record_error(op.table, op.kind)
+                    error = error_class(result.get('error'))
+                    error_classes[error] = error_classes.get(error, 0) + 1
+                    if exporter is not None:
+                        exporter.record_error(op.table, op.kind, result.get('error'))
+                    batch_errors += 1
+                    throttled = throttled or is_throttling(result.get('error'))
+                    if op.kind == 'insert':
+                        for key in operation_keys(op):
+                            generator.discard_key(op.table, key)
             
+            current_batch = sum(len(operation_keys(op)) for op in operations)
+            if sizer is not None:
+                pause = sizer.observe(current_batch, time.perf_counter() - batch_start, batch_errors, throttled)
+                if pause:
+                    time.sleep(pause)
             st.session_state.total_generated += current_batch
             remaining -= current_batch
             
             progress = st.session_state.total_generated / total_records
             progress_bar.progress(progress)
-            status_text.text(f"Generated {st.session_state.total_generated}/{total_records} records...")
+            status_text.text(f"Generated {st.session_state.total_generated}/{total_records} records... "
+                             f"({describe_rows(op_stats)})")
+            speed_card.markdown(speed_card_html(histograms), unsafe_allow_html=True)
+            if time.monotonic() - resources_drawn >= sampler.interval:
+                render_client_resources(resources_chart, sampler)
+                resources_drawn = time.monotonic()
             
-            time.sleep(current_batch / speed)
-            
-            if remaining <= 0:
-                st.session_state.is_generating = False
-                st.success(f"✅ Successfully generated {total_records} records!")
-                st.balloons()
-                break
-                
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
+            rate_limiter.acquire(current_batch)
+        
+        if remaining <= 0 or rate_limiter.finished:
             st.session_state.is_generating = False
-            break
+            st.success(f"✅ Successfully generated {st.session_state.total_generated} records! "
+                       f"{describe_rows(op_stats).capitalize()}")
+            st.balloons()
+    
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        st.session_state.is_generating = False
+    finally:
+        stop_server_metrics(collector)
+        stop_storage_growth(growth)
+        export_gauges()
+        finish_run_report(run_report, op_stats=op_stats, timeline=timeline, histograms=histograms,
+                          error_classes=error_classes)
     
     st.rerun()
@@ -15,8 +15,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import test modules
 from tests.test_all_features import (
-    TestConfig, TestSQLDataGenerator, TestMultiCoreGenerator,
-    TestPerformanceMonitor, TestValidators, TestDatabaseManagers
+    TestConfig, TestSQLDataGenerator, TestSQLWriter, TestValuePools, TestUniqueValues,
+    TestKeyRegistry, TestKeyTracker, TestAccessDistributions, TestContentionWorkloads, TestYCSBWorkloads,
+    TestVirtualUsers, TestAsyncEngine, TestLoadShapes, TestParameterSweep, TestAdaptiveBatching,
+    TestLatencyHistograms, TestSystemSampler, TestServerMetrics, TestStorageGrowth, TestMetricsExporter,
+    TestRunReport, TestRunHistory, TestMultiCoreGenerator, TestPerformanceMonitor, TestValidators, TestDatabaseManagers
 )
 from tests.test_integration import (
     TestEndToEndWorkflow, TestDataIntegrity, 
@@ -54,6 +57,26 @@ def run_all_tests():
     unit_test_classes = [
         ("Configuration Tests", TestConfig),
         ("SQL Data Generator Tests", TestSQLDataGenerator),
+        ("SQL Writer Tests", TestSQLWriter),
+        ("Value Pool Tests", TestValuePools),
+        ("Unique Value Tests", TestUniqueValues),
+        ("Key Registry Tests", TestKeyRegistry),
+        ("Key Tracker Tests", TestKeyTracker),
+        ("Access Distribution Tests", TestAccessDistributions),
+        ("Contention Workload Tests", TestContentionWorkloads),
+        ("YCSB Workload Tests", TestYCSBWorkloads),
+        ("Virtual User Tests", TestVirtualUsers),
+        ("Async Engine Tests", TestAsyncEngine),
+        ("Load Shape Tests", TestLoadShapes),
+        ("Parameter Sweep Tests", TestParameterSweep),
+        ("Adaptive Batching Tests", TestAdaptiveBatching),
+        ("Latency Histogram Tests", TestLatencyHistograms),
+        ("System Sampler Tests", TestSystemSampler),
+        ("Server Metrics Tests", TestServerMetrics),
+        ("Storage Growth Tests", TestStorageGrowth),
+        ("Metrics Exporter Tests", TestMetricsExporter),
+        ("Run Report Tests", TestRunReport),
+        ("Run History Tests", TestRunHistory),
         ("Multi-Core Generator Tests", TestMultiCoreGenerator),
         ("Performance Monitor Tests", TestPerformanceMonitor),
         ("Validator Tests", TestValidators),
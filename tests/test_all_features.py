@@ -5,16 +5,44 @@ Tests all core functionality, database managers, generators, and validators
 """
 
 import unittest
+import math
 import sys
 import os
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+import time
+import random
+import threading
+import uuid
+import asyncio
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from datetime import datetime, timezone
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.config import Config
-from core.generator import SQLDataGenerator, MultiCoreGenerator, PerformanceMonitor
+from core.generator import SQLDataGenerator, MultiCoreGenerator, PerformanceMonitor, TABLE_COLUMNS, operation_keys
+from core.writer import SQLWriter
+from core.pools import ValuePool, ValuePools
+from core.unique import FeistelPermutation, UniqueCounter, UniqueValues
+from core.keys import KeyRegistry, KeyRegistrySet, KeyTracker
+from core.distributions import ZipfianChooser, HotspotChooser, LatestChooser, make_chooser, make_choosers
+from core.metrics import (LatencyHistogram, LatencyStats, OperationHistograms, OperationStats, WindowedStats,
+                          find_knee)
+from core.ycsb import YCSBWorkload
+from core.users import VirtualUser, VirtualUserWorkload, make_think_time
+from core.rate import RateLimiter
+from core.shapes import ShapedRateLimiter, make_load_shape
+from core.sweep import ParameterSweep, sweep_figure
+from core.adaptive import AdaptiveBatchSizer, is_throttling
+from core.sampler import SystemSampler, weak_gauge
+from core.server_metrics import ServerMetricsCollector
+from core.storage import StorageGrowth
+from core.exporter import MetricsExporter, error_class
+from core.report import RunReport, redact
+from core.history import RunHistory, compare_runs, mann_whitney
+from core.async_engine import AsyncWorkload, AsyncMongoDriver, AsyncPostgreSQLDriver, AsyncMySQLDriver, driver_for
+from core.workloads import (LockContentionWorkload, DeadlockWorkload, OrderTransactionWorkload, TransactionAborted,
+                            WorkloadSession, classify_error)
 from utils.validators import validate_connection, validate_schema, format_error, get_table_icon
 
 
@@ -76,6 +104,12 @@ class TestConfig(unittest.TestCase):
         self.assertIn("users", tables)
         self.assertIn("products", tables)
         self.assertIn("orders", tables)
+    
+    def test_load_order(self):
+        """Test referenced tables are loaded first"""
+        self.assertEqual(Config.get_table_references("orders"), {"user_id": "users", "product_id": "products"})
+        self.assertEqual(Config.get_load_order(["orders", "users", "products"]), ["users", "products", "orders"])
+        self.assertEqual(Config.get_referenced_tables(), ["users", "products"])
 
 
 class TestSQLDataGenerator(unittest.TestCase):
@@ -175,6 +209,7 @@ class TestSQLDataGenerator(unittest.TestCase):
         # Check calculations
         expected_subtotal = round(order["quantity"] * order["unit_price"], 2)
         self.assertAlmostEqual(order["subtotal"], expected_subtotal, places=2)
+        self.assertEqual(SQLDataGenerator.order_totals(2, 10.0), (20.0, 1.6, 21.6))
     
     def test_generate_insert_statement(self):
         """Test INSERT statement generation"""
@@ -223,6 +258,2139 @@ class TestSQLDataGenerator(unittest.TestCase):
         for operation in ["insert", "update", "delete"]:
             statements = self.generator.generate_batch("user", 5, operation)
             self.assertEqual(len(statements), 5)
+    
+    def test_generate_rows(self):
+        """Test tuple rows follow the per-table column order"""
+        rows = {
+            "users": self.generator.generate_user_row(),
+            "products": self.generator.generate_product_row(),
+            "orders": self.generator.generate_order_row()
+        }
+        
+        for table, row in rows.items():
+            self.assertIsInstance(row, tuple)
+            self.assertEqual(len(row), len(TABLE_COLUMNS[table]))
+            self.assertEqual(TABLE_COLUMNS[table][0], "id")
+    
+    def test_insert_row_matches_dict_statement(self):
+        """Test row-based INSERT matches the dict-based statement"""
+        row = self.generator.generate_product_row()
+        data = dict(zip(TABLE_COLUMNS["products"], row))
+        
+        self.assertEqual(
+            self.generator.generate_insert_row("products", row),
+            self.generator.generate_insert_statement("products", data)
+        )
+        self.assertEqual(
+            self.generator.generate_update_row("products", row),
+            self.generator.generate_update_statement("products", data)
+        )
+    
+    def test_iter_batch_statements(self):
+        """Test lazy iteration yields single statements"""
+        statements = list(self.generator.iter_batch("user", 7, "insert"))
+        
+        self.assertEqual(len(statements), 7)
+        self.assertTrue(all(stmt.startswith("INSERT INTO users") for stmt in statements))
+    
+    def test_iter_batch_chunks(self):
+        """Test lazy iteration yields chunks of chunk_size"""
+        chunks = list(self.generator.iter_batch("product", 25, "update", chunk_size=10))
+        
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertTrue(all(stmt.startswith("UPDATE products") for stmt in chunks[2]))
+    
+    def test_iter_batch_is_lazy(self):
+        """Test huge counts are not materialized up front"""
+        import itertools
+        
+        iterator = self.generator.iter_batch("order", 10 ** 12, "insert", chunk_size=100)
+        first_chunks = list(itertools.islice(iterator, 2))
+        
+        self.assertEqual(len(first_chunks), 2)
+        self.assertEqual(len(first_chunks[1]), 100)
+    
+    def test_write_file(self):
+        """Test streaming statements to a SQL file"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "users.sql")
+            count = self.generator.write_file(path, "user", 25, "insert", chunk_size=10)
+            
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        
+        self.assertEqual(count, 25)
+        self.assertEqual(len(lines), 25)
+        self.assertTrue(all(line.startswith("INSERT INTO users") for line in lines))
+    
+    def test_generate_batch_table_name(self):
+        """Test batch generation accepts table names as well as data types"""
+        statements = self.generator.generate_batch("orders", 3, "insert")
+        
+        self.assertEqual(len(statements), 3)
+        self.assertTrue(all(stmt.startswith("INSERT INTO orders") for stmt in statements))
+    
+    def test_read_queries_target_existing_keys(self):
+        """Test point lookups and joins use keys that were inserted"""
+        inserted = {op.key for chunk in self.generator.iter_operations("user", 20, "insert") for op in chunk}
+        
+        for query in ("point_lookup", "join"):
+            op = self.generator.generate_operation("users", self.generator.generate_user_row(), query)
+            self.assertEqual(op.kind, query)
+            self.assertIn(op.key, inserted)
+            self.assertIn(f"'{op.key}'", op.sql)
+    
+    def test_read_query_mix(self):
+        """Test the read operation draws query classes from the mix"""
+        generator = SQLDataGenerator(seed=42, query_mix={"range_scan": 1, "top_n": 1})
+        kinds = {op.kind for chunk in generator.iter_operations("order", 50, "read") for op in chunk}
+        self.assertEqual(kinds, {"range_scan", "top_n"})
+        
+        with self.assertRaises(ValueError):
+            SQLDataGenerator(query_mix={"full_scan": 1})
+    
+    def test_read_write_ratio(self):
+        """Test the mixed operation follows the read ratio"""
+        generator = SQLDataGenerator(seed=42, read_ratio=0.9)
+        kinds = [op.kind for chunk in generator.iter_operations("product", 2000, "mixed") for op in chunk]
+        reads = sum(1 for kind in kinds if kind not in ("insert", "update", "delete"))
+        self.assertAlmostEqual(reads / len(kinds), 0.9, delta=0.03)
+    
+    def test_resizable_multi_row_chunks(self):
+        """Test chunk sizes follow a callable and multi-row chunks track every key"""
+        sizes = iter([3, 5, 100])
+        chunks = list(self.generator.iter_operations("user", 10, "insert", chunk_size=lambda: next(sizes),
+                                                     multi_row=True))
+        
+        self.assertEqual([len(operation_keys(chunk[0])) for chunk in chunks], [3, 5, 2])
+        op = chunks[0][0]
+        self.assertEqual(len(chunks[0]), 1)
+        self.assertTrue(op.sql.startswith("INSERT INTO users"))
+        self.assertEqual(op.sql.count("), ("), 2)
+        self.assertEqual(len(self.generator.get_tracker("users")), 10)
+        
+        single = self.generator.generate_operation("users", self.generator.generate_user_row())
+        self.assertEqual(operation_keys(single), (single.key,))
+
+
+class TestSQLWriter(unittest.TestCase):
+    """Test Buffer-Based SQL Writer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = SQLDataGenerator(seed=42)
+        self.writer = SQLWriter()
+    
+    def test_statements_round_trip(self):
+        """Test statements are recovered from the buffer in order"""
+        rows = [self.generator.generate_user_row() for _ in range(3)]
+        for row in rows:
+            self.writer.write_insert("users", row)
+        self.writer.write_delete("users", rows[0][0])
+        
+        statements = self.writer.statements()
+        self.assertEqual(len(statements), 4)
+        self.assertEqual(statements[0], self.generator.generate_insert_row("users", rows[0]))
+        self.assertEqual(statements[3], f"DELETE FROM users WHERE id = '{rows[0][0]}';")
+        self.assertEqual(self.writer.getvalue(), "\n".join(statements) + "\n")
+    
+    def test_insert_prefix_cached(self):
+        """Test INSERT prefix is computed once per table"""
+        prefix = self.writer.insert_prefix("products")
+        self.assertTrue(prefix.startswith("INSERT INTO products (id, sku"))
+        self.assertIs(self.writer.insert_prefix("products"), prefix)
+    
+    def test_format_lock(self):
+        """Test SELECT ... FOR UPDATE locks rows in key order"""
+        stmt = self.writer.format_lock("users", ["b", "a"])
+        self.assertEqual(stmt, "SELECT id FROM users WHERE id IN ('b', 'a') ORDER BY id FOR UPDATE;")
+        self.assertEqual(self.writer.format_select("products", "p", columns=("price", "stock_quantity"), for_update=True),
+                         "SELECT price, stock_quantity FROM products WHERE id = 'p' FOR UPDATE;")
+    
+    def test_bulk_statement_formats(self):
+        """Test parameterized INSERT, COPY and multi-row DELETE statements"""
+        columns = len(TABLE_COLUMNS["users"])
+        template = self.writer.insert_template("users")
+        self.assertTrue(template.startswith(self.writer.insert_prefix("users")))
+        self.assertEqual(template.count("%s"), columns)
+        self.assertEqual(self.writer.format_copy("users"),
+                         f"COPY users ({', '.join(TABLE_COLUMNS['users'])}) FROM STDIN WITH (FORMAT csv)")
+        self.assertEqual(self.writer.format_delete_many("users", ["a", "b"]), "DELETE FROM users WHERE id IN ('a', 'b');")
+    
+    def test_format_set(self):
+        """Test partial UPDATE by primary key"""
+        stmt = self.writer.format_set("orders", "o", {"status": "Shipped", "tax": 1.5})
+        self.assertEqual(stmt, "UPDATE orders SET status = 'Shipped', tax = 1.5 WHERE id = 'o';")
+    
+    def test_format_reads(self):
+        """Test lookup, range scan, join and top-N query formats"""
+        self.assertEqual(self.writer.format_select("users", "k"), "SELECT * FROM users WHERE id = 'k';")
+        self.assertEqual(
+            self.writer.format_range_scan("orders", "created_at", "2024-01-01", "2024-01-02", 50),
+            "SELECT * FROM orders WHERE created_at BETWEEN '2024-01-01' AND '2024-01-02' ORDER BY created_at LIMIT 50;"
+        )
+        
+        join = self.writer.format_join("users", "k")
+        self.assertIn("FROM orders JOIN users ON orders.user_id = users.id", join)
+        self.assertIn("JOIN products ON orders.product_id = products.id", join)
+        self.assertTrue(join.endswith("WHERE orders.user_id = 'k';"))
+        self.assertTrue(self.writer.format_join("orders", "k").endswith("WHERE orders.id = 'k';"))
+        
+        top_n = self.writer.format_top_n("products", 5)
+        self.assertTrue(top_n.startswith("SELECT product_id, COUNT(*) AS record_count, SUM(total) AS total_amount"))
+        self.assertTrue(top_n.endswith("ORDER BY total_amount DESC LIMIT 5;"))
+    
+    def test_reset_reuses_buffer(self):
+        """Test reset clears statements and count"""
+        self.generator.write_batch(self.writer, "user", 5, "insert")
+        self.assertEqual(self.writer.count, 5)
+        
+        self.writer.reset()
+        self.assertEqual(self.writer.count, 0)
+        self.assertEqual(self.writer.statements(), [])
+        
+        self.generator.write_batch(self.writer, "order", 2, "update")
+        self.assertEqual(len(self.writer.statements()), 2)
+    
+    def test_external_stream(self):
+        """Test writing into a caller-provided stream"""
+        import io
+        stream = io.StringIO()
+        writer = SQLWriter(stream)
+        
+        self.generator.write_batch(writer, "product", 3, "insert")
+        
+        self.assertEqual(writer.count, 3)
+        self.assertEqual(len(stream.getvalue().splitlines()), 3)
+        with self.assertRaises(ValueError):
+            writer.getvalue()
+    
+    def test_multi_row_insert(self):
+        """Test multi-row INSERT formatting"""
+        rows = [self.generator.generate_order_row() for _ in range(3)]
+        stmt = self.writer.format_insert_many("orders", rows)
+        
+        self.assertTrue(stmt.startswith("INSERT INTO orders ("))
+        self.assertEqual(stmt.count("), ("), 2)
+        self.assertTrue(stmt.endswith(");"))
+
+
+class TestValuePools(unittest.TestCase):
+    """Test Memory-Mapped Value Pools"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sizes = {"first_names": 50, "last_names": 50, "cities": 50, "companies": 50, "email_domains": 20}
+    
+    def tearDown(self):
+        """Clean up temporary pool files"""
+        self.tmp_dir.cleanup()
+    
+    def test_pool_file_round_trip(self):
+        """Test values survive write and memory-mapped read"""
+        path = os.path.join(self.tmp_dir.name, "names.pool")
+        values = ["Zoë", "O'Brien", "", "Nguyễn"]
+        
+        self.assertEqual(ValuePool.write(path, values), 4)
+        
+        pool = ValuePool(path)
+        self.assertEqual(len(pool), 4)
+        self.assertEqual(list(pool), values)
+        self.assertEqual(pool[-1], "Nguyễn")
+        with self.assertRaises(IndexError):
+            pool[4]
+        pool.close()
+    
+    def test_build_uses_cache(self):
+        """Test pools are built from Faker once and then reused"""
+        pools = ValuePools.build(cache_dir=self.tmp_dir.name, sizes=self.sizes)
+        self.assertGreater(len(pools.first_names), 0)
+        self.assertLessEqual(len(pools.cities), 50)
+        pools.close()
+        
+        with patch("core.pools.build_pool_values") as build:
+            cached = ValuePools.build(cache_dir=self.tmp_dir.name, sizes=self.sizes)
+            build.assert_not_called()
+        self.assertEqual(cached.paths, pools.paths)
+        cached.close()
+    
+    def test_generator_draws_from_pools(self):
+        """Test generator rows use pool values"""
+        pools = ValuePools.build(cache_dir=self.tmp_dir.name, sizes=self.sizes)
+        generator = SQLDataGenerator(seed=42, pools=pools)
+        
+        user = generator.generate_user()
+        self.assertIn(user["first_name"], list(pools.first_names))
+        self.assertIn(user["city"], list(pools.cities))
+        self.assertIn(user["email"].split("@")[1], list(pools.email_domains))
+        pools.close()
+    
+    def test_parallel_generation_with_pools(self):
+        """Test workers reopen the shared pool files"""
+        pools = ValuePools.build(cache_dir=self.tmp_dir.name, sizes=self.sizes)
+        result = MultiCoreGenerator(num_cores=2, pools=pools).generate_parallel("user", 10, "insert")
+        
+        self.assertEqual(result["count"], 10)
+        pools.close()
+
+
+class TestUniqueValues(unittest.TestCase):
+    """Test Counter-Based Unique Values"""
+    
+    def test_permutation_is_bijective(self):
+        """Test the Feistel permutation covers its domain exactly once"""
+        for domain in [1, 2, 10, 999, 4096]:
+            permutation = FeistelPermutation(domain, key=7)
+            self.assertEqual(sorted(permutation(i) for i in range(domain)), list(range(domain)))
+    
+    def test_permutation_rejects_out_of_range(self):
+        """Test indexes outside the domain are rejected"""
+        permutation = FeistelPermutation(100)
+        with self.assertRaises(ValueError):
+            permutation(100)
+    
+    def test_formats(self):
+        """Test unique values keep the column formats"""
+        unique = UniqueValues()
+        self.assertRegex(unique.sku(0), r'^[A-Z]{3}-\d{6}$')
+        self.assertRegex(unique.order_number(0), r'^ORD-\d{10}$')
+        self.assertRegex(unique.username_suffix(0), r'^[0-9a-z]{7}$')
+        self.assertRegex(unique.sku(UniqueValues.SKU_DOMAIN - 1), r'^[A-Z]{3}-\d{6}$')
+    
+    def test_generated_columns_unique(self):
+        """Test usernames, emails and SKUs never collide"""
+        generator = SQLDataGenerator(seed=42, unique_start=0)
+        users = [generator.generate_user() for _ in range(5000)]
+        products = [generator.generate_product() for _ in range(5000)]
+        
+        self.assertEqual(len({user["username"] for user in users}), 5000)
+        self.assertEqual(len({user["email"] for user in users}), 5000)
+        self.assertEqual(len({product["sku"] for product in products}), 5000)
+    
+    def test_parallel_workers_disjoint(self):
+        """Test workers get disjoint counter ranges"""
+        generator = MultiCoreGenerator(num_cores=2, unique_start=0)
+        first = generator.generate_parallel("product", 100, "insert")
+        second = generator.generate_parallel("product", 100, "insert")
+        
+        skus = {stmt.split("VALUES (")[1].split(", ")[1] for stmt in first["statements"] + second["statements"]}
+        self.assertEqual(len(skus), 200)
+        self.assertEqual(generator.unique_start, 200)
+    
+    def test_persistent_counter_across_sessions(self):
+        """Test sessions and later runs sharing a counter file never reissue values"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "counter")
+            first = SQLDataGenerator(unique_counter=UniqueCounter(path, block=50))
+            second = SQLDataGenerator(unique_counter=UniqueCounter(path, block=50))
+            skus = [generator.generate_product()["sku"] for _ in range(120) for generator in (first, second)]
+            restarted = SQLDataGenerator(unique_counter=UniqueCounter(path, block=50))
+            skus += [restarted.generate_product()["sku"] for _ in range(10)]
+            
+            self.assertEqual(len(set(skus)), 250)
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(int(handle.read()), 350)
+
+
+class TestKeyRegistry(unittest.TestCase):
+    """Test Shared-Memory Key Registry"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = SQLDataGenerator(seed=42)
+        self.registry = KeyRegistry(capacity=100)
+    
+    def tearDown(self):
+        """Free shared memory"""
+        self.registry.close()
+    
+    def test_append_and_sample(self):
+        """Test keys round-trip through the compact store"""
+        keys = [self.generator.generate_uuid() for _ in range(10)]
+        self.registry.extend(keys)
+        
+        self.assertEqual(len(self.registry), 10)
+        self.assertEqual(self.registry.get(3), keys[3])
+        self.assertIn(self.registry.sample(), keys)
+        self.assertEqual(self.registry.sample(lambda n: n - 1), keys[-1])
+    
+    def test_empty_sample(self):
+        """Test sampling an empty registry"""
+        self.assertIsNone(self.registry.sample())
+    
+    def test_full_registry_stays_bounded(self):
+        """Test appends past capacity replace existing keys"""
+        keys = [self.generator.generate_uuid() for _ in range(250)]
+        self.registry.extend(keys)
+        
+        self.assertEqual(len(self.registry), 100)
+        self.assertTrue(all(self.registry.get(i) in keys for i in range(100)))
+    
+    def test_full_registry_is_uniform_sample(self):
+        """Test reservoir sampling keeps old and new keys equally likely"""
+        random.seed(42)
+        kept_early = 0
+        for _ in range(50):
+            self.registry.clear()
+            keys = [self.generator.generate_uuid() for _ in range(1000)]
+            self.registry.extend(keys)
+            early = set(keys[:500])
+            kept_early += sum(self.registry.get(i) in early for i in range(100))
+        
+        # Half the keys seen are early ones; random overwrites would keep almost none
+        self.assertAlmostEqual(kept_early / 5000, 0.5, delta=0.05)
+    
+    def test_discarded_keys_are_not_sampled(self):
+        """Test failed inserts and deletes leave the registry"""
+        registries = KeyRegistrySet.create(capacity=100)
+        generator = SQLDataGenerator(seed=42, registries=registries)
+        users = [generator.generate_operation("users", generator.generate_user_row(), "insert").key
+                 for _ in range(3)]
+        
+        generator.discard_key("users", users[0])
+        deleted = generator.generate_operation("users", generator.generate_user_row(), "delete").key
+        live = set(users) - {users[0], deleted}
+        
+        self.assertEqual({registries["users"].sample() for _ in range(50)}, live)
+        registries.compact()
+        self.assertEqual(len(registries["users"]), len(live))
+        registries.close()
+    
+    def test_attach_by_name(self):
+        """Test another handle sees the same keys"""
+        key = self.generator.generate_uuid()
+        self.registry.append(key)
+        
+        attached = KeyRegistry(100, name=self.registry.name)
+        self.assertEqual(len(attached), 1)
+        self.assertEqual(attached.get(0), key)
+        
+        # Read-only attachments ignore appends
+        attached.append(self.generator.generate_uuid())
+        self.assertEqual(len(self.registry), 1)
+        attached.close()
+    
+    def test_orders_reference_registered_keys(self):
+        """Test order foreign keys come from inserted users and products"""
+        registries = KeyRegistrySet.create(capacity=100)
+        generator = SQLDataGenerator(seed=42, registries=registries)
+        
+        generator.generate_batch("user", 5, "insert")
+        generator.generate_batch("product", 5, "insert")
+        users = {registries["users"].get(i) for i in range(5)}
+        products = {registries["products"].get(i) for i in range(5)}
+        
+        for _ in range(20):
+            order = dict(zip(TABLE_COLUMNS["orders"], generator.generate_order_row()))
+            self.assertIn(order["user_id"], users)
+            self.assertIn(order["product_id"], products)
+        registries.close()
+    
+    def test_parallel_dataset_integrity(self):
+        """Test multi-core dataset generation keeps references valid"""
+        registries = KeyRegistrySet.create(capacity=1000)
+        results = MultiCoreGenerator(num_cores=2, registries=registries).generate_dataset(
+            {"orders": 20, "users": 30, "products": 10}
+        )
+        
+        self.assertEqual(list(results.keys()), ["users", "products", "orders"])
+        self.assertEqual(len(registries["users"]), 30)
+        self.assertEqual(len(registries["products"]), 10)
+        
+        user_ids = {registries["users"].get(i) for i in range(30)}
+        for stmt in results["orders"]["statements"]:
+            user_id = stmt.split("VALUES (")[1].split(", ")[2].strip("'")
+            self.assertIn(user_id, user_ids)
+        registries.close()
+    
+    def test_parallel_insert_into_full_registry(self):
+        """Test parallel inserts past the capacity are reservoir sampled instead of dropped"""
+        registries = KeyRegistrySet.create(["users"], capacity=100)
+        users = registries["users"]
+        old_keys = [self.generator.generate_uuid() for _ in range(80)]
+        users.extend(old_keys)
+        generator = MultiCoreGenerator(num_cores=2, registries=registries)
+        
+        # The first 20 keys fill the free slots, the rest replace sampled ones
+        generator.generate_parallel("user", 50, "insert")
+        self.assertEqual((len(users), users.seen), (100, 130))
+        new_keys = {users.get(i) for i in range(100)} - set(old_keys)
+        self.assertGreater(len(new_keys), 20)
+        
+        # A full registry still takes new keys
+        generator.generate_parallel("user", 300, "insert")
+        self.assertEqual((len(users), users.seen), (100, 430))
+        self.assertGreater(len({users.get(i) for i in range(100)} - set(old_keys) - new_keys), 50)
+        registries.close()
+
+
+class TestKeyTracker(unittest.TestCase):
+    """Test Live Key Tracker"""
+    
+    def test_add_choose_pop(self):
+        """Test tracking, picking and removing keys"""
+        tracker = KeyTracker(capacity=10)
+        keys = [str(uuid.uuid4()) for _ in range(5)]
+        tracker.extend(keys)
+        
+        self.assertEqual(len(tracker), 5)
+        self.assertIn(tracker.choose(), keys)
+        
+        popped = {tracker.pop() for _ in range(5)}
+        self.assertEqual(popped, set(keys))
+        self.assertEqual(len(tracker), 0)
+        self.assertIsNone(tracker.pop())
+        self.assertIsNone(tracker.choose())
+    
+    def test_discard(self):
+        """Test discarding a specific key"""
+        tracker = KeyTracker(capacity=10)
+        keys = [str(uuid.uuid4()) for _ in range(3)]
+        tracker.extend(keys)
+        
+        self.assertTrue(tracker.discard(keys[0]))
+        self.assertFalse(tracker.discard(keys[0]))
+        self.assertEqual({tracker.pop(), tracker.pop()}, set(keys[1:]))
+    
+    def test_capacity_bound(self):
+        """Test reservoir sampling keeps the tracker bounded"""
+        tracker = KeyTracker(capacity=50)
+        tracker.extend(str(uuid.uuid4()) for _ in range(500))
+        
+        self.assertEqual(len(tracker), 50)
+        self.assertEqual(tracker.seen, 500)
+    
+    def test_insertion_order(self):
+        """Test the newest key stays last through deletes, discards and reservoir sampling"""
+        tracker = KeyTracker(capacity=50)
+        keys = [str(uuid.uuid4()) for _ in range(40)]
+        tracker.extend(keys)
+        oldest, newest = (lambda n: 0), (lambda n: n - 1)
+        
+        tracker.discard(keys[-1])
+        self.assertEqual(tracker.pop(oldest), keys[0])
+        self.assertEqual(tracker.choose(newest), keys[-2])
+        
+        # Enough removals to squeeze out the holes
+        for _ in range(25):
+            tracker.pop(oldest)
+        self.assertEqual(len(tracker), 13)
+        self.assertEqual(tracker.choose(newest), keys[-2])
+        
+        # Past capacity, the kept keys are still in insertion order
+        keys += [str(uuid.uuid4()) for _ in range(200)]
+        tracker.extend(keys[40:])
+        self.assertEqual(len(tracker), 50)
+        drained = [tracker.pop(newest) for _ in range(50)]
+        self.assertEqual(drained, sorted(drained, key=keys.index, reverse=True))
+    
+    def test_operations_target_live_keys(self):
+        """Test UPDATE and DELETE target inserted keys and deletes are not repeated"""
+        generator = SQLDataGenerator(seed=42)
+        inserted = {op.key for chunk in generator.iter_operations("user", 10, "insert") for op in chunk}
+        
+        updates = [op for chunk in generator.iter_operations("user", 5, "update") for op in chunk]
+        for op in updates:
+            self.assertEqual(op.kind, "update")
+            self.assertIn(op.key, inserted)
+            self.assertTrue(op.sql.endswith(f"WHERE id = '{op.key}';"))
+        
+        deletes = [op.key for chunk in generator.iter_operations("user", 10, "delete") for op in chunk]
+        self.assertEqual(set(deletes), inserted)
+        self.assertEqual(len(generator.get_tracker("users")), 0)
+    
+    def test_discard_failed_insert(self):
+        """Test a failed insert's key is no longer targeted"""
+        generator = SQLDataGenerator(seed=42)
+        op = generator.generate_operation("users", generator.generate_user_row(), "insert")
+        generator.discard_key(op.table, op.key)
+        
+        self.assertEqual(len(generator.get_tracker("users")), 0)
+
+
+class TestAccessDistributions(unittest.TestCase):
+    """Test Key Access Distributions"""
+    
+    def test_choosers_in_range(self):
+        """Test every distribution picks valid indices"""
+        for name in ("uniform", "zipfian", "hotspot", "latest"):
+            chooser = make_chooser(name)
+            for n in (1, 2, 3, 100):
+                for _ in range(200):
+                    self.assertTrue(0 <= chooser(n) < n)
+    
+    def test_zipfian_skew(self):
+        """Test Zipfian concentrates picks on low indices"""
+        chooser = ZipfianChooser(theta=0.99)
+        picks = [chooser(1000) for _ in range(20000)]
+        
+        self.assertGreater(picks.count(0), picks.count(1))
+        self.assertGreater(sum(1 for p in picks if p < 200) / len(picks), 0.6)
+    
+    def test_zipfian_resize(self):
+        """Test incremental zeta matches a fresh computation after shrinking"""
+        chooser = ZipfianChooser(theta=0.5)
+        chooser(1000)
+        chooser(10)
+        expected = sum(1.0 / i ** 0.5 for i in range(1, 11))
+        self.assertAlmostEqual(chooser._zetan, expected, places=9)
+    
+    def test_hotspot(self):
+        """Test hotspot sends the configured share of picks to hot keys"""
+        chooser = HotspotChooser(hot_data_fraction=0.1, hot_op_fraction=0.9)
+        picks = [chooser(1000) for _ in range(20000)]
+        hot_share = sum(1 for p in picks if p < 100) / len(picks)
+        self.assertAlmostEqual(hot_share, 0.9, delta=0.02)
+    
+    def test_latest(self):
+        """Test latest-biased picks favour the newest keys"""
+        chooser = LatestChooser()
+        picks = [chooser(1000) for _ in range(20000)]
+        self.assertGreater(picks.count(999), picks.count(998))
+        self.assertGreater(sum(1 for p in picks if p >= 800) / len(picks), 0.6)
+    
+    def test_invalid_parameters(self):
+        """Test invalid distributions are rejected"""
+        with self.assertRaises(ValueError):
+            make_chooser("pareto")
+        with self.assertRaises(ValueError):
+            ZipfianChooser(theta=1.0)
+        with self.assertRaises(ValueError):
+            HotspotChooser(hot_data_fraction=0)
+    
+    def test_generator_uses_choosers(self):
+        """Test updates follow the configured access distribution"""
+        generator = SQLDataGenerator(seed=42, access_choosers=make_choosers({"update": {"name": "zipfian"}}))
+        list(generator.iter_operations("user", 100, "insert"))
+        hottest = generator.get_tracker("users")._get(0)
+        
+        updated = [op.key for chunk in generator.iter_operations("user", 500, "update") for op in chunk]
+        self.assertGreater(updated.count(hottest), 25)
+
+
+def offline_mysql_manager():
+    """MySQL manager that is never connected; tests patch its clone()"""
+    from core.database import MySQLManager
+    
+    return MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+
+
+def clone_factory(clones, configure=None):
+    """Side effect for a patched clone(): each call returns a new mock manager, configured and kept in clones"""
+    def clone():
+        session = MagicMock()
+        if configure is not None:
+            configure(session)
+        clones.append(session)
+        return session
+    return clone
+
+
+class TestContentionWorkloads(unittest.TestCase):
+    """Test Multi-Session Contention Workloads"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.manager = offline_mysql_manager()
+        self.keys = [str(uuid.uuid4()) for _ in range(5)]
+        self.sessions = []
+    
+    def fake_clone(self, fail_first=None, rows=None):
+        """Clone returning a mock manager with a mock connection"""
+        def configure(session):
+            session.sample_locks.return_value = [
+                {"lock_type": "RECORD", "lock_mode": "X", "status": "GRANTED", "count": 2},
+                {"lock_type": "RECORD", "lock_mode": "X", "status": "WAITING", "count": 1}
+            ]
+            cursor = session.connection.cursor.return_value
+            if fail_first is not None:
+                cursor.execute.side_effect = [fail_first] + [None] * 100000
+            if rows is not None:
+                cursor.fetchall.return_value = rows
+        return clone_factory(self.sessions, configure)
+    
+    def test_classify_error(self):
+        """Test driver errors are classified by MySQL errno and PostgreSQL SQLSTATE"""
+        pg_error = Exception("deadlock detected")
+        pg_error.pgcode = "40P01"
+        
+        self.assertEqual(classify_error(Exception(1213, "Deadlock found")), "deadlock")
+        self.assertEqual(classify_error(Exception(1205, "Lock wait timeout exceeded")), "lock_timeout")
+        self.assertEqual(classify_error(pg_error), "deadlock")
+        self.assertIsNone(classify_error(Exception("syntax error")))
+    
+    def test_running_totals(self):
+        """Test running totals track recorded operations without merging samples"""
+        stats = OperationStats()
+        stats.record("insert", 1, 0.002)
+        stats.record("insert", 1, 0.004)
+        stats.record_error("update")
+        self.assertEqual(stats.totals(), (2, 1))
+        
+        merged = OperationStats()
+        merged.merge(stats)
+        self.assertAlmostEqual(merged.kinds["insert"]["latency"].total, 0.006)
+        self.assertAlmostEqual(merged.summary()["insert"]["mean_ms"], 3)
+    
+    def test_pick_keys_small_hot_set(self):
+        """Test picking more keys than a hot set holds ends, with distinct keys"""
+        session = WorkloadSession(0, MagicMock(), "users",
+                                  {"name": "hotspot", "hot_data_fraction": 0.1, "hot_op_fraction": 1.0})
+        keys = list(range(10))
+        
+        picked = session.pick_keys(keys, 2)
+        self.assertEqual(len(set(picked)), 2)
+        self.assertIn(0, picked)
+        self.assertEqual(sorted(session.pick_keys(keys, 100)), keys)
+    
+    def test_latency_stats(self):
+        """Test latency percentiles"""
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record(ms / 1000)
+        
+        summary = stats.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 50)
+        self.assertAlmostEqual(summary["p99_ms"], 99)
+        self.assertAlmostEqual(summary["max_ms"], 100)
+        self.assertEqual(LatencyStats().summary()["count"], 0)
+    
+    def test_operation_stats(self):
+        """Test per-operation counts, rows and latency"""
+        stats = OperationStats()
+        stats.record("point_lookup", 1, 0.002)
+        stats.record("point_lookup", 1, 0.004)
+        stats.record("range_scan", 40, 0.010)
+        stats.record_error("range_scan")
+        
+        summary = stats.summary()
+        self.assertEqual(summary["point_lookup"]["count"], 2)
+        self.assertAlmostEqual(summary["point_lookup"]["mean_ms"], 3)
+        self.assertEqual(summary["range_scan"]["rows_per_op"], 40)
+        self.assertEqual(summary["range_scan"]["errors"], 1)
+        self.assertEqual(stats.rows("insert"), 0)
+    
+    def test_lock_workload(self):
+        """Test lock workload runs sessions on their own connections"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone()):
+            workload = LockContentionWorkload(self.manager, "users", self.keys, sessions=3, hold_time=0,
+                                              duration=0.3, sample_interval=0.05)
+            result = workload.run()
+        
+        self.assertTrue(result["success"])
+        self.assertGreater(result["transactions"], 0)
+        self.assertEqual(result["lock_wait"]["count"], result["transactions"])
+        self.assertGreater(len(result["lock_samples"]), 0)
+        self.assertEqual(result["lock_samples"][0]["waiting"], 1)
+        
+        # Three sessions plus the lock sampler, each with its own connection
+        self.assertEqual(len(self.sessions), 4)
+        statements = [c.args[0] for c in self.sessions[0].connection.cursor.return_value.execute.call_args_list]
+        self.assertIn("FOR UPDATE", statements[0])
+        self.assertTrue(statements[1].startswith("UPDATE users SET"))
+    
+    def test_lock_timeout_counted(self):
+        """Test lock wait timeouts are counted and the session carries on"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone(Exception(1205, "Lock wait timeout"))):
+            workload = LockContentionWorkload(self.manager, "users", self.keys, sessions=1, hold_time=0,
+                                              duration=0.2, sample_interval=None)
+            result = workload.run()
+        
+        self.assertEqual(result["errors"]["lock_timeout"], 1)
+        self.assertGreater(result["transactions"], 0)
+    
+    def test_deadlock_lock_order(self):
+        """Test paired sessions lock the same rows in opposite orders"""
+        workload = DeadlockWorkload(self.manager, "users", self.keys[:4], pairs=2)
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone()):
+            sessions = [WorkloadSession(i, self.manager, "users") for i in range(4)]
+        
+        orders = [workload.lock_order(session) for session in sessions]
+        self.assertEqual(orders[0], tuple(self.keys[:2]))
+        self.assertEqual(orders[1], tuple(reversed(self.keys[:2])))
+        self.assertEqual(set(orders[2]), set(self.keys[2:4]))
+    
+    def test_deadlock_retried(self):
+        """Test deadlocked transactions are retried and reported"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone(Exception(1213, "Deadlock found"))):
+            workload = DeadlockWorkload(self.manager, "users", self.keys, pairs=1, hold_time=0, duration=0.2,
+                                        max_retries=3, backoff=0.001, sample_interval=None)
+            result = workload.run()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["errors"]["deadlock"], 2)
+        self.assertEqual(result["retries"], 2)
+        self.assertEqual(result["retry_latency"]["count"], 2)
+        self.assertEqual(result["failed"], 0)
+        self.assertGreater(result["deadlock_rate"], 0)
+        self.assertEqual(result["attempts"], result["transactions"] + 2)
+        self.assertLessEqual(result["goodput"], result["throughput"])
+    
+    def test_deadlock_gives_up(self):
+        """Test transactions count as failed once retries run out"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone(Exception("40P01"))):
+            workload = DeadlockWorkload(self.manager, "users", self.keys, pairs=1, hold_time=0, duration=0.1,
+                                        max_retries=0, sample_interval=None)
+            with patch("core.workloads.classify_error", side_effect=lambda e: "deadlock" if e.args == ("40P01",) else None):
+                result = workload.run()
+        
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual(result["retries"], 0)
+    
+    def test_requires_sql_database(self):
+        """Test workloads reject MongoDB and empty key sets"""
+        from core.database import MongoDBManager
+        
+        mongo = MongoDBManager({"db_type": "mongodb", "database": {}, "ssh": {"enabled": False}})
+        self.assertFalse(LockContentionWorkload(mongo, "users", self.keys).run()["success"])
+        self.assertFalse(LockContentionWorkload(self.manager, "users", []).run()["success"])
+        self.assertFalse(DeadlockWorkload(self.manager, "users", self.keys[:1]).run()["success"])
+        self.assertFalse(OrderTransactionWorkload(self.manager, self.keys, []).run()["success"])
+    
+    def test_new_order_transaction(self):
+        """Test new order locks products, applies the restock rule and inserts order lines"""
+        workload = OrderTransactionWorkload(self.manager, self.keys[:1], self.keys[1:2], max_lines=1)
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone()):
+            session = WorkloadSession(0, self.manager, "orders")
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[(self.keys[0],)], [(19.99, 5)]]
+        
+        session.kind = "new_order"
+        workload.transaction(session, cursor)
+        
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertEqual(statements[1], f"SELECT price, stock_quantity FROM products WHERE id = '{self.keys[1]}' FOR UPDATE;")
+        stock = int(statements[2].split("stock_quantity = ")[1].split(",")[0])
+        self.assertGreaterEqual(stock, 5 - 10 + 91)
+        self.assertTrue(statements[3].startswith("INSERT INTO orders"))
+        self.assertIn("'Pending'", statements[3])
+        self.assertEqual(len(session.new_orders), 1)
+        
+        workload.on_commit(session)
+        self.assertEqual(workload.order_keys, session.new_orders)
+    
+    def test_payment_transaction(self):
+        """Test payment advances the order status and aborts on a missing order"""
+        workload = OrderTransactionWorkload(self.manager, self.keys[:1], self.keys[1:2], order_keys=self.keys[2:3])
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone()):
+            session = WorkloadSession(0, self.manager, "orders")
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(self.keys[0], "Pending")]
+        
+        session.kind = "payment"
+        workload.transaction(session, cursor)
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertIn("FOR UPDATE", statements[0])
+        self.assertIn("status = 'Processing'", statements[1])
+        self.assertTrue(statements[2].startswith("UPDATE users SET updated_at = "))
+        
+        cursor.fetchall.return_value = []
+        with self.assertRaises(TransactionAborted):
+            workload.transaction(session, cursor)
+    
+    def test_order_transactions_report(self):
+        """Test transactions per minute are reported overall and per transaction type"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone(rows=[(10.0, 500)])):
+            workload = OrderTransactionWorkload(self.manager, self.keys[:2], self.keys[2:], sessions=2,
+                                                duration=0.3, sample_interval=None)
+            result = workload.run()
+        
+        self.assertTrue(result["success"])
+        self.assertGreater(result["tpm"], 0)
+        self.assertEqual(result["abort_rate"], 0)
+        self.assertIn("new_order", result["transactions_by_kind"])
+        self.assertEqual(sum(entry["count"] for entry in result["transactions_by_kind"].values()),
+                         result["transactions"])
+        self.assertEqual(len(workload.order_keys), sum(
+            call.args[0].startswith("INSERT INTO orders")
+            for session in self.sessions for call in session.connection.cursor.return_value.execute.call_args_list
+        ))
+    
+    def test_aborted_transactions_counted(self):
+        """Test aborted transactions roll back, are counted and the session carries on"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone(rows=[])):
+            workload = OrderTransactionWorkload(self.manager, self.keys[:2], self.keys[2:], sessions=1,
+                                                duration=0.2, sample_interval=None)
+            result = workload.run()
+        
+        self.assertEqual(result["transactions"], 0)
+        self.assertGreater(result["errors"]["aborted"], 1)
+        self.assertEqual(result["abort_rate"], 1.0)
+        self.assertEqual(result["transactions_by_kind"]["new_order"]["errors"], result["attempts"])
+
+
+class TestYCSBWorkloads(unittest.TestCase):
+    """Test YCSB Core Workload Presets"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        from core.database import MySQLManager
+        
+        self.manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        self.manager.execute_query = MagicMock(return_value={
+            "success": True, "affected_rows": 1, "rows_returned": 1, "duration": 0.001, "error": None
+        })
+        self.tracker = KeyTracker(capacity=100)
+        self.tracker.extend(str(uuid.uuid4()) for _ in range(20))
+    
+    def executed(self):
+        """SQL statements sent to the manager"""
+        return [c.args[0] for c in self.manager.execute_query.call_args_list]
+    
+    def test_presets(self):
+        """Test every preset's proportions add up to one"""
+        self.assertEqual(sorted(Config.YCSB["workloads"]), ["A", "B", "C", "D", "E", "F"])
+        for preset in Config.YCSB["workloads"].values():
+            self.assertAlmostEqual(sum(preset["proportions"].values()), 1.0)
+        
+        with self.assertRaises(ValueError):
+            YCSBWorkload(self.manager, "users", "G", 10)
+    
+    def test_workload_a_sql(self):
+        """Test workload A issues key lookups and updates and reports per operation"""
+        result = YCSBWorkload(self.manager, "users", "A", 200, tracker=self.tracker).run()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["operations"], 200)
+        self.assertEqual(set(result["operations_by_kind"]), {"read", "update"})
+        self.assertTrue(all(sql.startswith(("SELECT * FROM users WHERE id =", "UPDATE users SET"))
+                            for sql in self.executed()))
+    
+    def test_workload_e_scans_and_inserts(self):
+        """Test workload E scans key ranges and tracks inserted keys"""
+        result = YCSBWorkload(self.manager, "users", "E", 300, tracker=self.tracker, max_scan_length=5).run()
+        
+        scans = [sql for sql in self.executed() if sql.startswith("SELECT")]
+        self.assertTrue(all("WHERE id >= " in sql and "ORDER BY id LIMIT" in sql for sql in scans))
+        self.assertEqual(len(self.tracker), 20 + result["operations_by_kind"]["insert"]["count"])
+    
+    def test_workload_f_mongodb(self):
+        """Test read-modify-write runs as MongoDB document operations"""
+        from core.database import MongoDBManager
+        
+        manager = MongoDBManager({"db_type": "mongodb", "database": {"database": "testdb"}, "ssh": {"enabled": False}})
+        manager.connection = MagicMock()
+        collection = manager.connection["testdb"]["users"]
+        collection.update_one.return_value.modified_count = 1
+        
+        result = YCSBWorkload(manager, "users", "F", 100, tracker=self.tracker).run()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["database"], "mongodb")
+        rmw = result["operations_by_kind"]["read_modify_write"]["count"]
+        self.assertEqual(collection.find_one.call_count, 100)
+        self.assertEqual(collection.update_one.call_count, rmw)
+    
+    def test_requires_loaded_table(self):
+        """Test a workload on an empty table asks for a load first"""
+        result = YCSBWorkload(self.manager, "users", "C", 10, tracker=KeyTracker(capacity=10)).run()
+        self.assertFalse(result["success"])
+
+
+class TestVirtualUsers(unittest.TestCase):
+    """Test Virtual User Workloads"""
+    
+    def setUp(self):
+        """Set up test fixtures; clones answer every query with self.result"""
+        self.manager = offline_mysql_manager()
+        self.clones = []
+        self.result = {"success": True, "affected_rows": 1, "rows_returned": 1, "duration": 0.001, "error": None}
+        self.fake_clone = clone_factory(
+            self.clones, lambda clone: clone.configure_mock(**{"execute_query.return_value": self.result}))
+    
+    def test_think_times(self):
+        """Test think time distributions and their defaults"""
+        self.assertEqual(make_think_time("constant", seconds=0.25)(), 0.25)
+        self.assertTrue(all(0.1 <= make_think_time("uniform", low=0.1, high=0.2)() <= 0.2 for _ in range(100)))
+        self.assertTrue(all(make_think_time("normal", mean=0.0, stddev=1.0)() >= 0 for _ in range(100)))
+        
+        exponential = make_think_time("exponential")
+        mean = sum(exponential() for _ in range(20000)) / 20000
+        self.assertAlmostEqual(mean, Config.THINK_TIMES["exponential"]["mean"], delta=0.05)
+        
+        with self.assertRaises(ValueError):
+            make_think_time("pareto")
+    
+    def test_ramp_schedule(self):
+        """Test the user count ramps up, holds and ramps down"""
+        workload = VirtualUserWorkload(self.manager, "users", users=10, duration=20, ramp_up=10, ramp_down=5)
+        
+        self.assertEqual(workload.target_users(0), 0)
+        self.assertEqual(workload.target_users(5), 5)
+        self.assertEqual(workload.target_users(12), 10)
+        self.assertEqual(workload.target_users(17.5), 5)
+        self.assertEqual(workload.target_users(20), 0)
+    
+    def test_users_run_on_own_connections(self):
+        """Test each virtual user connects, runs its script and disconnects"""
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone):
+            workload = VirtualUserWorkload(self.manager, "users", users=3, duration=0.3, ramp_up=0, ramp_down=0,
+                                           script={"insert": 1, "point_lookup": 1},
+                                           think_time={"name": "constant", "seconds": 0.01}, sample_interval=0.05)
+            ticks = []
+            result = workload.run(progress=ticks.append)
+        
+        self.assertTrue(result["success"])
+        self.assertTrue(ticks)
+        self.assertNotIn("operations_by_kind", ticks[-1])
+        self.assertLessEqual(ticks[-1]["operations"], result["operations"])
+        self.assertEqual(result["users"], 3)
+        self.assertEqual(result["peak_users"], 3)
+        self.assertEqual(result["connections_opened"], 3)
+        self.assertGreater(result["operations"], 0)
+        self.assertLessEqual(set(result["operations_by_kind"]), {"insert", "point_lookup"})
+        self.assertAlmostEqual(result["think_time"]["mean_ms"], 10)
+        for clone in self.clones:
+            clone.connect.assert_called_once()
+            clone.disconnect.assert_called_once()
+            self.assertGreater(clone.execute_query.call_count, 0)
+    
+    def test_scale_down_stops_newest_users(self):
+        """Test shrinking the user count stops the most recently started users"""
+        workload = VirtualUserWorkload(self.manager, "users", think_time={"name": "constant", "seconds": 0.01})
+        users = []
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone):
+            workload._scale(users, 3)
+            workload._scale(users, 1)
+            workload._scale(users, 2)
+        workload.stop()
+        for user in users:
+            user.thread.join()
+        
+        self.assertEqual(len(users), 4)
+        self.assertEqual([user.stop.is_set() for user in users], [False, True, True, False])
+    
+    def test_failed_insert_untracked(self):
+        """Test failed INSERTs are counted and their keys untracked"""
+        self.result = {"success": False, "affected_rows": 0, "duration": 0.001, "error": "Duplicate entry"}
+        generator = SQLDataGenerator()
+        with patch.object(self.manager, "clone", side_effect=self.fake_clone):
+            workload = VirtualUserWorkload(self.manager, "users", users=2, duration=0.2, ramp_up=0, ramp_down=0,
+                                           script={"insert": 1}, think_time={"name": "constant", "seconds": 0},
+                                           generator=generator, sample_interval=0.05)
+            result = workload.run()
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Duplicate entry")
+        self.assertEqual(result["errors"], result["operations_by_kind"]["insert"]["errors"])
+        self.assertEqual(len(generator.get_tracker("users")), 0)
+    
+    def test_requires_sql_database(self):
+        """Test virtual users reject MongoDB and empty scripts"""
+        from core.database import MongoDBManager
+        
+        mongo = MongoDBManager({"db_type": "mongodb", "database": {}, "ssh": {"enabled": False}})
+        self.assertFalse(VirtualUserWorkload(mongo, "users").run()["success"])
+        with self.assertRaises(ValueError):
+            VirtualUserWorkload(self.manager, "users", script={"insert": 0})
+
+
+class FakeAsyncDriver:
+    """Async driver double that tracks statements in flight"""
+    
+    def __init__(self, fail=False, connect_error=None):
+        self.fail = fail
+        self.connect_error = connect_error
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = 0
+    
+    async def connect(self):
+        if self.connect_error:
+            raise self.connect_error
+        return object()
+    
+    async def execute(self, connection, op, row):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if self.fail:
+            raise RuntimeError("Duplicate entry")
+        return 1
+    
+    async def close(self, connection):
+        self.closed += 1
+
+
+class TestAsyncEngine(unittest.TestCase):
+    """Test Rate Limiter and Async Engine"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        from core.database import MySQLManager
+        
+        self.manager = MySQLManager({"db_type": "mysql", "database": {"host": "db", "port": 3306}, "ssh": {"enabled": False}})
+    
+    def test_rate_limiter(self):
+        """Test the token bucket allows a burst, then spaces operations at the rate"""
+        limiter = RateLimiter(100, burst=5)
+        self.assertEqual([limiter.reserve() for _ in range(5)], [0.0] * 5)
+        self.assertAlmostEqual(limiter.reserve(), 0.01, delta=0.002)
+        self.assertAlmostEqual(limiter.reserve(10), 0.11, delta=0.002)
+        
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+    
+    def test_rate_limiter_async(self):
+        """Test tasks sharing a limiter are held to its rate"""
+        limiter = RateLimiter(200, burst=1)
+        
+        async def run():
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(21)))
+        
+        start = time.perf_counter()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+    
+    def test_async_workload(self):
+        """Test clients share the connection pool and every operation runs once"""
+        driver = FakeAsyncDriver()
+        workload = AsyncWorkload(self.manager, "users", operation_count=500, concurrency=50, connections=10,
+                                 driver=driver)
+        result = workload.run()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["operations"], 500)
+        self.assertEqual(result["connections"], 10)
+        self.assertEqual(driver.max_in_flight, 10)
+        self.assertEqual(driver.closed, 10)
+        self.assertEqual(result["pool_wait"]["count"], 500)
+        self.assertEqual(len(workload.generator.get_tracker("users")), 500)
+    
+    def test_async_failed_inserts_untracked(self):
+        """Test failed INSERTs are counted and their keys untracked"""
+        workload = AsyncWorkload(self.manager, "users", operation_count=20, concurrency=5, connections=5,
+                                 driver=FakeAsyncDriver(fail=True))
+        result = workload.run()
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["errors"], 20)
+        self.assertEqual(result["error"], "Duplicate entry")
+        self.assertEqual(len(workload.generator.get_tracker("users")), 0)
+    
+    def test_async_connect_failure(self):
+        """Test the run fails cleanly when no connection opens"""
+        result = AsyncWorkload(self.manager, "users", concurrency=2,
+                               driver=FakeAsyncDriver(connect_error=OSError("refused"))).run()
+        self.assertFalse(result["success"])
+        self.assertIn("refused", result["error"])
+    
+    def test_drivers(self):
+        """Test driver selection, optional imports and row counts"""
+        from core.database import MongoDBManager
+        
+        mongo = MongoDBManager({"db_type": "mongodb", "database": {"database": "testdb"}, "ssh": {"enabled": False}})
+        self.assertIsInstance(driver_for(self.manager), AsyncMySQLDriver)
+        self.assertIsInstance(driver_for(mongo), AsyncMongoDriver)
+        
+        with patch.dict(sys.modules, {"aiomysql": None}):
+            with self.assertRaises(ImportError):
+                asyncio.run(AsyncMySQLDriver(self.manager).connect())
+        
+        generator = SQLDataGenerator()
+        row = generator.generate_user_row()
+        op = generator.generate_operation("users", row, "update")
+        
+        connection = MagicMock()
+        connection.execute = AsyncMock(return_value="UPDATE 3")
+        self.assertEqual(asyncio.run(AsyncPostgreSQLDriver(self.manager).execute(connection, op, row)), 3)
+        
+        client = MagicMock()
+        collection = client["testdb"]["users"]
+        collection.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+        self.assertEqual(asyncio.run(AsyncMongoDriver(mongo).execute(client, op, row)), 1)
+        self.assertEqual(collection.update_one.call_args.args[0], {"id": op.key})
+
+
+class TestLoadShapes(unittest.TestCase):
+    """Test Load Shapes and Windowed Metrics"""
+    
+    def test_shapes(self):
+        """Test each profile's target rate over time"""
+        ramp = make_load_shape("ramp", start_rate=10, end_rate=110, duration=100)
+        self.assertEqual([ramp.rate(t) for t in (0, 50, 100, 200)], [10, 60, 110, 110])
+        
+        step = make_load_shape("step", start_rate=100, step_rate=50, step_duration=10, steps=3)
+        self.assertEqual(step.duration, 30)
+        self.assertEqual([step.rate(t) for t in (0, 9.9, 10, 25, 40)], [100, 100, 150, 200, 200])
+        
+        sine = make_load_shape("sine", base_rate=100, amplitude=50, period=40)
+        self.assertEqual(sine.duration, 40)
+        self.assertAlmostEqual(sine.rate(10), 150)
+        self.assertAlmostEqual(sine.rate(30), 50)
+        
+        spike = make_load_shape("spike", base_rate=10, spike_rate=500, interval=60, spike_duration=5)
+        self.assertEqual([spike.rate(t) for t in (0, 54, 56, 61)], [10, 10, 500, 10])
+        
+        soak = make_load_shape("soak")
+        self.assertEqual(soak.rate(1000), Config.LOAD_SHAPES["soak"]["rate"])
+        self.assertEqual(soak.duration, Config.LOAD_SHAPES["soak"]["duration"])
+        
+        with self.assertRaises(ValueError):
+            make_load_shape("sawtooth")
+    
+    def test_shaped_rate_limiter(self):
+        """Test the limiter follows the shape and finishes with it"""
+        limiter = ShapedRateLimiter(make_load_shape("step", start_rate=100, step_rate=900, step_duration=0.05, steps=2))
+        self.assertEqual(limiter.rate, 100)
+        self.assertFalse(limiter.finished)
+        
+        time.sleep(0.06)
+        limiter.reserve()
+        self.assertEqual(limiter.rate, 1000)
+        time.sleep(0.05)
+        self.assertTrue(limiter.finished)
+        self.assertFalse(RateLimiter(10).finished)
+    
+    def test_windowed_stats_and_knee(self):
+        """Test per-window throughput and latency, and knee detection"""
+        windows = WindowedStats(window=1, started=0)
+        for second, latency in enumerate([0.010, 0.012, 0.011, 0.050]):
+            for _ in range(10):
+                windows.record(latency, target_rate=100 * (second + 1), now=second + 0.5)
+        windows.record(0.0, error=True, now=3.5)
+        
+        result = windows.windows()
+        self.assertEqual([w["start"] for w in result], [0, 1, 2, 3])
+        self.assertEqual(result[0]["throughput"], 10)
+        self.assertEqual(result[3]["errors"], 1)
+        self.assertAlmostEqual(result[1]["p95_ms"], 12)
+        
+        knee = find_knee(result, factor=3)
+        self.assertEqual(knee["start"], 3)
+        self.assertEqual(knee["target_rate"], 400)
+        self.assertIsNone(find_knee(result[:3], factor=3))
+    
+    def test_async_run_follows_shape(self):
+        """Test an open-ended async run ends with its load shape"""
+        from core.database import MySQLManager
+        
+        manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        limiter = ShapedRateLimiter(make_load_shape("soak", rate=500, duration=0.2))
+        result = AsyncWorkload(manager, "users", operation_count=None, concurrency=10, connections=2,
+                               rate_limiter=limiter, driver=FakeAsyncDriver()).run()
+        
+        self.assertTrue(result["success"])
+        self.assertGreater(result["operations"], 0)
+        self.assertLessEqual(result["operations"], 0.2 * 500 + 5)
+        self.assertTrue(all(w["target_rate"] == 500 for w in result["windows"]))
+        
+        open_ended = AsyncWorkload(manager, "users", operation_count=None, driver=FakeAsyncDriver()).run()
+        self.assertFalse(open_ended["success"])
+
+
+class TestParameterSweep(unittest.TestCase):
+    """Test Parameter Sweep"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        from core.database import PostgreSQLManager
+        
+        self.mysql = offline_mysql_manager()
+        self.postgres = PostgreSQLManager({"db_type": "postgresql", "database": {}, "ssh": {"enabled": False}})
+        self.clones = []
+        self.fake_clone = clone_factory(self.clones)
+    
+    def run_trial(self, manager, **params):
+        """Run one trial of 100 rows on mock connections"""
+        params = {"style": "multi_row", "batch_size": 10, "workers": 2, "commit_interval": 20, **params}
+        with patch.object(manager, "clone", side_effect=self.fake_clone), \
+                patch.object(manager, "execute_query") as execute_query:
+            result = ParameterSweep(manager, "users", trial_rows=100).run_trial(params)
+        return result, execute_query
+    
+    def test_combinations(self):
+        """Test the grid covers every combination and COPY is PostgreSQL-only"""
+        mysql = ParameterSweep(self.mysql, "users", batch_sizes=[10, 100], workers=[1, 2, 4], commit_intervals=[100])
+        self.assertNotIn("copy", mysql.values["style"])
+        self.assertEqual(len(mysql.combinations()), 3 * 2 * 3 * 1)
+        
+        postgres = ParameterSweep(self.postgres, "users", styles=["copy"])
+        self.assertEqual(postgres.values["style"], ["copy"])
+        
+        with self.assertRaises(ValueError):
+            ParameterSweep(self.mysql, "users", strategy="random")
+        with self.assertRaises(ValueError):
+            ParameterSweep(self.mysql, "users", styles=["copy"])
+    
+    def test_trial_statement_styles(self):
+        """Test each style sends its statements and commits every commit_interval rows"""
+        result, execute_query = self.run_trial(self.mysql)
+        self.assertEqual(result["rows"], 100)
+        self.assertEqual(result["errors"], 0)
+        self.assertGreater(result["throughput"], 0)
+        self.assertEqual(len(self.clones), 2)
+        for clone in self.clones:
+            clone.connect.assert_called_once()
+            clone.disconnect.assert_called_once()
+            cursor = clone.connection.cursor.return_value
+            self.assertEqual(cursor.execute.call_count, 5)
+            self.assertTrue(cursor.execute.call_args[0][0].startswith("INSERT INTO users"))
+            # 50 rows per worker: commits after 20, 40 and the last 10
+            self.assertEqual(clone.connection.commit.call_count, 3)
+        # Trial rows are cleaned up in one DELETE
+        execute_query.assert_called_once()
+        self.assertTrue(execute_query.call_args[0][0].startswith("DELETE FROM users WHERE id IN ("))
+        
+        self.clones.clear()
+        self.run_trial(self.mysql, style="single", workers=1)
+        self.assertEqual(self.clones[0].connection.cursor.return_value.execute.call_count, 100)
+        
+        self.clones.clear()
+        self.run_trial(self.mysql, style="executemany", workers=1)
+        cursor = self.clones[0].connection.cursor.return_value
+        self.assertEqual(cursor.executemany.call_count, 10)
+        self.assertEqual(len(cursor.executemany.call_args[0][1]), 10)
+        
+        self.clones.clear()
+        self.run_trial(self.postgres, style="copy", workers=1)
+        cursor = self.clones[0].connection.cursor.return_value
+        self.assertEqual(cursor.copy_expert.call_count, 10)
+        self.assertTrue(cursor.copy_expert.call_args[0][0].startswith("COPY users"))
+    
+    def test_failed_trial_is_not_best(self):
+        """Test a worker error rolls back, is reported and disqualifies the trial"""
+        def failing_clone():
+            clone = self.fake_clone()
+            clone.connection.cursor.return_value.execute.side_effect = Exception("Duplicate entry")
+            return clone
+        
+        with patch.object(self.mysql, "clone", side_effect=failing_clone), patch.object(self.mysql, "execute_query"):
+            sweep = ParameterSweep(self.mysql, "users", trial_rows=50)
+            result = sweep.run_trial({"style": "single", "batch_size": 10, "workers": 1, "commit_interval": 10})
+        
+        self.assertEqual(result["errors"], 1)
+        self.assertEqual(result["rows"], 0)
+        self.assertEqual(result["error"], "Duplicate entry")
+        self.clones[0].connection.rollback.assert_called_once()
+        self.assertIsNone(sweep.score(result))
+    
+    def fake_trial(self, params):
+        """Synthetic trial: throughput peaks at batch 100, 4 workers; p99 grows with batch size"""
+        throughput = 1000 - abs(params["batch_size"] - 100) - 50 * abs(params["workers"] - 4)
+        throughput += {"multi_row": 200, "executemany": 100, "single": 0}[params["style"]]
+        return {**params, "rows": 100, "errors": 0, "duration": 1.0, "throughput": throughput,
+                "p50_ms": params["batch_size"] / 20, "p99_ms": params["batch_size"] / 10, "error": None}
+    
+    def test_grid_and_adaptive_search(self):
+        """Test both strategies find the best configuration and adaptive runs fewer trials"""
+        values = {"batch_sizes": [1, 10, 100, 1000], "workers": [1, 2, 4, 8], "commit_intervals": [100, 1000]}
+        progress = []
+        
+        grid = ParameterSweep(self.mysql, "users", strategy="grid", **values)
+        with patch.object(grid, "run_trial", side_effect=self.fake_trial):
+            grid_report = grid.run(progress=lambda done, total, trial: progress.append((done, total)))
+        self.assertEqual(len(grid_report["trials"]), 3 * 4 * 4 * 2)
+        self.assertEqual(progress[-1], (96, 96))
+        best = grid_report["best"]
+        self.assertEqual((best["style"], best["batch_size"], best["workers"]), ("multi_row", 100, 4))
+        
+        adaptive = ParameterSweep(self.mysql, "users", strategy="adaptive", **values)
+        with patch.object(adaptive, "run_trial", side_effect=self.fake_trial):
+            adaptive_report = adaptive.run()
+        self.assertLess(len(adaptive_report["trials"]), len(grid_report["trials"]))
+        self.assertEqual(adaptive_report["best"]["throughput"], best["throughput"])
+        
+        limited = ParameterSweep(self.mysql, "users", max_p99_ms=5, **values)
+        with patch.object(limited, "run_trial", side_effect=self.fake_trial):
+            self.assertEqual(limited.run()["best"]["batch_size"], 10)
+        
+        figure = sweep_figure(grid_report["trials"], best)
+        self.assertEqual(len(figure.data), 4)
+
+
+class TestAdaptiveBatching(unittest.TestCase):
+    """Test Adaptive Batch Sizing"""
+    
+    def test_additive_increase_multiplicative_decrease(self):
+        """Test fast batches grow additively and slow or failed batches halve"""
+        sizer = AdaptiveBatchSizer(initial=100, target_latency=0.1, increase=10, decrease=0.5)
+        
+        self.assertEqual(sizer.observe(100, 0.05), 0.0)
+        self.assertEqual(sizer.batch_size, 110)
+        sizer.observe(110, 0.2)
+        self.assertEqual(sizer.batch_size, 55)
+        sizer.observe(55, 0.01, errors=1)
+        self.assertEqual(sizer.batch_size, 27)
+        
+        summary = sizer.summary()
+        self.assertEqual((summary["increases"], summary["decreases"], summary["backoffs"]), (1, 2, 0))
+        self.assertEqual((summary["min_used"], summary["max_used"]), (55, 110))
+        self.assertEqual(AdaptiveBatchSizer().batch_size, Config.PERFORMANCE["batch_size"])
+    
+    def test_bounds(self):
+        """Test the batch size stays within its bounds"""
+        sizer = AdaptiveBatchSizer(initial=5, min_size=2, max_size=20, increase=100)
+        sizer.observe(5, 0.0)
+        self.assertEqual(sizer.batch_size, 20)
+        for _ in range(10):
+            sizer.observe(20, 60.0)
+        self.assertEqual(sizer.batch_size, 2)
+        
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSizer(min_size=10, max_size=5)
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSizer(decrease=1.5)
+    
+    def test_converges_to_latency_target(self):
+        """Test the size settles around the largest batch meeting the target"""
+        sizer = AdaptiveBatchSizer(initial=10, target_latency=0.5, increase=20, max_size=10000)
+        # Server cost: 5 ms fixed plus 1 ms per row, so 495 rows meet the 500 ms target
+        for _ in range(500):
+            size = sizer.batch_size
+            sizer.observe(size, 0.005 + size * 0.001)
+        
+        recent = [entry["rows"] for entry in sizer.history[-100:]]
+        self.assertLessEqual(max(recent), 515)
+        self.assertGreater(sum(recent) / len(recent), 300)
+    
+    def test_throttling_backoff(self):
+        """Test throttling shrinks the batch and pauses for exponentially longer"""
+        sizer = AdaptiveBatchSizer(initial=100, backoff=0.5, max_backoff=1.5)
+        pauses = [sizer.observe(100, 0.01, errors=1, throttled=True) for _ in range(4)]
+        
+        self.assertEqual(pauses, [0.5, 1.0, 1.5, 1.5])
+        self.assertEqual(sizer.batch_size, 6)
+        self.assertEqual(sizer.observe(6, 0.01), 0.0)
+        self.assertEqual(sizer.observe(16, 0.01, errors=1, throttled=True), 0.5)
+    
+    def test_is_throttling(self):
+        """Test overload errors are recognized from exceptions and messages"""
+        self.assertTrue(is_throttling(Exception(1040, "Too many connections")))
+        self.assertTrue(is_throttling("(1203, \"User app already has more than 'max_user_connections'\")"))
+        
+        pg_error = Exception("FATAL: sorry, too many clients already")
+        pg_error.pgcode = "53300"
+        self.assertTrue(is_throttling(pg_error))
+        self.assertTrue(is_throttling("FATAL:  sorry, too many clients already"))
+        
+        self.assertFalse(is_throttling(Exception(1062, "Duplicate entry")))
+        self.assertFalse(is_throttling("(1213, 'Deadlock found when trying to get lock')"))
+        self.assertFalse(is_throttling(None))
+
+
+class TestLatencyHistograms(unittest.TestCase):
+    """Test HDR-Style Latency Histograms"""
+    
+    def test_percentiles_within_precision(self):
+        """Test percentiles match exact ones to two significant digits"""
+        import random
+        
+        rng = random.Random(7)
+        samples = sorted(rng.lognormvariate(-5, 1) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+        
+        for percent in (50, 90, 99, 99.9):
+            exact = samples[math.ceil(percent / 100 * len(samples)) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent), exact, delta=exact * 0.01 + 1e-6)
+        
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 20000)
+        self.assertAlmostEqual(summary["max_ms"], samples[-1] * 1000, delta=0.001)
+        self.assertAlmostEqual(summary["mean_ms"], sum(samples) / len(samples) * 1000, delta=0.01)
+        self.assertEqual(LatencyHistogram().summary()["p999_ms"], 0.0)
+        
+        # Exact and histogram summaries report the same percentile set
+        exact = LatencyStats()
+        for sample in samples:
+            exact.record(sample)
+        self.assertEqual(list(summary), list(exact.summary()))
+        self.assertEqual(list(LatencyHistogram().summary()), list(LatencyStats().summary()))
+        self.assertIn("p95_ms", summary)
+    
+    def test_latency_stats_stay_bounded(self):
+        """Test latency stats fold samples into a histogram instead of growing, and still merge"""
+        import random
+        
+        rng = random.Random(3)
+        samples = [rng.lognormvariate(-5, 1) for _ in range(50000)]
+        stats, small = LatencyStats(), LatencyStats()
+        for sample in samples:
+            stats.record(sample)
+        small.record(0.002)
+        
+        self.assertEqual(len(stats.samples), 0)
+        self.assertEqual(len(stats), 50000)
+        ordered = sorted(samples)
+        exact = ordered[math.ceil(0.99 * len(ordered)) - 1]
+        self.assertAlmostEqual(stats.summary()["p99_ms"], exact * 1000, delta=exact * 10 + 0.001)
+        self.assertAlmostEqual(stats.summary()["mean_ms"], sum(samples) / len(samples) * 1000, delta=1e-6)
+        
+        # Exact and folded instances merge either way round
+        small.merge(stats)
+        stats.merge(small)
+        self.assertEqual(len(small), 50001)
+        self.assertEqual(len(stats), 100001)
+        
+        # Per-window stats use a smaller histogram
+        windows = WindowedStats(window=1.0, started=0.0)
+        for sample in samples:
+            windows.record(sample, now=0.5)
+        self.assertEqual(windows.windows()[0]["operations"], 50000)
+        self.assertLess(len(windows._windows[0]["latency"].histogram.counts), len(stats.histogram.counts))
+    
+    def test_fixed_size(self):
+        """Test memory does not grow with samples and out-of-range values are clamped"""
+        histogram = LatencyHistogram(highest=60)
+        size = len(histogram.counts)
+        for _ in range(100000):
+            histogram.record(0.003)
+        histogram.record(3600)
+        
+        self.assertEqual(len(histogram.counts), size)
+        self.assertLess(size * histogram.counts.itemsize, 32 * 1024)
+        self.assertEqual(histogram.summary()["max_ms"], 60000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.003, delta=0.00003)
+    
+    def test_merge_and_reset(self):
+        """Test merged histograms add counts and reset empties one"""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.001, count=3)
+        second.record(0.1)
+        first.merge(second)
+        
+        self.assertEqual(len(first), 4)
+        self.assertAlmostEqual(first.percentile(75), 0.001, delta=0.00001)
+        self.assertAlmostEqual(first.percentile(100), 0.1, delta=0.001)
+        
+        with self.assertRaises(ValueError):
+            first.merge(LatencyHistogram(highest=1))
+        
+        first.reset()
+        self.assertEqual(len(first), 0)
+        self.assertEqual(first.percentile(50), 0.0)
+    
+    def test_sliding_window(self):
+        """Test per table x operation summaries and throughput over the sliding window"""
+        histograms = OperationHistograms(window=10, slots=5)
+        start = histograms.started
+        for second in range(20):
+            for _ in range(10):
+                histograms.record("users", "insert", 0.001 if second < 15 else 0.05, now=start + second + 0.5)
+        histograms.record("orders", "insert", 0.002, rows=100, now=start + 19.5)
+        histograms.record_error("users", "insert")
+        
+        now = start + 19.9
+        self.assertAlmostEqual(histograms.throughput(now), (100 + 100) / 10)
+        
+        summary = {(entry["table"], entry["operation"]): entry for entry in histograms.summary(now)}
+        users = summary[("users", "insert")]
+        self.assertEqual((users["count"], users["errors"], users["rows"]), (200, 1, 200))
+        self.assertAlmostEqual(users["p50_ms"], 1.0, delta=0.01)
+        self.assertAlmostEqual(users["window_p99_ms"], 50.0, delta=0.5)
+        self.assertEqual(summary[("orders", "insert")]["rows"], 100)
+        
+        # The window empties once it has moved past the last records
+        self.assertEqual(histograms.throughput(start + 40), 0.0)
+        self.assertEqual(histograms.overall(start + 40)["window_p99_ms"], 0.0)
+
+
+class TestSystemSampler(unittest.TestCase):
+    """Test Background System Sampler"""
+    
+    def test_sample_fields(self):
+        """Test a sample covers CPU, memory, network, process usage and gauges"""
+        sampler = SystemSampler()
+        sampler.track("rows_per_sec", lambda: 42.0)
+        sampler.track("broken", lambda: 1 / 0)
+        sample = sampler.sample()
+        
+        self.assertGreaterEqual(sample["cpu_percent"], 0.0)
+        self.assertLessEqual(sample["cpu_percent"], 100.0)
+        self.assertEqual(len(sample["cpu_per_core"]), PerformanceMonitor.get_system_info()["cpu_count"])
+        self.assertGreater(sample["process_rss_mb"], 0)
+        self.assertGreaterEqual(sample["net_recv_kbps"], 0.0)
+        self.assertEqual(sample["rows_per_sec"], 42.0)
+        self.assertIsNone(sample["broken"])
+        self.assertIs(sampler.latest(), sample)
+        
+        sampler.untrack("broken")
+        self.assertNotIn("broken", sampler.sample())
+    
+    def test_session_gauges(self):
+        """Test sessions sharing the sampler only see their own gauges"""
+        sampler = SystemSampler()
+        first, second = OperationHistograms(), OperationHistograms()
+        first.record("users", "insert", 1.0, rows=10)
+        sampler.track("rows_per_sec", weak_gauge(first.throughput), session="a")
+        sampler.track("rows_per_sec", weak_gauge(second.throughput), session="b")
+        sampler.sample()
+        
+        self.assertGreater(sampler.latest("a")["rows_per_sec"], 0.0)
+        self.assertEqual(sampler.history(session="b")[0]["rows_per_sec"], 0.0)
+        self.assertNotIn("rows_per_sec", sampler.latest())
+        self.assertNotIn("sessions", sampler.latest("a"))
+        
+        # A session that is gone no longer keeps its gauge alive
+        del second
+        sampler.sample()
+        self.assertNotIn("rows_per_sec", sampler.latest("b"))
+        self.assertIn("rows_per_sec", sampler.latest("a"))
+    
+    def test_background_ring_buffer(self):
+        """Test the thread fills a bounded ring buffer and readers never block"""
+        sampler = SystemSampler(interval=0.02, capacity=5)
+        self.assertIsNone(sampler.latest())
+        sampler.start()
+        try:
+            time.sleep(0.3)
+            start = time.perf_counter()
+            latest = sampler.latest()
+            history = sampler.history()
+            self.assertLess(time.perf_counter() - start, 0.01)
+        finally:
+            sampler.stop()
+        
+        self.assertFalse(sampler.running)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[-1], latest)
+        self.assertEqual([s["elapsed"] for s in history], sorted(s["elapsed"] for s in history))
+    
+    def test_history_window(self):
+        """Test history returns only the most recent seconds"""
+        sampler = SystemSampler(capacity=100)
+        for elapsed in range(10):
+            sampler.samples.append({"elapsed": float(elapsed)})
+        
+        self.assertEqual([s["elapsed"] for s in sampler.history(seconds=3)], [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(len(sampler.history()), 10)
+
+
+class TestServerMetrics(unittest.TestCase):
+    """Test Server Metrics Collector"""
+    
+    def setUp(self):
+        """Set up a manager whose clone reports growing server counters"""
+        from core.database import MySQLManager
+        
+        self.manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        self.polls = 0
+        self.statements = [
+            [{"statement": "SELECT report ...", "calls": 50, "total_ms": 90000.0, "rows": 50},
+             {"statement": "INSERT INTO users ...", "calls": 10, "total_ms": 5.0, "rows": 10},
+             {"statement": "SELECT 1", "calls": 3, "total_ms": 1.0, "rows": 3}],
+            [{"statement": "SELECT report ...", "calls": 50, "total_ms": 90000.0, "rows": 50},
+             {"statement": "INSERT INTO users ...", "calls": 110, "total_ms": 55.0, "rows": 110},
+             {"statement": "SELECT 1", "calls": 3, "total_ms": 1.0, "rows": 3},
+             {"statement": "UPDATE users ...", "calls": 5, "total_ms": 20.0, "rows": 4}]
+        ]
+        self.clone = MagicMock()
+        self.clone.sample_server_stats.side_effect = self._stats
+        self.clone.top_statements.side_effect = lambda limit: self.statements.pop(0)
+    
+    def _stats(self):
+        """Each poll: 10 more commits, 100 cache requests of which 5 miss, 3 connections"""
+        self.polls += 1
+        return {"commits": 10.0 * self.polls, "cache_requests": 100.0 * self.polls, "disk_reads": 5.0 * self.polls,
+                "connections": 3.0}
+    
+    def test_rates_and_gauges(self):
+        """Test counters become per-second rates, gauges pass through and the hit ratio is derived"""
+        rates = ServerMetricsCollector._rates(
+            (0.0, {"commits": 100.0, "cache_requests": 1000.0, "disk_reads": 10.0, "connections": 4.0}),
+            (2.0, {"commits": 140.0, "cache_requests": 1400.0, "disk_reads": 30.0, "connections": 6.0})
+        )
+        self.assertAlmostEqual(rates["commits_per_sec"], 20.0)
+        self.assertEqual(rates["connections"], 6.0)
+        self.assertAlmostEqual(rates["cache_hit_ratio"], 0.95)
+        
+        # A counter reset counts as no activity, and no cache requests leave the ratio unknown
+        rates = ServerMetricsCollector._rates((0.0, {"commits": 100.0}), (1.0, {"commits": 5.0}))
+        self.assertEqual(rates["commits_per_sec"], 0.0)
+        self.assertIsNone(rates["cache_hit_ratio"])
+    
+    def test_collects_on_separate_connection(self):
+        """Test the collector polls a clone in the background and reports rates, deltas and statements"""
+        with patch.object(self.manager, "clone", return_value=self.clone):
+            collector = ServerMetricsCollector(self.manager, interval=0.02, throughput=lambda: 250.0, top_statements=2)
+            collector.start()
+            time.sleep(0.15)
+            report = collector.stop()
+        
+        self.assertTrue(report["success"])
+        self.clone.connect.assert_called_once()
+        self.clone.disconnect.assert_called_once()
+        self.assertGreaterEqual(len(report["samples"]), 2)
+        sample = report["samples"][0]
+        self.assertGreater(sample["commits_per_sec"], 0)
+        self.assertAlmostEqual(sample["cache_hit_ratio"], 0.95)
+        self.assertEqual(sample["connections"], 3.0)
+        self.assertEqual(sample["client_throughput"], 250.0)
+        self.assertEqual(report["deltas"]["commits"], 10.0 * (self.polls - 1))
+        self.assertNotIn("connections", report["deltas"])
+        
+        # Every digest is compared; only statements that ran during the collection, most time first, trimmed
+        self.clone.top_statements.assert_called_with(limit=None)
+        self.assertEqual([entry["statement"] for entry in report["top_statements"]],
+                         ["INSERT INTO users ...", "UPDATE users ..."])
+        self.assertEqual(report["top_statements"][0]["calls"], 100)
+        self.assertAlmostEqual(report["top_statements"][0]["mean_ms"], 0.5)
+    
+    def test_connection_failure(self):
+        """Test a collector that cannot connect reports the error instead of raising"""
+        self.clone.connect.side_effect = Exception("Access denied")
+        with patch.object(self.manager, "clone", return_value=self.clone):
+            report = ServerMetricsCollector(self.manager, interval=0.01).start().stop()
+        
+        self.assertFalse(report["success"])
+        self.assertEqual(report["error"], "Access denied")
+        self.assertEqual(report["samples"], [])
+    
+    def test_mysql_status_mapping(self):
+        """Test SHOW GLOBAL STATUS variables map onto the common counter names"""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("Com_commit", "42"), ("Innodb_buffer_pool_reads", "7"),
+                                        ("Threads_connected", "5"), ("Uptime", "100")]
+        self.manager.connection = MagicMock()
+        self.manager.connection.cursor.return_value = cursor
+        
+        self.assertEqual(self.manager.sample_server_stats(), {"commits": 42.0, "disk_reads": 7.0, "connections": 5.0})
+        self.assertIn("SHOW GLOBAL STATUS", cursor.execute.call_args[0][0])
+        self.manager.connection.commit.assert_called_once()
+        
+        cursor.execute.side_effect = Exception("denied")
+        self.assertEqual(self.manager.top_statements(), [])
+        self.manager.connection.rollback.assert_called_once()
+
+
+class TestStorageGrowth(unittest.TestCase):
+    """Test Storage Growth Report"""
+    
+    def test_compare(self):
+        """Test per-table bytes per row, index overhead and log bytes per row"""
+        before = {"tables": {"users": {"rows": 100.0, "data_bytes": 16384.0, "index_bytes": 16384.0},
+                             "products": {"rows": 50.0, "data_bytes": 8192.0, "index_bytes": 8192.0}},
+                  "logs": {"wal": 1000.0}}
+        after = {"tables": {"users": {"rows": 1100.0, "data_bytes": 216384.0, "index_bytes": 66384.0},
+                            "products": {"rows": 50.0, "data_bytes": 8192.0, "index_bytes": 8192.0}},
+                 "logs": {"wal": 501000.0, "binlog": 10.0}}
+        report = StorageGrowth.compare(before, after)
+        
+        self.assertTrue(report["success"])
+        self.assertEqual([table["table"] for table in report["tables"]], ["users"])
+        users = report["tables"][0]
+        self.assertEqual(users["rows_added"], 1000.0)
+        self.assertAlmostEqual(users["bytes_per_row"], 250.0)
+        self.assertAlmostEqual(users["index_overhead"], 0.25)
+        self.assertAlmostEqual(users["log_bytes_per_row"], 500.0)
+        # A log missing from the before snapshot cannot be compared
+        self.assertEqual(report["logs"], {"wal": 500000.0})
+    
+    def test_snapshots_through_manager(self):
+        """Test start and stop snapshot the manager's tables and logs"""
+        manager = MagicMock(db_type="postgresql")
+        manager.table_storage.side_effect = [
+            {"orders": {"rows": 0.0, "data_bytes": 0.0, "index_bytes": 8192.0}},
+            {"orders": {"rows": 10.0, "data_bytes": 8192.0, "index_bytes": 16384.0}}
+        ]
+        manager.log_bytes.side_effect = [{"wal": 0.0}, {"wal": 4096.0}]
+        
+        report = StorageGrowth(manager, ["orders"]).start().stop()
+        
+        manager.table_storage.assert_called_with(["orders"])
+        self.assertEqual(report["database"], "postgresql")
+        self.assertEqual(report["rows_added"], 10.0)
+        self.assertAlmostEqual(report["tables"][0]["bytes_per_row"], 1638.4)
+        self.assertAlmostEqual(report["log_bytes_per_row"], 409.6)
+        self.assertEqual(StorageGrowth(manager).tables, Config.get_all_tables())
+    
+    def test_unsupported_database(self):
+        """Test a manager without size statistics reports an error"""
+        report = StorageGrowth.compare({"tables": {}, "logs": {}}, {"tables": {}, "logs": {}})
+        
+        self.assertFalse(report["success"])
+        self.assertIsNone(report["log_bytes_per_row"])
+        self.assertIn("not available", report["error"])
+    
+    def test_mysql_sizes_and_logs(self):
+        """Test MySQL sizes come from information_schema after ANALYZE TABLE, logs from redo and binlog"""
+        from core.database import MySQLManager
+        
+        manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[("testdb.users", "analyze", "status", "OK")],
+                                       [("users", 16384, 32768)], [(120,)],
+                                       [("Innodb_os_log_written", "5000")],
+                                       [("binlog.000001", 100, "No"), ("binlog.000002", 50, "No")]]
+        manager.connection = MagicMock()
+        manager.connection.cursor.return_value = cursor
+        
+        self.assertEqual(manager.table_storage(["users"]),
+                         {"users": {"rows": 120.0, "data_bytes": 16384.0, "index_bytes": 32768.0}})
+        self.assertEqual(manager.log_bytes(), {"redo": 5000.0, "binlog": 150.0})
+        queries = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertTrue(queries[0].startswith("ANALYZE TABLE `users`"))
+
+
+class TestMetricsExporter(unittest.TestCase):
+    """Test Prometheus Metrics Exporter"""
+    
+    def test_error_classes(self):
+        """Test driver exceptions and error messages map to error classes"""
+        deadlock = Exception("deadlock detected")
+        deadlock.pgcode = "40P01"
+        self.assertEqual(error_class(deadlock), "deadlock")
+        self.assertEqual(error_class("(1040, 'Too many connections')"), "throttling")
+        self.assertEqual(error_class("(1062, \"Duplicate entry '5' for key 'PRIMARY'\")"), "duplicate_key")
+        self.assertEqual(error_class("(1205, 'Lock wait timeout exceeded')"), "lock_timeout")
+        self.assertEqual(error_class("syntax error at or near"), "other")
+        self.assertEqual(error_class(None), "other")
+    
+    def test_per_worker_counters(self):
+        """Test each thread records into its own counters and a scrape sums them"""
+        exporter = MetricsExporter(buckets=[0.001, 0.01])
+        
+        def work():
+            for _ in range(100):
+                exporter.record("users", "insert", 0.005)
+            exporter.record_error("users", "insert", "Duplicate entry")
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = exporter.collect()
+        
+        self.assertEqual(metrics["workers"], 4)
+        self.assertEqual(metrics["rows"][("users", "insert")], 400)
+        self.assertEqual(metrics["statements"][("users", "insert")], 404)
+        self.assertEqual(metrics["errors"][("users", "insert", "duplicate_key")], 4)
+        self.assertEqual(metrics["latency"][("users", "insert")][:3], [0, 400, 0])
+        
+        text = exporter.render()
+        self.assertIn('datagen_statement_duration_seconds_bucket{table="users",operation="insert",le="0.001"} 0', text)
+        self.assertIn('datagen_statement_duration_seconds_bucket{table="users",operation="insert",le="+Inf"} 400', text)
+        self.assertIn('datagen_errors_total{table="users",operation="insert",error="duplicate_key"} 4', text)
+    
+    def test_gauges(self):
+        """Test gauges are evaluated on scrape and cleared with the run"""
+        exporter = MetricsExporter()
+        exporter.gauge("target_rate", lambda: 100)
+        exporter.gauge("queue_depth", lambda: 1 / 0)
+        text = exporter.render()
+        
+        self.assertIn("datagen_target_rate 100", text)
+        self.assertNotIn("datagen_queue_depth", text)
+        exporter.clear_gauges()
+        self.assertNotIn("target_rate", exporter.render())
+    
+    def test_gauges_per_session(self):
+        """Test labelled gauges of one session are cleared without touching another's"""
+        exporter = MetricsExporter()
+        exporter.gauge("queue_depth", lambda: 3, labels={"session": "a"})
+        exporter.gauge("queue_depth", lambda: 5, labels={"session": "b"})
+        text = exporter.render()
+        
+        self.assertEqual(text.count("# TYPE datagen_queue_depth gauge"), 1)
+        self.assertIn('datagen_queue_depth{session="a"} 3', text)
+        exporter.clear_gauges(session="a")
+        text = exporter.render()
+        self.assertNotIn('session="a"', text)
+        self.assertIn('datagen_queue_depth{session="b"} 5', text)
+    
+    def test_http_endpoint(self):
+        """Test the endpoint serves Prometheus text, or OpenMetrics when asked"""
+        import urllib.request
+        
+        exporter = MetricsExporter(port=0).start()
+        try:
+            exporter.record("orders", "update", 0.02, rows=1)
+            with urllib.request.urlopen(exporter.url, timeout=5) as response:
+                self.assertIn("version=0.0.4", response.headers["Content-Type"])
+                text = response.read().decode()
+            request = urllib.request.Request(exporter.url, headers={"Accept": "application/openmetrics-text"})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                openmetrics = response.read().decode()
+        finally:
+            exporter.stop()
+        
+        self.assertFalse(exporter.running)
+        self.assertIn("# TYPE datagen_rows_total counter", text)
+        self.assertIn('datagen_rows_total{table="orders",operation="update"} 1', text)
+        self.assertIn("# TYPE datagen_rows counter", openmetrics)
+        self.assertTrue(openmetrics.endswith("# EOF\n"))
+    
+    def test_async_workload_exports(self):
+        """Test the async engine counts operations on the exporter"""
+        from core.database import MySQLManager
+        
+        manager = MySQLManager({"db_type": "mysql", "database": {"host": "db", "port": 3306}, "ssh": {"enabled": False}})
+        exporter = MetricsExporter()
+        result = AsyncWorkload(manager, "users", operation_count=50, concurrency=5, connections=2,
+                               driver=FakeAsyncDriver(), exporter=exporter).run()
+        
+        self.assertEqual(result["operations"], 50)
+        self.assertEqual(exporter.collect()["statements"][("users", "insert")], 50)
+
+
+class TestRunReport(unittest.TestCase):
+    """Test Run Reports"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.manager = MagicMock()
+        self.manager.db_type = "postgresql"
+        self.manager.config = {"db_type": "postgresql", "database": {"host": "db", "password": "secret"},
+                               "ssh": {"enabled": True, "password": "", "key_file": "/root/.ssh/id"}}
+    
+    def test_redact(self):
+        """Test secrets are masked and the settings left untouched"""
+        masked = redact(self.manager.config)
+        
+        self.assertEqual(masked["database"], {"host": "db", "password": "***"})
+        self.assertEqual(masked["ssh"]["password"], "")
+        self.assertEqual(masked["ssh"]["key_file"], "***")
+        self.assertEqual(self.manager.config["database"]["password"], "secret")
+    
+    def test_statement_run(self):
+        """Test a statement-by-statement run is summarized from its live statistics"""
+        report = RunReport({"operation": "mixed", "table": "users", "batch_size": 20}, self.manager)
+        op_stats = OperationStats()
+        timeline = WindowedStats(window=1)
+        histograms = OperationHistograms()
+        for _ in range(8):
+            op_stats.record("insert", 1, 0.002)
+            timeline.record(0.002)
+            histograms.record("users", "insert", 0.002)
+        op_stats.record_error("update")
+        histograms.record_error("users", "update")
+        data = report.finish(op_stats=op_stats, timeline=timeline, histograms=histograms,
+                             error_classes={"deadlock": 1})
+        
+        self.assertTrue(report.run_id.endswith("-mixed-users"))
+        self.assertNotEqual(RunReport({"operation": "mixed"}).run_id, RunReport({"operation": "mixed"}).run_id)
+        self.assertEqual(data["database"], "postgresql")
+        self.assertEqual(data["config"]["connection"]["database"]["password"], "***")
+        self.assertEqual(data["summary"]["operations"], 8)
+        self.assertEqual(data["summary"]["errors"], 1)
+        self.assertFalse(data["summary"]["success"])
+        self.assertEqual(data["errors"]["by_operation"], {"update": 1})
+        self.assertEqual(data["errors"]["by_class"], {"deadlock": 1})
+        self.assertEqual(sum(window["operations"] for window in data["timeline"]), 8)
+        self.assertEqual({entry["operation"] for entry in data["latency"]}, {"insert", "update"})
+    
+    def test_workload_run(self):
+        """Test a workload result is summarized, with the user timeline and error counts"""
+        result = {"success": True, "table": "users", "duration": 10.0, "throughput": 5.0, "error": None,
+                  "operations_by_kind": {"point_lookup": {"count": 50, "errors": 0, "rows": 50, "p95_ms": 2.0}},
+                  "timeline": [{"elapsed": 0.0, "users": 1, "operations": 0},
+                               {"elapsed": 2.0, "users": 2, "operations": 10},
+                               {"elapsed": 4.0, "users": 2, "operations": 30}],
+                  "errors": {"deadlock": 0, "lock_timeout": 2}}
+        data = RunReport({"operation": "users", "table": "users"}).finish(result=result)
+        
+        self.assertTrue(data["summary"]["success"])
+        self.assertEqual(data["summary"]["throughput"], 5.0)
+        self.assertEqual(data["latency"][0]["operation"], "point_lookup")
+        self.assertEqual([window["throughput"] for window in data["timeline"]], [5.0, 10.0])
+        self.assertEqual(data["timeline_window"], 2.0)
+        self.assertEqual(data["errors"]["by_class"], {"lock_timeout": 2})
+        self.assertIs(data["workload"], result)
+    
+    def test_resources_from_run(self):
+        """Test only resource samples taken since the run started are kept"""
+        sampler = MagicMock()
+        sampler.started = time.monotonic() - 10
+        sampler.history.return_value = [{"elapsed": 5.0, "cpu_percent": 90.0, "process_rss_mb": 50.0},
+                                        {"elapsed": 11.0, "cpu_percent": 20.0, "process_rss_mb": 60.0}]
+        data = RunReport({"operation": "insert"}).finish(op_stats=OperationStats(), sampler=sampler)
+        
+        self.assertEqual(len(data["resources"]["samples"]), 1)
+        self.assertEqual(data["resources"]["cpu_percent_max"], 20.0)
+        self.assertEqual(data["resources"]["process_rss_mb_max"], 60.0)
+    
+    def test_save(self):
+        """Test the report is written as JSON, and as HTML when asked"""
+        import json
+        import tempfile
+        
+        report = RunReport({"operation": "insert", "table": "orders"}, self.manager)
+        op_stats = OperationStats()
+        op_stats.record("insert", 1, 0.001)
+        report.finish(op_stats=op_stats)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = report.save(directory, html_report=True)
+            with open(paths[0], encoding="utf-8") as handle:
+                saved = json.load(handle)
+            with open(paths[1], encoding="utf-8") as handle:
+                page = handle.read()
+        
+        self.assertEqual([os.path.splitext(path)[1] for path in paths], [".json", ".html"])
+        self.assertEqual(saved["id"], report.run_id)
+        self.assertEqual(saved["summary"]["operations"], 1)
+        self.assertIn(report.run_id, page)
+        self.assertNotIn("secret", page)
+    
+    def test_cli_load_manager(self):
+        """Test the headless runner builds a manager from a connection file"""
+        import json
+        import tempfile
+        from cli import build_parser, load_manager
+        from core.database import PostgreSQLManager
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "connection.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"db_type": "postgresql", "database": {"host": "db", "port": 5432}}, handle)
+            manager = load_manager(path)
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"db_type": "oracle"}, handle)
+            with self.assertRaises(ValueError):
+                load_manager(path)
+        
+        self.assertIsInstance(manager, PostgreSQLManager)
+        args = build_parser().parse_args(["run", "--connection", path, "--table", "users", "--operation", "ycsb"])
+        self.assertEqual((args.operation, args.preset, args.rate), ("ycsb", "A", None))
+
+
+class TestRunHistory(unittest.TestCase):
+    """Test Run History and Regression Checks"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        import tempfile
+        
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Remove the report directory"""
+        import shutil
+        
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def make_report(self, run_id, throughputs, latency_ms, errors=0):
+        """Archived run report with one one-second window per throughput value, latency rising by window"""
+        stats, timeline = OperationStats(), WindowedStats(window=1.0, started=0.0)
+        for index, value in enumerate(throughputs):
+            seconds = (latency_ms + index % 3) / 1000
+            for _ in range(int(value)):
+                stats.record("insert", 1, seconds)
+                timeline.record(seconds, now=index + 0.5)
+        for _ in range(errors):
+            stats.record_error("insert")
+        
+        report = RunReport({"operation": "insert", "table": "users", "database": "mysql"})
+        report.started_at = datetime.strptime(run_id[:22], "%Y%m%d-%H%M%S-%f").replace(tzinfo=timezone.utc)
+        report.finish({"duration": float(len(throughputs))}, op_stats=stats, timeline=timeline)
+        report.save(self.directory)
+        self.assertEqual(report.data["id"], run_id)
+        return report.data
+    
+    def test_mann_whitney(self):
+        """Test the rank test separates shifted samples and not identical ones"""
+        self.assertLess(mann_whitney([10, 11, 12, 13, 14, 15], [20, 21, 22, 23, 24, 25]), 0.01)
+        self.assertGreater(mann_whitney([10, 12, 14, 16], [11, 13, 15, 17]), 0.5)
+        self.assertEqual(mann_whitney([5, 5, 5], [5, 5, 5]), 1.0)
+        self.assertIsNone(mann_whitney([], [1.0]))
+    
+    def test_regression_detected(self):
+        """Test a significant throughput drop and latency increase are regressions"""
+        baseline = self.make_report("20260101-000000-000000-insert-users", [100, 102, 98, 101, 99, 100], 10.0)
+        candidate = self.make_report("20260102-000000-000000-insert-users", [80, 82, 79, 81, 80, 78], 15.0)
+        comparison = compare_runs(baseline, candidate)
+        
+        self.assertTrue(comparison["regressed"])
+        regressed = {(check["metric"], check["operation"]) for check in comparison["regressions"]}
+        self.assertIn(("throughput", None), regressed)
+        self.assertIn(("p95_ms", "users.insert"), regressed)
+        self.assertFalse(compare_runs(candidate, baseline)["regressed"])
+        self.assertEqual(comparison["warnings"], [])
+    
+    def test_noise_is_not_a_regression(self):
+        """Test drops within the threshold, under the latency floor or without significance pass"""
+        baseline = self.make_report("20260101-000000-000000-insert-users", [100, 102, 98, 101, 99, 100], 1.0)
+        candidate = self.make_report("20260102-000000-000000-insert-users", [98, 100, 97, 99, 98, 99], 1.2)
+        self.assertFalse(compare_runs(baseline, candidate)["regressed"])
+        
+        # A large drop in the mean that one outlier window causes is not significant
+        noisy = self.make_report("20260103-000000-000000-insert-users", [100, 101, 99, 102, 100, 1], 1.0)
+        check = compare_runs(baseline, noisy)["checks"][0]
+        self.assertGreater(check["p_value"], 0.05)
+        self.assertFalse(check["regression"])
+        self.assertTrue(compare_runs(baseline, noisy, {"min_windows": 10})["checks"][0]["regression"])
+    
+    def test_error_rate(self):
+        """Test a higher error rate is a regression"""
+        baseline = self.make_report("20260101-000000-000000-insert-users", [100] * 6, 1.0)
+        candidate = self.make_report("20260102-000000-000000-insert-users", [100] * 6, 1.0, errors=60)
+        regressions = compare_runs(baseline, candidate)["regressions"]
+        self.assertEqual([check["metric"] for check in regressions], ["error_rate"])
+    
+    def test_history_and_baseline(self):
+        """Test runs are listed in order, referenced by name and pinned"""
+        self.make_report("20260102-000000-000000-insert-users", [100] * 6, 1.0)
+        self.make_report("20260101-000000-000000-insert-users", [100] * 6, 1.0)
+        history = RunHistory(self.directory)
+        
+        self.assertEqual(history.ids(), ["20260101-000000-000000-insert-users", "20260102-000000-000000-insert-users"])
+        self.assertIsNone(history.baseline)
+        with self.assertRaises(ValueError):
+            history.load("baseline")
+        self.assertEqual(history.pin("previous"), "20260101-000000-000000-insert-users")
+        self.assertEqual(history.load("baseline")["id"], "20260101-000000-000000-insert-users")
+        self.assertEqual(history.load("latest")["id"], "20260102-000000-000000-insert-users")
+        self.assertEqual([run["baseline"] for run in history.runs()], [True, False])
+        self.assertEqual(history.compare()["candidate"], "20260102-000000-000000-insert-users")
+        with self.assertRaises(ValueError):
+            history.load("20250101-000000-missing")
+        history.unpin()
+        self.assertIsNone(history.baseline)
+    
+    def test_cli_compare_exit_code(self):
+        """Test the compare command exits non-zero on a regression"""
+        import io
+        from contextlib import redirect_stdout
+        from cli import main
+        
+        self.make_report("20260101-000000-000000-insert-users", [100, 102, 98, 101, 99, 100], 10.0)
+        self.make_report("20260102-000000-000000-insert-users", [80, 82, 79, 81, 80, 78], 15.0)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(["history", "--report-dir", self.directory, "--pin", "previous"]), 0)
+            self.assertEqual(main(["compare", "--report-dir", self.directory]), 1)
+            self.assertEqual(main(["compare", "latest", "previous", "--report-dir", self.directory]), 0)
+            self.assertEqual(main(["compare", "--report-dir", self.directory, "--throughput-drop", "0.5",
+                                   "--latency-increase", "1.0"]), 0)
+        self.assertIn("REGRESSION", output.getvalue())
+    
+    def test_cli_builds_contention_workloads(self):
+        """Test the run command builds the lock, deadlock and transactions workloads as the page does"""
+        from cli import build_parser, contention_workload
+        from core.workloads import DeadlockWorkload, LockContentionWorkload, OrderTransactionWorkload
+        
+        manager = MagicMock()
+        manager.fetch_keys.side_effect = lambda table, limit=None: [f"{table}-{i}" for i in range(limit)]
+        parser = build_parser()
+        
+        def build(*options):
+            args = parser.parse_args(["run", "--connection", "connection.json", "--table", "users", *options])
+            return contention_workload(manager, args)
+        
+        lock = build("--operation", "lock", "--sessions", "3", "--hot-keys", "4", "--hold-time", "0")
+        self.assertIsInstance(lock, LockContentionWorkload)
+        self.assertEqual((lock.sessions, len(lock.keys), lock.hold_time), (3, 4, 0))
+        self.assertEqual(lock.duration, Config.WORKLOADS["lock"]["duration"])
+        
+        deadlock = build("--operation", "deadlock", "--pairs", "2", "--duration", "5", "--max-retries", "1")
+        self.assertIsInstance(deadlock, DeadlockWorkload)
+        self.assertEqual((deadlock.sessions, len(deadlock.keys), deadlock.duration), (4, 4, 5))
+        self.assertEqual(deadlock.max_retries, 1)
+        
+        transactions = build("--operation", "transactions", "--sessions", "2")
+        self.assertIsInstance(transactions, OrderTransactionWorkload)
+        self.assertEqual(transactions.sessions, 2)
+        self.assertEqual(transactions.product_keys[0], "products-0")
 
 
 class TestMultiCoreGenerator(unittest.TestCase):
@@ -260,6 +2428,14 @@ class TestPerformanceMonitor(unittest.TestCase):
         self.assertGreaterEqual(cpu, 0.0)
         self.assertLessEqual(cpu, 100.0)
     
+    def test_cpu_calls_do_not_block(self):
+        """Test CPU usage calls return immediately"""
+        start = time.perf_counter()
+        PerformanceMonitor.get_cpu_usage()
+        cores = PerformanceMonitor.get_cpu_per_core()
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(len(cores), PerformanceMonitor.get_system_info()["cpu_count"])
+    
     def test_get_memory_usage(self):
         """Test memory usage monitoring"""
         mem = PerformanceMonitor.get_memory_usage()
@@ -472,6 +2648,57 @@ class TestDatabaseManagers(unittest.TestCase):
         
         manager = MongoDBManager(config)
         self.assertEqual(manager.db_type, "mongodb")
+    
+    def test_execute_stream_commits_periodically(self):
+        """Test streamed execution commits every N statements"""
+        from core.database import MySQLManager
+        
+        manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        manager.connection = MagicMock()
+        manager.connection.cursor.return_value.rowcount = 1
+        
+        with patch.object(manager, "ensure_connection"):
+            generator = SQLDataGenerator(seed=42)
+            result = manager.execute_stream(generator.iter_batch("user", 25, "insert", chunk_size=10), commit_every=10)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["executed"], 25)
+        self.assertEqual(result["affected_rows"], 25)
+        self.assertEqual(manager.connection.commit.call_count, 3)
+    
+    def test_execute_stream_rolls_back_on_error(self):
+        """Test streamed execution reports committed count on failure"""
+        from core.database import PostgreSQLManager
+        
+        manager = PostgreSQLManager({"db_type": "postgresql", "database": {}, "ssh": {"enabled": False}})
+        manager.connection = MagicMock()
+        cursor = manager.connection.cursor.return_value
+        cursor.rowcount = 1
+        cursor.execute.side_effect = [None, None, Exception("duplicate key")]
+        
+        with patch.object(manager, "ensure_connection"):
+            result = manager.execute_stream(["SELECT 1", "SELECT 1", "SELECT 1"], commit_every=2)
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["executed"], 2)
+        self.assertIn("duplicate key", result["error"])
+        manager.connection.rollback.assert_called_once()
+    
+    def test_execute_query_rows_returned(self):
+        """Test SELECT results are drained and counted"""
+        from core.database import MySQLManager
+        
+        manager = MySQLManager({"db_type": "mysql", "database": {}, "ssh": {"enabled": False}})
+        manager.connection = MagicMock()
+        cursor = manager.connection.cursor.return_value
+        cursor.description = (("id",),)
+        cursor.fetchall.return_value = [("a",), ("b",)]
+        
+        with patch.object(manager, "ensure_connection"):
+            result = manager.execute_query("SELECT id FROM users")
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["rows_returned"], 2)
 
 
 def run_tests():
@@ -483,6 +2710,26 @@ def run_tests():
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestConfig))
     suite.addTests(loader.loadTestsFromTestCase(TestSQLDataGenerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestSQLWriter))
+    suite.addTests(loader.loadTestsFromTestCase(TestValuePools))
+    suite.addTests(loader.loadTestsFromTestCase(TestUniqueValues))
+    suite.addTests(loader.loadTestsFromTestCase(TestKeyRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestKeyTracker))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccessDistributions))
+    suite.addTests(loader.loadTestsFromTestCase(TestContentionWorkloads))
+    suite.addTests(loader.loadTestsFromTestCase(TestYCSBWorkloads))
+    suite.addTests(loader.loadTestsFromTestCase(TestVirtualUsers))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoadShapes))
+    suite.addTests(loader.loadTestsFromTestCase(TestParameterSweep))
+    suite.addTests(loader.loadTestsFromTestCase(TestAdaptiveBatching))
+    suite.addTests(loader.loadTestsFromTestCase(TestLatencyHistograms))
+    suite.addTests(loader.loadTestsFromTestCase(TestSystemSampler))
+    suite.addTests(loader.loadTestsFromTestCase(TestServerMetrics))
+    suite.addTests(loader.loadTestsFromTestCase(TestStorageGrowth))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetricsExporter))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunReport))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunHistory))
     suite.addTests(loader.loadTestsFromTestCase(TestMultiCoreGenerator))
     suite.addTests(loader.loadTestsFromTestCase(TestPerformanceMonitor))
     suite.addTests(loader.loadTestsFromTestCase(TestValidators))